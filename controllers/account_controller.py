@@ -18,6 +18,7 @@ from consts.notification_type import NotificationType
 
 from helpers.event_helper import EventHelper
 from helpers.match_helper import MatchHelper
+from helpers.model_summary_helper import ModelSummaryHelper
 from helpers.mytba_helper import MyTBAHelper
 from helpers.notification_helper import NotificationHelper
 from helpers.validation_helper import ValidationHelper
@@ -217,7 +218,7 @@ class MyTBAController(LoggedInHandler):
         self._require_registration()
 
         user = self.user_bundle.account.key
-        favorites = Favorite.query(ancestor=user).fetch()
+        favorites = Favorite.query(ancestor=user).fetch(projection=[Favorite.model_key, Favorite.model_type])
         subscriptions = Subscription.query(ancestor=user).fetch()
 
         team_keys = set()
@@ -263,19 +264,22 @@ class MyTBAController(LoggedInHandler):
                 elif type(item) == Subscription:
                     event_subs[item.model_key] = item
 
-        team_futures = ndb.get_multi_async(team_keys)
-        event_futures = ndb.get_multi_async(event_keys)
-        match_futures = ndb.get_multi_async(match_keys)
-        match_event_futures = ndb.get_multi_async(match_event_keys)
+        # Only what the page shows, from summaries
+        team_keys = list(team_keys)
+        event_keys = list(event_keys)
+        match_event_keys = list(match_event_keys)
+        summaries = ModelSummaryHelper.get_summaries(team_keys + event_keys + match_event_keys)
+        event_summaries = summaries[len(team_keys):len(team_keys) + len(event_keys)]
+        match_events = summaries[len(team_keys) + len(event_keys):]
 
-        teams = sorted([team_future.get_result() for team_future in team_futures], key=lambda x: x.team_number)
+        teams = sorted(summaries[:len(team_keys)], key=lambda x: x.team_number)
         team_fav_subs = []
         for team in teams:
             fav = team_fav.get(team.key.id(), None)
             subs = team_subs.get(team.key.id(), None)
             team_fav_subs.append((team, fav, subs))
 
-        events += [event_future.get_result() for event_future in event_futures]
+        events += event_summaries
         EventHelper.sort_events(events)
 
         event_fav_subs = []
@@ -284,8 +288,7 @@ class MyTBAController(LoggedInHandler):
             subs = event_subs.get(event.key.id(), None)
             event_fav_subs.append((event, fav, subs))
 
-        matches = [match_future.get_result() for match_future in match_futures]
-        match_events = [match_event_future.get_result() for match_event_future in match_event_futures]
+        matches = filter(None, [ModelSummaryHelper.match_summary(match_key) for match_key in match_keys])
         MatchHelper.natural_sort_matches(matches)
 
         match_fav_subs_by_event = {}
@@ -23,6 +23,8 @@ from helpers.district_manipulator import DistrictManipulator
 from helpers.district_team_manipulator import DistrictTeamManipulator
 from helpers.event_manipulator import EventManipulator
 from helpers.event_team_manipulator import EventTeamManipulator
+from helpers.geo_index_helper import GeoIndexHelper
+from helpers.location_helper import LocationHelper
 from helpers.match_helper import MatchHelper
 from helpers.notification_sender import NotificationSender
 from helpers.search_helper import SearchHelper
@@ -521,13 +523,47 @@ class AdminUpdateAllTeamSearchIndexEnqueue(LoggedInHandler):
 
 
 class AdminUpdateAllTeamSearchIndexDo(LoggedInHandler):
+    """
+    Indexes a page of teams, then enqueues itself with a cursor for the next page
+    """
+    TEAMS_PER_TASK = 50
+
     def get(self):
-        team_keys = Team.query().fetch(keys_only=True)
-        for team_key in team_keys:
+        cursor = self.request.get('cursor')
+        start_cursor = ndb.Cursor(urlsafe=cursor) if cursor else None
+        teams, next_cursor, more = Team.query().order(Team.key).fetch_page(
+            self.TEAMS_PER_TASK, start_cursor=start_cursor)
+
+        SearchHelper.update_team_awards_index_multi(teams)
+
+        if more and next_cursor:
             taskqueue.add(
                 queue_name='search-index-update',
-                url='/tasks/do/update_team_search_index/' + team_key.id(),
+                url='/tasks/do/update_all_team_search_index?cursor={}'.format(next_cursor.urlsafe()),
                 method='GET')
+        self.response.out.write("Indexed {} teams".format(len(teams)))
+
+
+class AdminRebuildGeoIndexDo(LoggedInHandler):
+    """
+    Rebuilds the GeoIndexEntries used by NearbyController for a year
+    """
+    def get(self, year):
+        year = int(year)
+        team_index = GeoIndexHelper.rebuild_team_index(year)
+        event_index = GeoIndexHelper.rebuild_event_index(year)
+        self.response.out.write("Indexed {} teams and {} events in {}".format(
+            len(team_index.points), len(event_index.points), year))
+
+
+class AdminLocationCacheCleanupDo(LoggedInHandler):
+    """
+    Deletes expired LocationCacheEntries, like those of one-off nearby searches
+    """
+    def get(self):
+        count = LocationHelper.delete_expired_location_results()
+        logging.info("Removed {} expired location cache entries".format(count))
+        self.response.out.write("Removed {} expired location cache entries".format(count))
 
 
 class AdminUpdateTeamSearchIndexDo(LoggedInHandler):
@@ -5,6 +5,7 @@ import json
 import time
 
 import datetime
+import webapp2
 
 from base_controller import CacheableHandler, LoggedInHandler
 from consts.client_type import ClientType
@@ -14,6 +15,7 @@ from google.appengine.ext import ndb
 from google.appengine.ext.webapp import template
 from helpers.model_to_dict import ModelToDict
 from helpers.mytba_helper import MyTBAHelper
+from helpers.typeahead_helper import TypeaheadHelper
 from models.account import Account
 from models.api_auth_access import ApiAuthAccess
 from models.event import Event
@@ -170,10 +172,8 @@ class LiveEventHandler(CacheableHandler):
 
 class TypeaheadHandler(CacheableHandler):
     """
-    Currently just returns a list of all teams and events
-    Needs to be optimized at some point.
-    Tried a trie but the datastructure was too big to
-    fit into memcache efficiently
+    Returns the whole list of teams or events for a search key.
+    See TypeaheadSearchHandler for prefix queries against the same data.
     """
     CACHE_VERSION = 2
     CACHE_KEY_FORMAT = "typeahead_entries:{}"  # (search_key)
@@ -199,6 +199,31 @@ class TypeaheadHandler(CacheableHandler):
             return entry.data_json
 
 
+class TypeaheadSearchHandler(webapp2.RequestHandler):
+    """
+    Returns the top matches for a query prefix from a typeahead entry,
+    using an in-memory prefix index instead of sending the whole entry
+    """
+    DEFAULT_LIMIT = 10
+    MAX_LIMIT = 50
+    CACHE_HEADER_LENGTH = 60 * 60
+
+    def get(self, search_key, query):
+        search_key = urllib2.unquote(search_key)
+        if not TypeaheadHelper.is_search_key(search_key):
+            self.abort(404)
+        query = urllib2.unquote(query).decode('utf-8', 'ignore')
+        try:
+            limit = min(int(self.request.get('limit', self.DEFAULT_LIMIT)), self.MAX_LIMIT)
+        except ValueError:
+            limit = self.DEFAULT_LIMIT
+
+        self.response.headers['content-type'] = 'application/json; charset="utf-8"'
+        self.response.headers['Cache-Control'] = "public, max-age=%d" % self.CACHE_HEADER_LENGTH
+        self.response.headers['Pragma'] = 'Public'
+        self.response.out.write(json.dumps(TypeaheadHelper.search(search_key, query, max(limit, 0))))
+
+
 class WebcastHandler(CacheableHandler):
     """
     Returns the HTML necessary to generate the webcast embed for a given event
@@ -12,7 +12,7 @@ from database.event_query import DistrictEventsQuery
 from google.appengine.ext import ndb
 
 from database.team_query import DistrictTeamsQuery
-from helpers.district_helper import DistrictHelper
+from helpers.district_points_table import DistrictPointsTable
 from helpers.event_helper import EventHelper
 from helpers.model_to_dict import ModelToDict
 from models import team
@@ -126,7 +126,7 @@ class ApiDistrictRankingsController(ApiDistrictControllerBase):
             return json.dumps([], ensure_ascii=True)
         EventHelper.sort_events(events)
 
-        team_totals = DistrictHelper.calculate_rankings(events, district_teams_future.get_result(), self.year)
+        team_totals = DistrictPointsTable.from_district_points(events).rankings(district_teams_future.get_result(), self.year)
 
         rankings = []
 
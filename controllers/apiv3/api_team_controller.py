@@ -9,9 +9,10 @@ from database.award_query import TeamAwardsQuery, TeamYearAwardsQuery, TeamEvent
 from database.event_query import TeamEventsQuery, TeamYearEventsQuery
 from database.match_query import TeamEventMatchesQuery, TeamYearMatchesQuery
 from database.media_query import TeamYearMediaQuery, TeamSocialMediaQuery
-from database.team_query import TeamQuery, TeamListQuery, TeamListYearQuery, TeamParticipationQuery, TeamDistrictsQuery
+from database.team_query import TeamQuery, TeamParticipationQuery, TeamDistrictsQuery
 from database.robot_query import TeamRobotsQuery
 from helpers.event_team_status_helper import EventTeamStatusHelper
+from helpers.team_list_summary_helper import TeamListSummaryHelper
 from models.event_team import EventTeam
 from models.team import Team
 
@@ -37,10 +38,8 @@ class ApiTeamListController(ApiBaseController):
         self._track_call_defer(action, page_num)
 
     def _render(self, page_num, year=None, model_type=None):
-        if year is None:
-            team_list, self._last_modified = TeamListQuery(int(page_num)).fetch(dict_version=3, return_updated=True)
-        else:
-            team_list, self._last_modified = TeamListYearQuery(int(year), int(page_num)).fetch(dict_version=3, return_updated=True)
+        team_list, self._last_modified = TeamListSummaryHelper.get_page(
+            int(page_num), int(year) if year is not None else None)
         if model_type is not None:
             team_list = filter_team_properties(team_list, model_type)
         return json.dumps(team_list, ensure_ascii=True, indent=2, sort_keys=True)
@@ -18,6 +18,7 @@ from google.appengine.ext import webapp
 from google.appengine.ext.webapp import template
 
 from helpers.award_manipulator import AwardManipulator
+from helpers.bulk_job_helper import BULK_JOBS, EventsCSVBackupJob
 from helpers.event_manipulator import EventManipulator
 from helpers.event_details_manipulator import EventDetailsManipulator
 from helpers.match_manipulator import MatchManipulator
@@ -36,90 +37,54 @@ from datafeeds.offseason_matches_parser import OffseasonMatchesParser
 
 class TbaCSVBackupEventsEnqueue(webapp.RequestHandler):
     """
-    Enqueues CSV backup
+    Starts the paginated CSV backup of every event, or of one year's events
     """
     def get(self, year=None):
-        if year is None:
-            years = range(1992, datetime.datetime.now().year + 1)
-            for y in years:
-                taskqueue.add(
-                    url='/tasks/enqueue/csv_backup_events/{}'.format(y),
-                    method='GET')
-            self.response.out.write("Enqueued backup for years: {}".format(years))
-        else:
-            event_keys = Event.query(Event.year == int(year)).fetch(None, keys_only=True)
-
-            for event_key in event_keys:
-                taskqueue.add(
-                    url='/tasks/do/csv_backup_event/{}'.format(event_key.id()),
-                    method='GET')
-
-            template_values = {'event_keys': event_keys}
-            path = os.path.join(os.path.dirname(__file__), '../templates/backup/csv_backup_enqueue.html')
-            self.response.out.write(template.render(path, template_values))
+        job = EventsCSVBackupJob({'year': year} if year else None)
+        job.start()
+        self.response.out.write("Started {}".format(job.job_id))
 
 
 class TbaCSVBackupEventDo(webapp.RequestHandler):
     """
     Backs up event awards, matches, team list, rankings, and alliance selection order
     """
-
-    AWARDS_FILENAME_PATTERN = '/tbatv-prod-hrd.appspot.com/tba-data-backup/events/{}/{}/{}_awards.csv'  # % (year, event_key, event_key)
-    MATCHES_FILENAME_PATTERN = '/tbatv-prod-hrd.appspot.com/tba-data-backup/events/{}/{}/{}_matches.csv'  # % (year, event_key, event_key)
-    TEAMS_FILENAME_PATTERN = '/tbatv-prod-hrd.appspot.com/tba-data-backup/events/{}/{}/{}_teams.csv'  # % (year, event_key, event_key)
-    RANKINGS_FILENAME_PATTERN = '/tbatv-prod-hrd.appspot.com/tba-data-backup/events/{}/{}/{}_rankings.csv'  # % (year, event_key, event_key)
-    ALLIANCES_FILENAME_PATTERN = '/tbatv-prod-hrd.appspot.com/tba-data-backup/events/{}/{}/{}_alliances.csv'  # % (year, event_key, event_key)
-
     def get(self, event_key):
         event = Event.get_by_id(event_key)
+        EventsCSVBackupJob.backup_event(event)
 
-        event.prepAwardsMatchesTeams()
-
-        if event.awards:
-            with cloudstorage.open(self.AWARDS_FILENAME_PATTERN.format(event.year, event_key, event_key), 'w') as awards_file:
-                writer = csv.writer(awards_file, delimiter=',')
-                for award in event.awards:
-                    for recipient in award.recipient_list:
-                        team = recipient['team_number']
-                        if type(team) == int:
-                            team = 'frc{}'.format(team)
-                        self._writerow_unicode(writer, [award.key.id(), award.name_str, team, recipient['awardee']])
-
-        if event.matches:
-            with cloudstorage.open(self.MATCHES_FILENAME_PATTERN.format(event.year, event_key, event_key), 'w') as matches_file:
-                writer = csv.writer(matches_file, delimiter=',')
-                for match in event.matches:
-                    red_score = match.alliances['red']['score']
-                    blue_score = match.alliances['blue']['score']
-                    self._writerow_unicode(writer, [match.key.id()] + match.alliances['red']['teams'] + match.alliances['blue']['teams'] + [red_score, blue_score])
-
-        if event.teams:
-            with cloudstorage.open(self.TEAMS_FILENAME_PATTERN.format(event.year, event_key, event_key), 'w') as teams_file:
-                writer = csv.writer(teams_file, delimiter=',')
-                self._writerow_unicode(writer, [team.key.id() for team in event.teams])
+        self.response.out.write("Done backing up {}!".format(event_key))
 
-        if event.rankings:
-            with cloudstorage.open(self.RANKINGS_FILENAME_PATTERN.format(event.year, event_key, event_key), 'w') as rankings_file:
-                writer = csv.writer(rankings_file, delimiter=',')
-                for row in event.rankings:
-                    self._writerow_unicode(writer, row)
 
-        if event.alliance_selections:
-            with cloudstorage.open(self.ALLIANCES_FILENAME_PATTERN.format(event.year, event_key, event_key), 'w') as alliances_file:
-                writer = csv.writer(alliances_file, delimiter=',')
-                for alliance in event.alliance_selections:
-                    self._writerow_unicode(writer, alliance['picks'])
+class TbaBulkJobEnqueue(webapp.RequestHandler):
+    """
+    Starts a bulk job, or resumes it from its checkpoint with ?resume=1
+    Other query params are passed to the job.
+    """
+    def get(self, job_name):
+        params = {k: v for k, v in self.request.GET.items() if k != 'resume'}
+        job = BULK_JOBS[job_name](params)
+        if self.request.get('resume'):
+            checkpoint = job.resume()
+            if checkpoint is None:
+                self.response.out.write("Nothing to resume for {}".format(job.job_id))
+            else:
+                self.response.out.write("Resumed {} at part {}".format(job.job_id, checkpoint.part))
+        else:
+            job.start()
+            self.response.out.write("Started {}".format(job.job_id))
 
-        self.response.out.write("Done backing up {}!".format(event_key))
 
-    def _writerow_unicode(self, writer, row):
-        unicode_row = []
-        for s in row:
-            try:
-                unicode_row.append(s.encode("utf-8"))
-            except:
-                unicode_row.append(s)
-        writer.writerow(unicode_row)
+class TbaBulkJobDo(webapp.RequestHandler):
+    """
+    Runs one page of a bulk job. The job enqueues the next page itself.
+    """
+    def get(self, job_name, part):
+        job = BULK_JOBS[job_name](dict(self.request.GET.items()))
+        checkpoint = job.run(int(part))
+        if checkpoint is not None:
+            self.response.out.write("{} part {}: {} rows so far, done: {}".format(
+                job.job_id, part, checkpoint.rows, checkpoint.done))
 
 
 class TbaCSVRestoreEventsEnqueue(webapp.RequestHandler):
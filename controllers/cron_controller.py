@@ -4,6 +4,8 @@ import os
 import json
 import pytz
 
+from collections import defaultdict
+
 from google.appengine.api import taskqueue
 
 from google.appengine.ext import ndb
@@ -18,8 +20,8 @@ from database.district_query import DistrictsInYearQuery
 from database.event_query import DistrictEventsQuery
 from database.team_query import DistrictTeamsQuery
 from helpers.bluezone_helper import BlueZoneHelper
-from helpers.district_helper import DistrictHelper
 from helpers.district_manipulator import DistrictManipulator
+from helpers.district_points_table import DistrictPointsTable
 from helpers.event_helper import EventHelper
 from helpers.event_manipulator import EventManipulator
 from helpers.event_details_manipulator import EventDetailsManipulator
@@ -30,11 +32,12 @@ from helpers.event_team_repairer import EventTeamRepairer
 from helpers.event_team_updater import EventTeamUpdater
 from helpers.firebase.firebase_pusher import FirebasePusher
 from helpers.insights_helper import InsightsHelper
-from helpers.match_helper import MatchHelper
 from helpers.match_time_prediction_helper import MatchTimePredictionHelper
 from helpers.matchstats_helper import MatchstatsHelper
 from helpers.notification_helper import NotificationHelper
 from helpers.prediction_helper import PredictionHelper
+from helpers.season_snapshot_helper import SeasonSnapshotHelper
+from helpers.typeahead_helper import TypeaheadHelper
 
 from helpers.insight_manipulator import InsightManipulator
 from helpers.team_manipulator import TeamManipulator
@@ -169,7 +172,7 @@ class EventMatchstatsDo(webapp.RequestHandler):
 
         predictions_dict = None
         if event.year >= 2016 and event.event_type_enum in EventType.SEASON_EVENT_TYPES:
-            sorted_matches = MatchHelper.play_order_sort_matches(event.matches)
+            sorted_matches = event.match_index.play_order
             match_predictions, match_prediction_stats, stat_mean_vars = PredictionHelper.get_match_predictions(sorted_matches)
             ranking_predictions, ranking_prediction_stats = PredictionHelper.get_ranking_predictions(sorted_matches, match_predictions)
 
@@ -276,7 +279,7 @@ class YearInsightsEnqueue(webapp.RequestHandler):
     def get(self, kind, year):
         taskqueue.add(
             target='backend-tasks-b2',
-            url='/backend-tasks-b2/math/do/insights/{}/{}'.format(kind, year),
+            url='/backend-tasks-b2/math/do/insights/{}/{}{}'.format(kind, year, '?rebuild=1' if self.request.get('rebuild') else ''),
             method='GET')
 
         template_values = {
@@ -301,7 +304,7 @@ class YearInsightsDo(webapp.RequestHandler):
         if kind == 'matches':
             insights = InsightsHelper.doMatchInsights(year)
         elif kind == 'awards':
-            insights = InsightsHelper.doAwardInsights(year)
+            insights = InsightsHelper.doAwardInsights(year, rebuild=bool(self.request.get('rebuild')))
         elif kind == 'predictions':
             insights = InsightsHelper.doPredictionInsights(year)
 
@@ -367,6 +370,37 @@ class OverallInsightsDo(webapp.RequestHandler):
         self.get()
 
 
+class SeasonSnapshotEnqueue(webapp.RequestHandler):
+    """
+    Enqueues a season snapshot refresh for a given year
+    """
+    def get(self, year):
+        url = '/backend-tasks-b2/math/do/season_snapshot/{}'.format(year)
+        if self.request.get('full'):
+            url += '?full=1'
+        taskqueue.add(
+            target='backend-tasks-b2',
+            url=url,
+            method='GET')
+        self.response.out.write("Enqueued season snapshot for {}".format(year))
+
+
+class SeasonSnapshotDo(webapp.RequestHandler):
+    """
+    Refreshes the snapshots of events that finished recently (or all events
+    with ?full=1), then rebuilds the season snapshot from the event snapshots.
+    """
+    def get(self, year):
+        year = int(year)
+        events = SeasonSnapshotHelper.get_events_to_refresh(year, full=bool(self.request.get('full')))
+        for event in events:
+            SeasonSnapshotHelper.update_event_snapshot(event)
+        snapshot = SeasonSnapshotHelper.rebuild_season_snapshot(year)
+
+        self.response.out.write("Refreshed {} events. Season {} snapshot has {} events and {} matches.".format(
+            len(events), year, len(snapshot['event_keys']), len(snapshot)))
+
+
 class TypeaheadCalcEnqueue(webapp.RequestHandler):
     """
     Enqueues typeahead calculations
@@ -383,7 +417,8 @@ class TypeaheadCalcEnqueue(webapp.RequestHandler):
 
 class TypeaheadCalcDo(webapp.RequestHandler):
     """
-    Calculates typeahead entries
+    Recalculates all typeahead entries from scratch as a consistency check
+    against the incrementally maintained ones
     """
     def get(self):
         @ndb.tasklet
@@ -411,54 +446,37 @@ class TypeaheadCalcDo(webapp.RequestHandler):
 
         events, teams, districts = get_events_teams_districts()
 
-        results = {}
+        results = defaultdict(list)
         for team in teams:
-            if not team.nickname:
-                nickname = "Team %s" % team.team_number
-            else:
-                nickname = team.nickname
-            data = '%s | %s' % (team.team_number, nickname)
-            if TypeaheadEntry.ALL_TEAMS_KEY in results:
-                results[TypeaheadEntry.ALL_TEAMS_KEY].append(data)
-            else:
-                results[TypeaheadEntry.ALL_TEAMS_KEY] = [data]
+            results[TypeaheadEntry.ALL_TEAMS_KEY].append(TypeaheadHelper.get_team_data(team))
 
         for district in districts:
-            data = '%s District [%s]' % (district.display_name, district.abbreviation.upper())
-            # all districts
-            if TypeaheadEntry.ALL_DISTRICTS_KEY in results:
-                if data not in results[TypeaheadEntry.ALL_DISTRICTS_KEY]:
-                    results[TypeaheadEntry.ALL_DISTRICTS_KEY].append(data)
-            else:
-                results[TypeaheadEntry.ALL_DISTRICTS_KEY] = [data]
-
+            results[TypeaheadEntry.ALL_DISTRICTS_KEY].append(TypeaheadHelper.get_district_data(district))
 
         for event in events:
-            data = '%s %s [%s]' % (event.year, event.name, event.event_short.upper())
-            # all events
-            if TypeaheadEntry.ALL_EVENTS_KEY in results:
-                results[TypeaheadEntry.ALL_EVENTS_KEY].append(data)
-            else:
-                results[TypeaheadEntry.ALL_EVENTS_KEY] = [data]
-            # events by year
-            if TypeaheadEntry.YEAR_EVENTS_KEY.format(event.year) in results:
-                results[TypeaheadEntry.YEAR_EVENTS_KEY.format(event.year)].append(data)
-            else:
-                results[TypeaheadEntry.YEAR_EVENTS_KEY.format(event.year)] = [data]
-
-        # Prepare to remove old entries
-        old_entry_keys_future = TypeaheadEntry.query().fetch_async(keys_only=True)
-
-        # Add new entries
+            data = TypeaheadHelper.get_event_data(event)
+            results[TypeaheadEntry.ALL_EVENTS_KEY].append(data)
+            results[TypeaheadEntry.YEAR_EVENTS_KEY.format(event.year)].append(data)
+
+        for key_name, data in results.items():
+            results[key_name] = TypeaheadHelper.sort_entry_data(key_name, data)
+
+        # Entries are maintained incrementally by manipulator hooks,
+        # so only write the ones that have drifted.
+        old_entries = {entry.key.id(): entry for entry in TypeaheadEntry.query().fetch()}
+
         entries = []
         for key_name, data in results.items():
-            entries.append(TypeaheadEntry(id=key_name, data_json=json.dumps(data)))
+            old_entry = old_entries.get(key_name)
+            if old_entry is None or json.loads(old_entry.data_json) != data:
+                logging.warning("TypeaheadEntry {} was inconsistent. Rewriting.".format(key_name))
+                entries.append(TypeaheadHelper.make_entry(key_name, data))
+            elif not old_entry.index_blob:
+                entries.append(TypeaheadHelper.make_entry(key_name, data))
         ndb.put_multi(entries)
 
         # Remove old entries
-        old_entry_keys = set(old_entry_keys_future.get_result())
-        new_entry_keys = set([ndb.Key(TypeaheadEntry, key_name) for key_name in results.keys()])
-        keys_to_delete = old_entry_keys.difference(new_entry_keys)
+        keys_to_delete = [ndb.Key(TypeaheadEntry, key_name) for key_name in set(old_entries.keys()).difference(results.keys())]
         logging.info("Removing the following unused TypeaheadEntries: {}".format([key.id() for key in keys_to_delete]))
         ndb.delete_multi(keys_to_delete)
 
@@ -469,17 +487,22 @@ class TypeaheadCalcDo(webapp.RequestHandler):
 
 class DistrictPointsCalcEnqueue(webapp.RequestHandler):
     """
-    Enqueues calculation of district points for all season events for a given year
+    Enqueues calculation of district points for all season events for a given year.
+    Each district's events are calculated together with its rankings.
     """
 
     def get(self, year):
         year = int(year)
 
-        event_keys = Event.query(Event.year == year, Event.event_type_enum.IN(EventType.SEASON_EVENT_TYPES)).fetch(None, keys_only=True)
+        events = Event.query(Event.year == year, Event.event_type_enum.IN(EventType.SEASON_EVENT_TYPES)).fetch()
+        district_keys = sorted({event.district_key.id() for event in events if event.district_key})
+        event_keys = [event.key.id() for event in events if not event.district_key]
+        for district_key in district_keys:
+            taskqueue.add(url='/tasks/math/do/district_points_calc_batch/{}'.format(district_key), method='GET')
         for event_key in event_keys:
-            taskqueue.add(url='/tasks/math/do/district_points_calc/{}'.format(event_key.id()), method='GET')
+            taskqueue.add(url='/tasks/math/do/district_points_calc/{}'.format(event_key), method='GET')
 
-        self.response.out.write("Enqueued for: {}".format([event_key.id() for event_key in event_keys]))
+        self.response.out.write("Enqueued for: {}".format(district_keys + event_keys))
 
 
 class DistrictPointsCalcDo(webapp.RequestHandler):
@@ -495,7 +518,7 @@ class DistrictPointsCalcDo(webapp.RequestHandler):
                                         .format(event.key_name))
             return
 
-        district_points = DistrictHelper.calculate_event_points(event)
+        district_points = DistrictPointsTable.calculate([event]).event_points(0)
 
         event_details = EventDetails(
             id=event_key,
@@ -511,6 +534,35 @@ class DistrictPointsCalcDo(webapp.RequestHandler):
             taskqueue.add(url='/tasks/math/do/district_rankings_calc/{}'.format(event.district_key.id()), method='GET')
 
 
+class DistrictPointsCalcBatchDo(webapp.RequestHandler):
+    """
+    Calculates district points for all season events of a district year,
+    and its rankings, in one pass
+    """
+
+    def get(self, district_key):
+        district = District.get_by_id(district_key)
+        if not district:
+            self.response.out.write("District {} does not exist!".format(district_key))
+            return
+
+        events_future = DistrictEventsQuery(district_key).fetch_async()
+        teams_future = DistrictTeamsQuery(district_key).fetch_async()
+
+        events = [event for event in events_future.get_result() if event.event_type_enum in EventType.SEASON_EVENT_TYPES]
+        EventHelper.sort_events(events)
+        points_table = DistrictPointsTable.calculate(events)
+
+        if events:
+            EventDetailsManipulator.createOrUpdate([
+                EventDetails(id=event.key.id(), district_points=points_table.event_points(event_index))
+                for event_index, event in enumerate(events)])
+        DistrictRankingsCalcDo.update_rankings(district, points_table.rankings(teams_future, district.year))
+
+        if 'X-Appengine-Taskname' not in self.request.headers:  # Only write out if not in taskqueue
+            self.response.out.write("Finished calculating district points and rankings for: {}".format(district_key))
+
+
 class DistrictRankingsCalcEnqueue(webapp.RequestHandler):
     """
     Enqueues calculation of rankings for all districts for a given year
@@ -543,8 +595,14 @@ class DistrictRankingsCalcDo(webapp.RequestHandler):
         for event in events:
             event.prep_details()
         EventHelper.sort_events(events)
-        team_totals = DistrictHelper.calculate_rankings(events, teams_future, district.year)
+        team_totals = DistrictPointsTable.from_district_points(events).rankings(teams_future, district.year)
+        self.update_rankings(district, team_totals)
 
+        if 'X-Appengine-Taskname' not in self.request.headers:  # Only write out if not in taskqueue
+            self.response.out.write("Finished calculating rankings for: {}".format(district_key))
+
+    @classmethod
+    def update_rankings(cls, district, team_totals):
         rankings = []
         current_rank = 1
         for key, points in team_totals:
@@ -566,9 +624,6 @@ class DistrictRankingsCalcDo(webapp.RequestHandler):
             district.rankings = rankings
             DistrictManipulator.createOrUpdate(district)
 
-        if 'X-Appengine-Taskname' not in self.request.headers:  # Only write out if not in taskqueue
-            self.response.out.write("Finished calculating rankings for: {}".format(district_key))
-
 
 class EventTeamStatusCalcEnqueue(webapp.RequestHandler):
     """
@@ -644,8 +699,8 @@ class MatchTimePredictionsDo(webapp.RequestHandler):
             return
 
         timezone = pytz.timezone(event.timezone_id)
-        played_matches = MatchHelper.recentMatches(matches, num=0)
-        unplayed_matches = MatchHelper.upcomingMatches(matches, num=len(matches))
+        played_matches = event.match_index.recent_matches(num=0)
+        unplayed_matches = event.match_index.upcoming_matches(num=len(matches))
         MatchTimePredictionHelper.predict_future_matches(event_key, played_matches, unplayed_matches, timezone, event.within_a_day)
 
 
@@ -21,7 +21,8 @@ from helpers.event_manipulator import EventManipulator
 from helpers.event_details_manipulator import EventDetailsManipulator
 from helpers.event_team_manipulator import EventTeamManipulator
 from helpers.match_manipulator import MatchManipulator
-from helpers.match_helper import MatchHelper
+from helpers.match_ingest_helper import MatchIngestHelper
+from helpers.poll_scheduler import PollScheduler
 from helpers.award_manipulator import AwardManipulator
 from helpers.team_manipulator import TeamManipulator
 from helpers.district_team_manipulator import DistrictTeamManipulator
@@ -36,6 +37,16 @@ from models.sitevar import Sitevar
 from models.team import Team
 
 
+def schedule_polls(feed, events, live):
+    """
+    Returns [(event, countdown)] of the polls of |feed| to enqueue.
+    Live polls are left to the PollScheduler.
+    """
+    if live and tba_config.CONFIG['adaptive_polling']:
+        return PollScheduler.schedule(feed, events)
+    return [(event, 0) for event in events]
+
+
 class FMSAPIAwardsEnqueue(webapp.RequestHandler):
     """
     Handles enqueing getting awards
@@ -48,13 +59,15 @@ class FMSAPIAwardsEnqueue(webapp.RequestHandler):
             event_keys = Event.query(Event.official == True).filter(Event.year == int(when)).fetch(500, keys_only=True)
             events = ndb.get_multi(event_keys)
 
-        for event in events:
+        polls = schedule_polls('awards', events, when == "now")
+        for event, countdown in polls:
             taskqueue.add(
                 queue_name='datafeed',
                 url='/tasks/get/fmsapi_awards/%s' % (event.key_name),
-                method='GET')
+                method='GET',
+                countdown=countdown)
         template_values = {
-            'events': events,
+            'events': [event for event, _ in polls],
         }
 
         if 'X-Appengine-Taskname' not in self.request.headers:  # Only write out if not in taskqueue
@@ -70,7 +83,8 @@ class FMSAPIAwardsGet(webapp.RequestHandler):
         datafeed = DatafeedFMSAPI('v2.0', save_response=True)
 
         event = Event.get_by_id(event_key)
-        new_awards = AwardManipulator.createOrUpdate(datafeed.getAwards(event))
+        with PollScheduler.poll('awards', event_key):
+            new_awards = AwardManipulator.createOrUpdate(datafeed.getAwards(event))
 
         if new_awards is None:
             new_awards = []
@@ -120,14 +134,16 @@ class FMSAPIEventAlliancesEnqueue(webapp.RequestHandler):
             event_keys = Event.query(Event.official == True).filter(Event.year == int(when)).fetch(500, keys_only=True)
             events = ndb.get_multi(event_keys)
 
-        for event in events:
+        polls = schedule_polls('alliances', events, when in {"now", "last_day_only"})
+        for event, countdown in polls:
             taskqueue.add(
                 queue_name='datafeed',
                 url='/tasks/get/fmsapi_event_alliances/' + event.key_name,
-                method='GET')
+                method='GET',
+                countdown=countdown)
 
         template_values = {
-            'events': events
+            'events': [event for event, _ in polls]
         }
 
         if 'X-Appengine-Taskname' not in self.request.headers:  # Only write out if not in taskqueue
@@ -144,7 +160,8 @@ class FMSAPIEventAlliancesGet(webapp.RequestHandler):
 
         event = Event.get_by_id(event_key)
 
-        alliance_selections = df.getEventAlliances(event_key)
+        with PollScheduler.poll('alliances', event_key):
+            alliance_selections = df.getEventAlliances(event_key)
 
         event_details = EventDetails(
             id=event_key,
@@ -172,14 +189,16 @@ class FMSAPIEventRankingsEnqueue(webapp.RequestHandler):
             event_keys = Event.query(Event.official == True).filter(Event.year == int(when)).fetch(500, keys_only=True)
             events = ndb.get_multi(event_keys)
 
-        for event in events:
+        polls = schedule_polls('rankings', events, when == "now")
+        for event, countdown in polls:
             taskqueue.add(
                 queue_name='datafeed',
                 url='/tasks/get/fmsapi_event_rankings/' + event.key_name,
-                method='GET')
+                method='GET',
+                countdown=countdown)
 
         template_values = {
-            'events': events,
+            'events': [event for event, _ in polls],
         }
 
         if 'X-Appengine-Taskname' not in self.request.headers:  # Only write out if not in taskqueue
@@ -194,7 +213,8 @@ class FMSAPIEventRankingsGet(webapp.RequestHandler):
     def get(self, event_key):
         df = DatafeedFMSAPI('v2.0', save_response=True)
 
-        rankings, rankings2 = df.getEventRankings(event_key)
+        with PollScheduler.poll('rankings', event_key):
+            rankings, rankings2 = df.getEventRankings(event_key)
 
         event_details = EventDetails(
             id=event_key,
@@ -223,14 +243,16 @@ class FMSAPIMatchesEnqueue(webapp.RequestHandler):
             event_keys = Event.query(Event.official == True).filter(Event.year == int(when)).fetch(500, keys_only=True)
             events = ndb.get_multi(event_keys)
 
-        for event in events:
+        polls = schedule_polls('matches', events, when == "now")
+        for event, countdown in polls:
             taskqueue.add(
                 queue_name='datafeed',
                 url='/tasks/get/fmsapi_matches/' + event.key_name,
-                method='GET')
+                method='GET',
+                countdown=countdown)
 
         template_values = {
-            'events': events,
+            'events': [event for event, _ in polls],
         }
 
         if 'X-Appengine-Taskname' not in self.request.headers:  # Only write out if not in taskqueue
@@ -245,12 +267,10 @@ class FMSAPIMatchesGet(webapp.RequestHandler):
     def get(self, event_key):
         df = DatafeedFMSAPI('v2.0', save_response=True)
 
-        new_matches = MatchManipulator.createOrUpdate(
-            MatchHelper.deleteInvalidMatches(
-                df.getMatches(event_key),
-                Event.get_by_id(event_key)
-            )
-        )
+        with PollScheduler.poll('matches', event_key) as outcome:
+            new_matches, updated_matches, deleted_matches = MatchIngestHelper.ingest(Event.get_by_id(event_key), df)
+            outcome['changed'] = bool(updated_matches or deleted_matches)
+            PollScheduler.record_matches(event_key, new_matches)
 
         template_values = {
             'matches': new_matches,
@@ -14,6 +14,7 @@ from consts.playoff_type import PlayoffType
 from database import event_query, media_query
 from database.district_query import DistrictsInYearQuery, DistrictQuery
 from database.event_query import EventQuery, EventDivisionsQuery
+from helpers.event_match_index import EventMatchIndex
 from helpers.match_helper import MatchHelper
 from helpers.award_helper import AwardHelper
 from helpers.team_helper import TeamHelper
@@ -134,6 +135,16 @@ class EventDetail(CacheableHandler):
         self._partial_cache_key = self.CACHE_KEY_FORMAT.format(event_key)
         super(EventDetail, self).get(event_key)
 
+    @classmethod
+    def _get_match_index(cls, event):
+        """
+        Index of the event's matches without invalid ones
+        """
+        cleaned_matches = MatchHelper.deleteInvalidMatches(event.matches, event)
+        if len(cleaned_matches) == len(event.matches):
+            return event.match_index
+        return EventMatchIndex(cleaned_matches)
+
     def _render(self, event_key):
         event = EventQuery(event_key).fetch()
 
@@ -156,8 +167,8 @@ class EventDetail(CacheableHandler):
             event_codivisions_future = EventDivisionsQuery(event.parent_event.id()).fetch_async()
 
         awards = AwardHelper.organizeAwards(event.awards)
-        cleaned_matches = MatchHelper.deleteInvalidMatches(event.matches, event)
-        matches = MatchHelper.organizeMatches(cleaned_matches)
+        match_index = self._get_match_index(event)
+        matches = match_index.organized
         teams = TeamHelper.sortTeams(event.teams)
 
         # Organize medias by team
@@ -181,8 +192,8 @@ class EventDetail(CacheableHandler):
         oprs = oprs[:15]  # get the top 15 OPRs
 
         if event.now:
-            matches_recent = MatchHelper.recentMatches(cleaned_matches)
-            matches_upcoming = MatchHelper.upcomingMatches(cleaned_matches)
+            matches_recent = match_index.recent_matches()
+            matches_upcoming = match_index.upcoming_matches()
         else:
             matches_recent = None
             matches_upcoming = None
@@ -287,14 +298,14 @@ class EventInsights(CacheableHandler):
         ranking_predictions = event.details.predictions.get('ranking_predictions', None)
         ranking_prediction_stats = event.details.predictions.get('ranking_prediction_stats', None)
 
-        cleaned_matches = MatchHelper.deleteInvalidMatches(event.matches, event)
-        matches = MatchHelper.organizeMatches(cleaned_matches)
+        matches = EventDetail._get_match_index(event).organized
 
         # If no matches but there are match predictions, create fake matches
         # For cases where FIRST doesn't allow posting of match schedule
         fake_matches = False
         if match_predictions and (not matches['qm'] and match_predictions['qual']):
             fake_matches = True
+            matches = dict(matches, qm=[])  # Don't add to the shared match index
             for i in xrange(len(match_predictions['qual'].keys())):
                 match_number = i + 1
                 alliances = {
@@ -383,7 +394,7 @@ class EventRss(CacheableHandler):
         if not event:
             self.abort(404)
 
-        matches = MatchHelper.organizeMatches(event.matches)
+        matches = event.match_index.organized
 
         self.template_values.update({
             "event": event,
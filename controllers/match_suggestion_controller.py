@@ -5,7 +5,6 @@ from controllers.base_controller import LoggedInHandler
 from template_engine import jinja2_engine
 
 from helpers.event_helper import EventHelper
-from helpers.match_helper import MatchHelper
 
 
 class MatchSuggestionHandler(LoggedInHandler):
@@ -40,8 +39,8 @@ class MatchSuggestionHandler(LoggedInHandler):
         upcoming_matches = []
         ranks = {}
         for event in current_events:
-            finished_matches += MatchHelper.recentMatches(event.matches, num=1)
-            for i, match in enumerate(MatchHelper.upcomingMatches(event.matches, num=3)):
+            finished_matches += event.match_index.recent_matches(num=1)
+            for i, match in enumerate(event.match_index.upcoming_matches(num=3)):
                 if match.key.id() not in event.details.predictions['match_predictions']['qual' if match.comp_level == 'qm' else 'playoff']:
                     match.prediction = defaultdict(lambda: defaultdict())
                     match.bluezone_score = 0
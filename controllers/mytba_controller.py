@@ -5,15 +5,12 @@ import os
 from google.appengine.ext import ndb
 from google.appengine.ext.webapp import template
 
-from consts.model_type import ModelType
 from controllers.base_controller import LoggedInHandler
-from database.award_query import TeamYearAwardsQuery
-from database.event_query import TeamYearEventsQuery
 from helpers.award_helper import AwardHelper
 from helpers.event_helper import EventHelper
 from helpers.event_team_status_helper import EventTeamStatusHelper
-from models.event_team import EventTeam
-from models.favorite import Favorite
+from helpers.mytba_dashboard_helper import MyTBADashboardHelper
+from models.event import Event
 from models.team import Team
 
 
@@ -30,55 +27,62 @@ class MyTBALiveController(LoggedInHandler):
         else:
             year = now.year
 
-        team_favorites_future = Favorite.query(Favorite.model_type == ModelType.TEAM, ancestor=user).fetch_async()
-
-        favorite_team_keys = map(lambda f: ndb.Key(Team, f.model_key), team_favorites_future.get_result())
-        favorite_teams_future = ndb.get_multi_async(favorite_team_keys)
-
-        favorite_teams = [team_future.get_result() for team_future in favorite_teams_future]
-
-        favorite_teams_events_futures = []
-        favorite_teams_awards_futures = {}
-        for team in favorite_teams:
-            favorite_teams_events_futures.append(TeamYearEventsQuery(team.key_name, year).fetch_async())
-            favorite_teams_awards_futures[team.key.id()] = TeamYearAwardsQuery(team.key_name, year).fetch_async()
+        # Everything the dashboard shows, in one batch
+        dashboard = MyTBADashboardHelper.get_dashboard(user, year)
+        event_keys = set()
+        team_keys = set()
+        for event_team_key in dashboard.event_team_keys:
+            event_key, team_key = event_team_key.id().split('_', 1)
+            event_keys.add(ndb.Key(Event, event_key))
+            team_keys.add(ndb.Key(Team, team_key))
+        event_keys = list(event_keys)
+        team_keys = list(team_keys)
+        models = ndb.get_multi(event_keys + team_keys + dashboard.event_team_keys + dashboard.award_keys)
+        teams_start = len(event_keys)
+        event_teams_start = teams_start + len(team_keys)
+        awards_start = event_teams_start + len(dashboard.event_team_keys)
+        events_by_key = dict(zip(event_keys, models[:teams_start]))
+        teams_by_key = dict(zip(team_keys, models[teams_start:event_teams_start]))
+        event_teams = models[event_teams_start:awards_start]
+        awards = models[awards_start:]
 
         past_events_by_event = {}
         live_events_by_event = {}
         future_events_by_event = {}
-        favorite_event_team_keys = []
-        for team, events_future in zip(favorite_teams, favorite_teams_events_futures):
-            events = events_future.get_result()
-            if not events:
+        event_teams_by_key = {}
+        for event_team_key, event_team in zip(dashboard.event_team_keys, event_teams):
+            event_key, team_key = event_team_key.id().split('_', 1)
+            event = events_by_key[ndb.Key(Event, event_key)]
+            team = teams_by_key[ndb.Key(Team, team_key)]
+            if event is None or team is None or event_team is None:
                 continue
-            EventHelper.sort_events(events)  # Sort by date
-            for event in events:
-                favorite_event_team_keys.append(ndb.Key(EventTeam, '{}_{}'.format(event.key.id(), team.key.id())))
-                if event.within_a_day:
-                    if event.key_name not in live_events_by_event:
-                        live_events_by_event[event.key_name] = (event, [])
-                    live_events_by_event[event.key_name][1].append(team)
-                elif event.start_date < now:
-                    if event.key_name not in past_events_by_event:
-                        past_events_by_event[event.key_name] = (event, [])
-                    past_events_by_event[event.key_name][1].append(team)
-                else:
-                    if event.key_name not in future_events_by_event:
-                        future_events_by_event[event.key_name] = (event, [])
-                    future_events_by_event[event.key_name][1].append(team)
+            event_teams_by_key[event_team_key.id()] = event_team
+            if event.within_a_day:
+                if event.key_name not in live_events_by_event:
+                    live_events_by_event[event.key_name] = (event, [])
+                live_events_by_event[event.key_name][1].append(team)
+            elif event.start_date < now:
+                if event.key_name not in past_events_by_event:
+                    past_events_by_event[event.key_name] = (event, [])
+                past_events_by_event[event.key_name][1].append(team)
+            else:
+                if event.key_name not in future_events_by_event:
+                    future_events_by_event[event.key_name] = (event, [])
+                future_events_by_event[event.key_name][1].append(team)
 
         event_team_awards = defaultdict(lambda: defaultdict(list))
-        for team_key, awards_future in favorite_teams_awards_futures.items():
-            for award in awards_future.get_result():
-                event_team_awards[award.event.id()][team_key].append(award)
-
-        ndb.get_multi(favorite_event_team_keys)  # Warms context cache
+        for award in awards:
+            if award is None:
+                continue
+            for team_key in award.team_list:
+                if team_key in teams_by_key:
+                    event_team_awards[award.event.id()][team_key.id()].append(award)
 
         past_events_with_teams = []
         for event, teams in past_events_by_event.itervalues():
             teams_and_statuses = []
             for team in teams:
-                event_team = EventTeam.get_by_id('{}_{}'.format(event.key.id(), team.key.id()))  # Should be in context cache
+                event_team = event_teams_by_key['{}_{}'.format(event.key.id(), team.key.id())]
                 status_str = {
                     'alliance': EventTeamStatusHelper.generate_team_at_event_alliance_status_string(team.key.id(), event_team.status),
                     'playoff': EventTeamStatusHelper.generate_team_at_event_playoff_status_string(team.key.id(), event_team.status),
@@ -99,7 +103,7 @@ class MyTBALiveController(LoggedInHandler):
         for event, teams in live_events_by_event.itervalues():
             teams_and_statuses = []
             for team in teams:
-                event_team = EventTeam.get_by_id('{}_{}'.format(event.key.id(), team.key.id()))  # Should be in context cache
+                event_team = event_teams_by_key['{}_{}'.format(event.key.id(), team.key.id())]
                 status_str = {
                     'alliance': EventTeamStatusHelper.generate_team_at_event_alliance_status_string(team.key.id(), event_team.status),
                     'playoff': EventTeamStatusHelper.generate_team_at_event_playoff_status_string(team.key.id(), event_team.status),
@@ -107,7 +111,8 @@ class MyTBALiveController(LoggedInHandler):
                 teams_and_statuses.append((
                     team,
                     event_team.status,
-                    status_str
+                    status_str,
+                    AwardHelper.organizeAwards(event_team_awards[event.key.id()][team.key.id()])
                 ))
             teams_and_statuses.sort(key=lambda x: x[0].team_number)
             live_events_with_teams.append((event, teams_and_statuses))
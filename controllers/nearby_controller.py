@@ -6,7 +6,9 @@ from google.appengine.api import search
 from google.appengine.ext import ndb
 
 from controllers.base_controller import CacheableHandler
+from helpers.geo_index_helper import GeoIndexHelper
 from helpers.location_helper import LocationHelper
+from models.geo_index_entry import GeoIndexEntry
 from template_engine import jinja2_engine
 
 
@@ -44,6 +46,81 @@ class NearbyController(CacheableHandler):
         self._partial_cache_key = self.CACHE_KEY_FORMAT.format(year, location, range_limit, search_type, page)
         super(NearbyController, self).get()
 
+    def _search_geo_index(self, lat, lon, year, range_limit, search_type, page):
+        """
+        Returns (num_results, keys, distances) from the local GeoIndex,
+        or None if it hasn't been built for this year
+        """
+        if search_type == 'teams':
+            key_name = GeoIndexEntry.TEAMS_KEY.format(year)
+        else:
+            key_name = GeoIndexEntry.EVENTS_KEY.format(year)
+
+        results = GeoIndexHelper.search(key_name, lat, lon, range_limit * self.METERS_PER_MILE)
+        if results is None:
+            return None
+
+        offset = self.PAGE_SIZE * page
+        distances = {}
+        keys = []
+        for distance, model_key in results[offset:offset + self.PAGE_SIZE]:
+            distances[model_key] = distance / self.METERS_PER_MILE
+            if search_type == 'teams':
+                keys.append(ndb.Key('Team', model_key))
+            else:
+                keys.append(ndb.Key('Event', model_key))
+        return len(results), keys, distances
+
+    def _search_index(self, lat, lon, year, range_limit, search_type, page):
+        """
+        Returns (num_results, keys, distances) from the Search API
+        """
+        dist_expr = 'distance(location, geopoint({}, {}))'.format(lat, lon)
+        query_string = '{} < {} AND year={}'.format(dist_expr, range_limit * self.METERS_PER_MILE, year)
+
+        offset = self.PAGE_SIZE * page
+
+        query = search.Query(
+            query_string=query_string,
+            options=search.QueryOptions(
+                limit=self.PAGE_SIZE,
+                offset=offset,
+                sort_options=search.SortOptions(
+                    expressions=[
+                        search.SortExpression(
+                            expression=dist_expr,
+                            direction=search.SortExpression.ASCENDING
+                        )
+                    ]
+                ),
+                returned_expressions=[
+                    search.FieldExpression(
+                        name='distance',
+                        expression=dist_expr
+                    )
+                ],
+            )
+        )
+        if search_type == 'teams':
+            search_index = search.Index(name="teamLocation")
+        else:
+            search_index = search.Index(name="eventLocation")
+
+        docs = search_index.search(query)
+        distances = {}
+        keys = []
+        for result in docs.results:
+            model_key = result.doc_id
+            if '_' in model_key:
+                model_key = model_key.split('_')[0]
+
+            distances[model_key] = result.expressions[0].value / self.METERS_PER_MILE
+            if search_type == 'teams':
+                keys.append(ndb.Key('Team', model_key))
+            else:
+                keys.append(ndb.Key('Event', model_key))
+        return docs.number_found, keys, distances
+
     def _render(self):
         year, location, range_limit, search_type, page = self._get_params()
 
@@ -55,51 +132,10 @@ class NearbyController(CacheableHandler):
             if lat_lon:
                 lat, lon = lat_lon
 
-                dist_expr = 'distance(location, geopoint({}, {}))'.format(lat, lon)
-                query_string = '{} < {} AND year={}'.format(dist_expr, range_limit * self.METERS_PER_MILE, year)
-
-                offset = self.PAGE_SIZE * page
-
-                query = search.Query(
-                    query_string=query_string,
-                    options=search.QueryOptions(
-                        limit=self.PAGE_SIZE,
-                        offset=offset,
-                        sort_options=search.SortOptions(
-                            expressions=[
-                                search.SortExpression(
-                                    expression=dist_expr,
-                                    direction=search.SortExpression.ASCENDING
-                                )
-                            ]
-                        ),
-                        returned_expressions=[
-                            search.FieldExpression(
-                                name='distance',
-                                expression=dist_expr
-                            )
-                        ],
-                    )
-                )
-                if search_type == 'teams':
-                    search_index = search.Index(name="teamLocation")
-                else:
-                    search_index = search.Index(name="eventLocation")
-
-                docs = search_index.search(query)
-                num_results = docs.number_found
-                distances = {}
-                keys = []
-                for result in docs.results:
-                    model_key = result.doc_id
-                    if '_' in model_key:
-                        model_key = model_key.split('_')[0]
-
-                    distances[model_key] = result.expressions[0].value / self.METERS_PER_MILE
-                    if search_type == 'teams':
-                        keys.append(ndb.Key('Team', model_key))
-                    else:
-                        keys.append(ndb.Key('Event', model_key))
+                found = self._search_geo_index(lat, lon, year, range_limit, search_type, page)
+                if found is None:
+                    found = self._search_index(lat, lon, year, range_limit, search_type, page)
+                num_results, keys, distances = found
 
                 result_futures = ndb.get_multi_async(keys)
                 results = [result_future.get_result() for result_future in result_futures]
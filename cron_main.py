@@ -5,12 +5,13 @@ import tba_config
 
 from controllers.backup_controller import TbaCSVBackupEventsEnqueue, TbaCSVBackupEventDo, TbaCSVRestoreEventsEnqueue, TbaCSVRestoreEventDo
 from controllers.backup_controller import TbaCSVBackupTeamsEnqueue
+from controllers.backup_controller import TbaBulkJobEnqueue, TbaBulkJobDo
 
 from controllers.datafeed_controller import TbaVideosGet, TbaVideosEnqueue
 from controllers.datafeed_controller import FMSAPIAwardsEnqueue, FMSAPIEventAlliancesEnqueue, FMSAPIEventRankingsEnqueue, FMSAPIMatchesEnqueue
 from controllers.datafeed_controller import FMSAPIAwardsGet, FMSAPIEventAlliancesGet, FMSAPIEventRankingsGet, FMSAPIMatchesGet
 
-from controllers.cron_controller import DistrictPointsCalcEnqueue, DistrictPointsCalcDo, \
+from controllers.cron_controller import DistrictPointsCalcEnqueue, DistrictPointsCalcDo, DistrictPointsCalcBatchDo, \
     MatchTimePredictionsEnqueue, MatchTimePredictionsDo, BlueZoneUpdateDo
 from controllers.cron_controller import DistrictRankingsCalcEnqueue, DistrictRankingsCalcDo
 from controllers.cron_controller import EventTeamStatusCalcEnqueue, EventTeamStatusCalcDo
@@ -25,12 +26,15 @@ from controllers.admin.admin_cron_controller import AdminMobileClearEnqueue, Adm
     AdminWebhooksClearEnqueue, AdminWebhooksClear, AdminRegistrationDayEnqueue, \
     AdminClearEventTeamsDo
 from controllers.admin.admin_cron_controller import AdminRunPostUpdateHooksEnqueue, AdminRunPostUpdateHooksDo, AdminRunEventPostUpdateHookDo, AdminRunTeamPostUpdateHookDo, \
-    AdminUpdateAllTeamSearchIndexEnqueue, AdminUpdateAllTeamSearchIndexDo, AdminUpdateTeamSearchIndexDo
+    AdminUpdateAllTeamSearchIndexEnqueue, AdminUpdateAllTeamSearchIndexDo, AdminUpdateTeamSearchIndexDo, \
+    AdminRebuildGeoIndexDo, AdminLocationCacheCleanupDo
 
 
 app = webapp2.WSGIApplication([('/tasks/enqueue/csv_backup_events', TbaCSVBackupEventsEnqueue),
                                ('/tasks/enqueue/csv_backup_events/([0-9]*)', TbaCSVBackupEventsEnqueue),
                                ('/tasks/do/csv_backup_event/(.*)', TbaCSVBackupEventDo),
+                               ('/tasks/enqueue/bulk_job/([a-z_]+)', TbaBulkJobEnqueue),
+                               ('/tasks/do/bulk_job/([a-z_]+)/([0-9]+)', TbaBulkJobDo),
                                ('/tasks/enqueue/csv_restore_events', TbaCSVRestoreEventsEnqueue),
                                ('/tasks/enqueue/csv_restore_events/([0-9]*)', TbaCSVRestoreEventsEnqueue),
                                ('/tasks/do/bluezone_update', BlueZoneUpdateDo),
@@ -48,6 +52,7 @@ app = webapp2.WSGIApplication([('/tasks/enqueue/csv_backup_events', TbaCSVBackup
                                ('/tasks/get/fmsapi_matches/(.*)', FMSAPIMatchesGet),
                                ('/tasks/math/enqueue/district_points_calc/([0-9]*)', DistrictPointsCalcEnqueue),
                                ('/tasks/math/do/district_points_calc/(.*)', DistrictPointsCalcDo),
+                               ('/tasks/math/do/district_points_calc_batch/(.*)', DistrictPointsCalcBatchDo),
                                ('/tasks/math/enqueue/district_rankings_calc/([0-9]*)', DistrictRankingsCalcEnqueue),
                                ('/tasks/math/do/district_rankings_calc/(.*)', DistrictRankingsCalcDo),
                                ('/tasks/math/enqueue/event_team_status/([0-9]*)', EventTeamStatusCalcEnqueue),
@@ -78,6 +83,8 @@ app = webapp2.WSGIApplication([('/tasks/enqueue/csv_backup_events', TbaCSVBackup
                                ('/tasks/enqueue/update_all_team_search_index', AdminUpdateAllTeamSearchIndexEnqueue),
                                ('/tasks/do/update_all_team_search_index', AdminUpdateAllTeamSearchIndexDo),
                                ('/tasks/do/update_team_search_index/(.*)', AdminUpdateTeamSearchIndexDo),
+                               ('/tasks/do/rebuild_geo_index/([0-9]*)', AdminRebuildGeoIndexDo),
+                               ('/tasks/do/clean_location_cache', AdminLocationCacheCleanupDo),
                                ('/tasks/do/update_live_events', UpdateLiveEventsDo),
                                ],
                               debug=tba_config.DEBUG)
@@ -1,8 +1,10 @@
 import datetime
 from google.appengine.api import memcache
+from google.appengine.ext import deferred
 from google.appengine.ext import ndb
 
 import logging
+from database.database_query_dependencies import DatabaseQueryDependencies
 from models.cached_query_result import CachedQueryResult
 import random
 import tba_config
@@ -32,12 +34,20 @@ class DatabaseQuery(object):
         return self._cache_key
 
     @classmethod
-    def delete_cache_multi(cls, cache_keys):
+    def get_all_cache_keys(cls, cache_keys):
+        """
+        Returns |cache_keys| along with the keys of their dict versions
+        """
         all_cache_keys = []
         for cache_key in cache_keys:
             all_cache_keys.append(cache_key)
             if cls.DICT_CONVERTER is not None:
                 all_cache_keys += [cls._dict_cache_key(cache_key, valid_dict_version) for valid_dict_version in cls.VALID_DICT_VERSIONS]
+        return all_cache_keys
+
+    @classmethod
+    def delete_cache_multi(cls, cache_keys):
+        all_cache_keys = cls.get_all_cache_keys(cache_keys)
         logging.info("Deleting db query cache keys: {}".format(all_cache_keys))
         ndb.delete_multi([ndb.Key(CachedQueryResult, cache_key) for cache_key in all_cache_keys])
 
@@ -68,6 +78,15 @@ class DatabaseQuery(object):
                     random.choice(self.DATABASE_MISSES_MEMCACHE_KEYS),
                     initial_value=0))
             query_result = yield self._query_async()
+            if tba_config.CONFIG['database_query_cache'] and tba_config.CONFIG['database_query_dependency_tracking']:
+                tokens = DatabaseQueryDependencies.get_tokens_for_result(query_result)
+                if tokens:
+                    deferred.defer(
+                        DatabaseQueryDependencies.record,
+                        cache_key,
+                        tokens,
+                        _queue='cache-dependency-tracking',
+                        _target='default')
             if dict_version:
                 query_result = self.DICT_CONVERTER.convert(query_result, dict_version)
             if tba_config.CONFIG['database_query_cache']:
@@ -0,0 +1,105 @@
+import logging
+
+from google.appengine.ext import ndb
+
+from models.cached_query_dependency import CachedQueryDependency
+
+
+class DatabaseQueryDependencies(object):
+    """
+    Tracks which entities each cached DatabaseQuery result depends on.
+
+    A dependency token is (model kind, attribute, referenced key) for every
+    key-valued attribute listed in the model's _affected_references, so the
+    tokens of a model that was read match the tokens built from the affected
+    references of a model that is written.
+    """
+    TOKEN_FORMAT = '{}:{}:{}:{}'  # (model kind, attr, referenced kind, referenced id)
+    MAX_CACHE_KEYS_PER_TOKEN = 1000
+
+    @classmethod
+    def _make_token(cls, kind, attr, key):
+        return cls.TOKEN_FORMAT.format(kind, attr, key.kind(), key.id())
+
+    @classmethod
+    def _listify(cls, thing):
+        if isinstance(thing, (list, set, tuple)):
+            return thing
+        return [thing]
+
+    @classmethod
+    def _iter_models(cls, result):
+        if isinstance(result, ndb.Model):
+            yield result
+        elif isinstance(result, dict):
+            for value in result.values():
+                for model in cls._iter_models(value):
+                    yield model
+        elif isinstance(result, (list, set, tuple)):
+            for value in result:
+                for model in cls._iter_models(value):
+                    yield model
+
+    @classmethod
+    def get_tokens_for_result(cls, result):
+        """
+        Returns the dependency tokens for every model in a query result
+        """
+        tokens = set()
+        for model in cls._iter_models(result):
+            if not hasattr(model, '_affected_references'):
+                continue
+            kind = model._get_kind()
+            for attr in model._affected_references.keys():
+                for value in cls._listify(getattr(model, attr, None)):
+                    if isinstance(value, ndb.Key):
+                        tokens.add(cls._make_token(kind, attr, value))
+        return tokens
+
+    @classmethod
+    def get_tokens_for_references(cls, kind, affected_references):
+        """
+        Returns the dependency tokens for the affected references of a written model
+        """
+        tokens = set()
+        for attr, values in affected_references.items():
+            for value in values:
+                if isinstance(value, ndb.Key):
+                    tokens.add(cls._make_token(kind, attr, value))
+        return tokens
+
+    @classmethod
+    def record(cls, cache_key, tokens):
+        """
+        Adds |cache_key| to the reverse index of each token.
+        Meant to be deferred off of the request path.
+        """
+        @ndb.transactional_tasklet
+        def add_cache_key(token):
+            dependency = yield CachedQueryDependency.get_by_id_async(token)
+            if dependency is None:
+                dependency = CachedQueryDependency(id=token)
+            if cache_key in dependency.cache_keys:
+                return
+            dependency.cache_keys = (dependency.cache_keys + [cache_key])[-cls.MAX_CACHE_KEYS_PER_TOKEN:]
+            yield dependency.put_async()
+
+        tokens = list(tokens)
+        futures = [add_cache_key(token) for token in tokens]
+        for token, future in zip(tokens, futures):
+            try:
+                future.get_result()
+            except Exception, e:
+                logging.warning("Recording cache dependency {} failed!".format(token))
+                logging.exception(e)
+
+    @classmethod
+    def get_dependent_cache_keys(cls, tokens):
+        """
+        Returns the cache keys of all cached queries that depend on any of |tokens|
+        """
+        cache_keys = set()
+        for dependency in ndb.get_multi([ndb.Key(CachedQueryDependency, token) for token in tokens]):
+            if dependency is not None:
+                cache_keys.update(dependency.cache_keys)
+        return cache_keys
@@ -20,9 +20,12 @@ class MatchConverter(ConverterBase):
 
     @classmethod
     def matchConverter_v3(cls, match):
+        # Copy instead of renaming keys in place, so the match's own alliances are left alone
+        alliances = {}
         for alliance in ['red', 'blue']:
-            match.alliances[alliance]['team_keys'] = match.alliances[alliance].pop('teams')
-            match.alliances[alliance]['surrogate_team_keys'] = match.alliances[alliance].pop('surrogates')
+            alliances[alliance] = dict(match.alliances[alliance])
+            alliances[alliance]['team_keys'] = alliances[alliance].pop('teams')
+            alliances[alliance]['surrogate_team_keys'] = alliances[alliance].pop('surrogates')
 
         match_dict = {
             'key': match.key.id(),
@@ -30,7 +33,7 @@ class MatchConverter(ConverterBase):
             'comp_level': match.comp_level,
             'set_number': match.set_number,
             'match_number': match.match_number,
-            'alliances': match.alliances,
+            'alliances': alliances,
             'winning_alliance': match.winning_alliance,
             'score_breakdown': match.score_breakdown,
             'videos': match.videos,
@@ -9,7 +9,8 @@ from database.match_query import MatchQuery, EventMatchesQuery, TeamEventMatches
 from database.media_query import TeamSocialMediaQuery, TeamYearMediaQuery, EventTeamsMediasQuery, EventTeamsPreferredMediasQuery, \
     EventMediasQuery
 from database.robot_query import TeamRobotsQuery
-from database.team_query import TeamQuery, TeamListQuery, TeamListYearQuery, DistrictTeamsQuery, EventTeamsQuery, TeamParticipationQuery, TeamDistrictsQuery
+from database.team_query import TeamQuery, TeamListQuery, TeamListYearQuery, DistrictTeamsQuery, EventTeamsQuery, TeamParticipationQuery, TeamDistrictsQuery, \
+    TeamYearSummaryQuery
 
 from models.district_team import DistrictTeam
 from models.event import Event
@@ -35,6 +36,7 @@ def award_updated(affected_refs):
         queries_and_keys.append((TeamAwardsQuery(team_key.id())))
         for year in years:
             queries_and_keys.append((TeamYearAwardsQuery(team_key.id(), year)))
+            queries_and_keys.append((TeamYearSummaryQuery(team_key.id(), year)))
 
     return queries_and_keys
 
@@ -63,6 +65,7 @@ def event_updated(affected_refs):
         year = int(et_key.id()[:4])
         queries_and_keys.append((TeamEventsQuery(team_key)))
         queries_and_keys.append((TeamYearEventsQuery(team_key, year)))
+        queries_and_keys.append((TeamYearSummaryQuery(team_key, year)))
 
     events_with_parents = filter(lambda e: e.get_result() is not None and e.get_result().parent_event is not None, events_future)
     parent_keys = set([e.get_result().parent_event for e in events_with_parents])
@@ -100,6 +103,7 @@ def match_updated(affected_refs):
     for team_key in team_keys:
         for year in years:
             queries_and_keys.append((TeamYearMatchesQuery(team_key.id(), year)))
+            queries_and_keys.append((TeamYearSummaryQuery(team_key.id(), year)))
 
     return queries_and_keys
 
@@ -179,6 +183,7 @@ def eventteam_updated(affected_refs):
         page_num = _get_team_page_num(team_key.id())
         for year in years:
             queries_and_keys.append(TeamYearEventsQuery(team_key.id(), year))
+            queries_and_keys.append(TeamYearSummaryQuery(team_key.id(), year))
             queries_and_keys.append(TeamListYearQuery(year, page_num))
 
     for event_key in event_keys:
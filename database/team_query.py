@@ -1,9 +1,14 @@
+import datetime
+
 from google.appengine.ext import ndb
 
 from consts.district_type import DistrictType
+from database.award_query import TeamYearAwardsQuery
 from database.dict_converters.district_converter import DistrictConverter
 from database.dict_converters.team_converter import TeamConverter
 from database.database_query import DatabaseQuery
+from database.event_query import TeamYearEventsQuery
+from database.match_query import TeamYearMatchesQuery
 from models.district import District
 from models.district_team import DistrictTeam
 from models.event import Event
@@ -112,3 +117,44 @@ class TeamDistrictsQuery(DatabaseQuery):
         district_team_keys = yield DistrictTeam.query(DistrictTeam.team == ndb.Key(Team, team_key)).fetch_async(keys_only=True)
         districts = yield ndb.get_multi_async([ndb.Key(District, dtk.id().split('_')[0]) for dtk in district_team_keys])
         raise ndb.Return(districts)
+
+
+class TeamYearSummaryQuery(DatabaseQuery):
+    """
+    Composite of TeamYearEventsQuery, TeamYearMatchesQuery, and TeamYearAwardsQuery
+    with the grouping that the team pages need already done, so a cache hit
+    is a single RPC.
+    Returns a dict with:
+    'events_sorted': events sorted by start date, unknown dates last
+    'matches_by_event_key': {event_key: [matches]}
+    'awards_by_event_key': {event_key: [awards]}
+    """
+    CACHE_VERSION = 0
+    CACHE_KEY_FORMAT = 'team_year_summary_{}_{}'  # (team_key, year)
+
+    @ndb.tasklet
+    def _query_async(self):
+        team_key = self._query_args[0]
+        year = self._query_args[1]
+        # Bypass the constituent queries' caches, which may be cleared after this one
+        events, matches, awards = yield (
+            TeamYearEventsQuery(team_key, year)._query_async(),
+            TeamYearMatchesQuery(team_key, year)._query_async(),
+            TeamYearAwardsQuery(team_key, year)._query_async(),
+        )
+
+        events_sorted = sorted(events, key=lambda e: e.start_date if e.start_date else datetime.datetime(year, 12, 31))  # unknown goes last
+
+        matches_by_event_key = {}
+        for match in matches:
+            matches_by_event_key.setdefault(match.event, []).append(match)
+
+        awards_by_event_key = {}
+        for award in awards:
+            awards_by_event_key.setdefault(award.event, []).append(award)
+
+        raise ndb.Return({
+            'events_sorted': events_sorted,
+            'matches_by_event_key': matches_by_event_key,
+            'awards_by_event_key': awards_by_event_key,
+        })
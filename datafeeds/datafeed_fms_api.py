@@ -1,6 +1,7 @@
 import base64
 import cloudstorage
 import datetime
+import itertools
 import json
 import logging
 import tba_config
@@ -11,6 +12,7 @@ from google.appengine.ext import ndb
 from consts.event_type import EventType
 from controllers.api.api_status_controller import ApiStatusController
 from datafeeds.datafeed_base import DatafeedBase
+from helpers.json_stream_helper import JSONStreamHelper
 
 from models.event_team import EventTeam
 from models.sitevar import Sitevar
@@ -215,6 +217,9 @@ class DatafeedFMSAPI(object):
 
             if type(parser) == list:
                 raise ndb.Return([p.parse(json.loads(result.content)) for p in parser])
+            elif hasattr(parser, 'ROWS_KEY'):
+                # Feed rows to the parser as they're decoded instead of decoding the whole response
+                raise ndb.Return(parser.parse_rows(JSONStreamHelper.iter_array(result.content, parser.ROWS_KEY)))
             else:
                 raise ndb.Return(parser.parse(json.loads(result.content)))
         elif result.status_code % 100 == 5:
@@ -277,12 +282,12 @@ class DatafeedFMSAPI(object):
             for match in playoff_matches[0]:
                 matches_by_key[match.key.id()] = match
 
-        qual_details = qual_details_future.get_result()
-        qual_details_items = qual_details.items() if qual_details is not None else []
-        playoff_details = playoff_details_future.get_result()
-        playoff_details_items = playoff_details.items() if playoff_details is not None else []
-        for match_key, match_details in qual_details_items + playoff_details_items:
-            match_key = playoff_matches[1].get(match_key, match_key)
+        # Details are streamed, so each breakdown is serialized before the next is read
+        remapped_matches = playoff_matches[1] if playoff_matches is not None else {}
+        qual_details = qual_details_future.get_result() or []
+        playoff_details = playoff_details_future.get_result() or []
+        for match_key, match_details in itertools.chain(qual_details, playoff_details):
+            match_key = remapped_matches.get(match_key, match_key)
             if match_key in matches_by_key:
                 matches_by_key[match_key].score_breakdown_json = json.dumps(match_details)
 
@@ -28,6 +28,7 @@ TIME_PATTERN = "%Y-%m-%dT%H:%M:%S"
 
 
 class FMSAPIHybridScheduleParser(object):
+    ROWS_KEY = 'Schedule'
 
     def __init__(self, year, event_short):
         self.year = year
@@ -49,8 +50,12 @@ class FMSAPIHybridScheduleParser(object):
         return True
 
     def parse(self, response):
-        matches = response['Schedule']
+        return self.parse_rows(response[self.ROWS_KEY])
 
+    def parse_rows(self, matches):
+        """
+        |matches| may be any iterable of schedule rows, like a stream from JSONStreamHelper
+        """
         event_key = '{}{}'.format(self.year, self.event_short)
         event = Event.get_by_id(event_key)
         if event.timezone_id:
@@ -227,18 +232,23 @@ class FMSAPIHybridScheduleParser(object):
 
 
 class FMSAPIMatchDetailsParser(object):
+    ROWS_KEY = 'MatchScores'
+
     def __init__(self, year, event_short):
         self.year = year
         self.event_short = event_short
 
     def parse(self, response):
-        matches = response['MatchScores']
+        return dict(self.parse_rows(response[self.ROWS_KEY]))
 
+    def parse_rows(self, matches):
+        """
+        Yields (match_key, breakdown) as each of |matches| is read, so only one
+        breakdown has to be in memory at a time
+        """
         event_key = '{}{}'.format(self.year, self.event_short)
         event = Event.get_by_id(event_key)
 
-        match_details_by_key = {}
-
         for match in matches:
             comp_level = PlayoffType.get_comp_level(event.playoff_type, match['matchLevel'], match['matchNumber'])
             set_number, match_number = PlayoffType.get_set_match_number(event.playoff_type, comp_level, match['matchNumber'])
@@ -256,10 +266,8 @@ class FMSAPIMatchDetailsParser(object):
                     if key != 'alliance':
                         breakdown[color][key] = value
 
-            match_details_by_key[Match.renderKeyName(
-                '{}{}'.format(self.year, self.event_short),
+            yield Match.renderKeyName(
+                event_key,
                 comp_level,
                 set_number,
-                match_number)] = breakdown
-
-        return match_details_by_key
+                match_number), breakdown
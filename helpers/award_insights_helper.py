@@ -0,0 +1,208 @@
+import itertools
+import logging
+
+from collections import defaultdict
+
+from google.appengine.ext import ndb
+
+import tba_config
+from consts.award_type import AwardType
+from consts.event_type import EventType
+from models.award import Award
+from models.award_insights_aggregate import AwardInsightsAggregate
+
+
+class AwardInsightsHelper(object):
+    """
+    Maintains the per-year AwardInsightsAggregate behind the award Insights.
+    An aggregate is built in full by rebuild, after which AwardManipulator
+    post update/delete hooks apply each award's change to the counters,
+    so neither the year nor the overall insights have to rescan awards.
+    """
+    COUNTERS = ['blue_banners', 'regional_winners', 'rca_winners', 'world_champions', 'elim_teamups']
+    BLUE_BANNER_EVENT_TYPES = {EventType.REGIONAL, EventType.DISTRICT, EventType.DISTRICT_CMP_DIVISION, EventType.DISTRICT_CMP, EventType.CMP_DIVISION, EventType.CMP_FINALS}
+
+    @classmethod
+    def is_tracked(cls, award_type_enum, event_type_enum):
+        """
+        Blue Banner awards, Division Finalists, and Championship Finalists
+        """
+        if award_type_enum in AwardType.BLUE_BANNER_AWARDS:
+            return event_type_enum in cls.BLUE_BANNER_EVENT_TYPES
+        if award_type_enum == AwardType.FINALIST:
+            return event_type_enum in EventType.CMP_EVENT_TYPES
+        return False
+
+    @classmethod
+    def _get_entry(cls, award):
+        if not cls.is_tracked(award.award_type_enum, award.event_type_enum):
+            return None
+        return [award.award_type_enum, award.event_type_enum, [team_key.id() for team_key in award.team_list]]
+
+    @classmethod
+    def _get_contributions(cls, entry):
+        """
+        Yields (counter, key) for each count |entry| adds
+        """
+        award_type_enum, event_type_enum, team_keys = entry
+        if award_type_enum in AwardType.BLUE_BANNER_AWARDS:
+            for team_key in team_keys:
+                yield 'blue_banners', team_key
+        if event_type_enum not in EventType.CMP_EVENT_TYPES:
+            if award_type_enum == AwardType.CHAIRMANS and event_type_enum in {EventType.REGIONAL, EventType.DISTRICT_CMP}:
+                for team_key in team_keys:
+                    yield 'rca_winners', team_key
+            elif award_type_enum == AwardType.WINNER:
+                for team_key in team_keys:
+                    yield 'regional_winners', team_key
+        if award_type_enum == AwardType.WINNER:
+            if event_type_enum == EventType.CMP_FINALS:
+                for team_key in team_keys:
+                    yield 'world_champions', team_key
+            for pair in itertools.combinations(team_keys, 2):
+                yield 'elim_teamups', ','.join(sorted(pair))
+
+    @classmethod
+    def _new_aggregate(cls, year):
+        aggregate = AwardInsightsAggregate(id=str(year), awards={})
+        for counter in cls.COUNTERS:
+            setattr(aggregate, counter, {})
+        return aggregate
+
+    @classmethod
+    def apply(cls, aggregate, award_key_name, entry):
+        """
+        Replaces the counts of |award_key_name| in |aggregate| with those of |entry|,
+        or removes them if |entry| is None. Returns whether anything changed.
+        """
+        old_entry = aggregate.awards.get(award_key_name)
+        if old_entry == entry:
+            return False
+
+        counters = dict((counter, getattr(aggregate, counter)) for counter in cls.COUNTERS)
+        if old_entry is not None:
+            for counter, key in cls._get_contributions(old_entry):
+                counters[counter][key] -= 1
+                if counters[counter][key] <= 0:
+                    del counters[counter][key]
+            del aggregate.awards[award_key_name]
+        if entry is not None:
+            for counter, key in cls._get_contributions(entry):
+                counters[counter][key] = counters[counter].get(key, 0) + 1
+            aggregate.awards[award_key_name] = entry
+        return True
+
+    @classmethod
+    @ndb.transactional
+    def _update_aggregate(cls, year, entries):
+        aggregate = AwardInsightsAggregate.get_by_id(str(year))
+        if aggregate is None:
+            return  # Not built yet. It will be built in full the first time it's needed.
+        changed = False
+        for award_key_name, entry in entries:
+            changed = cls.apply(aggregate, award_key_name, entry) or changed
+        if changed:
+            aggregate.put()
+
+    @classmethod
+    def _update_aggregates(cls, entries_by_year):
+        for year, entries in entries_by_year.items():
+            try:
+                cls._update_aggregate(year, entries)
+            except Exception, e:
+                logging.error("Award insights update for {} errored!".format(year))
+                logging.exception(e)
+
+    @classmethod
+    def update_awards(cls, awards):
+        entries_by_year = defaultdict(list)
+        for award in awards:
+            entries_by_year[award.year].append((award.key.id(), cls._get_entry(award)))
+        cls._update_aggregates(entries_by_year)
+
+    @classmethod
+    def remove_awards(cls, awards):
+        entries_by_year = defaultdict(list)
+        for award in awards:
+            entries_by_year[award.year].append((award.key.id(), None))
+        cls._update_aggregates(entries_by_year)
+
+    @classmethod
+    def rebuild(cls, year):
+        """
+        Builds the aggregate for |year| from every tracked award.
+        Awards are found with queries, which are eventually consistent, so the
+        awards already in the stored aggregate are read by key as well. Hook
+        updates that land while rebuilding are reapplied when the result is saved.
+        """
+        stored_aggregate = AwardInsightsAggregate.get_by_id(str(year), use_cache=False, use_memcache=False)
+        stored_entries = dict(stored_aggregate.awards) if stored_aggregate else {}
+
+        blue_banner_award_keys_future = Award.query(
+            Award.year == year,
+            Award.award_type_enum.IN(AwardType.BLUE_BANNER_AWARDS),
+            Award.event_type_enum.IN(cls.BLUE_BANNER_EVENT_TYPES)
+        ).fetch_async(10000, keys_only=True)
+        cmp_finalist_award_keys_future = Award.query(
+            Award.year == year,
+            Award.award_type_enum == AwardType.FINALIST,
+            Award.event_type_enum.IN(EventType.CMP_EVENT_TYPES)
+        ).fetch_async(10000, keys_only=True)
+
+        award_keys = set(blue_banner_award_keys_future.get_result()).union(
+            set(cmp_finalist_award_keys_future.get_result()))
+        award_keys.update(ndb.Key(Award, award_key_name) for award_key_name in stored_entries.keys())
+
+        aggregate = cls._new_aggregate(year)
+        for award in ndb.get_multi(list(award_keys), use_cache=False, use_memcache=False):
+            if award is not None:
+                cls.apply(aggregate, award.key.id(), cls._get_entry(award))
+        return cls._save_rebuilt_aggregate(aggregate, stored_entries)
+
+    @classmethod
+    @ndb.transactional
+    def _save_rebuilt_aggregate(cls, aggregate, stored_entries):
+        """
+        Saves a rebuilt |aggregate|, reapplying every entry that hooks changed
+        in the stored aggregate since |stored_entries| were read
+        """
+        current_aggregate = AwardInsightsAggregate.get_by_id(aggregate.key.id())
+        current_entries = current_aggregate.awards if current_aggregate else {}
+        for award_key_name in set(stored_entries.keys()).union(current_entries.keys()):
+            if current_entries.get(award_key_name) != stored_entries.get(award_key_name):
+                cls.apply(aggregate, award_key_name, current_entries.get(award_key_name))
+        aggregate.put()
+        return aggregate
+
+    @classmethod
+    def get_aggregate(cls, year, rebuild=False):
+        """
+        Returns the aggregate for |year|, building it if needed
+        """
+        aggregate = None if rebuild else AwardInsightsAggregate.get_by_id(str(year))
+        if aggregate is None:
+            aggregate = cls.rebuild(year)
+        return aggregate
+
+    @classmethod
+    def get_all_aggregates(cls):
+        """
+        Returns the aggregate of every year, building those that haven't been
+        """
+        years = range(1992, tba_config.MAX_YEAR + 1)
+        aggregates = ndb.get_multi([ndb.Key(AwardInsightsAggregate, str(year)) for year in years])
+        return [
+            aggregate if aggregate is not None else cls.rebuild(year)
+            for year, aggregate in zip(years, aggregates)]
+
+    @classmethod
+    def merge(cls, aggregates):
+        """
+        Sums the counters of |aggregates|. Returns a dict of counter: defaultdict(int).
+        """
+        merged = dict((counter, defaultdict(int)) for counter in cls.COUNTERS)
+        for aggregate in aggregates:
+            for counter in cls.COUNTERS:
+                for key, count in getattr(aggregate, counter).items():
+                    merged[counter][key] += count
+        return merged
@@ -1,10 +1,13 @@
 import json
 import logging
 
+from collections import defaultdict
 from google.appengine.api import taskqueue
 
+from helpers.award_insights_helper import AwardInsightsHelper
 from helpers.cache_clearer import CacheClearer
 from helpers.manipulator_base import ManipulatorBase
+from helpers.mytba_dashboard_helper import MyTBADashboardHelper
 from helpers.notification_helper import NotificationHelper
 
 
@@ -16,6 +19,21 @@ class AwardManipulator(ManipulatorBase):
     def getCacheKeysAndControllers(cls, affected_refs):
         return CacheClearer.get_award_cache_keys_and_controllers(affected_refs)
 
+    @classmethod
+    def postDeleteHook(cls, awards):
+        '''
+        To run after the award has been deleted.
+        '''
+        AwardInsightsHelper.remove_awards(awards)
+        cls._clear_dashboards(awards)
+
+    @classmethod
+    def _clear_dashboards(cls, awards):
+        team_keys_by_year = defaultdict(set)
+        for award in awards:
+            team_keys_by_year[award.year].update(team_key.id() for team_key in award.team_list)
+        MyTBADashboardHelper.clear_team_followers(team_keys_by_year)
+
     @classmethod
     def postUpdateHook(cls, awards, updated_attr_list, is_new_list):
         # Note, updated_attr_list will always be empty, for now
@@ -34,6 +52,9 @@ class AwardManipulator(ManipulatorBase):
                 except Exception:
                     logging.error("Error sending award update for {}".format(event.id()))
 
+        AwardInsightsHelper.update_awards(awards)
+        cls._clear_dashboards(awards)
+
         # Enqueue task to calculate district points
         for event in events:
             taskqueue.add(
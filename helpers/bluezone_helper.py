@@ -4,7 +4,6 @@ import json
 import logging
 
 from helpers.firebase.firebase_pusher import FirebasePusher
-from helpers.match_helper import MatchHelper
 from helpers.outgoing_notification_helper import OutgoingNotificationHelper
 from models.event import Event
 from models.match import Match
@@ -22,7 +21,7 @@ class BlueZoneHelper(object):
     def get_upcoming_matches(cls, live_events, n=1):
         matches = []
         for event in live_events:
-            upcoming_matches = MatchHelper.upcomingMatches(event.matches, n)
+            upcoming_matches = event.match_index.upcoming_matches(n)
             matches.extend(upcoming_matches)
         return matches
 
@@ -0,0 +1,286 @@
+import cloudstorage
+import csv
+import json
+import logging
+import urllib
+
+from google.appengine.api import taskqueue
+from google.appengine.ext import ndb
+
+from database.dict_converters.team_converter import TeamConverter
+from models.award import Award
+from models.bulk_job_checkpoint import BulkJobCheckpoint
+from models.event import Event
+from models.event_team import EventTeam
+from models.match import Match
+from models.team import Team
+
+
+class BulkJob(object):
+    """
+    Runs over the results of a datastore query one page per task.
+    Each task fetches PAGE_SIZE models starting at the checkpointed cursor,
+    processes them, and then atomically advances the checkpoint and enqueues
+    the task for the next page. Memory per task is bounded by the page size,
+    a retried task redoes only its own page, and a failed job can be resumed
+    from the checkpoint. A duplicate task that finds the checkpoint already
+    past its page doesn't advance it or enqueue another.
+    Subclasses set NAME and implement get_query and process_page.
+    """
+    NAME = None
+    PAGE_SIZE = 100
+    QUEUE_NAME = 'bulk-jobs'
+    DO_URL = '/tasks/do/bulk_job/{}/{}'  # (name, part)
+
+    def __init__(self, params=None):
+        self.params = params or {}
+
+    @property
+    def job_id(self):
+        return '_'.join([self.NAME] + ['{}={}'.format(k, v) for k, v in sorted(self.params.items())])
+
+    def get_query(self):
+        raise NotImplementedError
+
+    def process_page(self, models, part):
+        """
+        Processes one page of models and returns how many rows were handled
+        """
+        raise NotImplementedError
+
+    def finish(self, checkpoint):
+        """
+        Called once after the last page has been processed
+        """
+        pass
+
+    def _enqueue(self, part, transactional=False):
+        url = self.DO_URL.format(self.NAME, part)
+        if self.params:
+            url += '?' + urllib.urlencode(self.params)
+        taskqueue.add(
+            queue_name=self.QUEUE_NAME,
+            url=url,
+            method='GET',
+            transactional=transactional)
+
+    def start(self):
+        """
+        Starts the job over from the beginning
+        """
+        BulkJobCheckpoint(id=self.job_id).put()
+        self._enqueue(0)
+
+    def resume(self):
+        """
+        Re-enqueues the next unfinished page. Returns the checkpoint, or None if there is nothing to resume.
+        """
+        checkpoint = BulkJobCheckpoint.get_by_id(self.job_id)
+        if checkpoint is None or checkpoint.done:
+            return None
+        self._enqueue(checkpoint.part)
+        return checkpoint
+
+    @classmethod
+    def _is_due(cls, checkpoint, part):
+        return checkpoint is not None and not checkpoint.done and checkpoint.part == part
+
+    def run(self, part):
+        """
+        Runs page |part| if it is the next one due. Returns the updated checkpoint.
+        """
+        checkpoint = BulkJobCheckpoint.get_by_id(self.job_id)
+        if not self._is_due(checkpoint, part):
+            logging.warning("Skipping stale bulk job task {} part {}".format(self.job_id, part))
+            return checkpoint
+
+        start_cursor = ndb.Cursor(urlsafe=checkpoint.cursor) if checkpoint.cursor else None
+        models, next_cursor, more = self.get_query().fetch_page(self.PAGE_SIZE, start_cursor=start_cursor)
+        rows = self.process_page(models, part)
+
+        checkpoint.part += 1
+        checkpoint.rows += rows
+        checkpoint.cursor = next_cursor.urlsafe() if more and next_cursor else None
+        checkpoint.done = checkpoint.cursor is None
+        if checkpoint.done:
+            self.finish(checkpoint)
+
+        @ndb.transactional
+        def advance():
+            # A duplicate task for this part may have advanced the checkpoint since it was read
+            stored_checkpoint = BulkJobCheckpoint.get_by_id(self.job_id)
+            if not self._is_due(stored_checkpoint, part):
+                return stored_checkpoint, False
+            checkpoint.put()
+            if not checkpoint.done:
+                self._enqueue(checkpoint.part, transactional=True)
+            return checkpoint, True
+
+        checkpoint, advanced = advance()
+        if not advanced:
+            logging.warning("Bulk job {} part {} was already run by another task".format(self.job_id, part))
+            return checkpoint
+
+        logging.info("Bulk job {} part {}: {} models, {} rows total".format(self.job_id, part, len(models), checkpoint.rows))
+        return checkpoint
+
+    @classmethod
+    def open_file(cls, filename, mode='r', **kwargs):
+        """
+        Opens a Cloud Storage file
+        """
+        return cloudstorage.open(filename, mode, **kwargs)
+
+    @classmethod
+    def write_csv_row(cls, writer, row):
+        unicode_row = []
+        for s in row:
+            try:
+                unicode_row.append(s.encode("utf-8"))
+            except:
+                unicode_row.append(s)
+        writer.writerow(unicode_row)
+
+    @classmethod
+    def write_csv(cls, filename, rows):
+        """
+        Streams |rows| to a CSV file. The file is only created if there is at least one row.
+        Returns the number of rows written.
+        """
+        count = 0
+        csv_file = None
+        try:
+            for row in rows:
+                if csv_file is None:
+                    csv_file = cls.open_file(filename, 'w')
+                    writer = csv.writer(csv_file, delimiter=',')
+                cls.write_csv_row(writer, row)
+                count += 1
+        finally:
+            if csv_file is not None:
+                csv_file.close()
+        return count
+
+
+class BulkExportJob(BulkJob):
+    """
+    Exports rows to Cloud Storage as one CSV or JSONL part file per page,
+    followed by a JSON manifest listing the parts once the job is done.
+    Subclasses set NAME and PATH and implement get_query and get_rows.
+    """
+    FORMAT = 'csv'  # 'csv' or 'jsonl'
+    PATH = None  # Cloud Storage directory, like '/bucket/dir'
+
+    def get_rows(self, models):
+        """
+        Yields a list (for CSV) or a dict (for JSONL) per row
+        """
+        raise NotImplementedError
+
+    def get_part_filename(self, part):
+        return '{}/{}.part-{:05d}.{}'.format(self.PATH, self.job_id, part, self.FORMAT)
+
+    def get_manifest_filename(self):
+        return '{}/{}.manifest.json'.format(self.PATH, self.job_id)
+
+    def process_page(self, models, part):
+        count = 0
+        with self.open_file(self.get_part_filename(part), 'w') as part_file:
+            if self.FORMAT == 'csv':
+                writer = csv.writer(part_file, delimiter=',')
+                for row in self.get_rows(models):
+                    self.write_csv_row(writer, row)
+                    count += 1
+            else:
+                for row in self.get_rows(models):
+                    part_file.write(json.dumps(row) + '\n')
+                    count += 1
+        return count
+
+    def finish(self, checkpoint):
+        with self.open_file(self.get_manifest_filename(), 'w', content_type='application/json') as manifest_file:
+            manifest_file.write(json.dumps({
+                'parts': [self.get_part_filename(part) for part in xrange(checkpoint.part)],
+                'rows': checkpoint.rows,
+            }))
+
+
+class EventsCSVBackupJob(BulkJob):
+    """
+    Backs up event awards, matches, team list, rankings, and alliance selection order,
+    a few events per task. Optionally limited to one year with the "year" param.
+    """
+    NAME = 'csv_backup_events'
+    PAGE_SIZE = 10
+
+    AWARDS_FILENAME_PATTERN = '/tbatv-prod-hrd.appspot.com/tba-data-backup/events/{}/{}/{}_awards.csv'  # % (year, event_key, event_key)
+    MATCHES_FILENAME_PATTERN = '/tbatv-prod-hrd.appspot.com/tba-data-backup/events/{}/{}/{}_matches.csv'  # % (year, event_key, event_key)
+    TEAMS_FILENAME_PATTERN = '/tbatv-prod-hrd.appspot.com/tba-data-backup/events/{}/{}/{}_teams.csv'  # % (year, event_key, event_key)
+    RANKINGS_FILENAME_PATTERN = '/tbatv-prod-hrd.appspot.com/tba-data-backup/events/{}/{}/{}_rankings.csv'  # % (year, event_key, event_key)
+    ALLIANCES_FILENAME_PATTERN = '/tbatv-prod-hrd.appspot.com/tba-data-backup/events/{}/{}/{}_alliances.csv'  # % (year, event_key, event_key)
+    STREAM_BATCH_SIZE = 50
+
+    def get_query(self):
+        if self.params.get('year'):
+            return Event.query(Event.year == int(self.params['year']))
+        return Event.query()
+
+    def process_page(self, events, part):
+        for event in events:
+            self.backup_event(event)
+        return len(events)
+
+    @classmethod
+    def _award_rows(cls, event):
+        for award in Award.query(Award.event == event.key).iter(batch_size=cls.STREAM_BATCH_SIZE):
+            for recipient in award.recipient_list:
+                team = recipient['team_number']
+                if type(team) == int:
+                    team = 'frc{}'.format(team)
+                yield [award.key.id(), award.name_str, team, recipient['awardee']]
+
+    @classmethod
+    def _match_rows(cls, event):
+        for match in Match.query(Match.event == event.key).iter(batch_size=cls.STREAM_BATCH_SIZE):
+            red_score = match.alliances['red']['score']
+            blue_score = match.alliances['blue']['score']
+            yield [match.key.id()] + match.alliances['red']['teams'] + match.alliances['blue']['teams'] + [red_score, blue_score]
+
+    @classmethod
+    def _team_rows(cls, event):
+        team_keys = [event_team.team.id() for event_team in EventTeam.query(EventTeam.event == event.key).iter(batch_size=cls.STREAM_BATCH_SIZE)]
+        if team_keys:
+            yield team_keys
+
+    @classmethod
+    def backup_event(cls, event):
+        """
+        Streams each part of |event| to its CSV file. Files with no rows aren't written.
+        """
+        event_key = event.key.id()
+        cls.write_csv(cls.AWARDS_FILENAME_PATTERN.format(event.year, event_key, event_key), cls._award_rows(event))
+        cls.write_csv(cls.MATCHES_FILENAME_PATTERN.format(event.year, event_key, event_key), cls._match_rows(event))
+        cls.write_csv(cls.TEAMS_FILENAME_PATTERN.format(event.year, event_key, event_key), cls._team_rows(event))
+        cls.write_csv(cls.RANKINGS_FILENAME_PATTERN.format(event.year, event_key, event_key), event.rankings or [])
+        cls.write_csv(cls.ALLIANCES_FILENAME_PATTERN.format(event.year, event_key, event_key),
+                      [alliance['picks'] for alliance in event.alliance_selections or []])
+
+
+class TeamsJSONLExportJob(BulkExportJob):
+    """
+    Exports every team as API v3 team dicts, one per line
+    """
+    NAME = 'jsonl_export_teams'
+    FORMAT = 'jsonl'
+    PATH = '/tbatv-prod-hrd.appspot.com/tba-data-backup/exports/teams'
+    PAGE_SIZE = 500
+
+    def get_query(self):
+        return Team.query()
+
+    def get_rows(self, teams):
+        for team in teams:
+            yield TeamConverter.convert(team, 3)
+
+
+BULK_JOBS = {job.NAME: job for job in [EventsCSVBackupJob, TeamsJSONLExportJob]}
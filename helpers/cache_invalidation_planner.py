@@ -0,0 +1,118 @@
+import logging
+
+from collections import defaultdict
+
+from google.appengine.ext import ndb
+
+from database.database_query import DatabaseQuery
+from database.database_query_dependencies import DatabaseQueryDependencies
+from models.cached_query_result import CachedQueryResult
+
+
+class CacheInvalidationPlanner(object):
+    """
+    Collects the cache keys affected by a batch of writes and clears them.
+    - Cache keys are deduplicated across every model in the batch, and
+      models with identical affected references are only expanded once.
+    - Database query cache keys are checked against the datastore first with
+      strongly consistent gets, so only CachedQueryResults that actually
+      exist get deleted and counted.
+    - The fan-out of each write is recorded and logged.
+    - The manually mapped database query cache keys can be diffed against
+      the ones derived from tracked query dependencies (shadow mode).
+    """
+    EXISTENCE_CHECK_BATCH_SIZE = 100
+
+    def __init__(self, get_cache_keys_and_controllers):
+        self._get_cache_keys_and_controllers = get_cache_keys_and_controllers
+        self._seen_affected_references = {}  # frozen affected_references: fan-out
+        self.cache_keys_by_controller = defaultdict(set)
+        self.fan_outs = []  # Number of cache keys each write affected
+        self.dependency_tokens = set()
+
+    @classmethod
+    def _freeze(cls, affected_references):
+        return frozenset((attr, frozenset(values)) for attr, values in affected_references.items())
+
+    def add(self, affected_references, kind=None):
+        if kind is not None:
+            self.dependency_tokens.update(DatabaseQueryDependencies.get_tokens_for_references(kind, affected_references))
+
+        frozen = self._freeze(affected_references)
+        if frozen in self._seen_affected_references:
+            self.fan_outs.append(self._seen_affected_references[frozen])
+            return
+
+        cache_keys_and_controllers = set(self._get_cache_keys_and_controllers(affected_references))
+        for cache_key, controller in cache_keys_and_controllers:
+            self.cache_keys_by_controller[controller].add(cache_key)
+
+        self._seen_affected_references[frozen] = len(cache_keys_and_controllers)
+        self.fan_outs.append(len(cache_keys_and_controllers))
+
+    def get_manual_query_cache_keys(self):
+        query_cache_keys = set()
+        for controller, cache_keys in self.cache_keys_by_controller.items():
+            if issubclass(controller, DatabaseQuery):
+                query_cache_keys.update(controller.get_all_cache_keys(cache_keys))
+        return query_cache_keys
+
+    def report_dependency_diff(self):
+        """
+        Compares the manually mapped database query cache keys with the ones
+        derived from tracked dependencies and logs the difference.
+        Returns (derived but not manual, manual but not derived).
+        """
+        if not self.dependency_tokens:
+            return set(), set()
+
+        manual = self.get_manual_query_cache_keys()
+        derived = DatabaseQueryDependencies.get_dependent_cache_keys(self.dependency_tokens)
+        missing_from_manual = derived.difference(manual)
+        missing_from_derived = manual.difference(derived)
+        if missing_from_manual:
+            logging.warning("Cache dependency shadow diff: {} keys depend on this write but aren't mapped manually: {}".format(
+                len(missing_from_manual), sorted(missing_from_manual)))
+        logging.info("Cache dependency shadow diff: {} manual, {} derived, {} manual only".format(
+            len(manual), len(derived), len(missing_from_derived)))
+        return missing_from_manual, missing_from_derived
+
+    @classmethod
+    def _get_populated_keys(cls, keys):
+        """
+        Returns the subset of CachedQueryResult |keys| that exist
+        """
+        futures = []
+        for i in xrange(0, len(keys), cls.EXISTENCE_CHECK_BATCH_SIZE):
+            batch = keys[i:i + cls.EXISTENCE_CHECK_BATCH_SIZE]
+            futures.append(ndb.get_multi_async(batch, use_cache=False, use_memcache=False))
+
+        populated_keys = []
+        for batch_futures in futures:
+            populated_keys += [future.get_result().key for future in batch_futures if future.get_result() is not None]
+        return populated_keys
+
+    def execute(self):
+        """
+        Clears everything that has been added. Returns a dict of stats.
+        """
+        for controller, cache_keys in self.cache_keys_by_controller.items():
+            if not issubclass(controller, DatabaseQuery):
+                controller.delete_cache_multi(cache_keys)
+        query_cache_keys = self.get_manual_query_cache_keys()
+
+        candidate_keys = [ndb.Key(CachedQueryResult, cache_key) for cache_key in query_cache_keys]
+        populated_keys = self._get_populated_keys(candidate_keys)
+        logging.info("Deleting db query cache keys: {}".format(sorted(key.id() for key in populated_keys)))
+        ndb.delete_multi(populated_keys)
+
+        stats = {
+            'writes': len(self.fan_outs),
+            'max_fan_out': max(self.fan_outs) if self.fan_outs else 0,
+            'total_fan_out': sum(self.fan_outs),
+            'unique_cache_keys': sum(len(cache_keys) for cache_keys in self.cache_keys_by_controller.values()),
+            'query_cache_candidates': len(candidate_keys),
+            'query_cache_deleted': len(populated_keys),
+        }
+        logging.info("Cache invalidation fan-out: {}".format(stats))
+        return stats
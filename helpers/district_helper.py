@@ -66,7 +66,7 @@ class DistrictHelper(object):
         # match points
         if event.year >= 2015:
             # Switched to ranking-based points for 2015 and onward
-            cls.calc_rank_based_match_points(event, district_points, event.matches, POINTS_MULTIPLIER)
+            cls.calc_rank_based_match_points(event, district_points, event.match_index.organized, POINTS_MULTIPLIER)
         else:
             cls.calc_wlt_based_match_points(district_points, event.matches, POINTS_MULTIPLIER)
 
@@ -84,20 +84,7 @@ class DistrictHelper(object):
 
         # award points
         for award in event.awards:
-            point_value = 0
-            if event.year >= 2014:
-                if award.award_type_enum not in AwardType.NON_JUDGED_NON_TEAM_AWARDS:
-                    if award.award_type_enum == AwardType.CHAIRMANS:
-                        point_value = DistrictPointValues.CHAIRMANS.get(event.year, DistrictPointValues.CHAIRMANS_DEFAULT)
-                    elif award.award_type_enum in {AwardType.ENGINEERING_INSPIRATION, AwardType.ROOKIE_ALL_STAR}:
-                        point_value = DistrictPointValues.EI_AND_RAS_DEFAULT
-                    else:
-                        point_value = DistrictPointValues.OTHER_AWARD_DEFAULT
-            else:  # Legacy awards
-                if award.award_type_enum in DistrictPointValues.LEGACY_5_PT_AWARDS.get(event.year, []):
-                    point_value = 5
-                elif award.award_type_enum in DistrictPointValues.LEGACY_2_PT_AWARDS.get(event.year, []):
-                    point_value = 2
+            point_value = cls.award_point_value(award, event.year)
 
             # Add award points to all teams who won
             for team in award.team_list:
@@ -109,6 +96,27 @@ class DistrictHelper(object):
 
         return district_points
 
+    @classmethod
+    def award_point_value(cls, award, year):
+        """
+        District points for each team that won |award|, before the event's multiplier
+        """
+        if year >= 2014:
+            if award.award_type_enum in AwardType.NON_JUDGED_NON_TEAM_AWARDS:
+                return 0
+            elif award.award_type_enum == AwardType.CHAIRMANS:
+                return DistrictPointValues.CHAIRMANS.get(year, DistrictPointValues.CHAIRMANS_DEFAULT)
+            elif award.award_type_enum in {AwardType.ENGINEERING_INSPIRATION, AwardType.ROOKIE_ALL_STAR}:
+                return DistrictPointValues.EI_AND_RAS_DEFAULT
+            else:
+                return DistrictPointValues.OTHER_AWARD_DEFAULT
+        else:  # Legacy awards
+            if award.award_type_enum in DistrictPointValues.LEGACY_5_PT_AWARDS.get(year, []):
+                return 5
+            elif award.award_type_enum in DistrictPointValues.LEGACY_2_PT_AWARDS.get(year, []):
+                return 2
+            return 0
+
     @classmethod
     def calculate_rankings(cls, events, teams, year):
         # aggregate points from first two events and district championship
@@ -275,9 +283,8 @@ class DistrictHelper(object):
         This algorithm was introduced for the 2015 season and also used for 2016
         See: http://www.firstinspires.org/node/7616 and also
         http://www.firstinspires.org/robotics/frc/blog/Admin-Manual-Section-7-and-the-FIRST-STRONGHOLD-Logo
+        :param matches: Organized matches (via Event.match_index)
         """
-        from helpers.match_helper import MatchHelper  # circular import issue
-
         # qual match points are calculated by rank
         if event.rankings and len(event.rankings) > 1:
             rankings = event.rankings[1:]  # skip title row
@@ -296,8 +303,6 @@ class DistrictHelper(object):
             else:
                 logging.info(msg)
 
-        matches = MatchHelper.organizeMatches(matches)
-
         # qual match calculations. only used for tiebreaking
         for match in matches['qm']:
             for color in ['red', 'blue']:
@@ -3,6 +3,7 @@ import logging
 from database.district_query import DistrictHistoryQuery
 from helpers.cache_clearer import CacheClearer
 from helpers.manipulator_base import ManipulatorBase
+from helpers.typeahead_helper import TypeaheadHelper
 from models.district import District
 
 
@@ -43,6 +44,23 @@ class DistrictManipulator(ManipulatorBase):
                         to_put.append(other_district)
                 cls.createOrUpdate(to_put, run_post_update_hook=False)
 
+        TypeaheadHelper.update_district_typeaheads([
+            district for (district, updated_attrs, is_new) in zip(districts, updated_attr_list, is_new_list)
+            if is_new or 'display_name' in updated_attrs])
+
+    @classmethod
+    def postDeleteHook(cls, districts):
+        """
+        To run after a district has been deleted.
+        Only drops the typeahead entry once no other year of the district remains.
+        """
+        to_remove = []
+        for district in districts:
+            other_years = [d for d in DistrictHistoryQuery(district.abbreviation).fetch() if d.year != district.year]
+            if not other_years:
+                to_remove.append(district)
+        TypeaheadHelper.remove_district_typeaheads(to_remove)
+
     @classmethod
     def getCacheKeysAndControllers(cls, affected_refs):
         return CacheClearer.get_district_cache_keys_and_controllers(affected_refs)
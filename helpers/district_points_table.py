@@ -0,0 +1,415 @@
+import logging
+import math
+import numpy as np
+
+from collections import defaultdict
+
+from google.appengine.ext import ndb
+
+from consts.district_point_values import DistrictPointValues
+from consts.event_type import EventType
+
+from helpers.district_helper import DistrictHelper
+from helpers.event_helper import EventHelper
+
+
+class DistrictPointsTable(object):
+    """
+    District points of a list of events, such as all of a district's events in
+    a year, held as arrays indexed by (event, team). Points are accumulated from
+    flat lists of entries and rankings are sorted with array operations, instead
+    of walking nested dicts team by team.
+    Results are the same as DistrictHelper.calculate_event_points and
+    DistrictHelper.calculate_rankings.
+    Build with calculate() or from_district_points().
+    """
+    FIELDS = ['qual_points', 'elim_points', 'alliance_points', 'award_points', 'total']
+    NUM_TOP_SCORES = 3
+    ALPHA = 1.07  # Of the rank based qual points distribution
+
+    def __init__(self, events):
+        self.events = events
+        self.team_keys = []
+        self._team_indices = {}
+
+        # Entries accumulated into arrays by _build
+        self._points = {field: [] for field in self.FIELDS}  # field: [(event index, team index, points)]
+        self._qual_ranks = []  # [(event index, team index, rank, number of teams, multiplier)]
+        self._elim_wins = []  # [(event index, team index, series, series win number, points)]
+        self._series_wins = []  # series: number of wins
+        self._qual_wins = []  # [(event index, team index, wins)]
+        self._qual_scores = []  # [(event index, team index, score)]
+
+    @classmethod
+    def calculate(cls, events):
+        """
+        Calculates the points of all |events| at once
+        """
+        for event in events:
+            event.prep_details()
+            event.get_awards_async()
+            event.get_matches_async()
+
+        table = cls(events)
+        for event_index, event in enumerate(events):
+            table._add_event(event_index, event)
+        table._build()
+        return table
+
+    @classmethod
+    def from_district_points(cls, events):
+        """
+        Loads the stored district points of |events|. Events without any are skipped.
+        """
+        table = cls(events)
+        for event_index, event in enumerate(events):
+            if event.district_points is None:
+                continue
+            for team_key, points in event.district_points['points'].items():
+                for field in cls.FIELDS:
+                    table._add_points(field, event_index, team_key, points[field])
+            for team_key, tiebreakers in event.district_points['tiebreakers'].items():
+                table._add_qual_wins(event_index, team_key, tiebreakers['qual_wins'])
+                for score in tiebreakers['highest_qual_scores']:
+                    table._add_qual_score(event_index, team_key, score)
+        table._build()
+        return table
+
+    @classmethod
+    def inverf(cls, x):
+        """
+        DistrictHelper.inverf over an array
+        """
+        a = 0.147
+        log_term = np.log(1 - x ** 2)
+        b = (2 / (math.pi * a)) + log_term / 2
+        return np.sign(x) * np.sqrt(np.sqrt(b ** 2 - log_term / a) - b)
+
+    def _team_index(self, team_key):
+        team_index = self._team_indices.get(team_key)
+        if team_index is None:
+            team_index = self._team_indices[team_key] = len(self.team_keys)
+            self.team_keys.append(team_key)
+        return team_index
+
+    def _add_points(self, field, event_index, team_key, points):
+        self._points[field].append((event_index, self._team_index(team_key), points))
+
+    def _add_qual_wins(self, event_index, team_key, wins):
+        self._qual_wins.append((event_index, self._team_index(team_key), wins))
+
+    def _add_qual_score(self, event_index, team_key, score):
+        self._qual_scores.append((event_index, self._team_index(team_key), score))
+
+    def _add_event(self, event_index, event):
+        # Typically 3 for District CMP, 1 otherwise
+        multiplier = DistrictPointValues.DISTRICT_CMP_MULTIPLIER.get(event.year, DistrictPointValues.DISTRICT_CMP_MULIPLIER_DEFAULT) if event.event_type_enum == EventType.DISTRICT_CMP else DistrictPointValues.STANDARD_MULTIPLIER
+
+        # match points
+        if event.year >= 2015:
+            self._add_rank_based_match_points(event_index, event, event.match_index.organized, multiplier)
+        else:
+            self._add_wlt_based_match_points(event_index, event.matches, multiplier)
+
+        # alliance points
+        if event.alliance_selections:
+            selection_points = EventHelper.alliance_selections_to_points(event, multiplier, event.alliance_selections)
+            for team_key, points in selection_points.items():
+                self._add_points('alliance_points', event_index, team_key, points)
+        else:
+            self._log_missing(event, "Event {} has no alliance selection district_points!")
+
+        # award points
+        for award in event.awards:
+            point_value = DistrictHelper.award_point_value(award, event.year) * multiplier
+            for team in award.team_list:
+                self._add_points('award_points', event_index, team.id(), point_value)
+
+    def _log_missing(self, event, msg):
+        msg = msg.format(event.key.id())
+        if event.event_type_enum in EventType.SEASON_EVENT_TYPES:
+            logging.warning(msg)
+        else:
+            logging.info(msg)
+
+    def _add_wlt_based_match_points(self, event_index, matches, multiplier):
+        """
+        Like DistrictHelper.calc_wlt_based_match_points
+        """
+        elim_matches = []
+        for match in matches:
+            if not match.has_been_played:
+                continue
+
+            if match.comp_level == 'qm':
+                if match.winning_alliance == '':  # Match is a tie
+                    for team_key in match.team_key_names:
+                        self._add_points('qual_points', event_index, team_key, DistrictPointValues.MATCH_TIE * multiplier)
+                else:
+                    for team_key in match.alliances[match.winning_alliance]['teams']:
+                        self._add_points('qual_points', event_index, team_key, DistrictPointValues.MATCH_WIN * multiplier)
+                        self._add_qual_wins(event_index, team_key, 1)
+
+                for color in ['red', 'blue']:
+                    for team_key in match.alliances[color]['teams']:
+                        self._add_qual_score(event_index, team_key, match.alliances[color]['score'])
+            else:
+                elim_matches.append(match)
+        self._add_elim_match_points(event_index, elim_matches, multiplier)
+
+    def _add_rank_based_match_points(self, event_index, event, matches, multiplier):
+        """
+        Like DistrictHelper.calc_rank_based_match_points. Qual points are
+        calculated for all events at once by _build.
+        """
+        if event.rankings and len(event.rankings) > 1:
+            rankings = event.rankings[1:]  # skip title row
+            for row in rankings:
+                team_index = self._team_index('frc{}'.format(row[1]))
+                self._qual_ranks.append((event_index, team_index, int(row[0]), len(rankings), multiplier))
+        else:
+            self._log_missing(event, "Event {} has no rankings for qual_points calculations!")
+
+        # qual match scores. only used for tiebreaking
+        add_qual_score = self._qual_scores.append
+        team_index = self._team_index
+        for match in matches['qm']:
+            for color in ['red', 'blue']:
+                score = match.alliances[color]['score']
+                for team_key in match.alliances[color]['teams']:
+                    add_qual_score((event_index, team_index(team_key), score))
+
+        if event.year == 2015:
+            # Based on advancement through the 2015 playoff rounds, which doesn't reduce to arrays
+            district_points = {'points': defaultdict(lambda: defaultdict(int))}
+            DistrictHelper.calc_elim_match_points_2015(district_points, matches, multiplier)
+            for team_key, points in district_points['points'].items():
+                self._add_points('elim_points', event_index, team_key, points['elim_points'])
+        else:
+            elim_matches = matches.get('qf', []) + matches.get('sf', []) + matches.get('f', [])
+            self._add_elim_match_points(event_index, elim_matches, multiplier)
+
+    def _add_elim_match_points(self, event_index, matches, multiplier):
+        """
+        Like DistrictHelper.calc_elim_match_points: once an alliance has won 2
+        matches of a series, each of its wins so far is worth points, and each
+        later win is worth points again for every win before it.
+        _build counts how many times each win is worth points.
+        """
+        series_indices = {}
+        for match in matches:
+            if not match.has_been_played or match.winning_alliance == '':
+                # Skip unplayed matches
+                continue
+
+            series_key = (match.comp_level, match.set_number, match.winning_alliance)
+            series_index = series_indices.get(series_key)
+            if series_index is None:
+                series_index = series_indices[series_key] = len(self._series_wins)
+                self._series_wins.append(0)
+            self._series_wins[series_index] += 1
+
+            point_value = 0
+            if match.comp_level == 'qf':
+                point_value = DistrictPointValues.QF_WIN.get(match.year, DistrictPointValues.QF_WIN_DEFAULT) * multiplier
+            elif match.comp_level == 'sf':
+                point_value = DistrictPointValues.SF_WIN.get(match.year, DistrictPointValues.SF_WIN_DEFAULT) * multiplier
+            elif match.comp_level == 'f':
+                point_value = DistrictPointValues.F_WIN.get(match.year, DistrictPointValues.F_WIN_DEFAULT) * multiplier
+            for team_key in match.alliances[match.winning_alliance]['teams']:
+                self._elim_wins.append((event_index, self._team_index(team_key), series_index, self._series_wins[series_index], point_value))
+
+    @classmethod
+    def _entries(cls, entries, num_columns):
+        """
+        |entries| as columns of an int array
+        """
+        return np.array(entries, dtype=np.int64).reshape(-1, num_columns).T
+
+    @classmethod
+    def _sum(cls, cells, values, size):
+        if len(cells) == 0:
+            return np.zeros(size, dtype=np.int64)
+        return np.rint(np.bincount(cells, weights=values, minlength=size)).astype(np.int64)
+
+    @classmethod
+    def _top_scores(cls, cells, scores, size):
+        """
+        Returns the NUM_TOP_SCORES highest |scores| of each of |size| cells, highest
+        first, as a (size, NUM_TOP_SCORES) array, and how many of them each cell has
+        """
+        top_scores = np.zeros((size, cls.NUM_TOP_SCORES), dtype=np.int64)
+        if len(cells) == 0:
+            return top_scores, np.zeros(size, dtype=np.int64)
+
+        order = np.lexsort((-scores, cells))
+        cells, scores = cells[order], scores[order]
+        positions = np.arange(len(cells))
+        starts = np.concatenate(([True], cells[1:] != cells[:-1]))
+        places = positions - np.maximum.accumulate(np.where(starts, positions, 0))  # Within each cell
+        top = places < cls.NUM_TOP_SCORES
+        top_scores[cells[top], places[top]] = scores[top]
+        return top_scores, np.minimum(np.bincount(cells, minlength=size), cls.NUM_TOP_SCORES)
+
+    def _build(self):
+        num_events, num_teams = len(self.events), len(self.team_keys)
+        shape = (num_events, num_teams)
+        size = num_events * num_teams
+
+        self.points = np.zeros((len(self.FIELDS),) + shape, dtype=np.int64)
+        self.has_points = np.zeros(size, dtype=bool)
+        for field_index, field in enumerate(self.FIELDS):
+            event_indices, team_indices, points = self._entries(self._points[field], 3)
+            cells = event_indices * num_teams + team_indices
+            self.points[field_index] = self._sum(cells, points, size).reshape(shape)
+            self.has_points[cells] = True
+
+        # Elim wins are worth points once for each of the series' wins from the 2nd one on, up to and including it
+        event_indices, team_indices, series, win_numbers, points = self._entries(self._elim_wins, 5)
+        counts = np.maximum(0, np.array(self._series_wins, dtype=np.int64)[series] - np.maximum(win_numbers, 2) + 1)
+        counted = counts > 0
+        cells = (event_indices * num_teams + team_indices)[counted]
+        self.points[self.FIELDS.index('elim_points')] += self._sum(cells, (counts * points)[counted], size).reshape(shape)
+        self.has_points[cells] = True
+
+        # Rank based qual points of all events at once
+        event_indices, team_indices, ranks, num_ranked, multipliers = self._entries(self._qual_ranks, 5)
+        if len(ranks):
+            qual_points = np.ceil(self.inverf((num_ranked - 2 * ranks + 2) / (self.ALPHA * num_ranked)) * (
+                10.0 / DistrictHelper.inverf(1.0 / self.ALPHA)) + 12).astype(np.int64)
+            self.points[self.FIELDS.index('qual_points'), event_indices, team_indices] = qual_points * multipliers
+            self.has_points[event_indices * num_teams + team_indices] = True
+        self.has_points = self.has_points.reshape(shape)
+
+        if not self._points['total']:  # Not loaded with from_district_points
+            self.points[-1] = self.points[:-1].sum(axis=0)
+
+        event_indices, team_indices, wins = self._entries(self._qual_wins, 3)
+        win_cells = event_indices * num_teams + team_indices
+        self.qual_wins = self._sum(win_cells, wins, size).reshape(shape)
+
+        event_indices, team_indices, scores = self._entries(self._qual_scores, 3)
+        score_cells = event_indices * num_teams + team_indices
+        top_scores, top_counts = self._top_scores(score_cells, scores, size)
+        self.top_scores = top_scores.reshape(shape + (self.NUM_TOP_SCORES,))
+        self.top_counts = top_counts.reshape(shape)
+
+        self.has_tiebreakers = np.zeros(size, dtype=bool)
+        self.has_tiebreakers[win_cells] = True
+        self.has_tiebreakers[score_cells] = True
+        self.has_tiebreakers = self.has_tiebreakers.reshape(shape)
+
+    def _team_points(self, event_indices, team_indices):
+        """
+        [{field: points}] of each of the (event, team) cells
+        """
+        return [dict(zip(self.FIELDS, row)) for row in self.points[:, event_indices, team_indices].T.tolist()]
+
+    def event_points(self, event_index):
+        """
+        District points of self.events[event_index], as stored in EventDetails.district_points
+        """
+        team_indices = np.flatnonzero(self.has_points[event_index])
+        points = dict(zip(
+            [self.team_keys[team_index] for team_index in team_indices],
+            self._team_points(np.repeat(event_index, len(team_indices)), team_indices)))
+
+        tiebreakers = {}
+        team_indices = np.flatnonzero(self.has_tiebreakers[event_index])
+        qual_wins = self.qual_wins[event_index, team_indices].tolist()
+        top_scores = self.top_scores[event_index, team_indices].tolist()
+        top_counts = self.top_counts[event_index, team_indices].tolist()
+        for team_index, wins, scores, count in zip(team_indices, qual_wins, top_scores, top_counts):
+            tiebreakers[self.team_keys[team_index]] = {
+                'qual_wins': wins,
+                'highest_qual_scores': scores[:count],
+            }
+
+        return {
+            'points': points,
+            'tiebreakers': tiebreakers,
+        }
+
+    def rankings(self, teams, year):
+        """
+        Same as DistrictHelper.calculate_rankings for self.events, which must be sorted.
+        Returns [(team key, totals)], best first.
+        """
+        num_teams = len(self.team_keys)
+
+        # aggregate points from first two events and district championship
+        attended = self.has_points | self.has_tiebreakers
+        is_district_cmp = np.array([event.event_type_enum == EventType.DISTRICT_CMP for event in self.events], dtype=bool)
+        counted = attended & ((np.cumsum(attended, axis=0) <= 2) | is_district_cmp[:, np.newaxis])
+        counted_points = counted & self.has_points
+        counted_tiebreakers = counted & self.has_tiebreakers
+
+        qual_points, elim_points, alliance_points, _, total_points = [
+            np.where(counted_points, points, 0) for points in self.points]
+        no_points = np.zeros((1, num_teams), dtype=np.int64)  # Maxes start from 0
+        point_totals = total_points.sum(axis=0)
+        tiebreakers = [
+            elim_points.sum(axis=0),
+            np.concatenate((no_points, elim_points)).max(axis=0),
+            alliance_points.sum(axis=0),
+            np.concatenate((no_points, qual_points)).max(axis=0),
+            np.where(counted_tiebreakers, self.qual_wins, 0).sum(axis=0),
+        ]
+
+        event_indices, team_indices = np.nonzero(counted_tiebreakers)
+        scores = self.top_scores[event_indices, team_indices].reshape(-1)
+        score_teams = np.repeat(team_indices, self.NUM_TOP_SCORES)
+        has_score = (np.arange(self.NUM_TOP_SCORES) < self.top_counts[event_indices, team_indices][:, np.newaxis]).reshape(-1)
+        top_scores, top_counts = self._top_scores(score_teams[has_score], scores[has_score], num_teams)
+
+        # adding in rookie bonus
+        if type(teams) == ndb.tasklets.Future:
+            teams = teams.get_result()
+        rookie_bonuses = {}
+        for team in teams:
+            if type(team) == ndb.tasklets.Future:
+                team = team.get_result()
+            if team.rookie_year == year:
+                rookie_bonuses[team.key.id()] = 10
+            elif team.rookie_year == year - 1:
+                rookie_bonuses[team.key.id()] = 5
+
+        # Rookies who haven't played yet get columns of their own
+        team_keys = self.team_keys + [team_key for team_key in rookie_bonuses if team_key not in self._team_indices]
+        num_rookies = len(team_keys) - num_teams
+        pad = lambda values: np.concatenate((values, np.zeros((num_rookies,) + values.shape[1:], dtype=values.dtype)))
+        point_totals = pad(point_totals) + np.array([rookie_bonuses.get(team_key, 0) for team_key in team_keys], dtype=np.int64)
+        tiebreakers = [pad(values) for values in tiebreakers]
+        top_scores, top_counts = pad(top_scores), pad(top_counts)
+        included = pad(attended.any(axis=0)) | np.array([team_key in rookie_bonuses for team_key in team_keys], dtype=bool)
+
+        # Sort by point total, then each tiebreaker. Like comparing lists, a team
+        # with fewer top qual scores is ahead of one with more that ties it so far.
+        top_score_keys = [
+            np.where(top_counts > place, -top_scores[:, place].astype(float), -np.inf)
+            for place in xrange(self.NUM_TOP_SCORES)]
+        sort_keys = [-point_totals] + [-values for values in tiebreakers] + top_score_keys
+        order = np.lexsort(sort_keys[::-1])
+
+        # Counted event points by team, in event order
+        team_indices, event_indices = np.nonzero(counted_points.T)
+        event_points = defaultdict(list)
+        for team_index, event_index, points in zip(team_indices.tolist(), event_indices.tolist(), self._team_points(event_indices, team_indices)):
+            event_points[team_index].append((self.events[event_index], points))
+
+        point_totals = point_totals.tolist()
+        tiebreakers = np.array(tiebreakers).T.tolist()
+        top_scores, top_counts = top_scores.tolist(), top_counts.tolist()
+        team_totals = []
+        for team_index in order[included[order]].tolist():
+            team_key = team_keys[team_index]
+            totals = {
+                'event_points': event_points[team_index],
+                'point_total': point_totals[team_index],
+                'tiebreakers': tiebreakers[team_index] + [top_scores[team_index][:top_counts[team_index]]],
+            }
+            if team_key in rookie_bonuses:
+                totals['rookie_bonus'] = rookie_bonuses[team_key]
+            team_totals.append((team_key, totals))
+
+        return team_totals
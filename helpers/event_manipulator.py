@@ -4,10 +4,13 @@ import traceback
 from google.appengine.ext import ndb
 
 from helpers.cache_clearer import CacheClearer
+from helpers.geo_index_helper import GeoIndexHelper
 from helpers.location_helper import LocationHelper
 from helpers.manipulator_base import ManipulatorBase
+from helpers.model_summary_helper import ModelSummaryHelper
 from helpers.notification_helper import NotificationHelper
 from helpers.search_helper import SearchHelper
+from helpers.typeahead_helper import TypeaheadHelper
 
 
 class EventManipulator(ManipulatorBase):
@@ -23,14 +26,22 @@ class EventManipulator(ManipulatorBase):
         '''
         To run after the event has been deleted.
         '''
+        ModelSummaryHelper.clear([event.key for event in events])
+
         for event in events:
             SearchHelper.remove_event_location_index(event)
 
+        GeoIndexHelper.remove_event_locations(events)
+
+        TypeaheadHelper.remove_event_typeaheads(events)
+
     @classmethod
     def postUpdateHook(cls, events, updated_attr_list, is_new_list):
         """
         To run after models have been updated
         """
+        ModelSummaryHelper.clear([event.key for event in events])
+
         for (event, updated_attrs) in zip(events, updated_attr_list):
             # Disabled due to unreliability. 2017-01-24 -fangeugene
             # try:
@@ -58,8 +69,16 @@ class EventManipulator(ManipulatorBase):
             except Exception, e:
                 logging.error("update_event_location_index for {} errored!".format(event.key.id()))
                 logging.exception(e)
+
+        GeoIndexHelper.update_event_locations([
+            event for (event, updated_attrs, is_new) in zip(events, updated_attr_list, is_new_list)
+            if is_new or 'normalized_location' in updated_attrs])
         cls.createOrUpdate(events, run_post_update_hook=False)
 
+        TypeaheadHelper.update_event_typeaheads([
+            event for (event, updated_attrs, is_new) in zip(events, updated_attr_list, is_new_list)
+            if is_new or {'name', 'year', 'event_short'}.intersection(updated_attrs)])
+
     @classmethod
     def updateMerge(self, new_event, old_event, auto_union=True):
         """
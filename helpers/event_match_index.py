@@ -0,0 +1,71 @@
+from collections import defaultdict
+
+from helpers.match_helper import MatchHelper
+
+
+class EventMatchIndex(object):
+    """
+    The matches of one event, organized once and shared by everything that
+    needs them. Use Event.match_index, which is cached with Event.matches
+    and rebuilt if they change, instead of calling MatchHelper.organizeMatches
+    and friends on the same list over and over.
+    Everything in here is shared, so treat it as read-only.
+    """
+    def __init__(self, matches):
+        self.matches = matches
+
+        # Like MatchHelper.organizeMatches: by comp level, in display order
+        self.organized = MatchHelper.organizeMatches(matches)
+
+        self.play_order = MatchHelper.play_order_sort_matches(matches)
+        self.played = [match for match in self.play_order if match.has_been_played]
+        self.played_boundary = self._get_played_boundary(self.play_order)
+
+        self.by_team = defaultdict(list)  # team_key: matches in play order
+        for match in self.play_order:
+            for team_key in match.team_key_names:
+                self.by_team[team_key].append(match)
+        self._team_played = {}  # team_key: (played matches, played boundary). Filled lazily.
+
+    @classmethod
+    def _get_played_boundary(cls, play_order):
+        """
+        Index in |play_order| just past the last played match, or 0 if none have been played
+        """
+        for i in xrange(len(play_order) - 1, -1, -1):
+            if play_order[i].has_been_played:
+                return i + 1
+        return 0
+
+    def _get_team_played(self, team_key):
+        if team_key not in self._team_played:
+            team_matches = self.by_team.get(team_key, [])
+            self._team_played[team_key] = (
+                [match for match in team_matches if match.has_been_played],
+                self._get_played_boundary(team_matches))
+        return self._team_played[team_key]
+
+    def recent_matches(self, num=3, team_key=None):
+        """
+        Same as MatchHelper.recentMatches, optionally only for one team
+        """
+        played = self.played if team_key is None else self._get_team_played(team_key)[0]
+        return played[-num:]
+
+    def upcoming_matches(self, num=3, team_key=None):
+        """
+        Same as MatchHelper.upcomingMatches, optionally only for one team
+        """
+        if team_key is None:
+            play_order, boundary = self.play_order, self.played_boundary
+        else:
+            play_order, boundary = self.by_team.get(team_key, []), self._get_team_played(team_key)[1]
+        return play_order[boundary:boundary + num]
+
+    def last_match(self, team_key=None):
+        recent_matches = self.recent_matches(1, team_key=team_key)
+        return recent_matches[0] if recent_matches else None
+
+    def next_match(self, team_key=None):
+        upcoming_matches = self.upcoming_matches(1, team_key=team_key)
+        return upcoming_matches[0] if upcoming_matches else None
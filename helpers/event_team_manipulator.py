@@ -1,5 +1,10 @@
+from collections import defaultdict
+
 from helpers.cache_clearer import CacheClearer
+from helpers.geo_index_helper import GeoIndexHelper
 from helpers.manipulator_base import ManipulatorBase
+from helpers.mytba_dashboard_helper import MyTBADashboardHelper
+from helpers.team_list_summary_helper import TeamListSummaryHelper
 
 
 class EventTeamManipulator(ManipulatorBase):
@@ -10,6 +15,33 @@ class EventTeamManipulator(ManipulatorBase):
     def getCacheKeysAndControllers(cls, affected_refs):
         return CacheClearer.get_eventteam_cache_keys_and_controllers(affected_refs)
 
+    @classmethod
+    def _clear_dashboards(cls, event_teams):
+        team_keys_by_year = defaultdict(set)
+        for event_team in event_teams:
+            team_keys_by_year[event_team.year].add(event_team.team.id())
+        MyTBADashboardHelper.clear_team_followers(team_keys_by_year)
+
+    @classmethod
+    def postDeleteHook(cls, event_teams):
+        cls._clear_dashboards(event_teams)
+        TeamListSummaryHelper.remove_event_teams(event_teams)
+        GeoIndexHelper.remove_event_teams(event_teams)
+
+    @classmethod
+    def runPostUpdateHook(cls, event_teams):
+        # Status updates don't need the hook, since dashboards read statuses from the EventTeams
+        # and team lists don't show them
+        super(EventTeamManipulator, cls).runPostUpdateHook(
+            [event_team for event_team in event_teams
+             if getattr(event_team, '_is_new', False) or 'year' in getattr(event_team, '_updated_attrs', [])])
+
+    @classmethod
+    def postUpdateHook(cls, event_teams, updated_attr_list, is_new_list):
+        cls._clear_dashboards(event_teams)
+        TeamListSummaryHelper.add_event_teams(event_teams)
+        GeoIndexHelper.add_event_teams(event_teams)
+
     @classmethod
     def updateMerge(self, new_event_team, old_event_team, auto_union=True):
         """
@@ -25,10 +57,13 @@ class EventTeamManipulator(ManipulatorBase):
             "status",
         ]
 
+        old_event_team._updated_attrs = []
+
         for attr in attrs:
             if getattr(new_event_team, attr) is not None:
                 if getattr(new_event_team, attr) != getattr(old_event_team, attr):
                     setattr(old_event_team, attr, getattr(new_event_team, attr))
+                    old_event_team._updated_attrs.append(attr)
                     old_event_team.dirty = True
 
         return old_event_team
@@ -4,7 +4,7 @@ import numpy as np
 from google.appengine.ext import ndb
 from google.appengine.ext.ndb.tasklets import Future
 
-from helpers.match_helper import MatchHelper
+from helpers.event_match_index import EventMatchIndex
 from helpers.rankings_helper import RankingsHelper
 from helpers.team_helper import TeamHelper
 from models.event_details import EventDetails
@@ -183,21 +183,19 @@ class EventTeamStatusHelper(object):
         Generate a dict containing team@event status information
         :param team_key: Key name of the team to focus on
         :param event: Event object
-        :param matches: Organized matches (via MatchHelper.organizeMatches) from the event, optional
+        :param matches: Matches from the event, optional. Defaults to the event's (cached) match index.
         """
         event_details = event.details
-        if not matches:
-            matches = event.matches
-        team_matches = [m for m in matches if team_key in m.team_key_names]
-        next_match = MatchHelper.upcomingMatches(team_matches, num=1)
-        last_match = MatchHelper.recentMatches(team_matches, num=1)
-        matches = MatchHelper.organizeMatches(matches)
+        match_index = EventMatchIndex(matches) if matches else event.match_index
+        next_match = match_index.next_match(team_key)
+        last_match = match_index.last_match(team_key)
+        matches = match_index.organized
         return copy.deepcopy({
             'qual': cls._build_qual_info(team_key, event_details, matches, event.year),
             'alliance': cls._build_alliance_info(team_key, event_details, matches),
             'playoff': cls._build_playoff_info(team_key, event_details, matches, event.year),
-            'last_match_key': last_match[0].key_name if last_match else None,
-            'next_match_key': next_match[0].key_name if next_match else None,
+            'last_match_key': last_match.key_name if last_match else None,
+            'next_match_key': next_match.key_name if next_match else None,
         })  # TODO: Results are getting mixed unless copied. 2017-02-03 -fangeugene
 
     @classmethod
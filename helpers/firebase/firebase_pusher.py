@@ -2,8 +2,10 @@ import datetime
 import json
 import logging
 import tba_config
+import time
 import traceback
 
+from google.appengine.api import memcache
 from google.appengine.ext import deferred
 from google.appengine.ext import ndb
 from google.appengine.api import urlfetch
@@ -21,6 +23,9 @@ from models.sitevar import Sitevar
 
 
 class FirebasePusher(object):
+    LIVE_SNAPSHOT_KEY_FORMAT = 'firebase_snapshot_{}'  # (key)
+    LIVE_SNAPSHOT_RESYNC = 10 * 60
+
     @classmethod
     def _get_secret(cls):
         firebase_secrets = Sitevar.get_by_id("firebase.secrets")
@@ -90,6 +95,80 @@ class FirebasePusher(object):
         if result.status_code not in {200, 204}:
             raise Exception("Error with POST data to Firebase: {}; {}. ERROR {}: {}".format(url, data_json, result.status_code, result.content))
 
+    @classmethod
+    def _diff(cls, old, new, path=''):
+        """
+        Returns {path: value} for everything that changed from old to new,
+        with None for removed paths. Only dicts are diffed into.
+        """
+        if not isinstance(old, dict) or not isinstance(new, dict):
+            return {} if old == new else {path: new}
+
+        changes = {}
+        for key, value in new.items():
+            key_path = '{}/{}'.format(path, key) if path else key
+            if key not in old:
+                changes[key_path] = value
+            elif old[key] != value:
+                changes.update(cls._diff(old[key], value, key_path))
+        for key in old:
+            if key not in new:
+                changes['{}/{}'.format(path, key) if path else key] = None
+        return changes
+
+    @classmethod
+    def _write_snapshot_data(cls, key, data_json, full):
+        """
+        PUTs (if full) or PATCHes data for _publish_changes. Writes are not
+        retried, since a late retry could undo newer ones. Instead the snapshot
+        is dropped so the next publish is a full PUT.
+        """
+        try:
+            if full:
+                cls._put_data(key, data_json)
+            else:
+                cls._patch_data(key, data_json)
+        except Exception, e:
+            memcache.delete(cls.LIVE_SNAPSHOT_KEY_FORMAT.format(key))
+            logging.error("Firebase {} push failed! Next push will be a full PUT.".format(key))
+            logging.exception(e)
+            raise deferred.PermanentTaskFailure()
+
+    @classmethod
+    def _publish_changes(cls, key, data):
+        """
+        Writes data to key, sending only what changed since the last write as
+        a multi-path PATCH. The last written data is kept in memcache. The whole
+        tree is PUT when that's missing, or every LIVE_SNAPSHOT_RESYNC seconds
+        in case a push was lost.
+        """
+        data_json = json.dumps(data)
+        data = json.loads(data_json)  # Compare what Firebase would see
+        snapshot_key = cls.LIVE_SNAPSHOT_KEY_FORMAT.format(key)
+        snapshot = memcache.get(snapshot_key)
+        now = time.time()
+
+        changes = None
+        if snapshot and now - snapshot['put_time'] < cls.LIVE_SNAPSHOT_RESYNC:
+            changes = cls._diff(snapshot['data'], data)
+            if '' in changes:  # The root isn't a dict
+                changes = None
+
+        if changes is None:
+            deferred.defer(cls._write_snapshot_data, key, data_json, True, _queue="firebase")
+            snapshot = {'put_time': now}
+            sent = len(data_json)
+        elif changes:
+            changes_json = json.dumps(changes)
+            deferred.defer(cls._write_snapshot_data, key, changes_json, False, _queue="firebase")
+            sent = len(changes_json)
+        else:
+            sent = 0
+        snapshot['data'] = data
+        memcache.set(snapshot_key, snapshot)
+
+        logging.info("Firebase {} push: {} bytes sent, {} bytes saved".format(key, sent, len(data_json) - sent))
+
     @classmethod
     def delete_match(cls, match):
         """
@@ -209,17 +288,8 @@ class FirebasePusher(object):
 
             events_by_key[event_key] = partial_event
 
-        deferred.defer(
-            cls._put_data,
-            'live_events',
-            json.dumps(events_by_key),
-            _queue="firebase")
-
-        deferred.defer(
-            cls._put_data,
-            'special_webcasts',
-            json.dumps(cls.get_special_webcasts()),
-            _queue="firebase")
+        cls._publish_changes('live_events', events_by_key)
+        cls._publish_changes('special_webcasts', cls.get_special_webcasts())
 
     @classmethod
     @ndb.toplevel
@@ -227,11 +297,11 @@ class FirebasePusher(object):
         week_events = EventHelper.getWeekEvents()
         events_by_key = {}
         live_events = []
+        webcasts = []
         for event in week_events:
             if event.now:
                 event._webcast = event.current_webcasts  # Only show current webcasts
-                for webcast in event.webcast:
-                    WebcastOnlineHelper.add_online_status_async(webcast)
+                webcasts += event.webcast
                 events_by_key[event.key.id()] = event
             if event.within_a_day:
                 live_events.append(event)
@@ -242,18 +312,19 @@ class FirebasePusher(object):
             values_json=json.dumps([]))
         for event in ndb.get_multi([ndb.Key('Event', ekey) for ekey in forced_live_events.contents]):
             if event.webcast:
-                for webcast in event.webcast:
-                    WebcastOnlineHelper.add_online_status_async(webcast)
+                webcasts += event.webcast
             events_by_key[event.key.id()] = event
 
         # # Add in the Fake TBA BlueZone event (watch for circular imports)
         # from helpers.bluezone_helper import BlueZoneHelper
         # bluezone_event = BlueZoneHelper.update_bluezone(live_events)
         # if bluezone_event:
-        #     for webcast in bluezone_event.webcast:
-        #         WebcastOnlineHelper.add_online_status_async(webcast)
+        #     webcasts += bluezone_event.webcast
         #     events_by_key[bluezone_event.key_name] = bluezone_event
 
+        # Look up every webcast's status in one batch
+        WebcastOnlineHelper.add_online_status_async(webcasts)
+
         return events_by_key
 
     @classmethod
@@ -267,14 +338,15 @@ class FirebasePusher(object):
 
         special_webcasts = []
         for webcast in special_webcasts_temp:
-            WebcastOnlineHelper.add_online_status_async(webcast)
             special_webcasts.append(webcast)
+        WebcastOnlineHelper.add_online_status_async(special_webcasts)
 
         return special_webcasts
 
     @classmethod
     def update_event(cls, event):
         WebcastOnlineHelper.add_online_status(event.webcast)
+        memcache.delete(cls.LIVE_SNAPSHOT_KEY_FORMAT.format('live_events'))  # Next live_events push is a full PUT
 
         converted_event = EventConverter.convert(event, 3)
         deferred.defer(
@@ -0,0 +1,237 @@
+import bisect
+import json
+import logging
+import math
+import time
+
+from collections import defaultdict
+
+from google.appengine.ext import ndb
+
+from database.team_query import TeamParticipationQuery
+from models.event import Event
+from models.event_team import EventTeam
+from models.geo_index_entry import GeoIndexEntry
+from models.team import Team
+
+
+class GeoIndex(object):
+    """
+    A compact in-memory index of (lat, lng, key_name) points, sorted by
+    latitude. A radius query bisects to the band of latitudes that could be
+    in range and only computes distances for points inside it.
+    """
+    EARTH_RADIUS_METERS = 6371000.0
+
+    def __init__(self, points):
+        self.points = points
+        self._lats = [point[0] for point in points]
+
+    @classmethod
+    def build(cls, points):
+        return cls(sorted([(lat, lng, key_name) for lat, lng, key_name in points]))
+
+    def serialize(self):
+        return json.dumps(self.points, separators=(',', ':'))
+
+    @classmethod
+    def deserialize(cls, blob):
+        return cls([tuple(point) for point in json.loads(blob)])
+
+    def upsert(self, points):
+        """
+        Returns a new GeoIndex with |points| added, replacing existing points with the same key_name
+        """
+        points_by_key_name = dict((point[2], point) for point in points)
+        return self.build([point for point in self.points if point[2] not in points_by_key_name] + points_by_key_name.values())
+
+    def remove(self, key_names):
+        """
+        Returns a new GeoIndex without the points for |key_names|
+        """
+        return GeoIndex([point for point in self.points if point[2] not in key_names])
+
+    @classmethod
+    def distance(cls, lat1, lng1, lat2, lng2):
+        """
+        Great-circle distance in meters
+        """
+        lat1, lng1, lat2, lng2 = map(math.radians, [lat1, lng1, lat2, lng2])
+        a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+        return 2 * cls.EARTH_RADIUS_METERS * math.asin(min(1.0, math.sqrt(a)))
+
+    def search(self, lat, lng, radius_meters):
+        """
+        Returns a list of (distance in meters, key_name) within |radius_meters|, closest first
+        """
+        lat_delta = math.degrees(radius_meters / self.EARTH_RADIUS_METERS)
+        start = bisect.bisect_left(self._lats, lat - lat_delta)
+        end = bisect.bisect_right(self._lats, lat + lat_delta, lo=start)
+
+        results = []
+        for point_lat, point_lng, key_name in self.points[start:end]:
+            distance = self.distance(lat, lng, point_lat, point_lng)
+            if distance < radius_meters:
+                results.append((distance, key_name))
+        return sorted(results)
+
+
+class GeoIndexHelper(object):
+    """
+    Maintains the per-year GeoIndexEntry of teams and events.
+    An entry is created in full by rebuild_*_index, after which manipulator
+    post update/delete hooks call the update_* and remove_* methods so that
+    only the affected years are rewritten.
+    """
+    INDEX_RELOAD_SECONDS = 60 * 10
+    _index_cache = {}  # key_name: (load time, GeoIndex or None). Per instance.
+
+    @classmethod
+    def _get_point(cls, model):
+        if model.normalized_location and model.normalized_location.lat_lng:
+            lat_lng = model.normalized_location.lat_lng
+            return (lat_lng.lat, lat_lng.lon, model.key.id())
+        return None
+
+    @classmethod
+    @ndb.transactional
+    def _update_entry(cls, key_name, to_upsert, to_remove):
+        entry = GeoIndexEntry.get_by_id(key_name)
+        if entry is None:
+            return  # Not built yet. Building only part of it would hide results.
+        index = GeoIndex.deserialize(entry.index_blob)
+        updated = index.remove(to_remove).upsert(to_upsert)
+        if updated.points != index.points:
+            entry.index_blob = updated.serialize()
+            entry.put()
+        cls._index_cache.pop(key_name, None)
+
+    @classmethod
+    def _update_entries(cls, upserts, removals):
+        for key_name in set(upserts.keys()).union(removals.keys()):
+            try:
+                cls._update_entry(key_name, upserts.get(key_name, []), removals.get(key_name, set()))
+            except Exception, e:
+                logging.error("Geo index update for {} errored!".format(key_name))
+                logging.exception(e)
+
+    @classmethod
+    def _get_team_years(cls, teams):
+        years_futures = [TeamParticipationQuery(team.key.id()).fetch_async() for team in teams]
+        return [years_future.get_result() for years_future in years_futures]
+
+    @classmethod
+    def update_team_locations(cls, teams):
+        upserts = defaultdict(list)
+        removals = defaultdict(set)
+        for team, years in zip(teams, cls._get_team_years(teams)):
+            point = cls._get_point(team)
+            for year in years:
+                key_name = GeoIndexEntry.TEAMS_KEY.format(year)
+                if point:
+                    upserts[key_name].append(point)
+                else:
+                    removals[key_name].add(team.key.id())
+        cls._update_entries(upserts, removals)
+
+    @classmethod
+    def remove_team_locations(cls, teams):
+        removals = defaultdict(set)
+        for team, years in zip(teams, cls._get_team_years(teams)):
+            for year in years:
+                removals[GeoIndexEntry.TEAMS_KEY.format(year)].add(team.key.id())
+        cls._update_entries({}, removals)
+
+    @classmethod
+    def add_event_teams(cls, event_teams):
+        event_teams = [event_team for event_team in event_teams if event_team.year is not None]
+        teams = ndb.get_multi([event_team.team for event_team in event_teams])
+
+        upserts = defaultdict(list)
+        for event_team, team in zip(event_teams, teams):
+            point = cls._get_point(team) if team else None
+            if point:
+                upserts[GeoIndexEntry.TEAMS_KEY.format(event_team.year)].append(point)
+        cls._update_entries(upserts, {})
+
+    @classmethod
+    def remove_event_teams(cls, event_teams):
+        """
+        Teams are only removed from a year when they have no other EventTeams in it
+        """
+        event_teams = [event_team for event_team in event_teams if event_team.year is not None]
+        deleted_keys = set(event_team.key for event_team in event_teams)
+        remaining_futures = [
+            EventTeam.query(EventTeam.team == event_team.team, EventTeam.year == event_team.year).fetch_async(keys_only=True)
+            for event_team in event_teams]
+
+        removals = defaultdict(set)
+        for event_team, remaining_future in zip(event_teams, remaining_futures):
+            if not [key for key in remaining_future.get_result() if key not in deleted_keys]:
+                removals[GeoIndexEntry.TEAMS_KEY.format(event_team.year)].add(event_team.team.id())
+        cls._update_entries({}, removals)
+
+    @classmethod
+    def update_event_locations(cls, events):
+        upserts = defaultdict(list)
+        removals = defaultdict(set)
+        for event in events:
+            point = cls._get_point(event)
+            key_name = GeoIndexEntry.EVENTS_KEY.format(event.year)
+            if point:
+                upserts[key_name].append(point)
+            else:
+                removals[key_name].add(event.key.id())
+        cls._update_entries(upserts, removals)
+
+    @classmethod
+    def remove_event_locations(cls, events):
+        removals = defaultdict(set)
+        for event in events:
+            removals[GeoIndexEntry.EVENTS_KEY.format(event.year)].add(event.key.id())
+        cls._update_entries({}, removals)
+
+    @classmethod
+    def _put_index(cls, key_name, models):
+        index = GeoIndex.build(filter(None, [cls._get_point(model) for model in models]))
+        GeoIndexEntry(id=key_name, index_blob=index.serialize()).put()
+        cls._index_cache.pop(key_name, None)
+        return index
+
+    @classmethod
+    def rebuild_team_index(cls, year):
+        event_team_keys = EventTeam.query(EventTeam.year == year).fetch(keys_only=True)
+        team_keys = set(ndb.Key(Team, event_team_key.id().split('_')[1]) for event_team_key in event_team_keys)
+        teams = filter(None, ndb.get_multi(list(team_keys)))
+        return cls._put_index(GeoIndexEntry.TEAMS_KEY.format(year), teams)
+
+    @classmethod
+    def rebuild_event_index(cls, year):
+        events = Event.query(Event.year == year).fetch()
+        return cls._put_index(GeoIndexEntry.EVENTS_KEY.format(year), events)
+
+    @classmethod
+    def get_index(cls, key_name):
+        """
+        Returns the GeoIndex for |key_name|, or None if it hasn't been built.
+        Lazily loaded once per instance and reloaded periodically to pick up changes.
+        """
+        cached = cls._index_cache.get(key_name)
+        if cached is not None and time.time() - cached[0] < cls.INDEX_RELOAD_SECONDS:
+            return cached[1]
+
+        entry = GeoIndexEntry.get_by_id(key_name)
+        index = GeoIndex.deserialize(entry.index_blob) if entry else None
+        cls._index_cache[key_name] = (time.time(), index)
+        return index
+
+    @classmethod
+    def search(cls, key_name, lat, lng, radius_meters):
+        """
+        Returns a list of (distance in meters, key_name) closest first,
+        or None if there is no index for |key_name|.
+        """
+        index = cls.get_index(key_name)
+        if index is None:
+            return None
+        return index.search(lat, lng, radius_meters)
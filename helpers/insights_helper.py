@@ -1,21 +1,18 @@
-import itertools
 import json
 import math
 import numpy as np
 
 from collections import defaultdict
 
-from google.appengine.ext import ndb
-
 from consts.award_type import AwardType
 from consts.event_type import EventType
 
 from models.insight import Insight
 from models.event import Event
 from models.event_details import EventDetails
-from models.award import Award
 from models.match import Match
 
+from helpers.award_insights_helper import AwardInsightsHelper
 from helpers.event_helper import EventHelper
 from helpers.event_helper import OFFSEASON_EVENTS_LABEL, PRESEASON_EVENTS_LABEL
 from helpers.event_insights_helper import EventInsightsHelper
@@ -46,42 +43,31 @@ class InsightsHelper(object):
                 week_events.append((event, matches))
             week_event_matches.append((week, week_events))
 
+        columns = self._extractMatchColumns(week_event_matches, year)
+
         insights = []
-        insights += self._calculateHighscoreMatchesByWeek(week_event_matches, year)
-        insights += self._calculateHighscoreMatches(week_event_matches, year)
-        insights += self._calculateMatchAveragesByWeek(week_event_matches, year)
-        insights += self._calculateScoreDistribution(week_event_matches, year)
-        insights += self._calculateNumMatches(week_event_matches, year)
+        insights += self._calculateHighscoreMatchesByWeek(week_event_matches, columns, year)
+        insights += self._calculateHighscoreMatches(columns, year)
+        insights += self._calculateMatchAveragesByWeek(week_event_matches, columns, year)
+        insights += self._calculateScoreDistribution(columns, year)
+        insights += self._calculateNumMatches(columns, year)
         insights += self._calculateYearSpecific(week_event_matches, year)
         return insights
 
     @classmethod
-    def doAwardInsights(self, year):
+    def doAwardInsights(self, year, rebuild=False):
         """
         Calculate award insights for a given year. Returns a list of Insights.
+        Reads the year's AwardInsightsAggregate, which is only built from
+        scratch the first time or if |rebuild| is set.
         """
-        # Get all Blue Banner, Division Finalist, and Championship Finalist awards
-        blue_banner_award_keys_future = Award.query(
-            Award.year == year,
-            Award.award_type_enum.IN(AwardType.BLUE_BANNER_AWARDS),
-            Award.event_type_enum.IN({EventType.REGIONAL, EventType.DISTRICT, EventType.DISTRICT_CMP_DIVISION, EventType.DISTRICT_CMP, EventType.CMP_DIVISION, EventType.CMP_FINALS})
-        ).fetch_async(10000, keys_only=True)
-        cmp_finalist_award_keys_future = Award.query(
-            Award.year == year,
-            Award.award_type_enum == AwardType.FINALIST,
-            Award.event_type_enum.IN({EventType.CMP_DIVISION, EventType.CMP_FINALS})
-        ).fetch_async(10000, keys_only=True)
-
-        award_futures = ndb.get_multi_async(
-            set(blue_banner_award_keys_future.get_result()).union(
-            set(cmp_finalist_award_keys_future.get_result()))
-        )
+        aggregate = AwardInsightsHelper.get_aggregate(year, rebuild=rebuild)
 
         insights = []
-        insights += self._calculateBlueBanners(award_futures, year)
-        insights += self._calculateChampionshipStats(award_futures, year)
-        insights += self._calculateRegionalStats(award_futures, year)
-        insights += self._calculateSuccessfulElimTeamups(award_futures, year)
+        insights += self._calculateBlueBanners(aggregate, year)
+        insights += self._calculateChampionshipStats(aggregate, year)
+        insights += self._calculateRegionalStats(aggregate, year)
+        insights += self._calculateSuccessfulElimTeamups(aggregate, year)
 
         return insights
 
@@ -191,26 +177,72 @@ class InsightsHelper(object):
         return sorted(team_list, key=lambda team: int(team[3:]))  # Sort by team number
 
     @classmethod
-    def _calculateHighscoreMatchesByWeek(self, week_event_matches, year):
+    def _extractMatchColumns(self, week_event_matches, year):
+        """
+        Reads the numbers every match insight needs into NumPy arrays, in one
+        pass over the matches. Matches are in week_event_matches order, so
+        each week is a contiguous range given by week_bounds.
+        """
+        match_events = []  # (match, event) tuples
+        week_bounds = [0]
+        red_scores = []
+        blue_scores = []
+        red_foul_points = []
+        blue_foul_points = []
+        elims = []
+        for _, week_events in week_event_matches:
+            for event, matches in week_events:
+                for match in matches:
+                    match_events.append((match, event))
+                    red_scores.append(int(match.alliances['red']['score']))
+                    blue_scores.append(int(match.alliances['blue']['score']))
+                    elims.append(match.comp_level in Match.ELIM_LEVELS)
+                    if year >= 2017 and match.score_breakdown:
+                        red_foul_points.append(match.score_breakdown['red'].get('foulPoints', 0))
+                        blue_foul_points.append(match.score_breakdown['blue'].get('foulPoints', 0))
+                    else:
+                        red_foul_points.append(0)
+                        blue_foul_points.append(0)
+            week_bounds.append(len(match_events))
+
+        red_scores = np.array(red_scores, dtype=np.int64)
+        blue_scores = np.array(blue_scores, dtype=np.int64)
+        return {
+            'match_events': match_events,
+            'week_bounds': week_bounds,
+            'red_scores': red_scores,
+            'blue_scores': blue_scores,
+            'max_scores': np.maximum(red_scores, blue_scores),
+            'max_scores_no_fouls': np.maximum(
+                red_scores - np.array(red_foul_points, dtype=np.int64),
+                blue_scores - np.array(blue_foul_points, dtype=np.int64)),
+            'quals': np.array([match.comp_level == 'qm' for match, _ in match_events], dtype=np.bool_),
+            'elims': np.array(elims, dtype=np.bool_),
+            'played': (red_scores != -1) & (blue_scores != -1),
+        }
+
+    @classmethod
+    def _getHighscoreMatchData(self, columns, scores, indices):
+        """
+        Returns match data for the matches in |indices| that tie for the highest
+        of |scores|, in order. Scores below 0 never count as a high score.
+        """
+        if len(indices) == 0:
+            return []
+        highscore = max(scores[indices].max(), 0)
+        return [self._generateMatchData(*columns['match_events'][i]) for i in indices[scores[indices] == highscore]]
+
+    @classmethod
+    def _calculateHighscoreMatchesByWeek(self, week_event_matches, columns, year):
         """
         Returns an Insight where the data is a list of tuples:
         (week string, list of highest scoring matches)
         """
         highscore_matches_by_week = []  # tuples: week, list of matches (if there are ties)
-        for week, week_events in week_event_matches:
-            week_highscore_matches = []
-            highscore = 0
-            for event, matches in week_events:
-                for match in matches:
-                    redScore = int(match.alliances['red']['score'])
-                    blueScore = int(match.alliances['blue']['score'])
-                    maxScore = max(redScore, blueScore)
-                    if maxScore >= highscore:
-                        if maxScore > highscore:
-                            week_highscore_matches = []
-                        week_highscore_matches.append(self._generateMatchData(match, event))
-                        highscore = maxScore
-            highscore_matches_by_week.append((week, week_highscore_matches))
+        week_bounds = columns['week_bounds']
+        for i, (week, _) in enumerate(week_event_matches):
+            indices = np.arange(week_bounds[i], week_bounds[i + 1])
+            highscore_matches_by_week.append((week, self._getHighscoreMatchData(columns, columns['max_scores'], indices)))
 
         insight = None
         if highscore_matches_by_week != []:
@@ -221,49 +253,19 @@ class InsightsHelper(object):
             return []
 
     @classmethod
-    def _calculateHighscoreMatches(self, week_event_matches, year):
+    def _calculateHighscoreMatches(self, columns, year):
         """
         Returns an Insight where the data is list of highest scoring matches
+        Qual and playoff high scores are penalty free, if possible
         """
         highscore_matches = {
-            'qual': [],
-            'playoff': [],
-            'overall': [],
+            'overall': self._getHighscoreMatchData(
+                columns, columns['max_scores'], np.arange(len(columns['match_events']))),
+            'qual': self._getHighscoreMatchData(
+                columns, columns['max_scores_no_fouls'], np.nonzero(columns['quals'])[0]),
+            'playoff': self._getHighscoreMatchData(
+                columns, columns['max_scores_no_fouls'], np.nonzero(~columns['quals'])[0]),
         }  # dict of list of matches (if there are ties)
-        highscore = {
-            'qual': 0,
-            'playoff': 0,
-            'overall': 0,
-        }
-        for _, week_events in week_event_matches:
-            for event, matches in week_events:
-                for match in matches:
-                    comp_level = 'qual' if match.comp_level == 'qm' else 'playoff'
-                    match_data = self._generateMatchData(match, event)
-
-                    redScore = int(match.alliances['red']['score'])
-                    blueScore = int(match.alliances['blue']['score'])
-
-                    # Overall, including penalties
-                    maxScore = max(redScore, blueScore)
-                    if maxScore >= highscore['overall']:
-                        if maxScore > highscore['overall']:
-                            highscore_matches['overall'] = []
-                        highscore_matches['overall'].append(match_data)
-                        highscore['overall'] = maxScore
-
-                    # Penalty free, if possible
-                    if year >= 2017:
-                        if match.score_breakdown:
-                            redScore -= match.score_breakdown['red'].get('foulPoints', 0)
-                            blueScore -= match.score_breakdown['blue'].get('foulPoints', 0)
-
-                    maxScore = max(redScore, blueScore)
-                    if maxScore >= highscore[comp_level]:
-                        if maxScore > highscore[comp_level]:
-                            highscore_matches[comp_level] = []
-                        highscore_matches[comp_level].append(match_data)
-                        highscore[comp_level] = maxScore
 
         insight = None
         if highscore_matches != []:
@@ -274,7 +276,7 @@ class InsightsHelper(object):
             return []
 
     @classmethod
-    def _calculateMatchAveragesByWeek(self, week_event_matches, year):
+    def _calculateMatchAveragesByWeek(self, week_event_matches, columns, year):
         """
         Returns a list of Insights, one for all data and one for elim data
         The data for each Insight is a list of tuples:
@@ -282,29 +284,22 @@ class InsightsHelper(object):
         """
         match_averages_by_week = []  # tuples: week, average score
         elim_match_averages_by_week = []  # tuples: week, average score
-        for week, week_events in week_event_matches:
-            week_match_sum = 0
-            num_matches_by_week = 0
-            elim_week_match_sum = 0
-            elim_num_matches_by_week = 0
-            for _, matches in week_events:
-                for match in matches:
-                    if not match.has_been_played:
-                        continue
-                    redScore = int(match.alliances['red']['score'])
-                    blueScore = int(match.alliances['blue']['score'])
-                    week_match_sum += redScore + blueScore
-                    num_matches_by_week += 1
-                    if match.comp_level in Match.ELIM_LEVELS:
-                        elim_week_match_sum += redScore + blueScore
-                        elim_num_matches_by_week += 1
-
+        week_bounds = columns['week_bounds']
+        totals = columns['red_scores'] + columns['blue_scores']
+        for i, (week, _) in enumerate(week_event_matches):
+            week_slice = slice(week_bounds[i], week_bounds[i + 1])
+            played = columns['played'][week_slice]
+            elim_played = played & columns['elims'][week_slice]
+            week_totals = totals[week_slice]
+
+            num_matches_by_week = int(played.sum())
             if num_matches_by_week != 0:
-                week_average = float(week_match_sum) / num_matches_by_week / 2
+                week_average = float(int(week_totals[played].sum())) / num_matches_by_week / 2
                 match_averages_by_week.append((week, week_average))
 
+            elim_num_matches_by_week = int(elim_played.sum())
             if elim_num_matches_by_week != 0:
-                elim_week_average = float(elim_week_match_sum) / elim_num_matches_by_week / 2
+                elim_week_average = float(int(week_totals[elim_played].sum())) / elim_num_matches_by_week / 2
                 elim_match_averages_by_week.append((week, elim_week_average))
 
         insights = []
@@ -315,70 +310,68 @@ class InsightsHelper(object):
         return insights
 
     @classmethod
-    def _calculateScoreDistribution(self, week_event_matches, year):
+    def _countScores(self, scores):
+        """
+        Returns a dict of score: count, with keys inserted in order of first
+        appearance so it iterates (and sums) exactly like incrementally built counts.
+        """
+        if len(scores) == 0:
+            return {}
+        offset = scores.min()
+        counts = np.bincount(scores - offset)
+        _, first_indices = np.unique(scores, return_index=True)
+        score_counts = {}
+        for score in scores[np.sort(first_indices)]:
+            score_counts[int(score)] = int(counts[score - offset])
+        return score_counts
+
+    @classmethod
+    def _normalizeScoreDistribution(self, score_distribution, binAmount):
+        totalCount = float(sum(score_distribution.values()))
+        score_distribution_normalized = {}
+        for score, amount in score_distribution.items():
+            roundedScore = score - int(score % binAmount) + binAmount / 2  # Round off and then center in the bin
+            contribution = float(amount) * 100 / totalCount
+            if roundedScore in score_distribution_normalized:
+                score_distribution_normalized[roundedScore] += contribution
+            else:
+                score_distribution_normalized[roundedScore] = contribution
+        return score_distribution_normalized
+
+    @classmethod
+    def _calculateScoreDistribution(self, columns, year):
         """
         Returns a list of Insights, one for all data and one for elim data
         The data for each Insight is a dict:
         Key: Middle score of a bucketed range of scores, Value: % occurrence
         """
-        score_distribution = defaultdict(int)
-        elim_score_distribution = defaultdict(int)
-        overall_highscore = 0
-        for _, week_events in week_event_matches:
-            for _, matches in week_events:
-                for match in matches:
-                    if not match.has_been_played:
-                        continue
-                    redScore = int(match.alliances['red']['score'])
-                    blueScore = int(match.alliances['blue']['score'])
-
-                    overall_highscore = max(overall_highscore, redScore, blueScore)
-
-                    score_distribution[redScore] += 1
-                    score_distribution[blueScore] += 1
-
-                    if match.comp_level in Match.ELIM_LEVELS:
-                        elim_score_distribution[redScore] += 1
-                        elim_score_distribution[blueScore] += 1
+        played = columns['played']
+        elim_played = played & columns['elims']
+        # Red then blue for each match, the order scores were originally counted in
+        scores = np.column_stack((columns['red_scores'], columns['blue_scores']))
+        score_distribution = self._countScores(scores[played].ravel())
+        elim_score_distribution = self._countScores(scores[elim_played].ravel())
 
         insights = []
         if score_distribution != {}:
+            overall_highscore = max(int(scores[played].max()), 0)
             binAmount = math.ceil(float(overall_highscore) / 20)
-            totalCount = float(sum(score_distribution.values()))
-            score_distribution_normalized = {}
-            for score, amount in score_distribution.items():
-                roundedScore = score - int(score % binAmount) + binAmount / 2  # Round off and then center in the bin
-                contribution = float(amount) * 100 / totalCount
-                if roundedScore in score_distribution_normalized:
-                    score_distribution_normalized[roundedScore] += contribution
-                else:
-                    score_distribution_normalized[roundedScore] = contribution
-            insights.append(self._createInsight(score_distribution_normalized, Insight.INSIGHT_NAMES[Insight.SCORE_DISTRIBUTION], year))
+            insights.append(self._createInsight(
+                self._normalizeScoreDistribution(score_distribution, binAmount),
+                Insight.INSIGHT_NAMES[Insight.SCORE_DISTRIBUTION], year))
         if elim_score_distribution != {}:
-            if binAmount is None:  # Use same binAmount from above if possible
-                binAmount = math.ceil(float(overall_highscore) / 20)
-            totalCount = float(sum(elim_score_distribution.values()))
-            elim_score_distribution_normalized = {}
-            for score, amount in elim_score_distribution.items():
-                roundedScore = score - int(score % binAmount) + binAmount / 2
-                contribution = float(amount) * 100 / totalCount
-                if roundedScore in elim_score_distribution_normalized:
-                    elim_score_distribution_normalized[roundedScore] += contribution
-                else:
-                    elim_score_distribution_normalized[roundedScore] = contribution
-            insights.append(self._createInsight(elim_score_distribution_normalized, Insight.INSIGHT_NAMES[Insight.ELIM_SCORE_DISTRIBUTION], year))
+            insights.append(self._createInsight(
+                self._normalizeScoreDistribution(elim_score_distribution, binAmount),
+                Insight.INSIGHT_NAMES[Insight.ELIM_SCORE_DISTRIBUTION], year))
 
         return insights
 
     @classmethod
-    def _calculateNumMatches(self, week_event_matches, year):
+    def _calculateNumMatches(self, columns, year):
         """
         Returns an Insight where the data is the number of matches
         """
-        numMatches = 0
-        for _, week_events in week_event_matches:
-            for _, matches in week_events:
-                numMatches += len(matches)
+        numMatches = len(columns['match_events'])
 
         insight = None
         if numMatches != 0:
@@ -415,19 +408,12 @@ class InsightsHelper(object):
         return insights
 
     @classmethod
-    def _calculateBlueBanners(self, award_futures, year):
+    def _calculateBlueBanners(self, aggregate, year):
         """
         Returns an Insight where the data is a dict:
         Key: number of blue banners, Value: list of teams with that number of blue banners
         """
-        blue_banner_winners = defaultdict(int)
-        for award_future in award_futures:
-            award = award_future.get_result()
-            if award.award_type_enum in AwardType.BLUE_BANNER_AWARDS:
-                for team_key in award.team_list:
-                    team_key_name = team_key.id()
-                    blue_banner_winners[team_key_name] += 1
-        blue_banner_winners = self._sortTeamWinsDict(blue_banner_winners)
+        blue_banner_winners = self._sortTeamWinsDict(aggregate.blue_banners)
 
         insight = None
         if blue_banner_winners != []:
@@ -438,7 +424,7 @@ class InsightsHelper(object):
             return []
 
     @classmethod
-    def _calculateChampionshipStats(self, award_futures, year):
+    def _calculateChampionshipStats(self, aggregate, year):
         """
         Returns a list of Insights where, depending on the Insight, the data
         is either a team or a list of teams
@@ -448,21 +434,20 @@ class InsightsHelper(object):
         world_finalists = []
         division_winners = []
         division_finalists = []
-        for award_future in award_futures:
-            award = award_future.get_result()
-            for team_key in award.team_list:
-                team_key_name = team_key.id()
-                if award.event_type_enum == EventType.CMP_FINALS:
-                    if award.award_type_enum == AwardType.CHAIRMANS:
+        for award_key_name in sorted(aggregate.awards.keys()):
+            award_type_enum, event_type_enum, team_key_names = aggregate.awards[award_key_name]
+            for team_key_name in team_key_names:
+                if event_type_enum == EventType.CMP_FINALS:
+                    if award_type_enum == AwardType.CHAIRMANS:
                         ca_winner = team_key_name
-                    elif award.award_type_enum == AwardType.WINNER:
+                    elif award_type_enum == AwardType.WINNER:
                         world_champions.append(team_key_name)
-                    elif award.award_type_enum == AwardType.FINALIST:
+                    elif award_type_enum == AwardType.FINALIST:
                         world_finalists.append(team_key_name)
-                elif award.event_type_enum == EventType.CMP_DIVISION:
-                    if award.award_type_enum == AwardType.WINNER:
+                elif event_type_enum == EventType.CMP_DIVISION:
+                    if award_type_enum == AwardType.WINNER:
                         division_winners.append(team_key_name)
-                    elif award.award_type_enum == AwardType.FINALIST:
+                    elif award_type_enum == AwardType.FINALIST:
                         division_finalists.append(team_key_name)
 
         world_champions = self._sortTeamList(world_champions)
@@ -484,28 +469,18 @@ class InsightsHelper(object):
         return insights
 
     @classmethod
-    def _calculateRegionalStats(self, award_futures, year):
+    def _calculateRegionalStats(self, aggregate, year):
         """
         Returns a list of Insights where, depending on the Insight, the data
         is either a list of teams or a dict:
         Key: number of wins, Value: list of teams with that number of wins
         """
         rca_winners = []
-        regional_winners = defaultdict(int)
-        for award_future in award_futures:
-            award = award_future.get_result()
-            if award.event_type_enum in EventType.CMP_EVENT_TYPES:
-                continue
-            for team_key in award.team_list:
-                team_key_name = team_key.id()
-                if award.award_type_enum == AwardType.CHAIRMANS and award.event_type_enum in {EventType.REGIONAL, EventType.DISTRICT_CMP}:
-                    # Only count Chairman's at regionals and district championships
-                    rca_winners.append(team_key_name)
-                elif award.award_type_enum == AwardType.WINNER:
-                    regional_winners[team_key_name] += 1
+        for team_key_name, count in aggregate.rca_winners.items():
+            rca_winners += [team_key_name] * count
 
         rca_winners = self._sortTeamList(rca_winners)
-        regional_winners = self._sortTeamWinsDict(regional_winners)
+        regional_winners = self._sortTeamWinsDict(aggregate.regional_winners)
 
         insights = []
         if rca_winners != []:
@@ -515,15 +490,15 @@ class InsightsHelper(object):
         return insights
 
     @classmethod
-    def _calculateSuccessfulElimTeamups(self, award_futures, year):
+    def _calculateSuccessfulElimTeamups(self, aggregate, year):
         """
         Returns an Insight where the data is a list of list of teams that won an event together
         """
         successful_elim_teamups = []
-        for award_future in award_futures:
-            award = award_future.get_result()
-            if award.award_type_enum == AwardType.WINNER:
-                successful_elim_teamups.append([team_key.id() for team_key in award.team_list])
+        for award_key_name in sorted(aggregate.awards.keys()):
+            award_type_enum, _, team_key_names = aggregate.awards[award_key_name]
+            if award_type_enum == AwardType.WINNER:
+                successful_elim_teamups.append(team_key_names)
 
         if successful_elim_teamups != []:
             return [self._createInsight(successful_elim_teamups, Insight.INSIGHT_NAMES[Insight.SUCCESSFUL_ELIM_TEAMUPS], year)]
@@ -552,44 +527,24 @@ class InsightsHelper(object):
     def doOverallAwardInsights(self):
         """
         Calculate award insights across all years. Returns a list of Insights.
+        Merges the counters of every year's AwardInsightsAggregate, building
+        those of years that haven't been built yet.
         """
         insights = []
 
-        year_regional_winners = Insight.query(Insight.name == Insight.INSIGHT_NAMES[Insight.REGIONAL_DISTRICT_WINNERS], Insight.year != 0).fetch(1000)
-        regional_winners = defaultdict(int)
-        for insight in year_regional_winners:
-            for number, team_list in insight.data:
-                for team in team_list:
-                    regional_winners[team] += number
-
-        year_blue_banners = Insight.query(Insight.name == Insight.INSIGHT_NAMES[Insight.BLUE_BANNERS], Insight.year != 0).fetch(1000)
-        blue_banners = defaultdict(int)
-        for insight in year_blue_banners:
-            for number, team_list in insight.data:
-                for team in team_list:
-                    blue_banners[team] += number
-
-        year_rca_winners = Insight.query(Insight.name == Insight.INSIGHT_NAMES[Insight.RCA_WINNERS], Insight.year != 0).fetch(1000)
-        rca_winners = defaultdict(int)
-        for insight in year_rca_winners:
-            for team in insight.data:
-                rca_winners[team] += 1
-
-        year_world_champions = Insight.query(Insight.name == Insight.INSIGHT_NAMES[Insight.WORLD_CHAMPIONS], Insight.year != 0).fetch(1000)
-        world_champions = defaultdict(int)
-        for insight in year_world_champions:
-            for team in insight.data:
-                world_champions[team] += 1
-
-        year_successful_elim_teamups = Insight.query(Insight.name == Insight.INSIGHT_NAMES[Insight.SUCCESSFUL_ELIM_TEAMUPS], Insight.year != 0).fetch(1000)
-        successful_elim_teamups = defaultdict(int)
-        for insight in year_successful_elim_teamups:
-            for teams in insight.data:
-                for pairs in itertools.combinations(teams, 2):
-                    successful_elim_teamups[tuple(sorted(pairs))] += 1
+        aggregates = AwardInsightsHelper.get_all_aggregates()
+        merged = AwardInsightsHelper.merge(aggregates)
+        regional_winners = merged['regional_winners']
+        blue_banners = merged['blue_banners']
+        rca_winners = merged['rca_winners']
+        world_champions = merged['world_champions']
+        has_successful_elim_teamups = any(
+            award_type_enum == AwardType.WINNER
+            for aggregate in aggregates for award_type_enum, _, _ in aggregate.awards.values())
+
         successful_elim_teamups_sorted = defaultdict(list)
-        for teams, num_wins in successful_elim_teamups.items():
-            sorted_teams = sorted(teams, key=lambda team_key: int(team_key[3:]))
+        for pair, num_wins in merged['elim_teamups'].items():
+            sorted_teams = sorted(pair.split(','), key=lambda team_key: int(team_key[3:]))
             successful_elim_teamups_sorted[num_wins].append(sorted_teams)
         successful_elim_teamups_sorted = sorted(successful_elim_teamups_sorted.items(), key=lambda x: -x[0])
 
@@ -612,7 +567,7 @@ class InsightsHelper(object):
         if world_champions:
             insights.append(self._createInsight(world_champions, Insight.INSIGHT_NAMES[Insight.WORLD_CHAMPIONS], 0))
 
-        if year_successful_elim_teamups:
+        if has_successful_elim_teamups:
             insights.append(self._createInsight(successful_elim_teamups_sorted, Insight.INSIGHT_NAMES[Insight.SUCCESSFUL_ELIM_TEAMUPS], 0))
 
         return insights
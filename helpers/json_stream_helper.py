@@ -0,0 +1,64 @@
+import json
+import re
+
+
+class JSONStreamHelper(object):
+    """
+    Decodes the items of an array in a JSON object one at a time, so large
+    API responses don't have to be decoded into one tree of dicts. Only the
+    current item and the raw content are held in memory.
+    """
+    WHITESPACE_RE = re.compile(r'[ \t\n\r]*')
+    DECODER = json.JSONDecoder()
+
+    @classmethod
+    def _skip_whitespace(cls, content, idx):
+        return cls.WHITESPACE_RE.match(content, idx).end()
+
+    @classmethod
+    def _expect(cls, content, idx, chars):
+        """
+        Returns (char, index after it) for the next non-whitespace char, which must be in |chars|
+        """
+        idx = cls._skip_whitespace(content, idx)
+        if idx >= len(content) or content[idx] not in chars:
+            raise ValueError("Expecting one of '{}' at char {}".format(chars, idx))
+        return content[idx], idx + 1
+
+    @classmethod
+    def iter_array(cls, content, key):
+        """
+        Yields the items of the array at |key| of the JSON object in |content|.
+        Raises KeyError if the object has no |key|, like indexing the decoded object would.
+        """
+        _, idx = cls._expect(content, 0, '{')
+        if content.startswith('}', cls._skip_whitespace(content, idx)):
+            raise KeyError(key)
+
+        while True:
+            _, idx = cls._expect(content, idx, '"')
+            name, idx = json.decoder.scanstring(content, idx)
+            _, idx = cls._expect(content, idx, ':')
+            idx = cls._skip_whitespace(content, idx)
+
+            if name == key and content.startswith('[', idx):
+                idx = cls._skip_whitespace(content, idx + 1)
+                if content.startswith(']', idx):
+                    return
+                while True:
+                    item, idx = cls.DECODER.raw_decode(content, idx)
+                    yield item
+                    char, idx = cls._expect(content, idx, ',]')
+                    if char == ']':
+                        return
+                    idx = cls._skip_whitespace(content, idx)
+
+            value, idx = cls.DECODER.raw_decode(content, idx)
+            if name == key:  # Not an array
+                for item in value:
+                    yield item
+                return
+
+            char, idx = cls._expect(content, idx, ',}')
+            if char == '}':
+                raise KeyError(key)
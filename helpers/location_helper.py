@@ -1,3 +1,5 @@
+import datetime
+import hashlib
 import json
 import logging
 import math
@@ -6,10 +8,11 @@ import tba_config
 import urllib
 
 from difflib import SequenceMatcher
-from google.appengine.api import memcache, urlfetch
+from google.appengine.api import memcache
 from google.appengine.ext import ndb
 
 from models.location import Location
+from models.location_cache_entry import LocationCacheEntry
 from models.sitevar import Sitevar
 from models.team import Team
 
@@ -17,6 +20,35 @@ from models.team import Team
 class LocationHelper(object):
     GOOGLE_API_KEY = None
 
+    # Lookups are stored in the datastore behind memcache
+    LOCATION_CACHE_TTL = datetime.timedelta(days=180)
+    LOCATION_CACHE_NEGATIVE_TTL = datetime.timedelta(days=7)
+    LOCATION_CACHE_MAX_KEY_LENGTH = 400
+    LOCATION_CACHE_DELETE_BATCH_SIZE = 500
+
+    SIMILARITY_FEATURES_CACHE_SIZE = 10000
+    _similarity_features_cache = {}
+
+    @classmethod
+    def _get_similarity_features(cls, s):
+        """
+        Returns (lowercased, words sorted, acronym) for a string.
+        Memoized since the same query is compared against many candidates.
+        """
+        features = cls._similarity_features_cache.get(s)
+        if features is None:
+            lowered = s.lower().strip()
+            split = filter(lambda x: x, re.split('\s+|,|-', lowered))
+            features = (
+                lowered,
+                ' '.join(sorted(split)),
+                ''.join([w[0] if w else '' for w in split]).lower(),
+            )
+            if len(cls._similarity_features_cache) >= cls.SIMILARITY_FEATURES_CACHE_SIZE:
+                cls._similarity_features_cache.clear()
+            cls._similarity_features_cache[s] = features
+        return features
+
     @classmethod
     def get_similarity(cls, a, b):
         """
@@ -26,28 +58,34 @@ class LocationHelper(object):
                     similarity between a & acronym(b)) from 0 to 1
         where acronym() is generated by splitting along non word characters
         Ignores case and order
+
+        The length based bound (SequenceMatcher.real_quick_ratio()) is an
+        upper bound of ratio(), so the full ratio is only computed for pairs
+        that could beat the best so far. The result is identical to computing
+        all four.
         """
-        a = a.lower().strip()
-        b = b.lower().strip()
-
-        a_split = filter(lambda x: x, re.split('\s+|,|-', a))
-        b_split = filter(lambda x: x, re.split('\s+|,|-', b))
-        a_sorted = ' '.join(sorted(a_split))
-        b_sorted = ' '.join(sorted(b_split))
-        a_acr =  ''.join([w[0] if w else '' for w in a_split]).lower()
-        b_acr =  ''.join([w[0] if w else '' for w in b_split]).lower()
-
-        sm1 = SequenceMatcher(None, a, b)
-        sm2 = SequenceMatcher(None, a_sorted, b_sorted)
-        sm3 = SequenceMatcher(None, a_acr, b)
-        sm4 = SequenceMatcher(None, a, b_acr)
-
-        return  max([
-            sm1.ratio(),
-            sm2.ratio(),
-            sm3.ratio(),
-            sm4.ratio(),
-        ])
+        a, a_sorted, a_acr = cls._get_similarity_features(a)
+        b, b_sorted, b_acr = cls._get_similarity_features(b)
+        if a == b:
+            return 1.0
+
+        pairs = [
+            (a, b),
+            (a_sorted, b_sorted),
+            (a_acr, b),
+            (a, b_acr),
+        ]
+        # Same as SequenceMatcher.real_quick_ratio(), without building a matcher
+        bounded_pairs = sorted([(2.0 * min(len(x), len(y)) / (len(x) + len(y)) if x or y else 1.0, x, y) for x, y in pairs], reverse=True)
+
+        best = 0.0
+        for upper_bound, x, y in bounded_pairs:
+            if upper_bound <= best:
+                break  # Sorted, so no remaining pair can do better
+            best = max(best, SequenceMatcher(None, x, y).ratio())
+            if best == 1:
+                break
+        return best
 
     @classmethod
     def update_event_location(cls, event):
@@ -389,7 +427,12 @@ class LocationHelper(object):
             query = query.encode('ascii', 'ignore')
             cache_key = u'google_maps_{}:{}'.format(search_type, query)
             results = memcache.get(cache_key)
-            if results is None:
+            stored_query = u'{}|{},{}'.format(query, lat_lng[0], lat_lng[1])
+            from_memcache = results is not None
+            found = from_memcache
+            if not found:
+                found, results = yield cls.get_stored_location_result_async(search_type, stored_query)
+            if not found:
                 search_params = {
                     'key': cls.GOOGLE_API_KEY,
                     'location': '{},{}'.format(lat_lng[0], lat_lng[1]),
@@ -411,8 +454,10 @@ class LocationHelper(object):
                         search_dict = json.loads(search_result.content)
                         if search_dict['status'] == 'ZERO_RESULTS':
                             logging.info('No {} results for query: {}, lat_lng: {}'.format(search_type, query, lat_lng))
+                            yield cls.store_location_result_async(search_type, stored_query, [])
                         elif search_dict['status'] == 'OK':
                             results = search_dict['results']
+                            yield cls.store_location_result_async(search_type, stored_query, results)
                         else:
                             logging.warning(u'{} failed with query: {}, lat_lng: {}'.format(search_type, query, lat_lng))
                             logging.warning(search_dict)
@@ -423,6 +468,7 @@ class LocationHelper(object):
                     logging.warning(u'urlfetch for {} request failed with query: {}, lat_lng: {}'.format(search_type, query, lat_lng))
                     logging.warning(e)
 
+            if not from_memcache:
                 memcache.set(cache_key, results if results else [])
 
         raise ndb.Return(results if results else [])
@@ -443,7 +489,11 @@ class LocationHelper(object):
 
         cache_key = u'google_maps_place_details:{}'.format(place_id)
         result = memcache.get(cache_key)
-        if result is None:
+        from_memcache = result is not None
+        found = from_memcache
+        if not found:
+            found, result = yield cls.get_stored_location_result_async('place_details', place_id)
+        if not found:
             place_details_params = {
                 'placeid': place_id,
                 'key': cls.GOOGLE_API_KEY,
@@ -459,8 +509,10 @@ class LocationHelper(object):
                     place_details_dict = json.loads(place_details_result.content)
                     if place_details_dict['status'] == 'ZERO_RESULTS':
                         logging.info('No place_details result for place_id: {}'.format(place_id))
+                        yield cls.store_location_result_async('place_details', place_id, None)
                     elif place_details_dict['status'] == 'OK':
                         result = place_details_dict['result']
+                        yield cls.store_location_result_async('place_details', place_id, result)
                     else:
                         logging.warning('Placedetails failed with place_id: {}.'.format(place_id))
                         logging.warning(place_details_dict)
@@ -470,30 +522,107 @@ class LocationHelper(object):
                 logging.warning('urlfetch for place_details request failed with place_id: {}.'.format(place_id))
                 logging.warning(e)
 
-            if tba_config.CONFIG['memcache']:
-                memcache.set(cache_key, result)
+        if tba_config.CONFIG['memcache'] and not from_memcache:
+            memcache.set(cache_key, result)
 
         raise ndb.Return(result)
 
+    @classmethod
+    def normalize_location_query(cls, query):
+        """
+        Lowercases and collapses whitespace so equivalent queries share a cache entry
+        """
+        if isinstance(query, str):
+            query = query.decode('utf-8', 'ignore')
+        return u' '.join(query.lower().split())
+
+    @classmethod
+    def _location_cache_key_name(cls, lookup_type, query):
+        key_name = u'{}:{}'.format(lookup_type, cls.normalize_location_query(query))
+        if len(key_name.encode('utf-8')) > cls.LOCATION_CACHE_MAX_KEY_LENGTH:
+            key_name = u'{}:md5:{}'.format(lookup_type, hashlib.md5(key_name.encode('utf-8')).hexdigest())
+        return key_name
+
+    @classmethod
+    @ndb.tasklet
+    def get_stored_location_result_async(cls, lookup_type, query):
+        """
+        Returns (found, result) from the datastore backed location cache
+        """
+        entry = yield LocationCacheEntry.get_by_id_async(cls._location_cache_key_name(lookup_type, query))
+        if entry is None or (entry.expires and entry.expires < datetime.datetime.utcnow()):
+            raise ndb.Return((False, None))
+        raise ndb.Return((True, entry.result))
+
+    @classmethod
+    @ndb.tasklet
+    def store_location_result_async(cls, lookup_type, query, result):
+        """
+        Stores a lookup result. Empty results are kept for a shorter time.
+        Tests can use this to stub out the external services.
+        """
+        ttl = cls.LOCATION_CACHE_TTL if result else cls.LOCATION_CACHE_NEGATIVE_TTL
+        yield LocationCacheEntry(
+            id=cls._location_cache_key_name(lookup_type, query),
+            result=result,
+            expires=datetime.datetime.utcnow() + ttl,
+        ).put_async()
+
+    @classmethod
+    def delete_expired_location_results(cls):
+        """
+        Deletes expired location cache entries. Returns how many were deleted.
+        """
+        count = 0
+        batch = []
+        for key in LocationCacheEntry.query(LocationCacheEntry.expires < datetime.datetime.utcnow()).iter(keys_only=True):
+            batch.append(key)
+            if len(batch) >= cls.LOCATION_CACHE_DELETE_BATCH_SIZE:
+                ndb.delete_multi(batch)
+                count += len(batch)
+                batch = []
+        ndb.delete_multi(batch)
+        return count + len(batch)
+
+    @classmethod
+    def prefetch_geocodes(cls, locations):
+        """
+        Loads stored geocode results for many locations with one batch get.
+        Subsequent lookups of the same locations in this request are served
+        from the ndb context cache, so backfills aren't bound by the external API.
+        """
+        keys = [ndb.Key(LocationCacheEntry, cls._location_cache_key_name('geocode', location)) for location in set(filter(None, locations))]
+        ndb.get_multi(keys)
+
     @classmethod
     def get_lat_lng(cls, location):
-        results = cls.google_maps_geocode_async(location).get_result()
+        return cls.get_lat_lng_async(location).get_result()
+
+    @classmethod
+    @ndb.tasklet
+    def get_lat_lng_async(cls, location):
+        results = yield cls.google_maps_geocode_async(location)
         if results:
-            return results[0]['geometry']['location']['lat'], results[0]['geometry']['location']['lng']
+            raise ndb.Return((results[0]['geometry']['location']['lat'], results[0]['geometry']['location']['lng']))
         else:
-            return None
+            raise ndb.Return(None)
 
     @classmethod
     @ndb.tasklet
     def google_maps_geocode_async(cls, location):
+        if not location:
+            raise ndb.Return([])
+
         cache_key = u'google_maps_geocode:{}'.format(location)
         results = memcache.get(cache_key)
         if results is None:
-            context = ndb.get_context()
-
-            if not location:
-                raise ndb.Return([])
+            found, results = yield cls.get_stored_location_result_async('geocode', location)
+            if found:
+                memcache.set(cache_key, results if results else [])
+                raise ndb.Return(results if results else [])
 
+            context = ndb.get_context()
+            query = location
             location = location.encode('utf-8')
 
             google_secrets = Sitevar.get_by_id("google.secrets")
@@ -516,8 +645,10 @@ class LocationHelper(object):
                     geocode_dict = json.loads(geocode_results.content)
                     if geocode_dict['status'] == 'ZERO_RESULTS':
                         logging.info('No geocode results for location: {}'.format(location))
+                        yield cls.store_location_result_async('geocode', query, [])
                     elif geocode_dict['status'] == 'OK':
                         results = geocode_dict['results']
+                        yield cls.store_location_result_async('geocode', query, results)
                     else:
                         logging.warning('Geocoding failed!')
                         logging.warning(geocode_dict)
@@ -533,15 +664,26 @@ class LocationHelper(object):
 
     @classmethod
     def get_timezone_id(cls, location, lat_lng=None):
+        return cls.get_timezone_id_async(location, lat_lng=lat_lng).get_result()
+
+    @classmethod
+    @ndb.tasklet
+    def get_timezone_id_async(cls, location, lat_lng=None):
         if lat_lng is None:
-            result = cls.get_lat_lng(location)
+            result = yield cls.get_lat_lng_async(location)
             if result is None:
-                return None
+                raise ndb.Return(None)
             else:
                 lat, lng = result
         else:
             lat, lng = lat_lng.lat, lat_lng.lon
 
+        # Timezones don't change over ~10m, so round to share cache entries
+        stored_query = '{:.4f},{:.4f}'.format(lat, lng)
+        found, timezone_id = yield cls.get_stored_location_result_async('timezone', stored_query)
+        if found:
+            raise ndb.Return(timezone_id)
+
         google_secrets = Sitevar.get_by_id("google.secrets")
         google_api_key = None
         if google_secrets is None:
@@ -559,16 +701,20 @@ class LocationHelper(object):
             tz_params['key'] = google_api_key
         tz_url = 'https://maps.googleapis.com/maps/api/timezone/json?%s' % urllib.urlencode(tz_params)
         try:
-            tz_result = urlfetch.fetch(tz_url)
+            context = ndb.get_context()
+            tz_result = yield context.urlfetch(tz_url)
         except Exception, e:
             logging.warning('urlfetch for timezone request failed: {}'.format(tz_url))
             logging.info(e)
-            return None
+            raise ndb.Return(None)
         if tz_result.status_code != 200:
             logging.warning('TZ lookup for (lat, lng) failed! ({}, {})'.format(lat, lng))
-            return None
+            raise ndb.Return(None)
         tz_dict = json.loads(tz_result.content)
         if 'timeZoneId' not in tz_dict:
             logging.warning('No timeZoneId for (lat, lng)'.format(lat, lng))
-            return None
-        return tz_dict['timeZoneId']
+            if tz_dict.get('status') == 'ZERO_RESULTS':
+                yield cls.store_location_result_async('timezone', stored_query, None)
+            raise ndb.Return(None)
+        yield cls.store_location_result_async('timezone', stored_query, tz_dict['timeZoneId'])
+        raise ndb.Return(tz_dict['timeZoneId'])
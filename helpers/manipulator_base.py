@@ -1,7 +1,9 @@
-from collections import defaultdict
+import logging
+
 from google.appengine.ext import deferred
 from google.appengine.ext import ndb
 from helpers.cache_clearer import CacheClearer
+from helpers.cache_invalidation_planner import CacheInvalidationPlanner
 import tba_config
 
 
@@ -47,27 +49,35 @@ class ManipulatorBase(object):
             return
 
         all_affected_references = []
+        kinds = []
         for model in models:
             if getattr(model, 'dirty', False) and hasattr(model, '_affected_references'):
                 all_affected_references.append(model._affected_references)
+                kinds.append(model._get_kind())
 
         if all_affected_references != []:
             deferred.defer(
                 cls._clearCacheDeferred,
                 all_affected_references,
+                kinds,
                 _queue='cache-clearing',
                 _transactional=ndb.in_transaction(),
                 _target='default')
 
     @classmethod
-    def _clearCacheDeferred(cls, all_affected_references):
-        to_clear = defaultdict(set)
-        for affected_references in all_affected_references:
-            for cache_key, controller in cls.getCacheKeysAndControllers(affected_references):
-                to_clear[controller].add(cache_key)
-
-        for controller, cache_keys in to_clear.items():
-            controller.delete_cache_multi(cache_keys)
+    def _clearCacheDeferred(cls, all_affected_references, kinds=None):
+        if kinds is None:
+            kinds = [None] * len(all_affected_references)
+        planner = CacheInvalidationPlanner(cls.getCacheKeysAndControllers)
+        for affected_references, kind in zip(all_affected_references, kinds):
+            planner.add(affected_references, kind=kind)
+        planner.execute()
+        if tba_config.CONFIG['database_query_dependency_tracking']:
+            try:
+                planner.report_dependency_diff()
+            except Exception, e:
+                logging.error("Cache dependency shadow diff errored!")
+                logging.exception(e)
 
     @classmethod
     def listify(self, thing):
@@ -115,6 +125,31 @@ class ManipulatorBase(object):
                 model.dirty = False
         return self.delistify(models)
 
+    @classmethod
+    def commit(cls, merged_models, models_to_delete):
+        """
+        Puts the dirty models among |merged_models|, which must already have been
+        merged with updateMergeBase, and deletes |models_to_delete| as one batch,
+        with one cache clear and one run of each post hook.
+        Returns the models that were put.
+        """
+        models_to_put = [model for model in merged_models if getattr(model, "dirty", False)]
+        models_to_delete = filter(None, models_to_delete)
+        for model in models_to_delete:
+            model.dirty = True
+            cls._computeAndSaveAffectedReferences(model)
+
+        futures = ndb.put_multi_async(models_to_put) + ndb.delete_multi_async([model.key for model in models_to_delete])
+        for future in futures:
+            future.check_success()
+
+        cls._clearCache(models_to_put + models_to_delete)
+        cls.runPostUpdateHook(models_to_put)
+        cls.runPostDeleteHook(models_to_delete)
+        for model in merged_models:
+            model.dirty = False
+        return models_to_put
+
     @classmethod
     def findOrSpawn(self, new_models, auto_union=True):
         """"
@@ -59,7 +59,7 @@ class MatchHelper(object):
         if event.year < 2008 or event.event_type_enum not in EventType.SEASON_EVENT_TYPES:
             return
 
-        qual_matches = cls.organizeMatches(event.matches)['qm']
+        qual_matches = event.match_index.organized['qm']
         if not qual_matches:
             return
 
@@ -95,11 +95,12 @@ class MatchHelper(object):
     # Note: Matches within a comp_level (qual, qf, sf, f, etc.) will be in order,
     # but the comp levels themselves may not be in order. Doesn't matter because
     # XXX_match_table.html checks for comp_level when rendering the page
+    NATURAL_SORT_SPLIT_RE = re.compile('([0-9]+)')
+
     @classmethod
     def natural_sort_matches(self, matches):
-        import re
         convert = lambda text: int(text) if text.isdigit() else text.lower()
-        alphanum_key = lambda match: [convert(c) for c in re.split('([0-9]+)', str(match.key_name))]
+        alphanum_key = lambda match: [convert(c) for c in self.NATURAL_SORT_SPLIT_RE.split(str(match.key_name))]
         return sorted(matches, key=alphanum_key)
 
     @classmethod
@@ -112,8 +113,7 @@ class MatchHelper(object):
         match_list = MatchHelper.natural_sort_matches(match_list)
         matches = dict([(comp_level, list()) for comp_level in Match.COMP_LEVELS])
         matches["num"] = len(match_list)
-        while len(match_list) > 0:
-            match = match_list.pop(0)
+        for match in match_list:
             matches[match.comp_level].append(match)
 
         return matches
@@ -122,8 +122,7 @@ class MatchHelper(object):
     def organizeKeys(cls, match_keys):
         matches = dict([(comp_level, list()) for comp_level in Match.COMP_LEVELS])
         matches["num"] = len(match_keys)
-        while len(match_keys) > 0:
-            match_key = match_keys.pop(0)
+        for match_key in match_keys:
             match_id = match_key.split("_")[1]
             for comp_level in Match.COMP_LEVELS:
                 if match_id.startswith(comp_level):
@@ -157,9 +156,24 @@ class MatchHelper(object):
 
     @classmethod
     def deleteInvalidMatches(self, match_list, event):
+        """
+        Deletes invalid matches (see partitionInvalidMatches) and returns the rest
+        """
+        return_list, invalid_matches = self.partitionInvalidMatches(match_list, event)
+        for match in invalid_matches:
+            try:
+                MatchManipulator.delete(match)
+                logging.warning("Deleting invalid match: %s" % match.key_name)
+            except:
+                logging.warning("Tried to delete invalid match, but failed: %s" % match.key_name)
+        return return_list
+
+    @classmethod
+    def partitionInvalidMatches(self, match_list, event):
         """
         A match is invalid iff it is an elim match that has not been played
         and the same alliance already won in 2 match numbers in the same set.
+        Returns (valid matches, invalid matches)
         """
         red_win_counts = defaultdict(int)  # key: <comp_level><set_number>
         blue_win_counts = defaultdict(int)  # key: <comp_level><set_number>
@@ -172,20 +186,17 @@ class MatchHelper(object):
                     blue_win_counts[key] += 1
 
         return_list = []
+        invalid_matches = []
         for match in match_list:
             if match.comp_level in Match.ELIM_LEVELS and not match.has_been_played:
                 if event.playoff_type != PlayoffType.ROUND_ROBIN_6_TEAM or match.comp_level == 'f':  # Don't delete round robin semifinal matches
                     key = '{}{}'.format(match.comp_level, match.set_number)
                     if red_win_counts[key] == 2 or blue_win_counts[key] == 2:
-                        try:
-                            MatchManipulator.delete(match)
-                            logging.warning("Deleting invalid match: %s" % match.key_name)
-                        except:
-                            logging.warning("Tried to delete invalid match, but failed: %s" % match.key_name)
+                        invalid_matches.append(match)
                         continue
             return_list.append(match)
 
-        return return_list
+        return return_list, invalid_matches
 
     @classmethod
     def generateBracket(cls, matches, alliance_selections=None):
@@ -0,0 +1,36 @@
+import logging
+
+from google.appengine.ext import ndb
+
+from helpers.match_helper import MatchHelper
+from helpers.match_manipulator import MatchManipulator
+
+
+class MatchIngestHelper(object):
+    """
+    Ingests one event's matches from the FMS API in stages:
+    1. Fetch the schedule and score details endpoints in parallel (DatafeedFMSAPI.getMatches)
+    2. Merge the details onto the schedule in memory, and set aside invalid matches
+    3. Merge the result onto the stored matches, read with a single get_multi
+    4. Commit only the changed matches and the stored invalid ones, as one batch
+    Staging holds one event's matches, so memory per poll is bounded by the event's size.
+    """
+    @classmethod
+    def ingest(cls, event, datafeed):
+        """
+        Returns (merged matches, matches that were put, matches that were deleted)
+        """
+        matches, invalid_matches = MatchHelper.partitionInvalidMatches(datafeed.getMatches(event.key_name), event)
+
+        stored_matches = ndb.get_multi([match.key for match in matches + invalid_matches], use_cache=False)
+        stored_valid_matches = stored_matches[:len(matches)]
+        stored_invalid_matches = filter(None, stored_matches[len(matches):])
+
+        merged_matches = [
+            MatchManipulator.updateMergeBase(match, stored_match)
+            for match, stored_match in zip(matches, stored_valid_matches)]
+
+        for match in stored_invalid_matches:
+            logging.warning("Deleting invalid match: {}".format(match.key_name))
+        updated_matches = MatchManipulator.commit(merged_matches, stored_invalid_matches)
+        return merged_matches, updated_matches, stored_invalid_matches
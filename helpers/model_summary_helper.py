@@ -0,0 +1,80 @@
+import re
+
+from google.appengine.api import memcache
+from google.appengine.ext import ndb
+
+from models.event import Event
+from models.match import Match
+from models.team import Team
+
+
+class ModelSummaryHelper(object):
+    """
+    Memcached summaries of Teams and Events holding only the properties that
+    lists of them show. Summaries come back as unsaved partial models, so
+    templates and sort helpers use them like the full ones. Don't put them.
+    """
+    CACHE_VERSION = 0
+    CACHE_KEY_FORMAT = 'model_summary_{}_{}_{}'  # (version, kind, key_name)
+    CACHE_TIMEOUT = 60 * 60 * 24 * 7
+
+    SUMMARY_PROPERTIES = {
+        'Team': ['team_number', 'nickname'],
+        'Event': ['name', 'short_name', 'event_short', 'year', 'start_date', 'end_date'],
+    }
+    MODEL_CLASSES = {
+        'Team': Team,
+        'Event': Event,
+    }
+
+    MATCH_KEY_RE = re.compile(r'^((\d{4})[a-z0-9]+)_(qm|ef|qf|sf|f)(?:(\d+)m)?(\d+)$')
+
+    @classmethod
+    def _cache_key(cls, key):
+        return cls.CACHE_KEY_FORMAT.format(cls.CACHE_VERSION, key.kind(), key.id())
+
+    @classmethod
+    def get_summaries(cls, keys):
+        """
+        Returns summaries of Team or Event keys in order, with None for ones
+        that don't exist. One memcache lookup, then one get_multi for any
+        that aren't cached.
+        """
+        cache_keys = [cls._cache_key(key) for key in keys]
+        summaries = memcache.get_multi(cache_keys)
+
+        missing_keys = [key for key, cache_key in zip(keys, cache_keys) if cache_key not in summaries]
+        if missing_keys:
+            new_summaries = {}
+            for key, model in zip(missing_keys, ndb.get_multi(missing_keys)):
+                if model is not None:
+                    new_summaries[cls._cache_key(key)] = dict(
+                        (prop, getattr(model, prop)) for prop in cls.SUMMARY_PROPERTIES[key.kind()])
+            memcache.set_multi(new_summaries, time=cls.CACHE_TIMEOUT)
+            summaries.update(new_summaries)
+
+        return [
+            cls.MODEL_CLASSES[key.kind()](key=key, **summaries[cache_key]) if cache_key in summaries else None
+            for key, cache_key in zip(keys, cache_keys)]
+
+    @classmethod
+    def clear(cls, keys):
+        memcache.delete_multi([cls._cache_key(key) for key in keys])
+
+    @classmethod
+    def match_summary(cls, match_key):
+        """
+        Everything a match summary needs is in its key name, like 2017casj_qf1m2.
+        Returns None for key names that don't parse.
+        """
+        key_match = cls.MATCH_KEY_RE.match(match_key.id())
+        if key_match is None:
+            return None
+        event_key, year, comp_level, set_number, match_number = key_match.groups()
+        return Match(
+            key=match_key,
+            event=ndb.Key(Event, event_key),
+            year=int(year),
+            comp_level=comp_level,
+            set_number=int(set_number) if set_number else 1,
+            match_number=int(match_number))
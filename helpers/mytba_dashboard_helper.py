@@ -0,0 +1,100 @@
+from google.appengine.api import memcache
+from google.appengine.ext import ndb
+
+from consts.model_type import ModelType
+from models.award import Award
+from models.event_team import EventTeam
+from models.favorite import Favorite
+from models.mytba_dashboard import MyTBADashboard
+from models.team import Team
+
+
+class MyTBADashboardHelper(object):
+    """
+    Maintains MyTBADashboards. Dashboards are deleted when what they reference
+    changes and rebuilt the next time they're read.
+    """
+    # Dashboards are built from eventually consistent queries, so ones built
+    # this soon after being cleared aren't saved, as they may miss what
+    # caused the clear
+    RECENTLY_CLEARED_KEY_FORMAT = 'mytba_dashboard_cleared_{}'  # (dashboard key urlsafe)
+    RECENTLY_CLEARED_WINDOW = 60
+
+    @classmethod
+    def _dashboard_key(cls, account_key, year):
+        return ndb.Key(MyTBADashboard, str(year), parent=account_key)
+
+    @classmethod
+    def _recently_cleared_key(cls, dashboard_key):
+        return cls.RECENTLY_CLEARED_KEY_FORMAT.format(dashboard_key.urlsafe())
+
+    @classmethod
+    def get_dashboard(cls, account_key, year):
+        dashboard = cls._dashboard_key(account_key, year).get()
+        if dashboard is None:
+            dashboard = cls.build_dashboard(account_key, year)
+        return dashboard
+
+    @classmethod
+    def build_dashboard(cls, account_key, year):
+        """
+        Looks up the EventTeams and awards of every favorite team at once
+        """
+        favorites = Favorite.query(Favorite.model_type == ModelType.TEAM, ancestor=account_key).fetch()
+        team_keys = [ndb.Key(Team, favorite.model_key) for favorite in favorites]
+
+        event_teams_futures = [
+            EventTeam.query(EventTeam.team == team_key, EventTeam.year == year).fetch_async(keys_only=True)
+            for team_key in team_keys]
+        awards_futures = [
+            Award.query(Award.team_list == team_key, Award.year == year).fetch_async(keys_only=True)
+            for team_key in team_keys]
+
+        event_team_keys = []
+        for event_teams_future in event_teams_futures:
+            event_team_keys += event_teams_future.get_result()
+
+        award_keys = []
+        seen_award_keys = set()  # Favorite teams may share awards
+        for awards_future in awards_futures:
+            for award_key in awards_future.get_result():
+                if award_key not in seen_award_keys:
+                    seen_award_keys.add(award_key)
+                    award_keys.append(award_key)
+
+        dashboard = MyTBADashboard(
+            key=cls._dashboard_key(account_key, year),
+            event_team_keys=event_team_keys,
+            award_keys=award_keys)
+        if memcache.get(cls._recently_cleared_key(dashboard.key)) is None:
+            dashboard.put()
+        return dashboard
+
+    @classmethod
+    def clear_user(cls, account_key):
+        """
+        For when a user's favorites change
+        """
+        ndb.delete_multi(MyTBADashboard.query(ancestor=account_key).fetch(keys_only=True))
+
+    @classmethod
+    def clear_team_followers(cls, team_keys_by_year):
+        """
+        For when favorite teams are added to events or win awards.
+        team_keys_by_year is {year: set of team key names}
+        """
+        favorites_futures = []
+        for year, team_keys in team_keys_by_year.items():
+            for team_key in team_keys:
+                favorites_futures.append((year, Favorite.query(
+                    Favorite.model_key == team_key,
+                    Favorite.model_type == ModelType.TEAM).fetch_async(keys_only=True)))
+
+        dashboard_keys = set()
+        for year, favorites_future in favorites_futures:
+            for favorite_key in favorites_future.get_result():
+                dashboard_keys.add(cls._dashboard_key(favorite_key.parent(), year))
+        memcache.set_multi(
+            {cls._recently_cleared_key(dashboard_key): True for dashboard_key in dashboard_keys},
+            time=cls.RECENTLY_CLEARED_WINDOW)
+        ndb.delete_multi(list(dashboard_keys))
@@ -1,5 +1,7 @@
 from google.appengine.ext import ndb
 
+from consts.model_type import ModelType
+from helpers.mytba_dashboard_helper import MyTBADashboardHelper
 from helpers.notification_helper import NotificationHelper
 from models.account import Account
 from models.favorite import Favorite
@@ -13,6 +15,8 @@ class MyTBAHelper(object):
                           ancestor=ndb.Key(Account, fav.user_id)).count() == 0:
             # Favorite doesn't exist, add it
             fav.put()
+            if fav.model_type == ModelType.TEAM:
+                MyTBADashboardHelper.clear_user(ndb.Key(Account, fav.user_id))
             # Send updates to user's other devices
             NotificationHelper.send_favorite_update(fav.user_id, device_key)
             return 200
@@ -26,6 +30,8 @@ class MyTBAHelper(object):
                                    ancestor=ndb.Key(Account, user_id)).fetch(keys_only=True)
         if len(to_delete) > 0:
             ndb.delete_multi(to_delete)
+            if model_type == ModelType.TEAM:
+                MyTBADashboardHelper.clear_user(ndb.Key(Account, user_id))
             # Send updates to user's other devices
             NotificationHelper.send_favorite_update(user_id, device_key)
             return 200
@@ -74,18 +74,14 @@ class NotificationHelper(object):
 
     @classmethod
     def send_upcoming_matches(cls, live_events):
-        from helpers.match_helper import MatchHelper  # PJL: Hacky :P
-        # Causes circular import, otherwise
-        # https://github.com/the-blue-alliance/the-blue-alliance/pull/1098#discussion_r25128966
-
         down_events = []
         now = datetime.datetime.utcnow()
         for event in live_events:
             matches = event.matches
             if not matches:
                 continue
-            last_matches = MatchHelper.recentMatches(matches, num=1)
-            next_matches = MatchHelper.upcomingMatches(matches, num=2)
+            last_matches = event.match_index.recent_matches(num=1)
+            next_matches = event.match_index.upcoming_matches(num=2)
 
             # First, compare the difference between scheduled times of next/last match
             # Send an upcoming notification if it's <10 minutes, to account for events ahead of schedule
@@ -0,0 +1,227 @@
+import calendar
+import contextlib
+import logging
+import time
+
+from google.appengine.api import memcache
+
+
+class PollScheduler(object):
+    """
+    Decides which events the FMS API enqueue handlers poll on each cron tick.
+    Each event is polled at an interval based on its activity:
+    - hot when its matches changed recently or its next match is about to start
+    - otherwise half the time until its next match, up to a maximum
+    - at the fixed cron cadence it had before this scheduler while its next
+      match time is unknown, or no matches are scheduled (like during
+      alliance selection), until the event has ended
+    - backed off after errors and when the upstream is slow
+    Events with a poll still pending are skipped, and every tick shares one
+    request budget, with the most overdue hot events first.
+    Activity is recorded by the get handlers (see record_poll and record_matches).
+    State is kept in memcache. Losing it only means an event is polled sooner.
+    """
+    TICK_SECONDS = 60  # Cron cadence of the fastest enqueue handlers
+    TICK_SLACK_SECONDS = 10  # Polls due this soon are enqueued now rather than a tick late
+
+    # feed: (hot interval, live interval, max interval), in seconds
+    # The live interval is used while the next match time is unknown or there is none,
+    # and matches the cron cadence the feed was polled at before.
+    INTERVALS = {
+        'matches': (30, 60, 30 * 60),
+        'rankings': (60, 60, 30 * 60),
+        'alliances': (5 * 60, 5 * 60, 30 * 60),
+        'awards': (60 * 60, 60 * 60, 60 * 60),
+    }
+    # Upstream requests made by one poll
+    REQUESTS_PER_POLL = {
+        'matches': 4,  # Qual and playoff schedules and scores
+        'rankings': 1,
+        'alliances': 1,
+        'awards': 1,
+    }
+    REQUEST_BUDGET_PER_MINUTE = 300
+
+    RECENT_CHANGE_SECONDS = 5 * 60
+    HOT_LEAD_SECONDS = 2 * 60  # Poll at the hot interval this long before the next match
+    MAX_BACKOFF_SECONDS = 15 * 60
+    SLOW_LATENCY_SECONDS = 10
+    PENDING_TIMEOUT_SECONDS = 10 * 60  # Assume a poll was lost after this long
+    LATENCY_WEIGHT = 0.3  # Of the newest latency in the moving average
+
+    FEED_STATE_KEY_FORMAT = 'poll_scheduler_feed_{}_{}'  # (feed, event_key)
+    EVENT_STATE_KEY_FORMAT = 'poll_scheduler_event_{}'  # (event_key)
+    BUDGET_KEY_FORMAT = 'poll_scheduler_budget_{}'  # (minute)
+    STATE_TIMEOUT = 60 * 60 * 24 * 2
+
+    @classmethod
+    def _feed_state_key(cls, feed, event_key):
+        return cls.FEED_STATE_KEY_FORMAT.format(feed, event_key)
+
+    @classmethod
+    def _event_state_key(cls, event_key):
+        return cls.EVENT_STATE_KEY_FORMAT.format(event_key)
+
+    @classmethod
+    def has_ended(cls, event):
+        """
+        Whether |event| ended before today, in its local time
+        """
+        return event.end_date is not None and event.end_date.date() < event.local_time().date()
+
+    @classmethod
+    def interval(cls, feed, feed_state, event_state, now, ended=False):
+        """
+        Seconds until |feed| should be polled again for an event
+        """
+        hot_interval, live_interval, max_interval = cls.INTERVALS[feed]
+
+        last_change = event_state.get('last_change')
+        next_match_time = event_state.get('next_match_time')
+        if last_change is not None and now - last_change < cls.RECENT_CHANGE_SECONDS:
+            interval = hot_interval
+        elif ended:
+            interval = max_interval
+        elif next_match_time is None:  # Unknown, or no unplayed matches scheduled yet, like before playoffs
+            interval = live_interval
+        elif next_match_time - now <= cls.HOT_LEAD_SECONDS:  # Underway, about to start, or running late
+            interval = hot_interval
+        else:
+            interval = min(max(hot_interval, (next_match_time - now) / 2), max_interval)
+
+        errors = feed_state.get('errors', 0)
+        if errors:
+            interval = max(interval, min(interval * 2 ** errors, cls.MAX_BACKOFF_SECONDS))
+        latency = feed_state.get('latency')
+        if latency is not None and latency > cls.SLOW_LATENCY_SECONDS:
+            interval = max(interval, min(interval * 2, max_interval))
+        return interval
+
+    @classmethod
+    def _take_budget(cls, feed, polls, now):
+        """
+        Returns how many of |polls| fit in the rest of this minute's request budget
+        """
+        if polls <= 0:
+            return 0
+        cost = cls.REQUESTS_PER_POLL[feed]
+        budget_key = cls.BUDGET_KEY_FORMAT.format(int(now / 60))
+        used = memcache.incr(budget_key, delta=polls * cost, initial_value=0)
+        if used is None:  # memcache is unavailable
+            return polls
+        over = max(0, used - cls.REQUEST_BUDGET_PER_MINUTE)
+        granted = max(0, polls - (over + cost - 1) / cost)
+        if granted < polls:  # Give back what wasn't granted
+            memcache.decr(budget_key, delta=(polls - granted) * cost)
+        return granted
+
+    @classmethod
+    def schedule(cls, feed, events, now=None):
+        """
+        Returns [(event, countdown in seconds)] of the polls of |feed| to enqueue this tick
+        """
+        if now is None:
+            now = time.time()
+
+        feed_state_keys = [cls._feed_state_key(feed, event.key.id()) for event in events]
+        event_state_keys = [cls._event_state_key(event.key.id()) for event in events]
+        states = memcache.get_multi(feed_state_keys + event_state_keys)
+
+        candidates = []
+        for event, feed_state_key, event_state_key in zip(events, feed_state_keys, event_state_keys):
+            feed_state = states.get(feed_state_key, {})
+            event_state = states.get(event_state_key, {})
+            pending_since = feed_state.get('pending_since')
+            if pending_since is not None and now - pending_since < cls.PENDING_TIMEOUT_SECONDS:
+                continue  # Previous poll hasn't finished. Don't pile more onto the queue.
+            next_poll = feed_state.get('next_poll', now)
+            if next_poll > now + cls.TICK_SLACK_SECONDS:
+                continue
+
+            interval = cls.interval(feed, feed_state, event_state, now, ended=cls.has_ended(event))
+            polls = max(1, int(cls.TICK_SECONDS / interval))  # Hot events may be polled more than once a tick
+            candidates.append((interval > cls.INTERVALS[feed][0], next_poll, event, feed_state_key, feed_state, interval, polls))
+
+        # Hot, then most overdue first
+        candidates.sort(key=lambda candidate: candidate[:2])
+        budget = cls._take_budget(feed, sum(candidate[-1] for candidate in candidates), now)
+
+        scheduled = []
+        new_states = {}
+        for _, _, event, feed_state_key, feed_state, interval, polls in candidates:
+            polls = min(polls, budget)
+            if polls <= 0:
+                logging.warning("Poll budget exhausted. Skipping {} for {}".format(feed, event.key.id()))
+                continue
+            budget -= polls
+            for i in xrange(polls):
+                scheduled.append((event, int(i * interval)))
+            feed_state['pending_since'] = now
+            feed_state['next_poll'] = now + polls * interval
+            new_states[feed_state_key] = feed_state
+        memcache.set_multi(new_states, time=cls.STATE_TIMEOUT)
+
+        return scheduled
+
+    @classmethod
+    @contextlib.contextmanager
+    def poll(cls, feed, event_key):
+        """
+        Records the poll done in the block, as an error if the block raises.
+        Set 'changed' in the yielded dict if the poll found changes.
+        """
+        outcome = {'changed': False}
+        start = time.time()
+        try:
+            yield outcome
+        except Exception:
+            cls.record_poll(feed, event_key, time.time() - start, error=True)
+            raise
+        cls.record_poll(feed, event_key, time.time() - start, changed=outcome['changed'])
+
+    @classmethod
+    def record_poll(cls, feed, event_key, latency, error=False, changed=False, now=None):
+        """
+        Records the outcome of a poll of |feed| for |event_key|
+        """
+        if now is None:
+            now = time.time()
+
+        feed_state_key = cls._feed_state_key(feed, event_key)
+        event_state_key = cls._event_state_key(event_key)
+        states = memcache.get_multi([feed_state_key, event_state_key])
+        feed_state = states.get(feed_state_key, {})
+        event_state = states.get(event_state_key, {})
+
+        feed_state.pop('pending_since', None)
+        feed_state['errors'] = feed_state.get('errors', 0) + 1 if error else 0
+        if feed_state.get('latency') is None:
+            feed_state['latency'] = latency
+        else:
+            feed_state['latency'] = cls.LATENCY_WEIGHT * latency + (1 - cls.LATENCY_WEIGHT) * feed_state['latency']
+
+        new_states = {feed_state_key: feed_state}
+        if changed:
+            event_state['last_change'] = now
+            new_states[event_state_key] = event_state
+
+        # Poll sooner than planned if the event just became hot, or later if the poll errored
+        next_poll = now + cls.interval(feed, feed_state, event_state, now)
+        if error or next_poll < feed_state.get('next_poll', next_poll):
+            feed_state['next_poll'] = next_poll
+
+        memcache.set_multi(new_states, time=cls.STATE_TIMEOUT)
+
+    @classmethod
+    def record_matches(cls, event_key, matches):
+        """
+        Records when the next of an event's |matches| is expected to start,
+        from its predicted time (see MatchTimePredictionHelper) or scheduled time
+        """
+        match_times = [
+            match.predicted_time or match.time for match in matches
+            if not match.has_been_played and (match.predicted_time or match.time)]
+        event_state_key = cls._event_state_key(event_key)
+        event_state = memcache.get(event_state_key) or {}
+        event_state['next_match_time'] = calendar.timegm(min(match_times).utctimetuple()) if match_times else None
+        memcache.set(event_state_key, event_state, time=cls.STATE_TIMEOUT)
@@ -1,5 +1,6 @@
 from collections import defaultdict
 from google.appengine.api import search
+from google.appengine.ext import ndb
 
 from consts.award_type import AwardType
 from consts.event_type import EventType
@@ -16,6 +17,9 @@ class SearchHelper(object):
     TEAM_LOCATION_INDEX = 'teamLocation'
     TEAM_AWARDS_INDEX = 'teamAwards'
 
+    MAX_DOCUMENTS_PER_PUT = 200  # Search API limit
+    AWARDS_INDEX_TEAMS_PER_BATCH = 5  # Bounds how many teams' matches are held at once
+
     @classmethod
     def update_event_location_index(cls, event):
         if event.normalized_location and event.normalized_location.lat_lng:
@@ -32,46 +36,98 @@ class SearchHelper(object):
     def remove_event_location_index(cls, event):
         search.Index(name=cls.EVENT_LOCATION_INDEX).delete(event.key.id())
 
+    @classmethod
+    def _put_documents(cls, index_name, documents):
+        """
+        Writes |documents| in as few Index.put calls as the API allows
+        """
+        index = search.Index(name=index_name)
+        for i in xrange(0, len(documents), cls.MAX_DOCUMENTS_PER_PUT):
+            index.put(documents[i:i + cls.MAX_DOCUMENTS_PER_PUT])
+
     @classmethod
     def update_team_location_index(cls, team):
-        if team.normalized_location and team.normalized_location.lat_lng:
+        cls.update_team_location_index_multi([team])
+
+    @classmethod
+    def update_team_location_index_multi(cls, teams):
+        teams = [team for team in teams if team.normalized_location and team.normalized_location.lat_lng]
+        years_futures = [TeamParticipationQuery(team.key.id()).fetch_async() for team in teams]
+
+        documents = []
+        for team, years_future in zip(teams, years_futures):
             partial_fields = [
                 search.GeoField(name='location', value=search.GeoPoint(
                     team.normalized_location.lat_lng.lat,
                     team.normalized_location.lat_lng.lon))
             ]
             # Teams by year
-            for year in TeamParticipationQuery(team.key.id()).fetch():
+            for year in years_future.get_result():
                 fields = partial_fields + [
                     search.NumberField(name='year', value=year)
                 ]
-                search.Index(name=cls.TEAM_LOCATION_INDEX).put(
-                    search.Document(doc_id='{}_{}'.format(team.key.id(), year), fields=fields))
+                documents.append(search.Document(doc_id='{}_{}'.format(team.key.id(), year), fields=fields))
             # Any year
-            search.Index(name=cls.TEAM_LOCATION_INDEX).put(
-                    search.Document(doc_id=team.key.id(), fields=partial_fields))
+            documents.append(search.Document(doc_id=team.key.id(), fields=partial_fields))
+        cls._put_documents(cls.TEAM_LOCATION_INDEX, documents)
 
     @classmethod
     def remove_team_location_index(cls, team):
-        search.Index(name=TEAM_LOCATION_INDEX).delete(team.key.id())
+        search.Index(name=cls.TEAM_LOCATION_INDEX).delete(team.key.id())
 
     @classmethod
     def update_team_awards_index(cls, team):
-        awards_future = TeamAwardsQuery(team.key.id()).fetch_async()
-        events_future = TeamEventsQuery(team.key.id()).fetch_async()
-        medias_future = TeamMediaQuery(team.key.id()).fetch_async()
+        cls.update_team_awards_index_multi([team])
 
-        events_by_year = defaultdict(list)
-        for event in events_future.get_result():
-            events_by_year[event.year].append(event)
-            event.prep_details()  # For rankings
+    @classmethod
+    def update_team_awards_index_multi(cls, teams):
+        """
+        Indexes many teams, a few at a time. A veteran team's matches across
+        all years are thousands of entities, so only one batch of teams' worth
+        is held at once, and the context cache is cleared between batches.
+        """
+        for i in xrange(0, len(teams), cls.AWARDS_INDEX_TEAMS_PER_BATCH):
+            if i > 0:
+                ndb.get_context().clear_cache()
+            cls._update_team_awards_index_batch(teams[i:i + cls.AWARDS_INDEX_TEAMS_PER_BATCH])
 
+    @classmethod
+    def _update_team_awards_index_batch(cls, teams):
+        """
+        Every query of the batch, including the per-year match queries, is
+        started before any result is used.
+        """
+        data_futures = [(
+            TeamAwardsQuery(team.key.id()).fetch_async(),
+            TeamEventsQuery(team.key.id()).fetch_async(),
+            TeamMediaQuery(team.key.id()).fetch_async(),
+        ) for team in teams]
+
+        events_by_year_list = []
+        year_matches_futures = {}  # (team_key_name, year): future
+        for team, (_, events_future, _) in zip(teams, data_futures):
+            events_by_year = defaultdict(list)
+            for event in events_future.get_result():
+                events_by_year[event.year].append(event)
+                event.prep_details()  # For rankings
+            events_by_year_list.append(events_by_year)
+            for year in events_by_year.keys():
+                year_matches_futures[(team.key.id(), year)] = TeamYearMatchesQuery(team.key.id(), year).fetch_async()
+
+        documents = []
+        for team, (awards_future, _, medias_future), events_by_year in zip(teams, data_futures, events_by_year_list):
+            documents += cls._get_team_awards_documents(
+                team, events_by_year, awards_future.get_result(), medias_future.get_result(), year_matches_futures)
+        cls._put_documents(cls.TEAM_AWARDS_INDEX, documents)
+
+    @classmethod
+    def _get_team_awards_documents(cls, team, events_by_year, awards, medias, year_matches_futures):
         awards_by_event = defaultdict(list)
-        for award in awards_future.get_result():
+        for award in awards:
             awards_by_event[award.event.id()].append(award)
 
         medias_by_year = defaultdict(list)
-        for media in medias_future.get_result():
+        for media in medias:
             medias_by_year[media.year].append(media)
 
         # General stuff that's the same for indexes
@@ -81,9 +137,10 @@ class SearchHelper(object):
             search.TextField(name='nickname', value=team.nickname)
         ]
 
+        documents = []
         # field_counts = defaultdict(int)
         for year, events in events_by_year.items():
-            year_matches_future = TeamYearMatchesQuery(team.key.id(), year).fetch_async()
+            year_matches_future = year_matches_futures[(team.key.id(), year)]
             qual_seeds = defaultdict(int)
             comp_levels = defaultdict(int)
             year_awards = set()
@@ -136,5 +193,5 @@ class SearchHelper(object):
                     search.NumberField(name='has_cad', value=1)
                 ]
 
-            search.Index(name=cls.TEAM_AWARDS_INDEX).put(
-                search.Document(doc_id='{}_{}'.format(team.key.id(), year), fields=fields))
+            documents.append(search.Document(doc_id='{}_{}'.format(team.key.id(), year), fields=fields))
+        return documents
@@ -0,0 +1,241 @@
+import calendar
+import cloudstorage
+import datetime
+import logging
+import numpy as np
+import StringIO
+
+from models.compact_match import CompactMatch
+from models.event import Event
+from models.match import Match
+
+
+class SeasonSnapshot(object):
+    """
+    A columnar snapshot of every match in a season, stored as a .npz of typed arrays.
+    Event columns (one row per event):
+        event_keys, event_weeks (-1 if none), event_types, event_official
+    Team columns:
+        teams: sorted team keys, which the *_teams columns index into
+    Match columns (one row per match):
+        match_keys, match_events (index into event_keys),
+        comp_levels (index into Match.COMP_LEVELS), set_numbers, match_numbers,
+        times (epoch seconds, -1 if none),
+        red_teams, blue_teams (N x alliance size, -1 padded),
+        red_scores, blue_scores (-1 if unplayed),
+        red_sb_<field>, blue_sb_<field>: numeric score breakdown fields (NaN if missing).
+            Fields TBA derives itself (tba_*) are left out.
+    """
+    SCORE_BREAKDOWN_PREFIXES = ['red_sb_', 'blue_sb_']
+    DERIVED_FIELD_PREFIX = 'tba_'
+
+    def __init__(self, arrays):
+        self.arrays = arrays  # dict or lazily loaded NpzFile
+
+    def __getitem__(self, column):
+        return self.arrays[column]
+
+    @property
+    def columns(self):
+        return self.arrays.files if hasattr(self.arrays, 'files') else self.arrays.keys()
+
+    @property
+    def score_breakdown_fields(self):
+        fields = set()
+        for column in self.columns:
+            for prefix in self.SCORE_BREAKDOWN_PREFIXES:
+                if column.startswith(prefix):
+                    fields.add(column[len(prefix):])
+        return sorted(fields)
+
+    def __len__(self):
+        return len(self['match_keys'])
+
+    @classmethod
+    def _team_indices(cls, team_key_lists, teams, width):
+        indices = np.zeros((len(team_key_lists), width), dtype=np.int32) - 1
+        for i, team_keys in enumerate(team_key_lists):
+            if team_keys:
+                indices[i, :len(team_keys)] = np.searchsorted(teams, np.array(team_keys, dtype='S'))
+        return indices
+
+    @classmethod
+    def build(cls, events_matches):
+        """
+        Builds a snapshot from a list of (event, CompactMatches) tuples.
+        Match JSON is decoded once here, so readers never have to.
+        """
+        event_rows = []
+        match_rows = []
+        score_breakdown_fields = set()
+        for event_index, (event, matches) in enumerate(events_matches):
+            event_rows.append((event.key.id(), event.week, event.event_type_enum, event.official))
+            for match in matches:
+                score_breakdown = {}
+                if match.schema is not None:
+                    for color in ['red', 'blue']:
+                        for field in match.schema.fields:
+                            if field.startswith(cls.DERIVED_FIELD_PREFIX):
+                                continue
+                            value = match.breakdown(color, field)
+                            if value is not None:
+                                score_breakdown['{}_sb_{}'.format(color, field)] = value
+                score_breakdown_fields.update(score_breakdown.keys())
+                match_rows.append((match, event_index, score_breakdown))
+
+        red_team_keys = [match.team_keys('red') for match, _, _ in match_rows]
+        blue_team_keys = [match.team_keys('blue') for match, _, _ in match_rows]
+        teams = sorted(set(team_key for team_keys in red_team_keys + blue_team_keys for team_key in team_keys))
+        width = max([len(team_keys) for team_keys in red_team_keys + blue_team_keys] + [0])
+        teams = np.array(teams, dtype='S')
+
+        arrays = {
+            'event_keys': np.array([row[0] for row in event_rows], dtype='S'),
+            'event_weeks': np.array([row[1] if row[1] is not None else -1 for row in event_rows], dtype=np.int8),
+            'event_types': np.array([row[2] if row[2] is not None else -1 for row in event_rows], dtype=np.int16),
+            'event_official': np.array([bool(row[3]) for row in event_rows], dtype=np.bool_),
+            'teams': teams,
+            'match_keys': np.array([match.key_name for match, _, _ in match_rows], dtype='S'),
+            'match_events': np.array([event_index for _, event_index, _ in match_rows], dtype=np.int32),
+            'comp_levels': np.array([Match.COMP_LEVELS.index(match.comp_level) for match, _, _ in match_rows], dtype=np.int8),
+            'set_numbers': np.array([match.set_number for match, _, _ in match_rows], dtype=np.int16),
+            'match_numbers': np.array([match.match_number for match, _, _ in match_rows], dtype=np.int16),
+            'times': np.array([calendar.timegm(match.time.utctimetuple()) if match.time else -1 for match, _, _ in match_rows], dtype=np.int64),
+            'red_teams': cls._team_indices(red_team_keys, teams, width),
+            'blue_teams': cls._team_indices(blue_team_keys, teams, width),
+            'red_scores': np.array([match.score('red') for match, _, _ in match_rows], dtype=np.int16),
+            'blue_scores': np.array([match.score('blue') for match, _, _ in match_rows], dtype=np.int16),
+        }
+        for column in score_breakdown_fields:
+            arrays[column] = np.array([row_breakdown.get(column, np.nan) for _, _, row_breakdown in match_rows], dtype=np.float32)
+
+        # Keep empty arrays 1D/2D with the right dtype
+        if not match_rows:
+            arrays['red_teams'] = np.zeros((0, 0), dtype=np.int32)
+            arrays['blue_teams'] = np.zeros((0, 0), dtype=np.int32)
+        return cls(arrays)
+
+    @classmethod
+    def concatenate(cls, snapshots):
+        """
+        Merges snapshots of disjoint sets of events
+        """
+        snapshots = [snapshot for snapshot in snapshots if snapshot is not None]
+        if not snapshots:
+            return cls.build([])
+
+        teams = np.array(sorted(set(team for snapshot in snapshots for team in snapshot['teams'])), dtype='S')
+        width = max([snapshot['red_teams'].shape[1] for snapshot in snapshots] + [0])
+        score_breakdown_columns = set()
+        for snapshot in snapshots:
+            score_breakdown_columns.update(column for column in snapshot.columns if column.startswith(tuple(cls.SCORE_BREAKDOWN_PREFIXES)))
+
+        arrays = {}
+        for column in ['event_keys', 'event_weeks', 'event_types', 'event_official',
+                       'match_keys', 'comp_levels', 'set_numbers', 'match_numbers', 'times', 'red_scores', 'blue_scores']:
+            arrays[column] = np.concatenate([snapshot[column] for snapshot in snapshots])
+        arrays['teams'] = teams
+
+        match_events = []
+        event_offset = 0
+        for snapshot in snapshots:
+            match_events.append(snapshot['match_events'] + event_offset)
+            event_offset += len(snapshot['event_keys'])
+        arrays['match_events'] = np.concatenate(match_events).astype(np.int32)
+
+        for color in ['red', 'blue']:
+            remapped = []
+            for snapshot in snapshots:
+                indices = snapshot['{}_teams'.format(color)]
+                padded = np.zeros((indices.shape[0], width), dtype=np.int32) - 1
+                if indices.size:
+                    # Map indices into this snapshot's teams to indices into the merged teams
+                    mapping = np.searchsorted(teams, snapshot['teams']).astype(np.int32)
+                    padded[:, :indices.shape[1]] = np.where(indices >= 0, mapping[indices], -1)
+                remapped.append(padded)
+            arrays['{}_teams'.format(color)] = np.concatenate(remapped)
+
+        for column in score_breakdown_columns:
+            parts = []
+            for snapshot in snapshots:
+                if column in snapshot.columns:
+                    parts.append(snapshot[column])
+                else:
+                    missing = np.empty(len(snapshot), dtype=np.float32)
+                    missing.fill(np.nan)
+                    parts.append(missing)
+            arrays[column] = np.concatenate(parts)
+        return cls(arrays)
+
+    def to_bytes(self):
+        output = StringIO.StringIO()
+        np.savez_compressed(output, **dict((column, self[column]) for column in self.columns))
+        return output.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Columns are decompressed lazily, the first time each one is read
+        """
+        return cls(np.load(StringIO.StringIO(data)))
+
+
+class SeasonSnapshotHelper(object):
+    """
+    Maintains season snapshots in Cloud Storage. Each event has its own
+    snapshot, which is refreshed when the event finishes, and the season
+    snapshot is rebuilt from the event snapshots without touching the datastore.
+    """
+    SEASON_FILENAME_PATTERN = '/tbatv-prod-hrd.appspot.com/tba-data-snapshots/seasons/{}.npz'  # (year)
+    EVENTS_DIR_PATTERN = '/tbatv-prod-hrd.appspot.com/tba-data-snapshots/seasons/{}/events/'  # (year)
+    EVENT_FILENAME_PATTERN = EVENTS_DIR_PATTERN + '{}.npz'  # (year, event_key)
+    REFRESH_DAYS = 3  # Refresh events that ended this recently
+
+    @classmethod
+    def _write(cls, filename, snapshot):
+        with cloudstorage.open(filename, 'w', content_type='application/octet-stream') as f:
+            f.write(snapshot.to_bytes())
+
+    @classmethod
+    def _read(cls, filename):
+        try:
+            with cloudstorage.open(filename, 'r') as f:
+                return SeasonSnapshot.from_bytes(f.read())
+        except cloudstorage.NotFoundError:
+            return None
+
+    @classmethod
+    def update_event_snapshot(cls, event):
+        snapshot = SeasonSnapshot.build([(event, CompactMatch.fetch_event(event.key.id()))])
+        cls._write(cls.EVENT_FILENAME_PATTERN.format(event.year, event.key.id()), snapshot)
+        return snapshot
+
+    @classmethod
+    def get_events_to_refresh(cls, year, full=False):
+        """
+        Returns events that have finished recently or don't have a snapshot yet
+        """
+        events = Event.query(Event.year == year).fetch()
+        if full:
+            return events
+
+        existing = set(f.filename for f in cloudstorage.listbucket(cls.EVENTS_DIR_PATTERN.format(year)))
+        recent = datetime.datetime.now() - datetime.timedelta(days=cls.REFRESH_DAYS)
+        return [event for event in events if
+                cls.EVENT_FILENAME_PATTERN.format(year, event.key.id()) not in existing or
+                (event.end_date and recent <= event.end_date <= datetime.datetime.now() + datetime.timedelta(days=1))]
+
+    @classmethod
+    def rebuild_season_snapshot(cls, year):
+        filenames = sorted(f.filename for f in cloudstorage.listbucket(cls.EVENTS_DIR_PATTERN.format(year)))
+        snapshot = SeasonSnapshot.concatenate([cls._read(filename) for filename in filenames])
+        cls._write(cls.SEASON_FILENAME_PATTERN.format(year), snapshot)
+        logging.info("Season {} snapshot: {} events, {} matches".format(year, len(snapshot['event_keys']), len(snapshot)))
+        return snapshot
+
+    @classmethod
+    def load_season_snapshot(cls, year):
+        """
+        Returns the SeasonSnapshot for |year|, or None if it hasn't been built
+        """
+        return cls._read(cls.SEASON_FILENAME_PATTERN.format(year))
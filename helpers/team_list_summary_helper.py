@@ -0,0 +1,242 @@
+import bisect
+import logging
+
+from collections import defaultdict
+
+from google.appengine.api import memcache
+from google.appengine.ext import ndb
+
+from database.dict_converters.team_converter import TeamConverter
+from models.event_team import EventTeam
+from models.team import Team
+from models.team_list_summary import TeamListSummary
+
+
+class TeamListSummaryHelper(object):
+    """
+    Maintains the TeamListSummaries behind the paged team list API.
+    A summary is built in full the first time it's needed, after which Team
+    and EventTeam manipulator hooks apply each write to it. Decoded summaries
+    are kept in instance memory and checked against a memcached stamp, so
+    serving a page is usually one memcache get and a slice.
+    """
+    SUMMARY_VERSION = 0  # Increment when FIELDS or the v3 team dict changes
+    PAGE_SIZE = 500
+    FIELDS = [
+        'key', 'team_number', 'nickname', 'name', 'website', 'rookie_year', 'motto', 'home_championship',
+        'city', 'state_prov', 'country', 'postal_code', 'lat', 'lng', 'location_name', 'address',
+        'gmaps_place_id', 'gmaps_url',
+    ]
+    TEAM_NUMBER_INDEX = FIELDS.index('team_number')
+
+    STAMP_KEY_FORMAT = 'team_list_summary_stamp_{}_{}'  # (version, key_name)
+    STAMP_TIMEOUT = 60 * 60 * 24
+
+    _preloaded = {}  # key_name: TeamListSummary
+
+    @classmethod
+    def _page_key_name(cls, page_num):
+        return 'page_{}'.format(page_num)
+
+    @classmethod
+    def _year_key_name(cls, year):
+        return 'year_{}'.format(year)
+
+    @classmethod
+    def _stamp_key(cls, key_name):
+        return cls.STAMP_KEY_FORMAT.format(cls.SUMMARY_VERSION, key_name)
+
+    @classmethod
+    def _team_number(cls, team_key):
+        return int(team_key.id()[3:])
+
+    @classmethod
+    def _team_row(cls, team):
+        team_dict = TeamConverter.teamConverter_v3(team)
+        return [team_dict[field] for field in cls.FIELDS]
+
+    @classmethod
+    def build_page(cls, page_num):
+        start = cls.PAGE_SIZE * page_num
+        teams = Team.query(Team.team_number >= start, Team.team_number < start + cls.PAGE_SIZE).fetch()
+        return TeamListSummary(
+            id=cls._page_key_name(page_num),
+            version=cls.SUMMARY_VERSION,
+            rows=[cls._team_row(team) for team in sorted(teams, key=lambda team: team.team_number)])
+
+    @classmethod
+    def build_year(cls, year):
+        event_team_keys = EventTeam.query(EventTeam.year == year).fetch(keys_only=True)
+        return TeamListSummary(
+            id=cls._year_key_name(year),
+            version=cls.SUMMARY_VERSION,
+            team_numbers=sorted(set(int(key.id().split('_')[1][3:]) for key in event_team_keys)))
+
+    @classmethod
+    def _get_summaries(cls, builders):
+        """
+        builders is {key_name: function that builds the summary}.
+        Returns {key_name: summary}, from instance memory when the stamps match.
+        """
+        stamps = memcache.get_multi([cls._stamp_key(key_name) for key_name in builders])
+
+        summaries = {}
+        missing_key_names = []
+        for key_name in builders:
+            summary = cls._preloaded.get(key_name)
+            stamp = stamps.get(cls._stamp_key(key_name))
+            if summary is not None and stamp is not None and stamp == summary.updated:
+                summaries[key_name] = summary
+            else:
+                missing_key_names.append(key_name)
+
+        if missing_key_names:
+            new_stamps = {}
+            stored_summaries = ndb.get_multi([ndb.Key(TeamListSummary, key_name) for key_name in missing_key_names])
+            for key_name, summary in zip(missing_key_names, stored_summaries):
+                if summary is None or summary.version != cls.SUMMARY_VERSION:
+                    summary = builders[key_name]()
+                    if not (summary.rows or summary.team_numbers):
+                        summaries[key_name] = summary  # Don't store a summary for every empty page asked for
+                        continue
+                    summary.put()
+                new_stamps[cls._stamp_key(key_name)] = summary.updated
+                cls._preloaded[key_name] = summary
+                summaries[key_name] = summary
+            # add, so a summary read before a write can't replace the stamp of the write
+            memcache.add_multi(new_stamps, time=cls.STAMP_TIMEOUT)
+
+        return summaries
+
+    @classmethod
+    def get_page(cls, page_num, year=None):
+        """
+        Returns (list of v3 team dicts, last modified) for teams numbered
+        PAGE_SIZE * page_num to PAGE_SIZE * (page_num + 1) - 1, optionally
+        only those at events in |year|
+        """
+        page_key_name = cls._page_key_name(page_num)
+        builders = {page_key_name: lambda: cls.build_page(page_num)}
+        if year is not None:
+            year_key_name = cls._year_key_name(year)
+            builders[year_key_name] = lambda: cls.build_year(year)
+        summaries = cls._get_summaries(builders)
+
+        page_summary = summaries[page_key_name]
+        rows = page_summary.rows
+        last_modified = page_summary.updated
+        if year is not None:
+            year_summary = summaries[year_key_name]
+            start = cls.PAGE_SIZE * page_num
+            team_numbers = year_summary.team_numbers or []
+            year_team_numbers = set(team_numbers[
+                bisect.bisect_left(team_numbers, start):bisect.bisect_left(team_numbers, start + cls.PAGE_SIZE)])
+            rows = [row for row in rows if row[cls.TEAM_NUMBER_INDEX] in year_team_numbers]
+            if year_summary.updated is not None and (last_modified is None or year_summary.updated > last_modified):
+                last_modified = year_summary.updated
+
+        return [dict(zip(cls.FIELDS, row)) for row in rows], last_modified
+
+    @classmethod
+    @ndb.transactional
+    def _update_page(cls, page_num, rows, removed_team_numbers):
+        summary = TeamListSummary.get_by_id(cls._page_key_name(page_num))
+        if summary is None or summary.version != cls.SUMMARY_VERSION:
+            return None  # Not built yet. It will be built in full the first time it's needed.
+
+        rows_by_team_number = dict((row[cls.TEAM_NUMBER_INDEX], row) for row in summary.rows)
+        for team_number in removed_team_numbers:
+            rows_by_team_number.pop(team_number, None)
+        for row in rows:
+            rows_by_team_number[row[cls.TEAM_NUMBER_INDEX]] = row
+
+        new_rows = [rows_by_team_number[team_number] for team_number in sorted(rows_by_team_number)]
+        if new_rows == summary.rows:
+            return None
+        summary.rows = new_rows
+        summary.put()
+        return summary
+
+    @classmethod
+    @ndb.transactional
+    def _update_year(cls, year, added_team_numbers, removed_team_numbers):
+        summary = TeamListSummary.get_by_id(cls._year_key_name(year))
+        if summary is None or summary.version != cls.SUMMARY_VERSION:
+            return None  # Not built yet. It will be built in full the first time it's needed.
+
+        new_team_numbers = sorted(set(summary.team_numbers).difference(removed_team_numbers).union(added_team_numbers))
+        if new_team_numbers == summary.team_numbers:
+            return None
+        summary.team_numbers = new_team_numbers
+        summary.put()
+        return summary
+
+    @classmethod
+    def _set_stamp(cls, summary):
+        if summary is not None:
+            memcache.set(cls._stamp_key(summary.key.id()), summary.updated, time=cls.STAMP_TIMEOUT)
+
+    @classmethod
+    def _update_pages(cls, changes_by_page):
+        """
+        changes_by_page is {page_num: (rows, removed team numbers)}
+        """
+        for page_num, (rows, removed_team_numbers) in changes_by_page.items():
+            try:
+                cls._set_stamp(cls._update_page(page_num, rows, removed_team_numbers))
+            except Exception, e:
+                logging.error("Team list summary update for page {} errored!".format(page_num))
+                logging.exception(e)
+
+    @classmethod
+    def _update_years(cls, changes_by_year):
+        """
+        changes_by_year is {year: (added team numbers, removed team numbers)}
+        """
+        for year, (added_team_numbers, removed_team_numbers) in changes_by_year.items():
+            try:
+                cls._set_stamp(cls._update_year(year, added_team_numbers, removed_team_numbers))
+            except Exception, e:
+                logging.error("Team list summary update for {} errored!".format(year))
+                logging.exception(e)
+
+    @classmethod
+    def update_teams(cls, teams):
+        changes_by_page = defaultdict(lambda: ([], set()))
+        for team in teams:
+            if team.team_number is not None:
+                changes_by_page[team.team_number / cls.PAGE_SIZE][0].append(cls._team_row(team))
+        cls._update_pages(changes_by_page)
+
+    @classmethod
+    def remove_teams(cls, teams):
+        changes_by_page = defaultdict(lambda: ([], set()))
+        for team in teams:
+            team_number = cls._team_number(team.key)
+            changes_by_page[team_number / cls.PAGE_SIZE][1].add(team_number)
+        cls._update_pages(changes_by_page)
+
+    @classmethod
+    def add_event_teams(cls, event_teams):
+        changes_by_year = defaultdict(lambda: (set(), set()))
+        for event_team in event_teams:
+            if event_team.year is not None:
+                changes_by_year[event_team.year][0].add(cls._team_number(event_team.team))
+        cls._update_years(changes_by_year)
+
+    @classmethod
+    def remove_event_teams(cls, event_teams):
+        """
+        Teams are only removed from a year when they have no other EventTeams in it
+        """
+        event_teams = [event_team for event_team in event_teams if event_team.year is not None]
+        deleted_keys = set(event_team.key for event_team in event_teams)
+        remaining_futures = [
+            EventTeam.query(EventTeam.team == event_team.team, EventTeam.year == event_team.year).fetch_async(keys_only=True)
+            for event_team in event_teams]
+
+        changes_by_year = defaultdict(lambda: (set(), set()))
+        for event_team, remaining_future in zip(event_teams, remaining_futures):
+            if not [key for key in remaining_future.get_result() if key not in deleted_keys]:
+                changes_by_year[event_team.year][1].add(cls._team_number(event_team.team))
+        cls._update_years(changes_by_year)
@@ -3,9 +3,13 @@ import logging
 from google.appengine.api import search
 
 from helpers.cache_clearer import CacheClearer
+from helpers.geo_index_helper import GeoIndexHelper
 from helpers.location_helper import LocationHelper
 from helpers.manipulator_base import ManipulatorBase
+from helpers.model_summary_helper import ModelSummaryHelper
 from helpers.search_helper import SearchHelper
+from helpers.team_list_summary_helper import TeamListSummaryHelper
+from helpers.typeahead_helper import TypeaheadHelper
 
 
 class TeamManipulator(ManipulatorBase):
@@ -21,30 +25,60 @@ class TeamManipulator(ManipulatorBase):
         '''
         To run after the team has been deleted.
         '''
+        ModelSummaryHelper.clear([team.key for team in teams])
+
         for team in teams:
             SearchHelper.remove_team_location_index(team)
 
+        GeoIndexHelper.remove_team_locations(teams)
+
+        TypeaheadHelper.remove_team_typeaheads(teams)
+
+        TeamListSummaryHelper.remove_teams(teams)
+
     @classmethod
     def postUpdateHook(cls, teams, updated_attr_list, is_new_list):
         """
-        To run after models have been updated
+        To run after models have been updated.
+        New teams and teams whose city, state_prov, country or postalcode changed
+        are geocoded, which calls the Google Maps API unless the result is stored,
+        and get their search and geo index entries rewritten.
         """
-        for (team, updated_attrs) in zip(teams, updated_attr_list):
-            if 'city' in updated_attrs or 'state_prov' in updated_attrs or \
-                    'country' in updated_attrs or 'postalcode' in updated_attrs:
-                try:
-                    LocationHelper.update_team_location(team)
-                except Exception, e:
-                    logging.error("update_team_location for {} errored!".format(team.key.id()))
-                    logging.exception(e)
-
-                try:
-                    SearchHelper.update_team_location_index(team)
-                except Exception, e:
-                    logging.error("update_team_location_index for {} errored!".format(team.key.id()))
-                    logging.exception(e)
+        ModelSummaryHelper.clear([team.key for team in teams])
+
+        relocated_teams = [
+            team for (team, updated_attrs, is_new) in zip(teams, updated_attr_list, is_new_list)
+            if is_new or {'city', 'state_prov', 'country', 'postalcode'}.intersection(updated_attrs)]
+
+        # Batch load stored geocodes for bulk updates
+        try:
+            LocationHelper.prefetch_geocodes([team.location for team in relocated_teams])
+        except Exception, e:
+            logging.warning("Prefetching team geocodes errored!")
+            logging.exception(e)
+
+        for team in relocated_teams:
+            try:
+                LocationHelper.update_team_location(team)
+            except Exception, e:
+                logging.error("update_team_location for {} errored!".format(team.key.id()))
+                logging.exception(e)
+
+        try:
+            SearchHelper.update_team_location_index_multi(relocated_teams)
+        except Exception, e:
+            logging.error("update_team_location_index for {} errored!".format([team.key.id() for team in relocated_teams]))
+            logging.exception(e)
+
+        GeoIndexHelper.update_team_locations(relocated_teams)
         cls.createOrUpdate(teams, run_post_update_hook=False)
 
+        TypeaheadHelper.update_team_typeaheads([
+            team for (team, updated_attrs, is_new) in zip(teams, updated_attr_list, is_new_list)
+            if is_new or 'nickname' in updated_attrs])
+
+        TeamListSummaryHelper.update_teams(teams)
+
     @classmethod
     def updateMerge(self, new_team, old_team, auto_union=True):
         """
@@ -67,10 +101,13 @@ class TeamManipulator(ManipulatorBase):
             "motto",
         ]
 
+        old_team._updated_attrs = []
+
         for attr in attrs:
             if getattr(new_team, attr) is not None:
                 if getattr(new_team, attr) != getattr(old_team, attr):
                     setattr(old_team, attr, getattr(new_team, attr))
+                    old_team._updated_attrs.append(attr)
                     old_team.dirty = True
 
         # Take the new tpid and tpid_year iff the year is newer than or equal to the old one
@@ -1,8 +1,131 @@
+import bisect
+import heapq
+import json
+import logging
+import time
 import unicodedata
 import re
 
+from collections import defaultdict
+
+from google.appengine.ext import ndb
+
+from models.typeahead_entry import TypeaheadEntry
+
+
+class TypeaheadIndex(object):
+    """
+    A compact sorted-array prefix index over the data of one TypeaheadEntry.
+    Each entry is split into normalized tokens. |tokens| is the sorted list of
+    distinct tokens, and |postings[i]| lists the indices of the entries that
+    contain |tokens[i]|, so all tokens with a given prefix are a contiguous
+    range found by bisection.
+    """
+    TOKEN_SPLIT_RE = re.compile(r'[^\w]+', re.UNICODE)
+
+    def __init__(self, entries, tokens, postings):
+        self.entries = entries
+        self.tokens = tokens
+        self.postings = postings
+        self._normalized_entries = [self.fold(entry) for entry in entries]
+
+    @classmethod
+    def fold(cls, name):
+        """
+        Normalizes like TypeaheadHelper.get_search_keys and drops combining
+        marks, so "\xfc" matches "u"
+        """
+        return u''.join(c for c in TypeaheadHelper.normalize(name) if not unicodedata.combining(c))
+
+    @classmethod
+    def tokenize(cls, name):
+        return [token for token in cls.TOKEN_SPLIT_RE.split(cls.fold(name)) if token]
+
+    @classmethod
+    def build(cls, entries):
+        postings_by_token = defaultdict(list)
+        for i, entry in enumerate(entries):
+            for token in set(cls.tokenize(entry)):
+                postings_by_token[token].append(i)
+        tokens = sorted(postings_by_token.keys())
+        return cls(entries, tokens, [postings_by_token[token] for token in tokens])
+
+    def serialize(self):
+        return json.dumps([self.entries, self.tokens, self.postings], separators=(',', ':'))
+
+    @classmethod
+    def deserialize(cls, blob):
+        entries, tokens, postings = json.loads(blob)
+        return cls(entries, tokens, postings)
+
+    def _prefix_matches(self, prefix):
+        """
+        Returns the set of entry indices that have a token starting with |prefix|
+        """
+        start = bisect.bisect_left(self.tokens, prefix)
+        end = bisect.bisect_left(self.tokens, prefix + u'\uffff', lo=start)
+        matches = set()
+        for i in xrange(start, end):
+            matches.update(self.postings[i])
+        return matches
+
+    def search(self, query, limit):
+        """
+        Returns up to |limit| entries where every query word prefixes some word of the entry.
+        Entries that start with the query rank first, then entries with an exact
+        word match, then the rest, keeping the stored order within each group.
+        """
+        query_tokens = self.tokenize(query)
+        if not query_tokens:
+            return []
+
+        # Start with the most selective token
+        candidate_sets = sorted([self._prefix_matches(token) for token in query_tokens], key=len)
+        candidates = candidate_sets[0]
+        for candidate_set in candidate_sets[1:]:
+            candidates = candidates.intersection(candidate_set)
+            if not candidates:
+                return []
+
+        normalized_query = self.fold(query)
+        exact_matches = set()
+        for token in query_tokens:
+            token_index = bisect.bisect_left(self.tokens, token)
+            if token_index < len(self.tokens) and self.tokens[token_index] == token:
+                exact_matches.update(self.postings[token_index])
+
+        def rank(i):
+            if self._normalized_entries[i].startswith(normalized_query):
+                return (0, i)
+            elif i in exact_matches:
+                return (1, i)
+            else:
+                return (2, i)
+
+        return [self.entries[i] for i in heapq.nsmallest(limit, candidates, key=rank)]
+
 
 class TypeaheadHelper(object):
+    """
+    Maintains the precomputed TypeaheadEntry buckets.
+    Each bucket is stored as a sorted, deduplicated list of display strings.
+    Manipulator post update/delete hooks call the update_* and remove_*
+    methods so that only the affected buckets are rewritten.
+    """
+    TEAM_DATA_FORMAT = '%s | %s'  # (team_number, nickname)
+    EVENT_DATA_FORMAT = '%s %s [%s]'  # (year, name, event_short)
+    DISTRICT_DATA_FORMAT = '%s District [%s]'  # (display_name, abbreviation)
+
+    SEARCH_KEY_RE = re.compile(r'^({}|{}|{}|{})$'.format(
+        TypeaheadEntry.ALL_TEAMS_KEY, TypeaheadEntry.ALL_EVENTS_KEY, TypeaheadEntry.ALL_DISTRICTS_KEY,
+        TypeaheadEntry.YEAR_EVENTS_KEY.format(r'\d{4}')))
+    INDEX_RELOAD_SECONDS = 60 * 10
+    _index_cache = {}  # search_key: (load time, TypeaheadIndex). Per instance. Only holds valid search keys.
+
+    @classmethod
+    def normalize(cls, name):
+        return unicodedata.normalize('NFKD', unicode(name)).strip().lower()
+
     @classmethod
     def get_search_keys(self, name):
         """
@@ -11,7 +134,7 @@ class TypeaheadHelper(object):
         unicode character like \xfc, it gets changed to "u"
         """
         keys = set()
-        name = unicodedata.normalize('NFKD', unicode(name)).strip().lower()
+        name = self.normalize(name)
         for word in name.split(' '):
             for letter in word:
                 if letter != '':
@@ -19,3 +142,196 @@ class TypeaheadHelper(object):
                 if re.match('^[\w-]+$', letter) is not None:
                     break  # continue until first alphanumeric character
         return keys
+
+    @classmethod
+    def get_team_data(cls, team):
+        nickname = team.nickname if team.nickname else "Team %s" % team.team_number
+        return cls.TEAM_DATA_FORMAT % (team.team_number, nickname)
+
+    @classmethod
+    def get_event_data(cls, event):
+        return cls.EVENT_DATA_FORMAT % (event.year, event.name, event.event_short.upper())
+
+    @classmethod
+    def get_district_data(cls, district):
+        return cls.DISTRICT_DATA_FORMAT % (district.display_name, district.abbreviation.upper())
+
+    @classmethod
+    def _entry_identity(cls, key_name, data):
+        """
+        Returns what uniquely identifies the model that |data| was built from,
+        so a renamed model replaces its old entry instead of duplicating it.
+        """
+        if key_name == TypeaheadEntry.ALL_TEAMS_KEY:
+            return data.split(' | ', 1)[0]  # team_number
+        elif key_name == TypeaheadEntry.ALL_DISTRICTS_KEY:
+            return data[data.rfind('['):]  # [ABBREVIATION]
+        else:
+            return (data.split(' ', 1)[0], data[data.rfind('['):])  # (year, [EVENT_SHORT])
+
+    @classmethod
+    def _entry_sort_key(cls, key_name, data):
+        """
+        Teams are ordered by number, events by year (newest first) then name,
+        and districts by name.
+        """
+        if key_name == TypeaheadEntry.ALL_TEAMS_KEY:
+            return (int(data.split(' | ', 1)[0]), data)
+        elif key_name == TypeaheadEntry.ALL_DISTRICTS_KEY:
+            return data
+        else:
+            year, rest = data.split(' ', 1)
+            return (-int(year), rest)
+
+    @classmethod
+    def _dedupe_entry_data(cls, key_name, data):
+        """
+        Keeps the first of the entries in |data| with the same identity
+        """
+        identities = set()
+        deduped = []
+        for d in data:
+            identity = cls._entry_identity(key_name, d)
+            if identity not in identities:
+                identities.add(identity)
+                deduped.append(d)
+        return deduped
+
+    @classmethod
+    def sort_entry_data(cls, key_name, data):
+        """
+        Returns a sorted, deduplicated copy of |data| for the given bucket.
+        """
+        return sorted(cls._dedupe_entry_data(key_name, data), key=lambda d: cls._entry_sort_key(key_name, d))
+
+    @classmethod
+    def _merge_entry_data(cls, key_name, data, to_upsert, to_remove):
+        """
+        Merges changes into an already sorted list of entry data.
+        |to_upsert| is a list of data strings to add or replace, and
+        |to_remove| is a set of identities to drop.
+        """
+        to_upsert = cls._dedupe_entry_data(key_name, to_upsert)
+        identities_to_drop = set(to_remove)
+        identities_to_drop.update(cls._entry_identity(key_name, d) for d in to_upsert)
+        merged = [d for d in data if cls._entry_identity(key_name, d) not in identities_to_drop]
+        sort_keys = [cls._entry_sort_key(key_name, d) for d in merged]
+        for d in to_upsert:
+            sort_key = cls._entry_sort_key(key_name, d)
+            i = bisect.bisect_left(sort_keys, sort_key)
+            if i < len(merged) and merged[i] == d:
+                continue
+            sort_keys.insert(i, sort_key)
+            merged.insert(i, d)
+        return merged
+
+    @classmethod
+    def make_entry(cls, key_name, data):
+        """
+        Builds a TypeaheadEntry along with its serialized search index
+        """
+        return TypeaheadEntry(
+            id=key_name,
+            data_json=json.dumps(data),
+            index_blob=TypeaheadIndex.build(data).serialize())
+
+    @classmethod
+    def is_search_key(cls, search_key):
+        """
+        Whether |search_key| names a TypeaheadEntry bucket, like 'teams-all' or 'events-2017'
+        """
+        return cls.SEARCH_KEY_RE.match(search_key) is not None
+
+    @classmethod
+    def get_index(cls, search_key):
+        """
+        Returns the TypeaheadIndex for |search_key|, lazily loading it once per
+        instance and reloading it periodically to pick up changes.
+        Unknown search keys get an empty index without being looked up or cached.
+        """
+        if not cls.is_search_key(search_key):
+            return TypeaheadIndex.build([])
+
+        cached = cls._index_cache.get(search_key)
+        if cached is not None and time.time() - cached[0] < cls.INDEX_RELOAD_SECONDS:
+            return cached[1]
+
+        entry = TypeaheadEntry.get_by_id(search_key)
+        if entry is None:
+            index = TypeaheadIndex.build([])
+        elif entry.index_blob:
+            index = TypeaheadIndex.deserialize(entry.index_blob)
+        else:
+            index = TypeaheadIndex.build(json.loads(entry.data_json))
+        cls._index_cache[search_key] = (time.time(), index)
+        return index
+
+    @classmethod
+    def search(cls, search_key, query, limit):
+        return cls.get_index(search_key).search(query, limit)
+
+    @classmethod
+    @ndb.transactional
+    def _update_entry(cls, key_name, to_upsert, to_remove):
+        entry = TypeaheadEntry.get_by_id(key_name)
+        data = json.loads(entry.data_json) if entry else []
+        merged = cls._merge_entry_data(key_name, data, to_upsert, to_remove)
+        if merged == data:
+            return
+        if merged:
+            cls.make_entry(key_name, merged).put()
+        elif entry:
+            entry.key.delete()
+
+    @classmethod
+    def _update_entries(cls, upserts, removals):
+        for key_name in set(upserts.keys()).union(removals.keys()):
+            if not upserts.get(key_name) and not removals.get(key_name):
+                continue
+            try:
+                cls._update_entry(key_name, upserts.get(key_name, []), removals.get(key_name, set()))
+            except Exception, e:
+                logging.error("Typeahead update for {} errored!".format(key_name))
+                logging.exception(e)
+
+    @classmethod
+    def update_team_typeaheads(cls, teams):
+        upserts = {TypeaheadEntry.ALL_TEAMS_KEY: [cls.get_team_data(team) for team in teams]}
+        cls._update_entries(upserts, {})
+
+    @classmethod
+    def remove_team_typeaheads(cls, teams):
+        removals = {TypeaheadEntry.ALL_TEAMS_KEY: set(str(team.team_number) for team in teams)}
+        cls._update_entries({}, removals)
+
+    @classmethod
+    def update_event_typeaheads(cls, events):
+        upserts = defaultdict(list)
+        for event in events:
+            data = cls.get_event_data(event)
+            upserts[TypeaheadEntry.ALL_EVENTS_KEY].append(data)
+            upserts[TypeaheadEntry.YEAR_EVENTS_KEY.format(event.year)].append(data)
+        cls._update_entries(upserts, {})
+
+    @classmethod
+    def remove_event_typeaheads(cls, events):
+        removals = defaultdict(set)
+        for event in events:
+            identity = (str(event.year), '[{}]'.format(event.event_short.upper()))
+            removals[TypeaheadEntry.ALL_EVENTS_KEY].add(identity)
+            removals[TypeaheadEntry.YEAR_EVENTS_KEY.format(event.year)].add(identity)
+        cls._update_entries({}, removals)
+
+    @classmethod
+    def update_district_typeaheads(cls, districts):
+        districts = sorted(districts, key=lambda district: -district.year)  # Newest name wins, like TypeaheadCalcDo
+        upserts = {TypeaheadEntry.ALL_DISTRICTS_KEY: [cls.get_district_data(district) for district in districts]}
+        cls._update_entries(upserts, {})
+
+    @classmethod
+    def remove_district_typeaheads(cls, districts):
+        """
+        Only call with districts whose abbreviation no longer exists in any year.
+        """
+        removals = {TypeaheadEntry.ALL_DISTRICTS_KEY: set('[{}]'.format(district.abbreviation.upper()) for district in districts)}
+        cls._update_entries({}, removals)
@@ -1,8 +1,11 @@
 import base64
 import json
 import logging
+import time
 
+from collections import defaultdict
 from google.appengine.api import memcache
+from google.appengine.ext import deferred
 from google.appengine.ext import ndb
 from google.appengine.api import urlfetch
 
@@ -10,125 +13,211 @@ from models.sitevar import Sitevar
 
 
 class WebcastOnlineHelper(object):
+    """
+    Resolves the online status of webcasts. Statuses are cached in memcache
+    and looked up in one batch. Channels that aren't cached are checked with
+    one API request per provider where the provider allows it.
+    Statuses stay fresh for STATUS_FRESH_SECONDS. After that they're still
+    served for up to STATUS_CACHE_SECONDS while a task refreshes them.
+    """
+    STATUS_FRESH_SECONDS = 60 * 5
+    STATUS_CACHE_SECONDS = 60 * 30
+    REFRESH_LOCK_SECONDS = 60
+    TWITCH_BATCH_SIZE = 100
+    YOUTUBE_BATCH_SIZE = 50
+
     @classmethod
     @ndb.toplevel
     def add_online_status(cls, webcasts):
-        for webcast in webcasts:
-            cls.add_online_status_async(webcast)
+        cls.add_online_status_async(webcasts)
+
+    @classmethod
+    def _memcache_key(cls, webcast):
+        return 'webcast_status:{}:{}:{}'.format(webcast['type'], webcast.get('channel'), webcast.get('file'))
 
     @classmethod
     @ndb.tasklet
-    def add_online_status_async(cls, webcast):
-        memcache_key = 'webcast_status:{}:{}:{}'.format(webcast['type'], webcast.get('channel'), webcast.get('file'))
-        cached_webcast = memcache.get(memcache_key)
-        if cached_webcast:
-            if 'status' in cached_webcast:
-                webcast['status'] = cached_webcast['status']
-            if 'stream_title' in cached_webcast:
-                webcast['stream_title'] = cached_webcast['stream_title']
+    def add_online_status_async(cls, webcasts):
+        webcasts_by_key = defaultdict(list)
+        for webcast in webcasts or []:
+            webcasts_by_key[cls._memcache_key(webcast)].append(webcast)
+        if not webcasts_by_key:
             return
 
-        webcast['status'] = 'unknown'
-        webcast['stream_title'] = None
-        if webcast['type'] == 'twitch':
-            yield cls._add_twitch_status_async(webcast)
-        elif webcast['type'] == 'ustream':
-            yield cls._add_ustream_status_async(webcast)
-        elif webcast['type'] == 'youtube':
-            yield cls._add_youtube_status_async(webcast)
-        # Livestream charges for their API. Go figure.
-        # elif webcast['type'] == 'livestream':
-        #     yield cls._add_livestream_status_async(webcast)
+        cached_statuses = memcache.get_multi(webcasts_by_key.keys())
+        now = time.time()
+        missing_webcasts = []
+        stale_keys = []
+        for memcache_key, key_webcasts in webcasts_by_key.items():
+            cached_status = cached_statuses.get(memcache_key)
+            if cached_status:
+                for webcast in key_webcasts:
+                    if 'status' in cached_status:
+                        webcast['status'] = cached_status['status']
+                    if 'stream_title' in cached_status:
+                        webcast['stream_title'] = cached_status['stream_title']
+                if cached_status.get('fresh_until', 0) < now:
+                    stale_keys.append(memcache_key)
+            else:
+                missing_webcasts.append(key_webcasts[0])
+
+        if stale_keys:
+            cls._revalidate([webcasts_by_key[memcache_key][0] for memcache_key in stale_keys])
+
+        if missing_webcasts:
+            yield cls._update_statuses_async(missing_webcasts)
+            for webcast in missing_webcasts:
+                for other_webcast in webcasts_by_key[cls._memcache_key(webcast)][1:]:
+                    other_webcast['status'] = webcast['status']
+                    other_webcast['stream_title'] = webcast['stream_title']
+
+    @classmethod
+    def _revalidate(cls, webcasts):
+        """
+        Refreshes stale statuses in a task, unless one is already refreshing them
+        """
+        locks = dict(('{}:refresh'.format(cls._memcache_key(webcast)), True) for webcast in webcasts)
+        already_locked = set(memcache.add_multi(locks, time=cls.REFRESH_LOCK_SECONDS))
+        webcasts = [
+            {'type': webcast['type'], 'channel': webcast.get('channel'), 'file': webcast.get('file')}
+            for webcast in webcasts
+            if '{}:refresh'.format(cls._memcache_key(webcast)) not in already_locked]
+        if webcasts:
+            deferred.defer(cls.refresh_statuses, webcasts, _queue='default')
 
-        memcache.set(memcache_key, webcast, 60*5)
+    @classmethod
+    @ndb.toplevel
+    def refresh_statuses(cls, webcasts):
+        cls._update_statuses_async(webcasts)
 
     @classmethod
     @ndb.tasklet
-    def _add_twitch_status_async(cls, webcast):
-        twitch_secrets = Sitevar.get_or_insert('twitch.secrets')
-        client_id = None
-        if twitch_secrets and twitch_secrets.contents:
-            client_id = twitch_secrets.contents.get('client_id')
-        if client_id:
-            try:
-                url = 'https://api.twitch.tv/kraken/streams/{}?client_id={}'.format(webcast['channel'], client_id)
-                rpc = urlfetch.create_rpc()
-                result = yield urlfetch.make_fetch_call(rpc, url)
-            except Exception, e:
-                logging.error("URLFetch failed for: {}".format(url))
-                raise ndb.Return(None)
-        else:
-            logging.warning("Must have Twitch Client ID")
-            raise ndb.Return(None)
+    def _update_statuses_async(cls, webcasts):
+        """
+        Looks up the statuses of webcasts and caches them
+        """
+        webcasts_by_type = defaultdict(list)
+        for webcast in webcasts:
+            webcast['status'] = 'unknown'
+            webcast['stream_title'] = None
+            webcasts_by_type[webcast['type']].append(webcast)
 
-        if result.status_code == 200:
-            response = json.loads(result.content)
-            if response['stream']:
-                webcast['status'] = 'online'
-                webcast['stream_title'] = response['stream']['channel']['status']
-            else:
-                webcast['status'] = 'offline'
-        else:
-            logging.warning("Twitch status failed with code: {}".format(result.status_code))
-            logging.warning(result.content)
+        futures = []
+        if webcasts_by_type['twitch']:
+            futures.append(cls._add_twitch_statuses_async(webcasts_by_type['twitch']))
+        if webcasts_by_type['youtube']:
+            futures.append(cls._add_youtube_statuses_async(webcasts_by_type['youtube']))
+        # Ustream can only look up one channel at a time
+        for webcast in webcasts_by_type['ustream']:
+            futures.append(cls._add_ustream_status_async(webcast))
+        # Livestream charges for their API. Go figure.
+        # for webcast in webcasts_by_type['livestream']:
+        #     futures.append(cls._add_livestream_status_async(webcast))
+        yield futures
 
-        raise ndb.Return(None)
+        fresh_until = time.time() + cls.STATUS_FRESH_SECONDS
+        memcache.set_multi(dict(
+            (cls._memcache_key(webcast), {
+                'status': webcast['status'],
+                'stream_title': webcast['stream_title'],
+                'fresh_until': fresh_until,
+            }) for webcast in webcasts), time=cls.STATUS_CACHE_SECONDS)
 
     @classmethod
     @ndb.tasklet
-    def _add_ustream_status_async(cls, webcast):
+    def _fetch_async(cls, url, provider, headers={}):
         try:
-            url = 'https://api.ustream.tv/channels/{}.json'.format(webcast['channel'])
             rpc = urlfetch.create_rpc()
-            result = yield urlfetch.make_fetch_call(rpc, url)
+            result = yield urlfetch.make_fetch_call(rpc, url, headers=headers)
         except Exception, e:
             logging.error("URLFetch failed for: {}".format(url))
             raise ndb.Return(None)
 
-        if result.status_code == 200:
-            response = json.loads(result.content)
-            if response['channel']:
-                webcast['status'] = 'online' if response['channel']['status'] == 'live' else 'offline'
-                webcast['stream_title'] = response['channel']['title']
-            else:
-                webcast['status'] = 'offline'
-        else:
-            logging.warning("Ustream status failed with code: {}".format(result.status_code))
+        if result.status_code != 200:
+            logging.warning("{} status failed with code: {}".format(provider, result.status_code))
             logging.warning(result.content)
+            raise ndb.Return(None)
+        raise ndb.Return(json.loads(result.content))
 
+    @classmethod
+    @ndb.tasklet
+    def _get_secret_async(cls, sitevar_key, secret):
+        secrets = yield Sitevar.get_or_insert_async(sitevar_key)
+        if secrets and secrets.contents:
+            raise ndb.Return(secrets.contents.get(secret))
         raise ndb.Return(None)
 
+    @classmethod
+    def _chunks(cls, webcasts, size):
+        return [webcasts[i:i + size] for i in xrange(0, len(webcasts), size)]
+
     @classmethod
     @ndb.tasklet
-    def _add_youtube_status_async(cls, webcast):
-        google_secrets = Sitevar.get_or_insert('google.secrets')
-        api_key = None
-        if google_secrets and google_secrets.contents:
-            api_key = google_secrets.contents.get('api_key')
-        if api_key:
-            try:
-                url = 'https://www.googleapis.com/youtube/v3/videos?part=snippet&id={}&key={}'.format(webcast['channel'], api_key)
-                rpc = urlfetch.create_rpc()
-                result = yield urlfetch.make_fetch_call(rpc, url)
-            except Exception, e:
-                logging.error("URLFetch failed for: {}".format(url))
-                raise ndb.Return(None)
+    def _add_twitch_statuses_async(cls, webcasts):
+        client_id = yield cls._get_secret_async('twitch.secrets', 'client_id')
+        if not client_id:
+            logging.warning("Must have Twitch Client ID")
+            raise ndb.Return(None)
+
+        urls = [
+            'https://api.twitch.tv/kraken/streams?channel={}&limit={}&client_id={}'.format(
+                ','.join(webcast['channel'] for webcast in chunk), len(chunk), client_id)
+            for chunk in cls._chunks(webcasts, cls.TWITCH_BATCH_SIZE)]
+        responses = yield [cls._fetch_async(url, 'Twitch') for url in urls]
+
+        for chunk, response in zip(cls._chunks(webcasts, cls.TWITCH_BATCH_SIZE), responses):
+            if response is None:
+                continue
+            # Only live channels are returned
+            titles = dict((stream['channel']['name'].lower(), stream['channel']['status']) for stream in response['streams'])
+            for webcast in chunk:
+                channel = webcast['channel'].lower()
+                if channel in titles:
+                    webcast['status'] = 'online'
+                    webcast['stream_title'] = titles[channel]
+                else:
+                    webcast['status'] = 'offline'
+
+    @classmethod
+    @ndb.tasklet
+    def _add_ustream_status_async(cls, webcast):
+        url = 'https://api.ustream.tv/channels/{}.json'.format(webcast['channel'])
+        response = yield cls._fetch_async(url, 'Ustream')
+        if response is None:
+            raise ndb.Return(None)
+
+        if response['channel']:
+            webcast['status'] = 'online' if response['channel']['status'] == 'live' else 'offline'
+            webcast['stream_title'] = response['channel']['title']
         else:
+            webcast['status'] = 'offline'
+
+    @classmethod
+    @ndb.tasklet
+    def _add_youtube_statuses_async(cls, webcasts):
+        api_key = yield cls._get_secret_async('google.secrets', 'api_key')
+        if not api_key:
             logging.warning("Must have Google API key")
             raise ndb.Return(None)
 
-        if result.status_code == 200:
-            response = json.loads(result.content)
-            if response['items']:
-                webcast['status'] = 'online' if response['items'][0]['snippet']['liveBroadcastContent'] == 'live' else 'offline'
-                webcast['stream_title'] = response['items'][0]['snippet']['title']
-            else:
-                webcast['status'] = 'offline'
-        else:
-            logging.warning("YouTube status failed with code: {}".format(result.status_code))
-            logging.warning(result.content)
+        urls = [
+            'https://www.googleapis.com/youtube/v3/videos?part=snippet&id={}&key={}'.format(
+                ','.join(webcast['channel'] for webcast in chunk), api_key)
+            for chunk in cls._chunks(webcasts, cls.YOUTUBE_BATCH_SIZE)]
+        responses = yield [cls._fetch_async(url, 'YouTube') for url in urls]
 
-        raise ndb.Return(None)
+        for chunk, response in zip(cls._chunks(webcasts, cls.YOUTUBE_BATCH_SIZE), responses):
+            if response is None:
+                continue
+            # Unknown videos aren't returned
+            snippets = dict((item['id'], item['snippet']) for item in response['items'])
+            for webcast in chunk:
+                snippet = snippets.get(webcast['channel'])
+                if snippet:
+                    webcast['status'] = 'online' if snippet['liveBroadcastContent'] == 'live' else 'offline'
+                    webcast['stream_title'] = snippet['title']
+                else:
+                    webcast['status'] = 'offline'
 
     @classmethod
     @ndb.tasklet
@@ -0,0 +1,27 @@
+from google.appengine.ext import ndb
+
+
+class AwardInsightsAggregate(ndb.Model):
+    """
+    Per-year counters behind the award Insights, kept up to date as awards
+    are written (see helpers.award_insights_helper).
+    key_name is the year, like '2017'
+    """
+    # award_key: [award_type_enum, event_type_enum, [team_key, ...]] of every award the counters include
+    awards = ndb.JsonProperty(compressed=True)
+
+    # team_key: number of times counted
+    blue_banners = ndb.JsonProperty(compressed=True)
+    regional_winners = ndb.JsonProperty(compressed=True)
+    rca_winners = ndb.JsonProperty(compressed=True)
+    world_champions = ndb.JsonProperty(compressed=True)
+
+    # 'team_key_1,team_key_2' (sorted): number of events won together
+    elim_teamups = ndb.JsonProperty(compressed=True)
+
+    created = ndb.DateTimeProperty(auto_now_add=True, indexed=False)
+    updated = ndb.DateTimeProperty(auto_now=True, indexed=False)
+
+    @property
+    def year(self):
+        return int(self.key.id())
@@ -0,0 +1,18 @@
+from google.appengine.ext import ndb
+
+
+class BulkJobCheckpoint(ndb.Model):
+    """
+    Progress of a paginated bulk job (see helpers.bulk_job_helper).
+    key_name is the job id, like:
+    csv_backup_events
+    csv_backup_events_year=2017
+    |part| is the next page to run and |cursor| is where that page starts.
+    """
+    cursor = ndb.StringProperty(indexed=False)  # urlsafe datastore cursor
+    part = ndb.IntegerProperty(default=0, indexed=False)
+    rows = ndb.IntegerProperty(default=0, indexed=False)
+    done = ndb.BooleanProperty(default=False, indexed=False)
+
+    created = ndb.DateTimeProperty(auto_now_add=True, indexed=False)
+    updated = ndb.DateTimeProperty(auto_now=True, indexed=False)
@@ -0,0 +1,16 @@
+from google.appengine.ext import ndb
+
+
+class CachedQueryDependency(ndb.Model):
+    """
+    Reverse index from something a DatabaseQuery read to the cache keys
+    of the CachedQueryResults that depend on it.
+    key_name is a dependency token like:
+    Match:event:Event:2016casj
+    Team:key:Team:frc254
+    Each token is its own entity group.
+    """
+    cache_keys = ndb.StringProperty(repeated=True, indexed=False)
+
+    created = ndb.DateTimeProperty(auto_now_add=True, indexed=False)
+    updated = ndb.DateTimeProperty(auto_now=True, indexed=False)
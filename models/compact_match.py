@@ -0,0 +1,155 @@
+import array
+import json
+import math
+
+from google.appengine.ext import ndb
+
+from models.match import Match
+
+
+class ScoreBreakdownSchema(object):
+    """
+    The numeric score breakdown fields of a season's matches, in a fixed order.
+    Schemas are immutable and shared by every match with the same fields, so
+    get them with ScoreBreakdownSchema.get instead of constructing them.
+    """
+    __slots__ = ('year', 'fields', 'indices')
+    _schemas = {}  # (year, fields): ScoreBreakdownSchema. Per instance.
+
+    def __init__(self, year, fields):
+        object.__setattr__(self, 'year', year)
+        object.__setattr__(self, 'fields', fields)
+        object.__setattr__(self, 'indices', dict((field, i) for i, field in enumerate(fields)))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ScoreBreakdownSchema is immutable")
+
+    @classmethod
+    def get(cls, year, fields):
+        fields = tuple(sorted(fields))
+        schema = cls._schemas.get((year, fields))
+        if schema is None:
+            schema = cls._schemas[(year, fields)] = cls(year, fields)
+        return schema
+
+
+class CompactMatch(object):
+    """
+    A small, read-only view of a Match for bulk reads and analytics, where
+    thousands of full Match entities and their decoded JSON would be held.
+    Teams are stored as team numbers and numeric score breakdown fields as
+    a typed array ordered by a shared ScoreBreakdownSchema. The JSON is only
+    decoded the first time alliance or breakdown data is read.
+    Non-numeric breakdown fields, surrogates, and videos aren't kept.
+    """
+    __slots__ = ('key_name', 'year', 'comp_level', 'set_number', 'match_number', 'time',
+                 '_alliances_json', '_score_breakdown_json',
+                 '_red_teams', '_blue_teams', '_red_score', '_blue_score',
+                 '_schema', '_red_breakdown', '_blue_breakdown')
+
+    def __init__(self, key_name, year, comp_level, set_number, match_number, time, alliances_json, score_breakdown_json=None):
+        self.key_name = key_name
+        self.year = year
+        self.comp_level = comp_level
+        self.set_number = set_number
+        self.match_number = match_number
+        self.time = time
+        self._alliances_json = alliances_json
+        self._score_breakdown_json = score_breakdown_json
+        self._schema = None
+
+    @classmethod
+    def from_match(cls, match):
+        return cls(match.key.id(), match.year, match.comp_level, match.set_number, match.match_number,
+                   match.time, match.alliances_json, match.score_breakdown_json)
+
+    @classmethod
+    def _fetch(cls, query, batch_size):
+        # Skip the caches so full entities aren't kept around
+        return [cls.from_match(match) for match in query.iter(batch_size=batch_size, use_cache=False, use_memcache=False)]
+
+    @classmethod
+    def fetch_event(cls, event_key, batch_size=200):
+        return cls._fetch(Match.query(Match.event == ndb.Key('Event', event_key)), batch_size)
+
+    @classmethod
+    def fetch_year(cls, year, batch_size=500):
+        return cls._fetch(Match.query(Match.year == year), batch_size)
+
+    @classmethod
+    def _encode_teams(cls, team_keys):
+        try:
+            return array.array('i', [int(team_key[3:]) for team_key in team_keys])
+        except ValueError:
+            return tuple(team_keys)  # B teams and such
+
+    def _decode(self):
+        if self._alliances_json is None:
+            return
+        alliances = json.loads(self._alliances_json)
+        for color in ['red', 'blue']:
+            score = alliances[color]['score']
+            setattr(self, '_{}_score'.format(color), -1 if score is None else int(score))
+            setattr(self, '_{}_teams'.format(color), self._encode_teams(alliances[color]['teams']))
+
+        score_breakdown = json.loads(self._score_breakdown_json) if self._score_breakdown_json else None
+        if score_breakdown:
+            numeric = {}
+            for color in ['red', 'blue']:
+                for field, value in (score_breakdown.get(color) or {}).items():
+                    if isinstance(value, (bool, int, long, float)):
+                        numeric[(color, field)] = float(value)
+            self._schema = ScoreBreakdownSchema.get(self.year, set(field for _, field in numeric))
+            for color in ['red', 'blue']:
+                values = array.array('d', [float('nan')]) * len(self._schema.fields)
+                for field, i in self._schema.indices.items():
+                    values[i] = numeric.get((color, field), float('nan'))
+                setattr(self, '_{}_breakdown'.format(color), values)
+
+        self._alliances_json = None
+        self._score_breakdown_json = None
+
+    @property
+    def event_key_name(self):
+        return self.key_name.split('_')[0]
+
+    @property
+    def play_order(self):
+        return Match.COMP_LEVELS_PLAY_ORDER[self.comp_level] * 1000000 + self.match_number * 1000 + self.set_number
+
+    def team_keys(self, color):
+        self._decode()
+        teams = getattr(self, '_{}_teams'.format(color))
+        if isinstance(teams, tuple):
+            return list(teams)
+        return ['frc{}'.format(team) for team in teams]
+
+    @property
+    def team_key_names(self):
+        return self.team_keys('red') + self.team_keys('blue')
+
+    def score(self, color):
+        self._decode()
+        return getattr(self, '_{}_score'.format(color))
+
+    @property
+    def has_been_played(self):
+        return self.score('red') != -1 and self.score('blue') != -1
+
+    @property
+    def schema(self):
+        """
+        ScoreBreakdownSchema of this match, or None if it has no score breakdown
+        """
+        self._decode()
+        return self._schema
+
+    def breakdown(self, color, field):
+        """
+        Numeric value of a score breakdown field (bools are 0 or 1), or None if missing
+        """
+        schema = self.schema
+        if schema is None or field not in schema.indices:
+            return None
+        value = getattr(self, '_{}_breakdown'.format(color))[schema.indices[field]]
+        return None if math.isnan(value) else value
@@ -69,6 +69,7 @@ class Event(ndb.Model):
         self._location = None
         self._city_state_country = None
         self._matches = None
+        self._match_index = None
         self._teams = None
         self._venue_address_safe = None
         self._webcast = None
@@ -146,6 +147,17 @@ class Event(ndb.Model):
             self._matches = self._matches.get_result()
         return self._matches
 
+    @property
+    def match_index(self):
+        """
+        EventMatchIndex of self.matches, rebuilt if they change
+        """
+        from helpers.event_match_index import EventMatchIndex
+        matches = self.matches
+        if self._match_index is None or self._match_index.matches is not matches:
+            self._match_index = EventMatchIndex(matches)
+        return self._match_index
+
     def local_time(self):
         now = datetime.datetime.now()
         if self.timezone_id is not None:
@@ -465,18 +477,8 @@ class Event(ndb.Model):
 
     @property
     def next_match(self):
-        from helpers.match_helper import MatchHelper
-        upcoming_matches = MatchHelper.upcomingMatches(self.matches, 1)
-        if upcoming_matches:
-            return upcoming_matches[0]
-        else:
-            return None
+        return self.match_index.next_match()
 
     @property
     def previous_match(self):
-        from helpers.match_helper import MatchHelper
-        recent_matches = MatchHelper.recentMatches(self.matches, 1)[0]
-        if recent_matches:
-            return recent_matches[0]
-        else:
-            return None
+        return self.match_index.last_match()
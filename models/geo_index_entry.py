@@ -0,0 +1,18 @@
+from google.appengine.ext import ndb
+
+
+class GeoIndexEntry(ndb.Model):
+    """
+    Stores a serialized GeoIndex (see helpers.geo_index_helper) of the teams
+    or events with a location in a given year.
+    key_name is like:
+    teams_2017
+    events_2017
+    """
+    TEAMS_KEY = 'teams_{}'  # (year)
+    EVENTS_KEY = 'events_{}'  # (year)
+
+    index_blob = ndb.BlobProperty(compressed=True)
+
+    created = ndb.DateTimeProperty(auto_now_add=True, indexed=False)
+    updated = ndb.DateTimeProperty(auto_now=True, indexed=False)
@@ -0,0 +1,18 @@
+from google.appengine.ext import ndb
+
+
+class LocationCacheEntry(ndb.Model):
+    """
+    Stores the result of an external geocode, place, or timezone lookup
+    so that it survives memcache eviction.
+    key_name is like:
+    geocode:san jose, ca usa
+    timezone:37.3382,-121.8863
+    An empty result is a negative cache entry.
+    Expired entries are deleted daily (see LocationHelper.delete_expired_location_results).
+    """
+    result = ndb.JsonProperty(compressed=True)
+    expires = ndb.DateTimeProperty()  # UTC
+
+    created = ndb.DateTimeProperty(auto_now_add=True, indexed=False)
+    updated = ndb.DateTimeProperty(auto_now=True, indexed=False)
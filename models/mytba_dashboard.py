@@ -0,0 +1,20 @@
+from google.appengine.ext import ndb
+
+
+class MyTBADashboard(ndb.Model):
+    """
+    What a user's myTBA dashboard shows for a year: the EventTeams of their
+    favorite teams and those teams' awards. Statuses and names are read from
+    the referenced models, so only favorite changes and teams being added to
+    events or winning awards change this (see helpers.mytba_dashboard_helper).
+    Parent is the Account key, key_name is the year, like '2017'
+    """
+    event_team_keys = ndb.KeyProperty(repeated=True, indexed=False)
+    award_keys = ndb.KeyProperty(repeated=True, indexed=False)
+
+    created = ndb.DateTimeProperty(auto_now_add=True, indexed=False)
+    updated = ndb.DateTimeProperty(auto_now=True, indexed=False)
+
+    @property
+    def year(self):
+        return int(self.key.id())
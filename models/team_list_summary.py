@@ -0,0 +1,20 @@
+from google.appengine.ext import ndb
+
+
+class TeamListSummary(ndb.Model):
+    """
+    Compact copy of a page of the team list API, kept up to date as Teams and
+    EventTeams are written (see helpers.team_list_summary_helper).
+    key_name is 'page_<page_num>' for the teams of a page, like 'page_0',
+    or 'year_<year>' for the team numbers at that year's events, like 'year_2017'
+    """
+    version = ndb.IntegerProperty(indexed=False)
+
+    # Only on pages: one row of values per team, in TeamListSummaryHelper.FIELDS order, sorted by team number
+    rows = ndb.JsonProperty(compressed=True)
+
+    # Only on years: sorted team numbers
+    team_numbers = ndb.JsonProperty(compressed=True)
+
+    created = ndb.DateTimeProperty(auto_now_add=True, indexed=False)
+    updated = ndb.DateTimeProperty(auto_now=True, indexed=False)
@@ -5,7 +5,8 @@ class TypeaheadEntry(ndb.Model):
     """
     Model for storing precomputed typeahead entries as keys and values, where
     TypeaheadEntry.id (set in cron_controller.TypeaheadCalcDo) is the key and
-    TypeaheadEntry.data_json is the value.
+    TypeaheadEntry.data_json is the value. TypeaheadEntry.index_blob is a
+    prefix search index over the same data (see helpers.typeahead_helper).
     """
     ALL_TEAMS_KEY = 'teams-all'
     ALL_EVENTS_KEY = 'events-all'
@@ -13,6 +14,7 @@ class TypeaheadEntry(ndb.Model):
     YEAR_EVENTS_KEY = 'events-{}'
 
     data_json = ndb.StringProperty(required=True, indexed=False)
+    index_blob = ndb.BlobProperty(compressed=True)  # Serialized TypeaheadIndex of data_json
 
     created = ndb.DateTimeProperty(auto_now_add=True, indexed=False)
     updated = ndb.DateTimeProperty(auto_now=True, indexed=False)
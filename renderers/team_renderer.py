@@ -10,6 +10,7 @@ from helpers.data_fetchers.team_details_data_fetcher import TeamDetailsDataFetch
 
 from helpers.award_helper import AwardHelper
 from helpers.event_helper import EventHelper
+from helpers.event_match_index import EventMatchIndex
 from helpers.match_helper import MatchHelper
 from helpers.media_helper import MediaHelper
 
@@ -48,11 +49,12 @@ class TeamRenderer(object):
         for event in events_sorted:
             event_matches = matches_by_event_key.get(event.key, [])
             event_awards = AwardHelper.organizeAwards(awards_by_event_key.get(event.key, []))
-            matches_organized = MatchHelper.organizeMatches(event_matches)
+            match_index = EventMatchIndex(event_matches)
+            matches_organized = match_index.organized
 
             if event.now:
                 current_event = event
-                matches_upcoming = MatchHelper.upcomingMatches(event_matches)
+                matches_upcoming = match_index.upcoming_matches()
 
             if event.within_a_day:
                 short_cache = True
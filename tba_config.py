@@ -27,7 +27,10 @@ if DEBUG:
         "env": "dev",
         "memcache": False,
         "database_query_cache": False,
+        "database_query_dependency_tracking": False,
         "response_cache": False,
+        "fragment_cache": False,
+        "adaptive_polling": False,
         "firebase-url": "https://thebluealliance-dev.firebaseio.com/{}.json?print=silent&auth={}",
         "firebase-push": False,
         "use-compiled-templates": False,
@@ -38,7 +41,10 @@ else:
         "env": "prod",
         "memcache": True,
         "database_query_cache": True,
+        "database_query_dependency_tracking": False,  # Shadow mode. Only reported, not used for clearing yet.
         "response_cache": True,
+        "fragment_cache": True,
+        "adaptive_polling": True,
         "firebase-url": "https://tbatv-prod-hrd.firebaseio.com/{}.json?print=silent&auth={}",
         "firebase-push": True,
         "use-compiled-templates": True,
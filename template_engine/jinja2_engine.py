@@ -1,24 +1,98 @@
+import hashlib
 import jinja2
 import logging
 import os
 import tba_config
 
+from google.appengine.api import memcache
+from google.appengine.ext import ndb
+from jinja2 import nodes
+from jinja2.ext import Extension
+
 from template_engine import jinja2_filters
 
 
+class FragmentCacheExtension(Extension):
+    """
+    Caches the rendered output of a template fragment in memcache, keyed on
+    the data the fragment depends on:
+
+    {% cache 'event_teams', event.key_name, teams_a, teams_b %}...{% endcache %}
+
+    The first argument names the fragment and the rest make up its key.
+    Models are keyed on their key and updated time, so they don't have to be
+    walked. Other values are keyed on their contents.
+    """
+    tags = set(['cache'])
+
+    CACHE_VERSION = 0
+    CACHE_KEY_FORMAT = "fragment_{}_{}_{}_{}"  # (version, deployed version, name, key hash)
+    TIMEOUT = 60 * 60 * 24
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        name = parser.parse_expression()
+        key_parts = []
+        while parser.stream.skip_if('comma'):
+            key_parts.append(parser.parse_expression())
+        body = parser.parse_statements(['name:endcache'], drop_needle=True)
+        return nodes.CallBlock(
+            self.call_method('_render_fragment', [name, nodes.List(key_parts)]),
+            [], [], body).set_lineno(lineno)
+
+    @classmethod
+    def _key_part(cls, value):
+        if isinstance(value, ndb.Model):
+            updated = getattr(value, 'updated', None)
+            if value.key is None or updated is None:
+                return repr(value)
+            return (value.key.kind(), value.key.id(), updated)
+        if isinstance(value, dict):
+            return sorted((cls._key_part(k), cls._key_part(v)) for k, v in value.items())
+        if isinstance(value, (list, tuple)):
+            return [cls._key_part(v) for v in value]
+        if isinstance(value, jinja2.Undefined):
+            return None
+        return value
+
+    @classmethod
+    def cache_key(cls, name, key_parts):
+        return cls.CACHE_KEY_FORMAT.format(
+            cls.CACHE_VERSION,
+            os.environ.get('CURRENT_VERSION_ID'),  # Templates may change with every deploy
+            name,
+            hashlib.md5(repr(cls._key_part(key_parts))).hexdigest())
+
+    def _render_fragment(self, name, key_parts, caller):
+        if not tba_config.CONFIG['fragment_cache']:
+            return caller()
+
+        cache_key = self.cache_key(name, key_parts)
+        rendered = memcache.get(cache_key)
+        if rendered is not None:
+            return jinja2.Markup(rendered)
+
+        rendered = caller()
+        try:
+            memcache.set(cache_key, unicode(rendered), self.TIMEOUT)
+        except ValueError:  # Too large
+            logging.warning("Fragment {} too large to cache".format(name))
+        return rendered
+
+
 def get_jinja_env(force_filesystemloader=False):
     if tba_config.CONFIG['use-compiled-templates'] and not force_filesystemloader:
         logging.info("Using jinja2.ModuleLoader")
         env = jinja2.Environment(
             auto_reload=False,
             loader=jinja2.ModuleLoader(os.path.join(os.path.dirname(__file__), '../templates_jinja2_compiled.zip')),
-            extensions=['jinja2.ext.autoescape'],
+            extensions=['jinja2.ext.autoescape', FragmentCacheExtension],
             autoescape=True)
     else:
         logging.info("Using jinja2.FileSystemLoader")
         env = jinja2.Environment(
             loader=jinja2.FileSystemLoader(os.path.join(os.path.dirname(__file__), '../templates_jinja2')),
-            extensions=['jinja2.ext.autoescape'],
+            extensions=['jinja2.ext.autoescape', FragmentCacheExtension],
             autoescape=True)
     env.filters['ceil'] = jinja2_filters.ceil
     env.filters['defense_name'] = jinja2_filters.defense_name
@@ -0,0 +1,95 @@
+import json
+import unittest2
+
+from google.appengine.ext import ndb
+from google.appengine.ext import testbed
+
+from consts.award_type import AwardType
+from consts.event_type import EventType
+from helpers.award_insights_helper import AwardInsightsHelper
+from helpers.insights_helper import InsightsHelper
+from models.award import Award
+from models.award_insights_aggregate import AwardInsightsAggregate
+from models.event import Event
+from models.insight import Insight
+from models.team import Team
+
+
+class TestAwardInsightsHelper(unittest2.TestCase):
+    def setUp(self):
+        self.testbed = testbed.Testbed()
+        self.testbed.activate()
+        self.testbed.init_datastore_v3_stub()
+        self.testbed.init_memcache_stub()
+        ndb.get_context().clear_cache()  # Prevent data from leaking between tests
+
+        self._award(2016, '2016casj', EventType.REGIONAL, AwardType.WINNER, [254, 604, 8]).put()
+        self._award(2016, '2016casj', EventType.REGIONAL, AwardType.CHAIRMANS, [1678]).put()
+        self._award(2016, '2016cmp', EventType.CMP_FINALS, AwardType.WINNER, [330, 2481, 120]).put()
+        self._award(2016, '2016cmp', EventType.CMP_FINALS, AwardType.FINALIST, [1640, 1024]).put()
+        self._award(2016, '2016casj', EventType.REGIONAL, AwardType.FINALIST, [971]).put()  # Not tracked
+        self._award(2017, '2017casj', EventType.REGIONAL, AwardType.WINNER, [254, 604, 1678]).put()
+
+    def tearDown(self):
+        self.testbed.deactivate()
+
+    def _award(self, year, event_key, event_type_enum, award_type_enum, team_numbers):
+        return Award(
+            id=Award.render_key_name(event_key, award_type_enum),
+            name_str='Award',
+            award_type_enum=award_type_enum,
+            year=year,
+            event=ndb.Key(Event, event_key),
+            event_type_enum=event_type_enum,
+            team_list=[ndb.Key(Team, 'frc{}'.format(team_number)) for team_number in team_numbers],
+            recipient_json_list=[json.dumps({'team_number': team_number, 'awardee': None}) for team_number in team_numbers])
+
+    def _insight_data(self, insights, name):
+        for insight in insights:
+            if insight.name == Insight.INSIGHT_NAMES[name]:
+                return json.loads(insight.data_json)
+        return None
+
+    def test_rebuild(self):
+        aggregate = AwardInsightsHelper.rebuild(2016)
+        self.assertEqual(len(aggregate.awards), 4)
+        self.assertEqual(aggregate.blue_banners, {'frc254': 1, 'frc604': 1, 'frc8': 1, 'frc1678': 1, 'frc330': 1, 'frc2481': 1, 'frc120': 1})
+        self.assertEqual(aggregate.regional_winners, {'frc254': 1, 'frc604': 1, 'frc8': 1})
+        self.assertEqual(aggregate.rca_winners, {'frc1678': 1})
+        self.assertEqual(aggregate.world_champions, {'frc330': 1, 'frc2481': 1, 'frc120': 1})
+        self.assertEqual(aggregate.elim_teamups['frc254,frc604'], 1)
+        self.assertEqual(len(aggregate.elim_teamups), 6)
+
+        insights = InsightsHelper.doAwardInsights(2016)
+        self.assertEqual(self._insight_data(insights, Insight.WORLD_FINALISTS), ['frc1024', 'frc1640'])
+        self.assertEqual(self._insight_data(insights, Insight.RCA_WINNERS), ['frc1678'])
+        self.assertEqual(self._insight_data(insights, Insight.REGIONAL_DISTRICT_WINNERS), [[1, ['frc8', 'frc254', 'frc604']]])
+
+    def test_update_and_remove_awards(self):
+        AwardInsightsHelper.rebuild(2016)
+
+        award = self._award(2016, '2016casj', EventType.REGIONAL, AwardType.WINNER, [254, 971])
+        AwardInsightsHelper.update_awards([award])
+        aggregate = AwardInsightsAggregate.get_by_id('2016')
+        self.assertEqual(aggregate.regional_winners, {'frc254': 1, 'frc971': 1})
+        self.assertEqual(aggregate.elim_teamups.get('frc254,frc604'), None)
+        self.assertEqual(aggregate.elim_teamups['frc254,frc971'], 1)
+
+        AwardInsightsHelper.remove_awards([award])
+        aggregate = AwardInsightsAggregate.get_by_id('2016')
+        self.assertEqual(aggregate.regional_winners, {})
+        self.assertEqual(aggregate.blue_banners.get('frc254'), None)
+
+        # Years that haven't been built aren't created by updates
+        AwardInsightsHelper.update_awards([self._award(2015, '2015casj', EventType.REGIONAL, AwardType.WINNER, [254])])
+        self.assertEqual(AwardInsightsAggregate.get_by_id('2015'), None)
+
+    def test_overall_merges_years(self):
+        AwardInsightsHelper.rebuild(2017)  # 2016 hasn't been built
+
+        insights = InsightsHelper.doOverallAwardInsights()
+        self.assertEqual(self._insight_data(insights, Insight.REGIONAL_DISTRICT_WINNERS),
+                         [[2, ['frc254', 'frc604']], [1, ['frc8', 'frc1678']]])
+        self.assertEqual(self._insight_data(insights, Insight.BLUE_BANNERS)[0], [2, ['frc254', 'frc604', 'frc1678']])
+        self.assertEqual(self._insight_data(insights, Insight.SUCCESSFUL_ELIM_TEAMUPS)[0], [2, [['frc254', 'frc604']]])
+        self.assertEqual(len(AwardInsightsAggregate.get_by_id('2016').awards), 4)
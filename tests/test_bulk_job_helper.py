@@ -0,0 +1,123 @@
+import json
+import StringIO
+import unittest2
+
+from google.appengine.ext import ndb
+from google.appengine.ext import testbed
+
+from helpers.bulk_job_helper import TeamsJSONLExportJob
+from models.bulk_job_checkpoint import BulkJobCheckpoint
+from models.team import Team
+
+
+class FakeFile(StringIO.StringIO):
+    def __init__(self, files, filename):
+        StringIO.StringIO.__init__(self, files.get(filename, ''))
+        self.files = files
+        self.filename = filename
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, atype, value, traceback):
+        self.close()
+
+    def close(self):
+        if not self.closed:
+            self.files[self.filename] = self.getvalue()
+        StringIO.StringIO.close(self)
+
+
+class FakeStorageJob(TeamsJSONLExportJob):
+    """
+    Writes to memory instead of Cloud Storage. Runs a duplicate of part
+    |duplicate_part| while the original is still processing its page.
+    """
+    PAGE_SIZE = 2
+
+    def __init__(self, params=None):
+        super(FakeStorageJob, self).__init__(params)
+        self.files = {}
+        self.duplicate_part = None
+
+    def open_file(self, filename, mode='r', **kwargs):
+        return FakeFile(self.files, filename)
+
+    def process_page(self, models, part):
+        rows = super(FakeStorageJob, self).process_page(models, part)
+        if part == self.duplicate_part:
+            self.duplicate_part = None
+            ndb.get_context().clear_cache()  # As if run by another task
+            self.run(part)
+        return rows
+
+
+class TestBulkJobHelper(unittest2.TestCase):
+    def setUp(self):
+        self.testbed = testbed.Testbed()
+        self.testbed.activate()
+        self.testbed.init_datastore_v3_stub()
+        self.testbed.init_memcache_stub()
+        self.testbed.init_taskqueue_stub(root_path=".")
+        self.taskqueue_stub = self.testbed.get_stub(testbed.TASKQUEUE_SERVICE_NAME)
+        ndb.get_context().clear_cache()  # Prevent data from leaking between tests
+
+        for team_number in xrange(1, 6):
+            Team(id='frc{}'.format(team_number), team_number=team_number).put()
+
+        self.job = FakeStorageJob()
+
+    def tearDown(self):
+        self.testbed.deactivate()
+
+    def _read_lines(self, filename):
+        return [json.loads(line) for line in self.job.files[filename].splitlines()]
+
+    def _task_urls(self):
+        return [task.url for task in self.taskqueue_stub.get_filtered_tasks(queue_names=self.job.QUEUE_NAME)]
+
+    def test_runs_pages_until_done(self):
+        self.job.start()
+        part = 0
+        while True:
+            checkpoint = self.job.run(part)
+            part += 1
+            if checkpoint.done:
+                break
+            self.assertEqual(self._task_urls()[-1], self.job.DO_URL.format(self.job.NAME, part))
+
+        self.assertEqual(checkpoint.rows, 5)
+        self.assertEqual(checkpoint.part, 3)
+        manifest = json.loads(self.job.files[self.job.get_manifest_filename()])
+        self.assertEqual(manifest['rows'], 5)
+
+        team_keys = []
+        for filename in manifest['parts']:
+            team_keys += [team['key'] for team in self._read_lines(filename)]
+        self.assertEqual(team_keys, ['frc1', 'frc2', 'frc3', 'frc4', 'frc5'])
+
+    def test_stale_and_resumed_tasks(self):
+        self.job.start()
+        self.job.run(0)
+
+        # A retried task for a page that was already done is skipped
+        checkpoint = self.job.run(0)
+        self.assertEqual(checkpoint.part, 1)
+        self.assertEqual(checkpoint.rows, 2)
+
+        checkpoint = self.job.resume()
+        self.assertEqual(checkpoint.part, 1)
+        checkpoint = self.job.run(1)
+        self.assertEqual(checkpoint.rows, 4)
+        self.assertEqual(BulkJobCheckpoint.get_by_id(self.job.job_id).part, 2)
+
+    def test_duplicate_task(self):
+        self.job.start()
+        self.job.duplicate_part = 0
+        checkpoint = self.job.run(0)
+
+        # The duplicate advanced the job, and the original didn't advance it again
+        self.assertEqual(checkpoint.part, 1)
+        self.assertEqual(checkpoint.rows, 2)
+        self.assertEqual(BulkJobCheckpoint.get_by_id(self.job.job_id).part, 1)
+        self.assertEqual(self._task_urls().count(self.job.DO_URL.format(self.job.NAME, 1)), 1)
@@ -0,0 +1,54 @@
+import unittest2
+
+from google.appengine.ext import ndb
+from google.appengine.ext import testbed
+
+from database.event_query import EventQuery
+from database.match_query import EventMatchesQuery, MatchQuery
+from helpers.cache_invalidation_planner import CacheInvalidationPlanner
+from models.cached_query_result import CachedQueryResult
+
+
+class TestCacheInvalidationPlanner(unittest2.TestCase):
+    def setUp(self):
+        self.testbed = testbed.Testbed()
+        self.testbed.activate()
+        self.testbed.init_datastore_v3_stub()
+        self.testbed.init_memcache_stub()
+        ndb.get_context().clear_cache()  # Prevent data from leaking between tests
+
+        self.calls = 0
+
+    def tearDown(self):
+        self.testbed.deactivate()
+
+    def _get_cache_keys_and_controllers(self, affected_refs):
+        self.calls += 1
+        queries = [EventMatchesQuery(event_key.id()) for event_key in affected_refs['event']]
+        queries += [MatchQuery(match_key.id()) for match_key in affected_refs['key']]
+        return [(query.cache_key, type(query)) for query in queries]
+
+    def test_dedupes(self):
+        CachedQueryResult(id=EventMatchesQuery('2016casj').cache_key, result=[]).put()
+        CachedQueryResult(id=MatchQuery('2016casj_qm1').cache_key, result=None).put()
+        CachedQueryResult(id=EventQuery('2016casj').cache_key, result=None).put()
+
+        planner = CacheInvalidationPlanner(self._get_cache_keys_and_controllers)
+        for match_key in ['2016casj_qm1', '2016casj_qm2', '2016casj_qm1']:
+            planner.add({
+                'key': {ndb.Key('Match', match_key)},
+                'event': {ndb.Key('Event', '2016casj')},
+            })
+        stats = planner.execute()
+
+        self.assertEqual(self.calls, 2)  # Identical references are only expanded once
+        self.assertEqual(stats['writes'], 3)
+        self.assertEqual(stats['max_fan_out'], 2)
+        self.assertEqual(stats['total_fan_out'], 6)
+        self.assertEqual(stats['unique_cache_keys'], 3)
+        self.assertEqual(stats['query_cache_candidates'], len(planner.get_manual_query_cache_keys()))
+        self.assertEqual(stats['query_cache_deleted'], 2)  # Nothing was cached for 2016casj_qm2
+
+        self.assertEqual(CachedQueryResult.get_by_id(EventMatchesQuery('2016casj').cache_key), None)
+        self.assertEqual(CachedQueryResult.get_by_id(MatchQuery('2016casj_qm1').cache_key), None)
+        self.assertNotEqual(CachedQueryResult.get_by_id(EventQuery('2016casj').cache_key), None)
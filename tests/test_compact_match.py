@@ -0,0 +1,89 @@
+import json
+import unittest2
+
+from google.appengine.ext import ndb
+from google.appengine.ext import testbed
+
+from database.dict_converters.match_converter import MatchConverter
+from models.compact_match import CompactMatch, ScoreBreakdownSchema
+from models.event import Event
+from models.match import Match
+
+
+class TestCompactMatch(unittest2.TestCase):
+    def setUp(self):
+        self.testbed = testbed.Testbed()
+        self.testbed.activate()
+        self.testbed.init_datastore_v3_stub()
+        self.testbed.init_memcache_stub()
+        ndb.get_context().clear_cache()  # Prevent data from leaking between tests
+
+    def tearDown(self):
+        self.testbed.deactivate()
+
+    def _match(self, match_number, red, blue, red_score, score_breakdown=None):
+        return Match(
+            id=Match.renderKeyName('2017casj', 'qm', 1, match_number),
+            event=ndb.Key(Event, '2017casj'),
+            year=2017,
+            comp_level='qm',
+            set_number=1,
+            match_number=match_number,
+            team_key_names=red + blue,
+            alliances_json=json.dumps({
+                'red': {'teams': red, 'score': red_score},
+                'blue': {'teams': blue, 'score': 20},
+            }),
+            score_breakdown_json=json.dumps(score_breakdown) if score_breakdown else None)
+
+    def test_from_match(self):
+        match = CompactMatch.from_match(self._match(
+            1, ['frc254', 'frc604', 'frc8'], ['frc1', 'frc2', 'frc3'], 10,
+            {'red': {'foulPoints': 5, 'rotorRankingPointAchieved': True, 'touchpadNear': 'ReadyForTakeoff'},
+             'blue': {'foulPoints': 0}}))
+        self.assertEqual(match.key_name, '2017casj_qm1')
+        self.assertEqual(match.event_key_name, '2017casj')
+        self.assertEqual(match.team_keys('red'), ['frc254', 'frc604', 'frc8'])
+        self.assertEqual(match.team_key_names, ['frc254', 'frc604', 'frc8', 'frc1', 'frc2', 'frc3'])
+        self.assertEqual(match.score('red'), 10)
+        self.assertTrue(match.has_been_played)
+
+        self.assertEqual(match.schema.fields, ('foulPoints', 'rotorRankingPointAchieved'))
+        self.assertEqual(match.breakdown('red', 'foulPoints'), 5)
+        self.assertEqual(match.breakdown('red', 'rotorRankingPointAchieved'), 1)
+        self.assertEqual(match.breakdown('blue', 'rotorRankingPointAchieved'), None)
+        self.assertEqual(match.breakdown('red', 'touchpadNear'), None)
+
+    def test_unplayed_and_b_teams(self):
+        match = CompactMatch.from_match(self._match(2, ['frc254B', 'frc604', 'frc8'], ['frc1', 'frc2', 'frc3'], None))
+        self.assertEqual(match.team_keys('red'), ['frc254B', 'frc604', 'frc8'])
+        self.assertEqual(match.team_keys('blue'), ['frc1', 'frc2', 'frc3'])
+        self.assertEqual(match.score('red'), -1)
+        self.assertFalse(match.has_been_played)
+        self.assertEqual(match.schema, None)
+        self.assertEqual(match.breakdown('red', 'foulPoints'), None)
+
+    def test_shared_schema(self):
+        match_1 = CompactMatch.from_match(self._match(1, [], [], 10, {'red': {'foulPoints': 5}, 'blue': {'foulPoints': 0}}))
+        match_2 = CompactMatch.from_match(self._match(2, [], [], 10, {'red': {'foulPoints': 0}, 'blue': {'foulPoints': 0}}))
+        self.assertTrue(match_1.schema is match_2.schema)
+        self.assertTrue(match_1.schema is ScoreBreakdownSchema.get(2017, ['foulPoints']))
+        with self.assertRaises(AttributeError):
+            match_1.schema.fields = ()
+
+    def test_fetch_event(self):
+        self._match(1, ['frc254'], ['frc1'], 10).put()
+        self._match(2, ['frc254'], ['frc1'], None).put()
+        matches = CompactMatch.fetch_event('2017casj')
+        self.assertEqual(sorted(match.key_name for match in matches), ['2017casj_qm1', '2017casj_qm2'])
+
+    def test_converter_leaves_match_alone(self):
+        match = self._match(1, ['frc254', 'frc604', 'frc8'], ['frc1', 'frc2', 'frc3'], 10)
+        match_dict = MatchConverter.matchConverter_v3(match)
+        self.assertEqual(match_dict['alliances']['red']['team_keys'], ['frc254', 'frc604', 'frc8'])
+        self.assertEqual(match_dict['alliances']['red']['surrogate_team_keys'], [])
+        self.assertEqual(match.alliances['red']['teams'], ['frc254', 'frc604', 'frc8'])
+        self.assertFalse('team_keys' in match.alliances['red'])
+
+        # Converting twice gives the same dict
+        self.assertEqual(MatchConverter.matchConverter_v3(match), match_dict)
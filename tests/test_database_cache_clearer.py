@@ -13,7 +13,8 @@ from database.match_query import MatchQuery, EventMatchesQuery, TeamEventMatches
 from database.media_query import TeamSocialMediaQuery, TeamYearMediaQuery, EventTeamsMediasQuery, EventTeamsPreferredMediasQuery, \
     EventMediasQuery
 from database.robot_query import TeamRobotsQuery
-from database.team_query import TeamQuery, TeamListQuery, TeamListYearQuery, DistrictTeamsQuery, EventTeamsQuery, TeamParticipationQuery, TeamDistrictsQuery
+from database.team_query import TeamQuery, TeamListQuery, TeamListYearQuery, DistrictTeamsQuery, EventTeamsQuery, TeamParticipationQuery, TeamDistrictsQuery, \
+    TeamYearSummaryQuery
 
 from consts.event_type import EventType
 from models.district import District
@@ -136,15 +137,19 @@ class TestDatabaseCacheClearer(unittest2.TestCase):
         }
         cache_keys = [q.cache_key for q in get_affected_queries.award_updated(affected_refs)]
 
-        self.assertEqual(len(cache_keys), 12)
+        self.assertEqual(len(cache_keys), 16)
         self.assertTrue(EventAwardsQuery('2015casj').cache_key in cache_keys)
         self.assertTrue(EventAwardsQuery('2015cama').cache_key in cache_keys)
         self.assertTrue(TeamAwardsQuery('frc254').cache_key in cache_keys)
         self.assertTrue(TeamAwardsQuery('frc604').cache_key in cache_keys)
         self.assertTrue(TeamYearAwardsQuery('frc254', 2014).cache_key in cache_keys)
+        self.assertTrue(TeamYearSummaryQuery('frc254', 2014).cache_key in cache_keys)
         self.assertTrue(TeamYearAwardsQuery('frc254', 2015).cache_key in cache_keys)
+        self.assertTrue(TeamYearSummaryQuery('frc254', 2015).cache_key in cache_keys)
         self.assertTrue(TeamYearAwardsQuery('frc604', 2014).cache_key in cache_keys)
+        self.assertTrue(TeamYearSummaryQuery('frc604', 2014).cache_key in cache_keys)
         self.assertTrue(TeamYearAwardsQuery('frc604', 2015).cache_key in cache_keys)
+        self.assertTrue(TeamYearSummaryQuery('frc604', 2015).cache_key in cache_keys)
         self.assertTrue(TeamEventAwardsQuery('frc254', '2015casj').cache_key in cache_keys)
         self.assertTrue(TeamEventAwardsQuery('frc254', '2015cama').cache_key in cache_keys)
         self.assertTrue(TeamEventAwardsQuery('frc604', '2015casj').cache_key in cache_keys)
@@ -158,7 +163,7 @@ class TestDatabaseCacheClearer(unittest2.TestCase):
         }
         cache_keys = [q.cache_key for q in get_affected_queries.event_updated(affected_refs)]
 
-        self.assertEqual(len(cache_keys), 13)
+        self.assertEqual(len(cache_keys), 15)
         self.assertTrue(EventQuery('2015casj').cache_key in cache_keys)
         self.assertTrue(EventQuery('2015cama').cache_key in cache_keys)
         self.assertTrue(EventListQuery(2014).cache_key in cache_keys)
@@ -168,7 +173,9 @@ class TestDatabaseCacheClearer(unittest2.TestCase):
         self.assertTrue(TeamEventsQuery('frc254').cache_key in cache_keys)
         self.assertTrue(TeamEventsQuery('frc604').cache_key in cache_keys)
         self.assertTrue(TeamYearEventsQuery('frc254', 2015).cache_key in cache_keys)
+        self.assertTrue(TeamYearSummaryQuery('frc254', 2015).cache_key in cache_keys)
         self.assertTrue(TeamYearEventsQuery('frc604', 2015).cache_key in cache_keys)
+        self.assertTrue(TeamYearSummaryQuery('frc604', 2015).cache_key in cache_keys)
         self.assertTrue(EventDivisionsQuery('2015casj').cache_key in cache_keys)
         self.assertTrue(EventDivisionsQuery('2015cama').cache_key in cache_keys)
         self.assertTrue(EventDivisionsQuery('2015cafoo').cache_key in cache_keys)
@@ -192,7 +199,7 @@ class TestDatabaseCacheClearer(unittest2.TestCase):
         }
         cache_keys = [q.cache_key for q in get_affected_queries.match_updated(affected_refs)]
 
-        self.assertEqual(len(cache_keys), 12)
+        self.assertEqual(len(cache_keys), 16)
         self.assertTrue(MatchQuery('2015casj_qm1').cache_key in cache_keys)
         self.assertTrue(MatchQuery('2015casj_qm2').cache_key in cache_keys)
         self.assertTrue(EventMatchesQuery('2015casj').cache_key in cache_keys)
@@ -202,9 +209,13 @@ class TestDatabaseCacheClearer(unittest2.TestCase):
         self.assertTrue(TeamEventMatchesQuery('frc604', '2015casj').cache_key in cache_keys)
         self.assertTrue(TeamEventMatchesQuery('frc604', '2015cama').cache_key in cache_keys)
         self.assertTrue(TeamYearMatchesQuery('frc254', 2014).cache_key in cache_keys)
+        self.assertTrue(TeamYearSummaryQuery('frc254', 2014).cache_key in cache_keys)
         self.assertTrue(TeamYearMatchesQuery('frc254', 2015).cache_key in cache_keys)
+        self.assertTrue(TeamYearSummaryQuery('frc254', 2015).cache_key in cache_keys)
         self.assertTrue(TeamYearMatchesQuery('frc604', 2014).cache_key in cache_keys)
+        self.assertTrue(TeamYearSummaryQuery('frc604', 2014).cache_key in cache_keys)
         self.assertTrue(TeamYearMatchesQuery('frc604', 2015).cache_key in cache_keys)
+        self.assertTrue(TeamYearSummaryQuery('frc604', 2015).cache_key in cache_keys)
 
     def test_media_updated_team(self):
         affected_refs = {
@@ -274,15 +285,19 @@ class TestDatabaseCacheClearer(unittest2.TestCase):
         }
         cache_keys = [q.cache_key for q in get_affected_queries.eventteam_updated(affected_refs)]
 
-        self.assertEqual(len(cache_keys), 18)
+        self.assertEqual(len(cache_keys), 22)
         self.assertTrue(TeamEventsQuery('frc254').cache_key in cache_keys)
         self.assertTrue(TeamEventsQuery('frc604').cache_key in cache_keys)
         self.assertTrue(TeamParticipationQuery('frc254').cache_key in cache_keys)
         self.assertTrue(TeamParticipationQuery('frc604').cache_key in cache_keys)
         self.assertTrue(TeamYearEventsQuery('frc254', 2014).cache_key in cache_keys)
+        self.assertTrue(TeamYearSummaryQuery('frc254', 2014).cache_key in cache_keys)
         self.assertTrue(TeamYearEventsQuery('frc254', 2015).cache_key in cache_keys)
+        self.assertTrue(TeamYearSummaryQuery('frc254', 2015).cache_key in cache_keys)
         self.assertTrue(TeamYearEventsQuery('frc604', 2014).cache_key in cache_keys)
+        self.assertTrue(TeamYearSummaryQuery('frc604', 2014).cache_key in cache_keys)
         self.assertTrue(TeamYearEventsQuery('frc604', 2015).cache_key in cache_keys)
+        self.assertTrue(TeamYearSummaryQuery('frc604', 2015).cache_key in cache_keys)
         self.assertTrue(TeamListYearQuery(2014, 0).cache_key in cache_keys)
         self.assertTrue(TeamListYearQuery(2014, 1).cache_key in cache_keys)
         self.assertTrue(TeamListYearQuery(2015, 0).cache_key in cache_keys)
@@ -315,7 +330,7 @@ class TestDatabaseCacheClearer(unittest2.TestCase):
         }
         cache_keys = [q.cache_key for q in get_affected_queries.district_updated(affected_refs)]
 
-        self.assertEqual(len(cache_keys), 12)
+        self.assertEqual(len(cache_keys), 13)
         self.assertTrue(DistrictsInYearQuery(2015).cache_key in cache_keys)
         self.assertTrue(DistrictsInYearQuery(2016).cache_key in cache_keys)
         self.assertTrue(DistrictHistoryQuery('ne').cache_key in cache_keys)
@@ -329,4 +344,5 @@ class TestDatabaseCacheClearer(unittest2.TestCase):
         self.assertTrue(DistrictEventsQuery('2016ne').cache_key in cache_keys)
         self.assertTrue(TeamEventsQuery('frc125').cache_key in cache_keys)
         self.assertTrue(TeamYearEventsQuery('frc125', 2016).cache_key in cache_keys)
+        self.assertTrue(TeamYearSummaryQuery('frc125', 2016).cache_key in cache_keys)
         self.assertTrue(EventDivisionsQuery('2016necmp').cache_key in cache_keys)
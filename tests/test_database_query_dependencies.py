@@ -0,0 +1,68 @@
+import unittest2
+
+from google.appengine.ext import ndb
+from google.appengine.ext import testbed
+
+from database.database_query_dependencies import DatabaseQueryDependencies
+from helpers.cache_invalidation_planner import CacheInvalidationPlanner
+from models.event import Event
+from models.match import Match
+from models.team import Team
+
+
+class TestDatabaseQueryDependencies(unittest2.TestCase):
+    def setUp(self):
+        self.testbed = testbed.Testbed()
+        self.testbed.activate()
+        self.testbed.init_datastore_v3_stub()
+        self.testbed.init_memcache_stub()
+        ndb.get_context().clear_cache()  # Prevent data from leaking between tests
+
+        self.match = Match(
+            id='2016casj_qm1',
+            event=ndb.Key(Event, '2016casj'),
+            year=2016,
+            comp_level='qm',
+            set_number=1,
+            match_number=1,
+            team_key_names=['frc254', 'frc604'],
+            alliances_json='{}',
+        )
+
+    def tearDown(self):
+        self.testbed.deactivate()
+
+    def test_result_tokens_match_reference_tokens(self):
+        result_tokens = DatabaseQueryDependencies.get_tokens_for_result({'matches': [self.match]})
+        self.assertTrue('Match:event:Event:2016casj' in result_tokens)
+        self.assertTrue('Match:team_keys:Team:frc254' in result_tokens)
+        self.assertTrue('Match:key:Match:2016casj_qm1' in result_tokens)
+
+        # Writing a new match at the same event affects the same token
+        affected_refs = {
+            'key': {ndb.Key(Match, '2016casj_qm2')},
+            'event': {ndb.Key(Event, '2016casj')},
+            'team_keys': set(),
+            'year': {2016},
+        }
+        write_tokens = DatabaseQueryDependencies.get_tokens_for_references('Match', affected_refs)
+        self.assertEqual(write_tokens.intersection(result_tokens), {'Match:event:Event:2016casj'})
+
+    def test_record(self):
+        tokens = DatabaseQueryDependencies.get_tokens_for_result([Team(id='frc254', team_number=254)])
+        DatabaseQueryDependencies.record('team_254:0:2', tokens)
+        DatabaseQueryDependencies.record('team_254:0:2', tokens)  # No duplicates
+        DatabaseQueryDependencies.record('team_list_0:1:2', tokens)
+
+        self.assertEqual(
+            DatabaseQueryDependencies.get_dependent_cache_keys({'Team:key:Team:frc254'}),
+            {'team_254:0:2', 'team_list_0:1:2'})
+
+    def test_shadow_diff(self):
+        DatabaseQueryDependencies.record('team_254:0:2', {'Team:key:Team:frc254'})
+        DatabaseQueryDependencies.record('unmapped:0:2', {'Team:key:Team:frc254'})
+
+        planner = CacheInvalidationPlanner(lambda affected_refs: [])
+        planner.add({'key': {ndb.Key(Team, 'frc254')}}, kind='Team')
+        missing_from_manual, _ = planner.report_dependency_diff()
+        self.assertEqual(missing_from_manual, {'team_254:0:2', 'unmapped:0:2'})
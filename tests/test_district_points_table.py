@@ -0,0 +1,146 @@
+import json
+import random
+import unittest2
+
+from datetime import datetime
+
+from google.appengine.ext import ndb
+from google.appengine.ext import testbed
+
+from consts.award_type import AwardType
+from consts.event_type import EventType
+from helpers.district_helper import DistrictHelper
+from helpers.district_points_table import DistrictPointsTable
+from models.award import Award
+from models.event import Event
+from models.event_details import EventDetails
+from models.match import Match
+from models.team import Team
+
+
+class TestDistrictPointsTable(unittest2.TestCase):
+    def setUp(self):
+        self.testbed = testbed.Testbed()
+        self.testbed.activate()
+        self.testbed.init_datastore_v3_stub()
+        self.testbed.init_memcache_stub()
+        ndb.get_context().clear_cache()  # Prevent data from leaking between tests
+
+        self.random = random.Random(254)
+        self.team_keys = ['frc{}'.format(team_number) for team_number in xrange(1, 41)]
+
+    def tearDown(self):
+        self.testbed.deactivate()
+
+    def _make_event(self, event_key, year, event_type_enum, day):
+        event = Event(
+            id=event_key,
+            event_short=event_key[4:],
+            year=year,
+            event_type_enum=event_type_enum,
+            start_date=datetime(year, 3, day),
+            end_date=datetime(year, 3, day + 2),
+            official=True)
+        event.put()
+
+        team_keys = self.random.sample(self.team_keys, 30)
+        matches = []
+        for match_number in xrange(1, 41):
+            teams = self.random.sample(team_keys, 6)
+            scores = [self.random.choice([20, 30, 40]) for _ in xrange(2)] if match_number <= 36 else [-1, -1]
+            matches.append(self._match(event_key, year, 'qm', 1, match_number, teams, scores))
+        for comp_level, num_sets in [('qf', 4), ('sf', 2), ('f', 1)]:
+            for set_number in xrange(1, num_sets + 1):
+                teams = self.random.sample(team_keys, 6)
+                for match_number in xrange(1, 4):
+                    scores = self.random.choice([[50, 40], [40, 50], [45, 45]])
+                    matches.append(self._match(event_key, year, comp_level, set_number, match_number, teams, scores))
+        ndb.put_multi(matches)
+
+        EventDetails(
+            id=event_key,
+            rankings=[['Rank', 'Team']] + [[rank, team_key[3:]] for rank, team_key in enumerate(team_keys, 1)],
+            alliance_selections=[{'declines': [], 'picks': team_keys[i:i + 3]} for i in xrange(0, 24, 3)],
+        ).put()
+
+        ndb.put_multi([
+            self._award(event, AwardType.CHAIRMANS, team_keys[:1]),
+            self._award(event, AwardType.WINNER, team_keys[:3]),
+            self._award(event, AwardType.ENGINEERING_INSPIRATION, team_keys[5:6]),
+            self._award(event, AwardType.EXCELLENCE_IN_DESIGN, team_keys[10:11]),
+        ])
+        return event
+
+    def _match(self, event_key, year, comp_level, set_number, match_number, teams, scores):
+        return Match(
+            id=Match.renderKeyName(event_key, comp_level, set_number, match_number),
+            alliances_json=json.dumps({
+                'red': {'score': scores[0], 'teams': teams[:3]},
+                'blue': {'score': scores[1], 'teams': teams[3:]},
+            }),
+            comp_level=comp_level,
+            event=ndb.Key(Event, event_key),
+            year=year,
+            set_number=set_number,
+            match_number=match_number,
+            team_key_names=teams)
+
+    def _award(self, event, award_type_enum, team_keys):
+        return Award(
+            id=Award.render_key_name(event.key_name, award_type_enum),
+            name_str='Award',
+            award_type_enum=award_type_enum,
+            year=event.year,
+            event=event.key,
+            event_type_enum=event.event_type_enum,
+            team_list=[ndb.Key(Team, team_key) for team_key in team_keys],
+            recipient_json_list=[json.dumps({'team_number': int(team_key[3:]), 'awardee': None}) for team_key in team_keys])
+
+    def _make_events(self, year):
+        return [
+            self._make_event('{}mial'.format(year), year, EventType.DISTRICT, 1),
+            self._make_event('{}mibe'.format(year), year, EventType.DISTRICT, 8),
+            self._make_event('{}mike'.format(year), year, EventType.DISTRICT, 15),
+            self._make_event('{}micmp'.format(year), year, EventType.DISTRICT_CMP, 22),
+        ]
+
+    def _assert_same_points(self, year):
+        events = self._make_events(year)
+        table = DistrictPointsTable.calculate(events)
+        for event_index, event in enumerate(events):
+            expected = json.loads(json.dumps(DistrictHelper.calculate_event_points(event)))
+            self.assertEqual(table.event_points(event_index), expected)
+
+            event.details.district_points = expected
+            event.details.put()
+
+        teams = [Team(id=team_key, team_number=int(team_key[3:]), rookie_year=year - int(team_key[3:]) % 3) for team_key in self.team_keys]
+        teams.append(Team(id='frc9999', team_number=9999, rookie_year=year))  # Rookie without events
+        expected = DistrictHelper.calculate_rankings(events, teams, year)
+        for team_totals in [table.rankings(teams, year), DistrictPointsTable.from_district_points(events).rankings(teams, year)]:
+            self._assert_same_rankings(team_totals, expected)
+
+    def _assert_same_rankings(self, team_totals, expected):
+        def sort_key((_, totals)):
+            return [totals['point_total']] + totals['tiebreakers']
+
+        def by_team(team_totals):
+            return {
+                team_key: dict(totals, event_points=[(event.key_name, points) for event, points in totals['event_points']])
+                for team_key, totals in team_totals}
+
+        # Teams tied on everything may be in either order
+        self.assertEqual([sort_key(totals) for totals in team_totals], [sort_key(totals) for totals in expected])
+        self.assertEqual(by_team(team_totals), by_team(expected))
+
+    def test_rank_based_points(self):
+        self._assert_same_points(2017)
+
+    def test_wlt_based_points(self):
+        self._assert_same_points(2014)
+
+    def test_no_events(self):
+        teams = [Team(id='frc9999', team_number=9999, rookie_year=2017)]
+        self.assertEqual(
+            DistrictPointsTable.calculate([]).rankings(teams, 2017),
+            [('frc9999', {'event_points': [], 'point_total': 10, 'tiebreakers': [0, 0, 0, 0, 0, []], 'rookie_bonus': 10})])
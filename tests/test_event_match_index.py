@@ -0,0 +1,81 @@
+import json
+import unittest2
+
+from google.appengine.ext import ndb
+from google.appengine.ext import testbed
+
+from helpers.event_match_index import EventMatchIndex
+from helpers.match_helper import MatchHelper
+from models.event import Event
+from models.match import Match
+
+
+class TestEventMatchIndex(unittest2.TestCase):
+    def setUp(self):
+        self.testbed = testbed.Testbed()
+        self.testbed.activate()
+        self.testbed.init_datastore_v3_stub()
+        self.testbed.init_memcache_stub()
+        ndb.get_context().clear_cache()  # Prevent data from leaking between tests
+
+        self.event = Event(id='2017casj', year=2017, event_short='casj')
+        self.matches = [
+            self._match('qf', 2, 1, ['frc1', 'frc2', 'frc3'], ['frc7', 'frc8', 'frc9'], -1),
+            self._match('qm', 1, 10, ['frc1', 'frc2', 'frc3'], ['frc4', 'frc5', 'frc6'], -1),
+            self._match('qm', 1, 2, ['frc1', 'frc5', 'frc9'], ['frc4', 'frc2', 'frc6'], 20),
+            self._match('qf', 1, 1, ['frc4', 'frc5', 'frc6'], ['frc7', 'frc8', 'frc9'], -1),
+            self._match('qm', 1, 1, ['frc1', 'frc2', 'frc3'], ['frc4', 'frc5', 'frc6'], 10),
+        ]
+        self.event._matches = self.matches
+
+    def tearDown(self):
+        self.testbed.deactivate()
+
+    def _match(self, comp_level, set_number, match_number, red, blue, score):
+        return Match(
+            id=Match.renderKeyName(self.event.key.id(), comp_level, set_number, match_number),
+            event=self.event.key,
+            year=2017,
+            comp_level=comp_level,
+            set_number=set_number,
+            match_number=match_number,
+            team_key_names=red + blue,
+            alliances_json=json.dumps({
+                'red': {'teams': red, 'score': score},
+                'blue': {'teams': blue, 'score': score},
+            }))
+
+    def _key_names(self, matches):
+        return [match.key_name for match in matches]
+
+    def test_organized(self):
+        match_index = EventMatchIndex(self.matches)
+        self.assertEqual(match_index.organized, MatchHelper.organizeMatches(self.matches))
+        self.assertEqual(self._key_names(match_index.organized['qm']), ['2017casj_qm1', '2017casj_qm2', '2017casj_qm10'])
+        self.assertEqual(self._key_names(match_index.play_order),
+                         ['2017casj_qm1', '2017casj_qm2', '2017casj_qm10', '2017casj_qf1m1', '2017casj_qf2m1'])
+        self.assertEqual(match_index.played_boundary, 2)
+
+    def test_recent_and_upcoming(self):
+        match_index = EventMatchIndex(self.matches)
+        self.assertEqual(match_index.recent_matches(), MatchHelper.recentMatches(self.matches))
+        self.assertEqual(match_index.upcoming_matches(), MatchHelper.upcomingMatches(self.matches))
+        self.assertEqual(match_index.next_match().key_name, '2017casj_qm10')
+        self.assertEqual(match_index.last_match().key_name, '2017casj_qm2')
+
+        self.assertEqual(match_index.next_match('frc7').key_name, '2017casj_qf1m1')
+        self.assertEqual(match_index.last_match('frc7'), None)
+        self.assertEqual(match_index.next_match('frc9').key_name, '2017casj_qf1m1')
+        self.assertEqual(match_index.last_match('frc9').key_name, '2017casj_qm2')
+        self.assertEqual(match_index.next_match('frc254'), None)
+
+    def test_event_match_index(self):
+        match_index = self.event.match_index
+        self.assertTrue(self.event.match_index is match_index)
+        self.assertEqual(self.event.next_match.key_name, '2017casj_qm10')
+        self.assertEqual(self.event.previous_match.key_name, '2017casj_qm2')
+
+        # Rebuilt when the matches change
+        self.event._matches = self.matches[:2]
+        self.assertFalse(self.event.match_index is match_index)
+        self.assertEqual(self.event.match_index.organized['num'], 2)
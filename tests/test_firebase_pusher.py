@@ -0,0 +1,66 @@
+import unittest2
+
+from google.appengine.ext import ndb
+from google.appengine.ext import testbed
+
+from helpers.firebase.firebase_pusher import FirebasePusher
+
+
+class TestFirebasePusher(unittest2.TestCase):
+    def setUp(self):
+        self.testbed = testbed.Testbed()
+        self.testbed.activate()
+        self.testbed.init_datastore_v3_stub()
+        self.testbed.init_memcache_stub()
+        self.testbed.init_taskqueue_stub(root_path=".")
+        self.taskqueue_stub = self.testbed.get_stub(testbed.TASKQUEUE_SERVICE_NAME)
+        ndb.get_context().clear_cache()  # Prevent data from leaking between tests
+
+        self.live_events = {
+            '2017casj': {'key': '2017casj', 'name': 'Silicon Valley', 'webcasts': [{'type': 'twitch', 'channel': 'a', 'status': 'online'}]},
+            '2017cada': {'key': '2017cada', 'name': 'Sacramento', 'webcasts': []},
+        }
+
+    def tearDown(self):
+        self.testbed.deactivate()
+
+    def _num_tasks(self):
+        return len(self.taskqueue_stub.get_filtered_tasks(queue_names='firebase'))
+
+    def test_diff(self):
+        self.assertEqual(FirebasePusher._diff(self.live_events, self.live_events), {})
+
+        new_live_events = {
+            '2017casj': {'key': '2017casj', 'name': 'Silicon Valley Regional', 'webcasts': [{'type': 'twitch', 'channel': 'a', 'status': 'offline'}]},
+            '2017code': {'key': '2017code', 'name': 'Denver', 'webcasts': []},
+        }
+        self.assertEqual(FirebasePusher._diff(self.live_events, new_live_events), {
+            '2017casj/name': 'Silicon Valley Regional',
+            '2017casj/webcasts': [{'type': 'twitch', 'channel': 'a', 'status': 'offline'}],
+            '2017code': {'key': '2017code', 'name': 'Denver', 'webcasts': []},
+            '2017cada': None,
+        })
+
+        self.assertEqual(FirebasePusher._diff([1, 2], [1, 2]), {})
+        self.assertEqual(FirebasePusher._diff([1, 2], [1]), {'': [1]})
+
+    def test_publish_changes(self):
+        # Nothing published yet, so the whole tree is put
+        FirebasePusher._publish_changes('live_events', self.live_events)
+        self.assertEqual(self._num_tasks(), 1)
+
+        # Nothing changed
+        FirebasePusher._publish_changes('live_events', self.live_events)
+        self.assertEqual(self._num_tasks(), 1)
+
+        self.live_events['2017cada']['name'] = 'Sacramento Regional'
+        FirebasePusher._publish_changes('live_events', self.live_events)
+        self.assertEqual(self._num_tasks(), 2)
+
+    def test_publish_list(self):
+        FirebasePusher._publish_changes('special_webcasts', [])
+        FirebasePusher._publish_changes('special_webcasts', [])
+        self.assertEqual(self._num_tasks(), 1)
+
+        FirebasePusher._publish_changes('special_webcasts', [{'type': 'twitch', 'channel': 'a'}])
+        self.assertEqual(self._num_tasks(), 2)
@@ -160,7 +160,7 @@ class TestFMSAPIEventListParser(unittest2.TestCase):
             self.assertEqual(len(events), 159)
             self.assertEqual(len(districts), 10)
 
-            non_einstein_types = EventType.CMP_EVENT_TYPES
+            non_einstein_types = set(EventType.CMP_EVENT_TYPES)
             non_einstein_types.remove(EventType.CMP_FINALS)
             for key in hack_sitevar.contents['divisions_to_skip']:
                 self.assertFalse(filter(lambda e: e.key_name == key, events))
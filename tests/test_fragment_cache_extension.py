@@ -0,0 +1,59 @@
+import datetime
+import unittest2
+
+from google.appengine.ext import ndb
+from google.appengine.ext import testbed
+
+import tba_config
+from models.team import Team
+from template_engine import jinja2_engine
+from template_engine.jinja2_engine import FragmentCacheExtension
+
+
+class TestFragmentCacheExtension(unittest2.TestCase):
+    def setUp(self):
+        self.testbed = testbed.Testbed()
+        self.testbed.activate()
+        self.testbed.init_datastore_v3_stub()
+        self.testbed.init_memcache_stub()
+        ndb.get_context().clear_cache()  # Prevent data from leaking between tests
+
+        self.fragment_cache = tba_config.CONFIG['fragment_cache']
+        tba_config.CONFIG['fragment_cache'] = True
+        self.template = jinja2_engine.JINJA_ENV.from_string(
+            "{% for team in teams %}{% cache 'teams', team %}{{ team.nickname }}{{ suffix }}{% endcache %}{% endfor %}")
+
+    def tearDown(self):
+        tba_config.CONFIG['fragment_cache'] = self.fragment_cache
+        self.testbed.deactivate()
+
+    def _team(self, nickname, updated):
+        return Team(id='frc254', team_number=254, nickname=nickname, updated=updated)
+
+    def test_cached(self):
+        team = self._team('<Poofs>', datetime.datetime(2017, 3, 1))
+        self.assertEqual(self.template.render(teams=[team], suffix='1'), '&lt;Poofs&gt;1')
+
+        # The fragment doesn't depend on suffix, so it isn't re-rendered
+        self.assertEqual(self.template.render(teams=[team], suffix='2'), '&lt;Poofs&gt;1')
+
+        # Updated models miss
+        team = self._team('Cheesy Poofs', datetime.datetime(2017, 3, 2))
+        self.assertEqual(self.template.render(teams=[team], suffix='3'), 'Cheesy Poofs3')
+
+    def test_disabled(self):
+        tba_config.CONFIG['fragment_cache'] = False
+        team = self._team('Cheesy Poofs', datetime.datetime(2017, 3, 1))
+        self.assertEqual(self.template.render(teams=[team], suffix='1'), 'Cheesy Poofs1')
+        self.assertEqual(self.template.render(teams=[team], suffix='2'), 'Cheesy Poofs2')
+
+    def test_cache_key(self):
+        self.assertEqual(
+            FragmentCacheExtension.cache_key('a', [{'x': 1, 'y': [2, 3]}]),
+            FragmentCacheExtension.cache_key('a', [{'y': [2, 3], 'x': 1}]))
+        self.assertNotEqual(
+            FragmentCacheExtension.cache_key('a', [{'x': 1}]),
+            FragmentCacheExtension.cache_key('a', [{'x': 2}]))
+        self.assertNotEqual(
+            FragmentCacheExtension.cache_key('a', [1]),
+            FragmentCacheExtension.cache_key('b', [1]))
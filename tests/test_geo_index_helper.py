@@ -0,0 +1,97 @@
+import unittest2
+
+from google.appengine.ext import ndb
+from google.appengine.ext import testbed
+
+from helpers.geo_index_helper import GeoIndex, GeoIndexHelper
+from models.event import Event
+from models.event_team import EventTeam
+from models.geo_index_entry import GeoIndexEntry
+from models.location import Location
+from models.team import Team
+
+
+class TestGeoIndex(unittest2.TestCase):
+    def setUp(self):
+        self.index = GeoIndex.build([
+            (37.24, -121.83, 'frc254'),
+            (37.22, -121.87, 'frc604'),
+            (42.36, -71.06, 'frc125'),
+            (47.60, -122.30, 'frc492'),
+        ])
+        self.san_jose = (37.3382, -121.8863)
+
+    def test_search(self):
+        results = self.index.search(self.san_jose[0], self.san_jose[1], 100000)
+        self.assertEqual([key_name for _, key_name in results], ['frc254', 'frc604'])
+        self.assertAlmostEqual(results[0][0], 12000, delta=100)
+
+        results = self.index.search(self.san_jose[0], self.san_jose[1], 2000000)
+        self.assertEqual([key_name for _, key_name in results], ['frc254', 'frc604', 'frc492'])
+
+    def test_upsert_and_remove(self):
+        index = self.index.upsert([(42.36, -71.06, 'frc254')]).remove({'frc604'})
+        results = index.search(self.san_jose[0], self.san_jose[1], 100000)
+        self.assertEqual(results, [])
+        results = index.search(42.36, -71.06, 1000)
+        self.assertEqual([key_name for _, key_name in results], ['frc125', 'frc254'])
+
+    def test_serialize(self):
+        index = GeoIndex.deserialize(self.index.serialize())
+        self.assertEqual(index.search(47.6, -122.3, 1000), self.index.search(47.6, -122.3, 1000))
+
+
+class TestGeoIndexHelper(unittest2.TestCase):
+    def setUp(self):
+        self.testbed = testbed.Testbed()
+        self.testbed.activate()
+        self.testbed.init_datastore_v3_stub()
+        self.testbed.init_memcache_stub()
+        ndb.get_context().clear_cache()  # Prevent data from leaking between tests
+        GeoIndexHelper._index_cache.clear()
+
+        self.team = Team(id='frc254', team_number=254, normalized_location=Location(lat_lng=ndb.GeoPt(37.24, -121.83)))
+        self.team.put()
+        EventTeam(id='2017casj_frc254', event=ndb.Key(Event, '2017casj'), team=self.team.key, year=2017).put()
+
+    def tearDown(self):
+        self.testbed.deactivate()
+
+    def test_updates_only_built_indexes(self):
+        GeoIndexHelper.update_team_locations([self.team])
+        self.assertEqual(GeoIndexEntry.get_by_id(GeoIndexEntry.TEAMS_KEY.format(2017)), None)
+        self.assertEqual(GeoIndexHelper.search(GeoIndexEntry.TEAMS_KEY.format(2017), 37.24, -121.83, 1000), None)
+
+        GeoIndexHelper.rebuild_team_index(2017)
+        results = GeoIndexHelper.search(GeoIndexEntry.TEAMS_KEY.format(2017), 37.24, -121.83, 1000)
+        self.assertEqual([key_name for _, key_name in results], ['frc254'])
+
+        self.team.normalized_location = Location(lat_lng=ndb.GeoPt(42.36, -71.06))
+        GeoIndexHelper.update_team_locations([self.team])
+        self.assertEqual(GeoIndexHelper.search(GeoIndexEntry.TEAMS_KEY.format(2017), 37.24, -121.83, 1000), [])
+
+        GeoIndexHelper.remove_team_locations([self.team])
+        self.assertEqual(GeoIndexHelper.search(GeoIndexEntry.TEAMS_KEY.format(2017), 42.36, -71.06, 1000), [])
+
+    def test_event_teams(self):
+        GeoIndexHelper.rebuild_team_index(2017)
+        index_key_name = GeoIndexEntry.TEAMS_KEY.format(2017)
+
+        team = Team(id='frc604', team_number=604, normalized_location=Location(lat_lng=ndb.GeoPt(37.25, -121.84)))
+        team.put()
+        event_teams = [
+            EventTeam(id='2017casj_frc604', event=ndb.Key(Event, '2017casj'), team=team.key, year=2017),
+            EventTeam(id='2017cada_frc604', event=ndb.Key(Event, '2017cada'), team=team.key, year=2017),
+        ]
+        ndb.put_multi(event_teams)
+        GeoIndexHelper.add_event_teams(event_teams)
+        self.assertEqual([key_name for _, key_name in GeoIndexHelper.search(index_key_name, 37.24, -121.83, 5000)], ['frc254', 'frc604'])
+
+        # frc604 is still at 2017cada
+        event_teams[0].key.delete()
+        GeoIndexHelper.remove_event_teams(event_teams[:1])
+        self.assertEqual(len(GeoIndexHelper.search(index_key_name, 37.24, -121.83, 5000)), 2)
+
+        event_teams[1].key.delete()
+        GeoIndexHelper.remove_event_teams(event_teams[1:])
+        self.assertEqual([key_name for _, key_name in GeoIndexHelper.search(index_key_name, 37.24, -121.83, 5000)], ['frc254'])
@@ -0,0 +1,91 @@
+import json
+import unittest2
+
+from google.appengine.ext import ndb
+from google.appengine.ext import testbed
+
+from helpers.insights_helper import InsightsHelper
+from models.event import Event
+from models.insight import Insight
+from models.match import Match
+
+
+class TestInsightsHelper(unittest2.TestCase):
+    def setUp(self):
+        self.testbed = testbed.Testbed()
+        self.testbed.activate()
+        self.testbed.init_datastore_v3_stub()
+        self.testbed.init_memcache_stub()
+        ndb.get_context().clear_cache()  # Prevent data from leaking between tests
+
+        self.event = Event(id='2017casj', year=2017, event_short='casj', name='Silicon Valley Regional')
+        self.matches = [
+            self._match('qm', 1, 200, 150, 50, 0),  # 150 qual high score without fouls
+            self._match('qm', 2, 150, 120, 0, 0),
+            self._match('qm', 3, -1, -1, 0, 0),  # Unplayed
+            self._match('sf', 1, 200, 180, 0, 0),  # Ties for the overall high score
+        ]
+        self.week_event_matches = [('Week 1', [(self.event, self.matches)])]
+        self.columns = InsightsHelper._extractMatchColumns(self.week_event_matches, 2017)
+
+    def tearDown(self):
+        self.testbed.deactivate()
+
+    def _match(self, comp_level, match_number, red_score, blue_score, red_fouls, blue_fouls):
+        return Match(
+            id=Match.renderKeyName(self.event.key.id(), comp_level, 1, match_number),
+            event=self.event.key,
+            year=2017,
+            comp_level=comp_level,
+            set_number=1,
+            match_number=match_number,
+            alliances_json=json.dumps({
+                'red': {'teams': ['frc1', 'frc2', 'frc3'], 'score': red_score},
+                'blue': {'teams': ['frc4', 'frc5', 'frc6'], 'score': blue_score},
+            }),
+            score_breakdown_json=json.dumps({
+                'red': {'foulPoints': red_fouls},
+                'blue': {'foulPoints': blue_fouls},
+            }))
+
+    def _key_names(self, match_datas):
+        return [match_data['key_name'] for match_data in match_datas]
+
+    def test_highscore_matches(self):
+        insight = InsightsHelper._calculateHighscoreMatches(self.columns, 2017)[0]
+        data = json.loads(insight.data_json)
+        self.assertEqual(self._key_names(data['overall']), ['2017casj_qm1', '2017casj_sf1m1'])
+        self.assertEqual(self._key_names(data['qual']), ['2017casj_qm1', '2017casj_qm2'])
+        self.assertEqual(self._key_names(data['playoff']), ['2017casj_sf1m1'])
+
+    def test_match_averages_and_num_matches(self):
+        insights = InsightsHelper._calculateMatchAveragesByWeek(self.week_event_matches, self.columns, 2017)
+        self.assertEqual(json.loads(insights[0].data_json), [['Week 1', (350 + 270 + 380) / 3.0 / 2]])
+        self.assertEqual(json.loads(insights[1].data_json), [['Week 1', 190.0]])
+
+        insight = InsightsHelper._calculateNumMatches(self.columns, 2017)[0]
+        self.assertEqual(insight.name, Insight.INSIGHT_NAMES[Insight.NUM_MATCHES])
+        self.assertEqual(json.loads(insight.data_json), 4)
+
+    def test_count_scores(self):
+        counts = InsightsHelper._countScores(self.columns['red_scores'][self.columns['played']])
+        self.assertEqual(counts, {200: 2, 150: 1})
+
+    def test_highscore_matches_by_week(self):
+        insight = InsightsHelper._calculateHighscoreMatchesByWeek(self.week_event_matches, self.columns, 2017)[0]
+        week, match_datas = json.loads(insight.data_json)[0]
+        self.assertEqual(week, 'Week 1')
+        self.assertEqual(self._key_names(match_datas), ['2017casj_qm1', '2017casj_sf1m1'])
+
+    def test_score_distribution(self):
+        # Same data as the per-match loops this replaced produced for these matches
+        insights = InsightsHelper._calculateScoreDistribution(self.columns, 2017)
+        self.assertEqual(insights[0].name, Insight.INSIGHT_NAMES[Insight.SCORE_DISTRIBUTION])
+        self.assertEqual(json.loads(insights[0].data_json), {
+            '125.0': 100 / 6.0,
+            '155.0': 200 / 6.0,
+            '185.0': 100 / 6.0,
+            '205.0': 200 / 6.0,
+        })
+        self.assertEqual(insights[1].name, Insight.INSIGHT_NAMES[Insight.ELIM_SCORE_DISTRIBUTION])
+        self.assertEqual(json.loads(insights[1].data_json), {'185.0': 50.0, '205.0': 50.0})
@@ -0,0 +1,29 @@
+import json
+import unittest2
+
+from helpers.json_stream_helper import JSONStreamHelper
+
+
+class TestJSONStreamHelper(unittest2.TestCase):
+    def test_iter_array(self):
+        content = '{"Other": {"a": [1, 2]}, "Schedule" : [ 1, {"b": "\\u00e9", "c": [null, true]} ,\n"d"]}'
+        self.assertEqual(list(JSONStreamHelper.iter_array(content, 'Schedule')), [1, {u'b': u'\xe9', u'c': [None, True]}, u'd'])
+        self.assertEqual(list(JSONStreamHelper.iter_array(content, 'Other')), [u'a'])  # Like iterating a dict
+        self.assertEqual(list(JSONStreamHelper.iter_array(' { "Schedule": [ ] } ', 'Schedule')), [])
+
+    def test_iter_array_matches_loads(self):
+        for file_name in ['2016_nyny_hybrid_schedule_qual.json', '2016_nyny_qual_breakdown.json']:
+            with open('test_data/fms_api/{}'.format(file_name), 'r') as f:
+                content = f.read()
+            for key, value in json.loads(content).items():
+                self.assertEqual(list(JSONStreamHelper.iter_array(content, key)), value)
+
+    def test_iter_array_errors(self):
+        with self.assertRaises(KeyError):
+            list(JSONStreamHelper.iter_array('{}', 'Schedule'))
+        with self.assertRaises(KeyError):
+            list(JSONStreamHelper.iter_array('{"MatchScores": []}', 'Schedule'))
+        with self.assertRaises(ValueError):
+            list(JSONStreamHelper.iter_array('{"Schedule": [1 2]}', 'Schedule'))
+        with self.assertRaises(ValueError):
+            list(JSONStreamHelper.iter_array('[]', 'Schedule'))
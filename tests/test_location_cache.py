@@ -0,0 +1,61 @@
+import datetime
+import unittest2
+
+from google.appengine.ext import ndb
+from google.appengine.ext import testbed
+
+from helpers.location_helper import LocationHelper
+from models.location_cache_entry import LocationCacheEntry
+
+
+class TestLocationCache(unittest2.TestCase):
+    """
+    The urlfetch stub isn't initialized, so any external lookup would fail.
+    """
+    def setUp(self):
+        self.testbed = testbed.Testbed()
+        self.testbed.activate()
+        self.testbed.init_datastore_v3_stub()
+        self.testbed.init_memcache_stub()
+        ndb.get_context().clear_cache()  # Prevent data from leaking between tests
+
+        LocationHelper.store_location_result_async('geocode', 'San Jose, CA', [
+            {'geometry': {'location': {'lat': 37.3382082, 'lng': -121.8863286}}},
+        ]).get_result()
+        LocationHelper.store_location_result_async('geocode', 'somewhere on mars', []).get_result()
+        LocationHelper.store_location_result_async('timezone', '37.3382,-121.8863', 'America/Los_Angeles').get_result()
+
+    def tearDown(self):
+        self.testbed.deactivate()
+
+    def test_normalize_location_query(self):
+        self.assertEqual(LocationHelper.normalize_location_query('  San   Jose,\tCA '), u'san jose, ca')
+
+    def test_stored_geocode(self):
+        self.assertEqual(LocationHelper.get_lat_lng('san jose,  ca'), (37.3382082, -121.8863286))
+
+    def test_negative_geocode(self):
+        self.assertEqual(LocationHelper.get_lat_lng('Somewhere on Mars'), None)
+
+    def test_stored_timezone(self):
+        self.assertEqual(LocationHelper.get_timezone_id('San Jose, CA'), 'America/Los_Angeles')
+        self.assertEqual(LocationHelper.get_timezone_id(None, lat_lng=ndb.GeoPt(37.33821, -121.88633)), 'America/Los_Angeles')
+
+    def test_expired(self):
+        entry = LocationCacheEntry.get_by_id(LocationHelper._location_cache_key_name('geocode', 'San Jose, CA'))
+        entry.expires = datetime.datetime.utcnow() - datetime.timedelta(minutes=1)
+        entry.put()
+        self.assertEqual(LocationHelper.get_stored_location_result_async('geocode', 'San Jose, CA').get_result(), (False, None))
+
+    def test_delete_expired(self):
+        key = ndb.Key(LocationCacheEntry, LocationHelper._location_cache_key_name('geocode', 'San Jose, CA'))
+        entry = key.get()
+        entry.expires = datetime.datetime.utcnow() - datetime.timedelta(minutes=1)
+        entry.put()
+        self.assertEqual(LocationHelper.delete_expired_location_results(), 1)
+        self.assertEqual(key.get(), None)
+        self.assertEqual(LocationCacheEntry.query().count(), 2)
+
+    def test_prefetch_geocodes(self):
+        LocationHelper.prefetch_geocodes(['San Jose, CA', None, 'somewhere on mars'])
+        self.assertEqual(LocationHelper.get_lat_lng('San Jose, CA'), (37.3382082, -121.8863286))
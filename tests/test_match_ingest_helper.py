@@ -0,0 +1,89 @@
+import json
+import unittest2
+
+from google.appengine.ext import ndb
+from google.appengine.ext import testbed
+
+from consts.event_type import EventType
+from helpers.match_ingest_helper import MatchIngestHelper
+from models.event import Event
+from models.match import Match
+
+
+class FakeDatafeed(object):
+    def __init__(self, matches):
+        self.matches = matches
+
+    def getMatches(self, event_key):
+        return self.matches
+
+
+class TestMatchIngestHelper(unittest2.TestCase):
+    def setUp(self):
+        self.testbed = testbed.Testbed()
+        self.testbed.activate()
+        self.testbed.init_datastore_v3_stub()
+        self.testbed.init_memcache_stub()
+        ndb.get_context().clear_cache()  # Prevent data from leaking between tests
+
+        self.testbed.init_taskqueue_stub(root_path=".")
+        self.taskqueue_stub = self.testbed.get_stub(testbed.TASKQUEUE_SERVICE_NAME)
+
+        self.event = Event(id="2012ct", event_short="ct", year=2012, event_type_enum=EventType.REGIONAL)
+        self.event.put()
+
+        ndb.put_multi([
+            self._match('qm', 1, 1, -1, -1),
+            self._match('sf', 1, 1, 50, 20),
+            self._match('sf', 1, 3, -1, -1),
+        ])
+
+    def tearDown(self):
+        self.testbed.deactivate()
+
+    def _match(self, comp_level, set_number, match_number, red_score, blue_score):
+        return Match(
+            id=Match.renderKeyName(self.event.key.id(), comp_level, set_number, match_number),
+            alliances_json=json.dumps({
+                'red': {'score': red_score, 'teams': ['frc1', 'frc2', 'frc3']},
+                'blue': {'score': blue_score, 'teams': ['frc4', 'frc5', 'frc6']},
+            }),
+            comp_level=comp_level,
+            event=self.event.key,
+            year=2012,
+            set_number=set_number,
+            match_number=match_number,
+            team_key_names=['frc1', 'frc2', 'frc3', 'frc4', 'frc5', 'frc6'])
+
+    def test_ingest(self):
+        datafeed = FakeDatafeed([
+            self._match('qm', 1, 1, 30, 40),  # Scored
+            self._match('sf', 1, 1, 50, 20),  # Unchanged
+            self._match('sf', 1, 2, 60, 10),  # New
+            self._match('sf', 1, 3, -1, -1),  # Invalid and stored
+            self._match('sf', 1, 4, -1, -1),  # Invalid, never stored
+            self._match('sf', 2, 3, -1, -1),  # Valid
+        ])
+
+        merged_matches, updated_matches, deleted_matches = MatchIngestHelper.ingest(self.event, datafeed)
+
+        self.assertEqual(
+            sorted(match.key.id() for match in merged_matches),
+            ['2012ct_qm1', '2012ct_sf1m1', '2012ct_sf1m2', '2012ct_sf2m3'])
+        self.assertEqual(
+            sorted(match.key.id() for match in updated_matches),
+            ['2012ct_qm1', '2012ct_sf1m2', '2012ct_sf2m3'])
+        self.assertEqual([match.key.id() for match in deleted_matches], ['2012ct_sf1m3'])
+
+        self.assertEqual(Match.get_by_id('2012ct_qm1').alliances['red']['score'], 30)
+        self.assertEqual(Match.get_by_id('2012ct_sf1m3'), None)
+
+        # One post update hook run and one post delete hook run
+        self.assertEqual(len(self.taskqueue_stub.get_filtered_tasks(queue_names='post-update-hooks')), 2)
+
+    def test_ingest_unchanged(self):
+        datafeed = FakeDatafeed([self._match('qm', 1, 1, -1, -1)])
+        _, updated_matches, deleted_matches = MatchIngestHelper.ingest(self.event, datafeed)
+        self.assertEqual(updated_matches, [])
+        self.assertEqual(deleted_matches, [])
+        self.assertEqual(len(self.taskqueue_stub.get_filtered_tasks(queue_names='post-update-hooks')), 0)
@@ -0,0 +1,63 @@
+import datetime
+import unittest2
+
+from google.appengine.ext import ndb
+from google.appengine.ext import testbed
+
+from consts.event_type import EventType
+from helpers.model_summary_helper import ModelSummaryHelper
+from models.event import Event
+from models.match import Match
+from models.team import Team
+
+
+class TestModelSummaryHelper(unittest2.TestCase):
+    def setUp(self):
+        self.testbed = testbed.Testbed()
+        self.testbed.activate()
+        self.testbed.init_datastore_v3_stub()
+        self.testbed.init_memcache_stub()
+        ndb.get_context().clear_cache()  # Prevent data from leaking between tests
+
+        Team(id='frc254', team_number=254, nickname='The Cheesy Poofs', city='San Jose').put()
+        Event(id='2017casj', year=2017, event_short='casj', event_type_enum=EventType.REGIONAL,
+              name='Silicon Valley Regional', short_name='Silicon Valley', start_date=datetime.datetime(2017, 3, 29),
+              end_date=datetime.datetime(2017, 4, 1)).put()
+
+    def tearDown(self):
+        self.testbed.deactivate()
+
+    def test_get_summaries(self):
+        keys = [ndb.Key(Team, 'frc254'), ndb.Key(Team, 'frc9999'), ndb.Key(Event, '2017casj')]
+        for _ in xrange(2):  # Built, then cached
+            team, missing_team, event = ModelSummaryHelper.get_summaries(keys)
+            self.assertEqual(team.key, ndb.Key(Team, 'frc254'))
+            self.assertEqual(team.team_number, 254)
+            self.assertEqual(team.nickname, 'The Cheesy Poofs')
+            self.assertEqual(team.city, None)
+            self.assertEqual(missing_team, None)
+            self.assertEqual(event.short_name, 'Silicon Valley')
+            self.assertEqual(event.start_date, datetime.datetime(2017, 3, 29))
+
+    def test_clear(self):
+        ModelSummaryHelper.get_summaries([ndb.Key(Team, 'frc254')])
+        team = Team.get_by_id('frc254')
+        team.nickname = 'Poofs'
+        team.put()
+        self.assertEqual(ModelSummaryHelper.get_summaries([team.key])[0].nickname, 'The Cheesy Poofs')
+
+        ModelSummaryHelper.clear([team.key])
+        self.assertEqual(ModelSummaryHelper.get_summaries([team.key])[0].nickname, 'Poofs')
+
+    def test_match_summary(self):
+        match = ModelSummaryHelper.match_summary(ndb.Key(Match, '2017casj_qm12'))
+        self.assertEqual((match.event_key_name, match.year, match.comp_level, match.set_number, match.match_number),
+                         ('2017casj', 2017, 'qm', 1, 12))
+        self.assertEqual(match.verbose_name, 'Quals 12')
+
+        match = ModelSummaryHelper.match_summary(ndb.Key(Match, '2017micmp4_sf2m3'))
+        self.assertEqual((match.event_key_name, match.comp_level, match.set_number, match.match_number),
+                         ('2017micmp4', 'sf', 2, 3))
+        self.assertEqual(match.verbose_name, 'Semis 2 Match 3')
+
+        self.assertEqual(ModelSummaryHelper.match_summary(ndb.Key(Match, '2017casj_bogus')), None)
@@ -0,0 +1,85 @@
+import unittest2
+
+from google.appengine.ext import ndb
+from google.appengine.ext import testbed
+
+from consts.award_type import AwardType
+from consts.event_type import EventType
+from consts.model_type import ModelType
+from helpers.mytba_dashboard_helper import MyTBADashboardHelper
+from models.account import Account
+from models.award import Award
+from models.event import Event
+from models.event_team import EventTeam
+from models.favorite import Favorite
+from models.mytba_dashboard import MyTBADashboard
+from models.team import Team
+
+
+class TestMyTBADashboardHelper(unittest2.TestCase):
+    def setUp(self):
+        self.testbed = testbed.Testbed()
+        self.testbed.activate()
+        self.testbed.init_datastore_v3_stub()
+        self.testbed.init_memcache_stub()
+        ndb.get_context().clear_cache()  # Prevent data from leaking between tests
+
+        self.account_key = ndb.Key(Account, '42')
+        for team_key in ['frc254', 'frc604']:
+            Favorite(parent=self.account_key, user_id='42', model_key=team_key, model_type=ModelType.TEAM).put()
+        Favorite(parent=self.account_key, user_id='42', model_key='2017casj', model_type=ModelType.EVENT).put()
+
+        for event_key, team_key in [('2017casj', 'frc254'), ('2017casj', 'frc604'), ('2017cada', 'frc254'),
+                                    ('2017cada', 'frc1'), ('2016casj', 'frc254')]:
+            EventTeam(
+                id='{}_{}'.format(event_key, team_key),
+                event=ndb.Key(Event, event_key),
+                team=ndb.Key(Team, team_key),
+                year=int(event_key[:4])).put()
+
+        Award(
+            id='2017casj_1',
+            name_str='Regional Winner',
+            award_type_enum=AwardType.WINNER,
+            year=2017,
+            event=ndb.Key(Event, '2017casj'),
+            event_type_enum=EventType.REGIONAL,
+            team_list=[ndb.Key(Team, 'frc254'), ndb.Key(Team, 'frc604')]).put()
+
+    def tearDown(self):
+        self.testbed.deactivate()
+
+    def _dashboard_key(self, year):
+        return ndb.Key(MyTBADashboard, str(year), parent=self.account_key)
+
+    def test_build_dashboard(self):
+        dashboard = MyTBADashboardHelper.get_dashboard(self.account_key, 2017)
+        self.assertEqual(dashboard.year, 2017)
+        self.assertEqual(
+            sorted(event_team_key.id() for event_team_key in dashboard.event_team_keys),
+            ['2017cada_frc254', '2017casj_frc254', '2017casj_frc604'])
+        self.assertEqual(dashboard.award_keys, [ndb.Key(Award, '2017casj_1')])
+        self.assertTrue(self._dashboard_key(2017).get() is not None)
+
+    def test_clear_user(self):
+        MyTBADashboardHelper.get_dashboard(self.account_key, 2016)
+        MyTBADashboardHelper.get_dashboard(self.account_key, 2017)
+        MyTBADashboardHelper.clear_user(self.account_key)
+        self.assertEqual(MyTBADashboard.query(ancestor=self.account_key).count(), 0)
+
+    def test_clear_team_followers(self):
+        MyTBADashboardHelper.get_dashboard(self.account_key, 2016)
+        MyTBADashboardHelper.get_dashboard(self.account_key, 2017)
+
+        # Not a favorite team
+        MyTBADashboardHelper.clear_team_followers({2017: set(['frc1'])})
+        self.assertTrue(self._dashboard_key(2017).get() is not None)
+
+        MyTBADashboardHelper.clear_team_followers({2017: set(['frc1', 'frc604'])})
+        self.assertTrue(self._dashboard_key(2016).get() is not None)
+        self.assertTrue(self._dashboard_key(2017).get() is None)
+
+        # Rebuilt right after being cleared, so not saved
+        dashboard = MyTBADashboardHelper.get_dashboard(self.account_key, 2017)
+        self.assertEqual(len(dashboard.event_team_keys), 3)
+        self.assertTrue(self._dashboard_key(2017).get() is None)
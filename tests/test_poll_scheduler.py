@@ -0,0 +1,118 @@
+import datetime
+import json
+import unittest2
+
+from google.appengine.ext import ndb
+from google.appengine.ext import testbed
+
+from helpers.poll_scheduler import PollScheduler
+from models.event import Event
+from models.match import Match
+
+
+class TestPollScheduler(unittest2.TestCase):
+    def setUp(self):
+        self.testbed = testbed.Testbed()
+        self.testbed.activate()
+        self.testbed.init_datastore_v3_stub()
+        self.testbed.init_memcache_stub()
+        ndb.get_context().clear_cache()  # Prevent data from leaking between tests
+
+        self.events = [Event(id=event_key, year=2017, event_short=event_key[4:]) for event_key in ['2017casj', '2017cada']]
+        self.now = 1490000000.0
+
+    def tearDown(self):
+        self.testbed.deactivate()
+
+    def _event_keys(self, polls):
+        return [(event.key.id(), countdown) for event, countdown in polls]
+
+    def test_interval(self):
+        now = self.now
+        self.assertEqual(PollScheduler.interval('matches', {}, {}, now), 60)  # Unknown
+        self.assertEqual(PollScheduler.interval('matches', {}, {'last_change': now - 60}, now), 30)
+        self.assertEqual(PollScheduler.interval('matches', {}, {'next_match_time': now + 60}, now), 30)
+        self.assertEqual(PollScheduler.interval('matches', {}, {'next_match_time': now - 600}, now), 30)  # Running late
+        self.assertEqual(PollScheduler.interval('matches', {}, {'next_match_time': now + 20 * 60}, now), 10 * 60)  # Break
+        self.assertEqual(PollScheduler.interval('matches', {}, {'next_match_time': now + 12 * 60 * 60}, now), 30 * 60)  # Overnight
+        self.assertEqual(PollScheduler.interval('matches', {}, {'next_match_time': None}, now), 60)  # None scheduled
+        self.assertEqual(PollScheduler.interval('matches', {}, {'next_match_time': None}, now, ended=True), 30 * 60)
+        self.assertEqual(PollScheduler.interval('matches', {}, {'last_change': now - 60}, now, ended=True), 30)
+        self.assertEqual(PollScheduler.interval('matches', {'errors': 2}, {'next_match_time': now + 60}, now), 120)
+        self.assertEqual(PollScheduler.interval('matches', {'errors': 10}, {'next_match_time': now + 60}, now), 15 * 60)
+        self.assertEqual(PollScheduler.interval('matches', {'latency': 20}, {'next_match_time': now + 60}, now), 60)
+
+    def test_schedule(self):
+        PollScheduler.record_poll('matches', '2017casj', 1, changed=True, now=self.now - 60)
+
+        # Hot events are polled twice a tick
+        self.assertEqual(
+            sorted(self._event_keys(PollScheduler.schedule('matches', self.events, now=self.now))),
+            [('2017cada', 0), ('2017casj', 0), ('2017casj', 30)])
+
+        # Pending polls aren't piled onto
+        self.assertEqual(PollScheduler.schedule('matches', self.events, now=self.now + 60), [])
+
+        # The hot event, then the other at the cron cadence
+        PollScheduler.record_poll('matches', '2017casj', 1, now=self.now + 30)
+        PollScheduler.record_poll('matches', '2017cada', 1, now=self.now + 30)
+        self.assertEqual(
+            self._event_keys(PollScheduler.schedule('matches', self.events, now=self.now + 60)),
+            [('2017casj', 0), ('2017casj', 30), ('2017cada', 0)])
+
+        PollScheduler.record_poll('matches', '2017cada', 1, now=self.now + 90)
+        self.assertEqual(
+            self._event_keys(PollScheduler.schedule('matches', self.events, now=self.now + 120)),
+            [('2017cada', 0)])
+
+    def test_schedule_budget(self):
+        PollScheduler.record_poll('matches', '2017casj', 1, changed=True, now=self.now - 60)
+        budget = PollScheduler.REQUEST_BUDGET_PER_MINUTE
+        try:
+            PollScheduler.REQUEST_BUDGET_PER_MINUTE = 3 * PollScheduler.REQUESTS_PER_POLL['matches'] - 1
+            # The hot event first
+            self.assertEqual(
+                self._event_keys(PollScheduler.schedule('matches', self.events, now=self.now)),
+                [('2017casj', 0), ('2017casj', 30)])
+        finally:
+            PollScheduler.REQUEST_BUDGET_PER_MINUTE = budget
+
+    def test_record_poll_error(self):
+        PollScheduler.schedule('matches', self.events, now=self.now)
+        PollScheduler.record_poll('matches', '2017casj', 1, error=True, now=self.now)
+        PollScheduler.record_poll('matches', '2017cada', 1, now=self.now)
+        self.assertEqual(
+            self._event_keys(PollScheduler.schedule('matches', self.events, now=self.now + 60)),
+            [('2017cada', 0)])
+
+    def test_has_ended(self):
+        today = datetime.datetime.now()
+        self.assertFalse(PollScheduler.has_ended(self.events[0]))  # No dates
+        self.assertFalse(PollScheduler.has_ended(Event(id='2017casj', start_date=today - datetime.timedelta(days=2), end_date=today)))
+        self.assertTrue(PollScheduler.has_ended(Event(id='2017casj', start_date=today - datetime.timedelta(days=3), end_date=today - datetime.timedelta(days=1))))
+
+    def _played_match(self, match_id):
+        return Match(id=match_id, alliances_json=json.dumps({'red': {'score': 10, 'teams': []}, 'blue': {'score': 20, 'teams': []}}))
+
+    def test_between_quals_and_playoffs(self):
+        # Quals are over and the playoff schedule isn't posted yet, as during alliance selection
+        PollScheduler.record_matches('2017casj', [self._played_match('2017casj_qm1'), self._played_match('2017casj_qm2')])
+        for feed, cadence in [('matches', 60), ('rankings', 60), ('alliances', 5 * 60)]:
+            for tick in xrange(3):
+                now = self.now + tick * cadence
+                self.assertEqual(self._event_keys(PollScheduler.schedule(feed, self.events[:1], now=now)), [('2017casj', 0)])
+                PollScheduler.record_poll(feed, '2017casj', 1, now=now)
+
+    def test_record_matches(self):
+        match_time = datetime.datetime(2017, 3, 30, 16, 0)
+        matches = [
+            Match(id='2017casj_qm1', time=match_time - datetime.timedelta(minutes=7),
+                  alliances_json=json.dumps({'red': {'score': 10, 'teams': []}, 'blue': {'score': 20, 'teams': []}})),
+            Match(id='2017casj_qm2', time=match_time,
+                  alliances_json=json.dumps({'red': {'score': -1, 'teams': []}, 'blue': {'score': -1, 'teams': []}})),
+        ]
+        PollScheduler.record_matches('2017casj', matches)
+        now = (match_time - datetime.datetime(1970, 1, 1)).total_seconds()
+        self.assertEqual(
+            self._event_keys(PollScheduler.schedule('matches', self.events[:1], now=now)),
+            [('2017casj', 0), ('2017casj', 30)])
@@ -0,0 +1,58 @@
+import unittest2
+
+from google.appengine.api import search
+from google.appengine.ext import ndb
+from google.appengine.ext import testbed
+
+from helpers.search_helper import SearchHelper
+from models.event import Event
+from models.event_team import EventTeam
+from models.location import Location
+from models.team import Team
+
+
+class TestSearchHelper(unittest2.TestCase):
+    def setUp(self):
+        self.testbed = testbed.Testbed()
+        self.testbed.activate()
+        self.testbed.init_datastore_v3_stub()
+        self.testbed.init_memcache_stub()
+        self.testbed.init_search_stub()
+        ndb.get_context().clear_cache()  # Prevent data from leaking between tests
+
+        self.teams = [
+            Team(id='frc254', team_number=254, nickname='The Cheesy Poofs',
+                 normalized_location=Location(lat_lng=ndb.GeoPt(37.24, -121.83))),
+            Team(id='frc604', team_number=604, nickname='Quixilver',
+                 normalized_location=Location(lat_lng=ndb.GeoPt(37.22, -121.87))),
+            Team(id='frc9999', team_number=9999),  # No location
+        ]
+        for year in [2016, 2017]:
+            for team_key in ['frc254', 'frc604']:
+                EventTeam(
+                    id='{}casj_{}'.format(year, team_key),
+                    event=ndb.Key(Event, '{}casj'.format(year)),
+                    team=ndb.Key(Team, team_key),
+                    year=year).put()
+
+    def tearDown(self):
+        self.testbed.deactivate()
+
+    def test_update_team_location_index_multi(self):
+        SearchHelper.update_team_location_index_multi(self.teams)
+
+        index = search.Index(name=SearchHelper.TEAM_LOCATION_INDEX)
+        for team_key in ['frc254', 'frc604']:
+            self.assertNotEqual(index.get(team_key), None)
+            self.assertNotEqual(index.get('{}_2016'.format(team_key)), None)
+            self.assertNotEqual(index.get('{}_2017'.format(team_key)), None)
+        self.assertEqual(index.get('frc9999'), None)
+
+    def test_put_documents_batches(self):
+        documents = [search.Document(doc_id='doc{}'.format(i), fields=[search.NumberField(name='year', value=2017)])
+                     for i in xrange(SearchHelper.MAX_DOCUMENTS_PER_PUT * 2 + 1)]
+        SearchHelper._put_documents(SearchHelper.TEAM_LOCATION_INDEX, documents)
+
+        index = search.Index(name=SearchHelper.TEAM_LOCATION_INDEX)
+        response = index.get_range(limit=1000, ids_only=True)
+        self.assertEqual(len(response.results), len(documents))
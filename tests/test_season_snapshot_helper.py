@@ -0,0 +1,88 @@
+import datetime
+import json
+import numpy as np
+import unittest2
+
+from google.appengine.ext import ndb
+from google.appengine.ext import testbed
+
+from consts.event_type import EventType
+from helpers.season_snapshot_helper import SeasonSnapshot
+from models.compact_match import CompactMatch
+from models.event import Event
+from models.match import Match
+
+
+class TestSeasonSnapshot(unittest2.TestCase):
+    def setUp(self):
+        self.testbed = testbed.Testbed()
+        self.testbed.activate()
+        self.testbed.init_datastore_v3_stub()
+        self.testbed.init_memcache_stub()
+        ndb.get_context().clear_cache()  # Prevent data from leaking between tests
+
+        self.event_a = Event(id='2017casj', year=2017, event_short='casj', event_type_enum=EventType.REGIONAL,
+                             start_date=datetime.datetime(2017, 3, 1), end_date=datetime.datetime(2017, 3, 4), official=True)
+        self.event_b = Event(id='2017cada', year=2017, event_short='cada', event_type_enum=EventType.REGIONAL,
+                             start_date=datetime.datetime(2017, 3, 8), end_date=datetime.datetime(2017, 3, 11), official=True)
+        self.event_a.put()
+        self.event_b.put()
+
+        self.matches_a = [
+            self._match(self.event_a, 'qm', 1, ['frc254', 'frc604', 'frc8'], ['frc1', 'frc2', 'frc3'], 100, 90,
+                        {'red': {'foulPoints': 5, 'rotorRankingPointAchieved': True, 'tba_rpEarned': 2}, 'blue': {'foulPoints': 0}}),
+            self._match(self.event_a, 'qm', 2, ['frc1', 'frc604', 'frc8'], ['frc254', 'frc2', 'frc3'], None, None),
+        ]
+        self.matches_b = [
+            self._match(self.event_b, 'f', 1, ['frc9', 'frc254', 'frc1678'], ['frc5', 'frc6', 'frc7'], 50, 60),
+        ]
+
+    def tearDown(self):
+        self.testbed.deactivate()
+
+    def _match(self, event, comp_level, match_number, red, blue, red_score, blue_score, score_breakdown=None):
+        return CompactMatch.from_match(Match(
+            id=Match.renderKeyName(event.key.id(), comp_level, 1, match_number),
+            event=event.key,
+            year=event.year,
+            comp_level=comp_level,
+            set_number=1,
+            match_number=match_number,
+            team_key_names=red + blue,
+            alliances_json=json.dumps({
+                'red': {'teams': red, 'score': red_score},
+                'blue': {'teams': blue, 'score': blue_score},
+            }),
+            score_breakdown_json=json.dumps(score_breakdown) if score_breakdown else None,
+        ))
+
+    def _team_keys(self, snapshot, color):
+        teams = snapshot['teams']
+        return [[teams[i] for i in row if i >= 0] for row in snapshot['{}_teams'.format(color)]]
+
+    def test_build(self):
+        snapshot = SeasonSnapshot.build([(self.event_a, self.matches_a)])
+        self.assertEqual(len(snapshot), 2)
+        self.assertEqual(list(snapshot['event_keys']), ['2017casj'])
+        self.assertEqual(self._team_keys(snapshot, 'red'), [['frc254', 'frc604', 'frc8'], ['frc1', 'frc604', 'frc8']])
+        self.assertEqual(list(snapshot['red_scores']), [100, -1])
+        self.assertEqual(list(snapshot['comp_levels']), [Match.COMP_LEVELS.index('qm')] * 2)
+        self.assertEqual(snapshot['red_sb_foulPoints'][0], 5)
+        self.assertEqual(snapshot['red_sb_rotorRankingPointAchieved'][0], 1)
+        self.assertTrue(np.isnan(snapshot['red_sb_foulPoints'][1]))
+
+    def test_concatenate_round_trip(self):
+        snapshot = SeasonSnapshot.concatenate([
+            SeasonSnapshot.build([(self.event_a, self.matches_a)]),
+            SeasonSnapshot.build([(self.event_b, self.matches_b)]),
+        ])
+        snapshot = SeasonSnapshot.from_bytes(snapshot.to_bytes())
+
+        self.assertEqual(len(snapshot), 3)
+        self.assertEqual(list(snapshot['event_keys']), ['2017casj', '2017cada'])
+        self.assertEqual(list(snapshot['match_events']), [0, 0, 1])
+        self.assertEqual(list(snapshot['event_weeks']), [0, 1])
+        self.assertEqual(self._team_keys(snapshot, 'red')[2], ['frc9', 'frc254', 'frc1678'])
+        self.assertEqual(self._team_keys(snapshot, 'blue')[1], ['frc254', 'frc2', 'frc3'])
+        self.assertEqual(snapshot.score_breakdown_fields, ['foulPoints', 'rotorRankingPointAchieved'])
+        self.assertTrue(np.isnan(snapshot['blue_sb_foulPoints'][2]))
@@ -0,0 +1,84 @@
+import json
+import unittest2
+
+from google.appengine.ext import ndb
+from google.appengine.ext import testbed
+
+from database.dict_converters.team_converter import TeamConverter
+from helpers.team_list_summary_helper import TeamListSummaryHelper
+from models.event import Event
+from models.event_team import EventTeam
+from models.team import Team
+from models.team_list_summary import TeamListSummary
+
+
+class TestTeamListSummaryHelper(unittest2.TestCase):
+    def setUp(self):
+        self.testbed = testbed.Testbed()
+        self.testbed.activate()
+        self.testbed.init_datastore_v3_stub()
+        self.testbed.init_memcache_stub()
+        ndb.get_context().clear_cache()  # Prevent data from leaking between tests
+        TeamListSummaryHelper._preloaded.clear()
+
+        self.teams = [
+            Team(id='frc254', team_number=254, nickname='The Cheesy Poofs', city='San Jose', state_prov='CA', country='USA', rookie_year=1999),
+            Team(id='frc604', team_number=604, nickname='Quixilver', city='San Jose', state_prov='CA', country='USA'),
+            Team(id='frc1', team_number=1, nickname='The Juggernauts'),
+        ]
+        ndb.put_multi(self.teams)
+
+        self.event_teams = [
+            EventTeam(id='2017casj_frc254', event=ndb.Key(Event, '2017casj'), team=ndb.Key(Team, 'frc254'), year=2017),
+            EventTeam(id='2017cada_frc254', event=ndb.Key(Event, '2017cada'), team=ndb.Key(Team, 'frc254'), year=2017),
+            EventTeam(id='2016casj_frc1', event=ndb.Key(Event, '2016casj'), team=ndb.Key(Team, 'frc1'), year=2016),
+        ]
+        ndb.put_multi(self.event_teams)
+
+    def tearDown(self):
+        self.testbed.deactivate()
+
+    def assertSameJson(self, teams, expected):
+        # Pages are stored as JSON, which turns int keys like home_championship's years into strings
+        self.assertEqual(json.dumps(teams, sort_keys=True), json.dumps(expected, sort_keys=True))
+
+    def test_get_page(self):
+        for _ in xrange(2):  # Built, then preloaded
+            teams, last_modified = TeamListSummaryHelper.get_page(0)
+            self.assertSameJson(teams, TeamConverter.convert([self.teams[2], self.teams[0]], 3))
+            self.assertTrue(last_modified is not None)
+
+        self.assertSameJson(TeamListSummaryHelper.get_page(1)[0], TeamConverter.convert([self.teams[1]], 3))
+        self.assertEqual(TeamListSummaryHelper.get_page(2)[0], [])
+        self.assertTrue(TeamListSummary.get_by_id('page_2') is None)
+
+    def test_get_page_year(self):
+        self.assertEqual([converted_team['key'] for converted_team in TeamListSummaryHelper.get_page(0, 2017)[0]], ['frc254'])
+        self.assertEqual([converted_team['key'] for converted_team in TeamListSummaryHelper.get_page(0, 2016)[0]], ['frc1'])
+        self.assertEqual(TeamListSummaryHelper.get_page(1, 2017)[0], [])
+
+    def test_update_teams(self):
+        TeamListSummaryHelper.get_page(0)
+        team = Team(id='frc2', team_number=2, nickname='Team 2')
+        self.teams[0].nickname = 'Poofs'
+        TeamListSummaryHelper.update_teams([team, self.teams[0]])
+
+        teams = TeamListSummaryHelper.get_page(0)[0]
+        self.assertEqual([converted_team['key'] for converted_team in teams], ['frc1', 'frc2', 'frc254'])
+        self.assertEqual(teams[2]['nickname'], 'Poofs')
+
+        TeamListSummaryHelper.remove_teams([team])
+        self.assertEqual([converted_team['key'] for converted_team in TeamListSummaryHelper.get_page(0)[0]], ['frc1', 'frc254'])
+
+    def test_update_event_teams(self):
+        TeamListSummaryHelper.get_page(0, 2017)
+        event_team = EventTeam(id='2017casj_frc1', event=ndb.Key(Event, '2017casj'), team=ndb.Key(Team, 'frc1'), year=2017)
+        event_team.put()
+        TeamListSummaryHelper.add_event_teams([event_team])
+        self.assertEqual([converted_team['key'] for converted_team in TeamListSummaryHelper.get_page(0, 2017)[0]], ['frc1', 'frc254'])
+
+        # frc254 is still at 2017cada
+        self.event_teams[0].key.delete()
+        event_team.key.delete()
+        TeamListSummaryHelper.remove_event_teams([self.event_teams[0], event_team])
+        self.assertEqual([converted_team['key'] for converted_team in TeamListSummaryHelper.get_page(0, 2017)[0]], ['frc254'])
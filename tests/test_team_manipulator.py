@@ -3,6 +3,9 @@ import unittest2
 from google.appengine.ext import ndb
 from google.appengine.ext import testbed
 
+from helpers.geo_index_helper import GeoIndexHelper
+from helpers.location_helper import LocationHelper
+from helpers.search_helper import SearchHelper
 from helpers.team_manipulator import TeamManipulator
 from models.team import Team
 
@@ -74,3 +77,39 @@ class TestTeamManipulator(unittest2.TestCase):
         team = Team.get_by_id("frc%s" % (number - 1))
         self.assertEqual(team.key_name, "frc%s" % (number - 1))
         self.assertEqual(team.team_number, number - 1)
+
+    def test_postUpdateHook_relocated_teams(self):
+        located = []
+        indexed = []
+        geo_indexed = []
+        update_team_location = LocationHelper.__dict__['update_team_location']
+        update_team_location_index_multi = SearchHelper.__dict__['update_team_location_index_multi']
+        update_team_locations = GeoIndexHelper.__dict__['update_team_locations']
+        try:
+            LocationHelper.update_team_location = classmethod(lambda cls, team: located.append(team.key.id()))
+            SearchHelper.update_team_location_index_multi = classmethod(
+                lambda cls, teams: indexed.extend(team.key.id() for team in teams))
+            GeoIndexHelper.update_team_locations = classmethod(
+                lambda cls, teams: geo_indexed.extend(team.key.id() for team in teams))
+
+            self.old_team.city = 'Manchester'
+            self.old_team.put()
+            renamed_team = Team(id="frc254", team_number=254, nickname="The Cheesy Poofs", city="San Jose")
+            renamed_team.put()
+            new_team = Team(id="frc9999", team_number=9999, city="Denver")
+
+            relocated_team = TeamManipulator.updateMerge(Team(id="frc177", team_number=177, city="South Windsor"), self.old_team)
+            renamed_team = TeamManipulator.updateMerge(Team(id="frc254", team_number=254, nickname="Poofs"), renamed_team)
+            TeamManipulator.postUpdateHook(
+                [relocated_team, renamed_team, new_team],
+                [relocated_team._updated_attrs, renamed_team._updated_attrs, []],
+                [False, False, True])
+        finally:
+            LocationHelper.update_team_location = update_team_location
+            SearchHelper.update_team_location_index_multi = update_team_location_index_multi
+            GeoIndexHelper.update_team_locations = update_team_locations
+
+        # Only the relocated and new teams are geocoded and indexed
+        self.assertEqual(located, ['frc177', 'frc9999'])
+        self.assertEqual(indexed, ['frc177', 'frc9999'])
+        self.assertEqual(geo_indexed, ['frc177', 'frc9999'])
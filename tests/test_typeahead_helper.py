@@ -0,0 +1,143 @@
+import json
+import unittest2
+
+from google.appengine.ext import ndb
+from google.appengine.ext import testbed
+
+from helpers.typeahead_helper import TypeaheadHelper, TypeaheadIndex
+from models.event import Event
+from models.team import Team
+from models.typeahead_entry import TypeaheadEntry
+
+
+class TestTypeaheadHelper(unittest2.TestCase):
+    def setUp(self):
+        self.testbed = testbed.Testbed()
+        self.testbed.activate()
+        self.testbed.init_datastore_v3_stub()
+        self.testbed.init_memcache_stub()
+        ndb.get_context().clear_cache()  # Prevent data from leaking between tests
+
+    def tearDown(self):
+        self.testbed.deactivate()
+
+    def _get_data(self, key_name):
+        return json.loads(TypeaheadEntry.get_by_id(key_name).data_json)
+
+    def test_team_typeaheads(self):
+        TypeaheadHelper.update_team_typeaheads([
+            Team(id='frc254', team_number=254, nickname='The Cheesy Poofs'),
+            Team(id='frc9', team_number=9),
+        ])
+        TypeaheadHelper.update_team_typeaheads([Team(id='frc1114', team_number=1114, nickname='Simbotics')])
+        self.assertEqual(self._get_data(TypeaheadEntry.ALL_TEAMS_KEY), [
+            '9 | Team 9',
+            '254 | The Cheesy Poofs',
+            '1114 | Simbotics',
+        ])
+
+        # Renaming replaces the old entry
+        TypeaheadHelper.update_team_typeaheads([Team(id='frc9', team_number=9, nickname='Nine')])
+        self.assertEqual(self._get_data(TypeaheadEntry.ALL_TEAMS_KEY), [
+            '9 | Nine',
+            '254 | The Cheesy Poofs',
+            '1114 | Simbotics',
+        ])
+
+        TypeaheadHelper.remove_team_typeaheads([Team(id='frc254', team_number=254)])
+        self.assertEqual(self._get_data(TypeaheadEntry.ALL_TEAMS_KEY), [
+            '9 | Nine',
+            '1114 | Simbotics',
+        ])
+
+    def test_event_typeaheads(self):
+        events = [
+            Event(id='2016casj', year=2016, event_short='casj', name='Silicon Valley Regional'),
+            Event(id='2017casj', year=2017, event_short='casj', name='Silicon Valley Regional'),
+            Event(id='2017cada', year=2017, event_short='cada', name='Sacramento Regional'),
+        ]
+        TypeaheadHelper.update_event_typeaheads(events)
+        TypeaheadHelper.update_event_typeaheads(events[:1])  # No duplicates
+        self.assertEqual(self._get_data(TypeaheadEntry.ALL_EVENTS_KEY), [
+            '2017 Sacramento Regional [CADA]',
+            '2017 Silicon Valley Regional [CASJ]',
+            '2016 Silicon Valley Regional [CASJ]',
+        ])
+        self.assertEqual(self._get_data(TypeaheadEntry.YEAR_EVENTS_KEY.format(2016)), [
+            '2016 Silicon Valley Regional [CASJ]',
+        ])
+
+        TypeaheadHelper.remove_event_typeaheads(events[:1])
+        self.assertEqual(TypeaheadEntry.get_by_id(TypeaheadEntry.YEAR_EVENTS_KEY.format(2016)), None)
+        self.assertEqual(self._get_data(TypeaheadEntry.ALL_EVENTS_KEY), [
+            '2017 Sacramento Regional [CADA]',
+            '2017 Silicon Valley Regional [CASJ]',
+        ])
+
+    def test_sort_entry_data_matches_merge(self):
+        data = ['254 | The Cheesy Poofs', '9 | Team 9', '254 | The Cheesy Poofs']
+        self.assertEqual(
+            TypeaheadHelper.sort_entry_data(TypeaheadEntry.ALL_TEAMS_KEY, data),
+            TypeaheadHelper._merge_entry_data(TypeaheadEntry.ALL_TEAMS_KEY, [], data, set()))
+
+        # A district renamed across years
+        data = ['FIRST In Michigan District [FIM]', 'Chesapeake District [CHS]', 'Michigan District [FIM]']
+        self.assertEqual(
+            TypeaheadHelper.sort_entry_data(TypeaheadEntry.ALL_DISTRICTS_KEY, data),
+            ['Chesapeake District [CHS]', 'FIRST In Michigan District [FIM]'])
+        self.assertEqual(
+            TypeaheadHelper.sort_entry_data(TypeaheadEntry.ALL_DISTRICTS_KEY, data),
+            TypeaheadHelper._merge_entry_data(TypeaheadEntry.ALL_DISTRICTS_KEY, [], data, set()))
+
+    def test_search_keys(self):
+        TypeaheadHelper._index_cache.clear()
+        TypeaheadHelper.update_team_typeaheads([Team(id='frc254', team_number=254, nickname='The Cheesy Poofs')])
+        self.assertEqual(TypeaheadHelper.search(TypeaheadEntry.ALL_TEAMS_KEY, 'chee', 10), ['254 | The Cheesy Poofs'])
+
+        for search_key in [TypeaheadEntry.ALL_EVENTS_KEY, TypeaheadEntry.ALL_DISTRICTS_KEY, TypeaheadEntry.YEAR_EVENTS_KEY.format(2017)]:
+            self.assertTrue(TypeaheadHelper.is_search_key(search_key))
+
+        # Unknown keys aren't looked up or cached
+        for search_key in ['teams-allx', 'events-17', 'anything']:
+            self.assertFalse(TypeaheadHelper.is_search_key(search_key))
+            self.assertEqual(TypeaheadHelper.search(search_key, 'chee', 10), [])
+        self.assertEqual(TypeaheadHelper._index_cache.keys(), [TypeaheadEntry.ALL_TEAMS_KEY])
+
+
+class TestTypeaheadIndex(unittest2.TestCase):
+    def setUp(self):
+        self.index = TypeaheadIndex.build([
+            '25 | Raider Robotix',
+            '254 | The Cheesy Poofs',
+            '1114 | Simbotics',
+            '2056 | OP Robotics',
+            u'3940 | CyberTooth Z\xfcrich',
+        ])
+
+    def test_prefix(self):
+        self.assertEqual(self.index.search('25', 10), ['25 | Raider Robotix', '254 | The Cheesy Poofs'])
+        self.assertEqual(self.index.search('cheesy', 10), ['254 | The Cheesy Poofs'])
+        self.assertEqual(self.index.search('zur', 10), [u'3940 | CyberTooth Z\xfcrich'])
+
+    def test_multiple_words(self):
+        self.assertEqual(self.index.search('op rob', 10), ['2056 | OP Robotics'])
+        self.assertEqual(self.index.search('rob', 10), ['25 | Raider Robotix', '2056 | OP Robotics'])
+        self.assertEqual(self.index.search('rob', 1), ['25 | Raider Robotix'])
+        self.assertEqual(self.index.search('poofs cheesy', 10), ['254 | The Cheesy Poofs'])
+        self.assertEqual(self.index.search('cheesy simbotics', 10), [])
+
+    def test_ranking(self):
+        index = TypeaheadIndex.build([
+            '9 | Robot Army',
+            '10 | Rob',
+            '11 | Rob Roy',
+            '119 | Team 119',
+        ])
+        # Entries starting with the query rank first, then exact word matches
+        self.assertEqual(index.search('rob', 10), ['10 | Rob', '11 | Rob Roy', '9 | Robot Army'])
+        self.assertEqual(index.search('119', 10), ['119 | Team 119'])
+        self.assertEqual(index.search('11', 10), ['11 | Rob Roy', '119 | Team 119'])
+
+    def test_serialize(self):
+        index = TypeaheadIndex.deserialize(self.index.serialize())
+        self.assertEqual(index.search('si', 10), ['1114 | Simbotics'])
@@ -0,0 +1,66 @@
+import time
+import unittest2
+
+from google.appengine.api import memcache
+from google.appengine.ext import ndb
+from google.appengine.ext import testbed
+
+from helpers.webcast_online_helper import WebcastOnlineHelper
+
+
+class TestWebcastOnlineHelper(unittest2.TestCase):
+    """
+    The urlfetch stub isn't initialized, so any status lookup would fail.
+    """
+    def setUp(self):
+        self.testbed = testbed.Testbed()
+        self.testbed.activate()
+        self.testbed.init_datastore_v3_stub()
+        self.testbed.init_memcache_stub()
+        self.testbed.init_taskqueue_stub(root_path=".")
+        self.taskqueue_stub = self.testbed.get_stub(testbed.TASKQUEUE_SERVICE_NAME)
+        ndb.get_context().clear_cache()  # Prevent data from leaking between tests
+
+    def tearDown(self):
+        self.testbed.deactivate()
+
+    def _cache_status(self, webcast, status, stream_title, fresh_until):
+        memcache.set(WebcastOnlineHelper._memcache_key(webcast), {
+            'status': status,
+            'stream_title': stream_title,
+            'fresh_until': fresh_until,
+        })
+
+    def test_cached(self):
+        webcasts = [
+            {'type': 'twitch', 'channel': 'firstinspires'},
+            {'type': 'youtube', 'channel': 'abc123'},
+            {'type': 'twitch', 'channel': 'firstinspires'},
+        ]
+        self._cache_status(webcasts[0], 'online', 'Einstein', time.time() + 60)
+        self._cache_status(webcasts[1], 'offline', None, time.time() + 60)
+
+        WebcastOnlineHelper.add_online_status(webcasts)
+        self.assertEqual([webcast['status'] for webcast in webcasts], ['online', 'offline', 'online'])
+        self.assertEqual(webcasts[2]['stream_title'], 'Einstein')
+        self.assertEqual(len(self.taskqueue_stub.get_filtered_tasks(queue_names='default')), 0)
+
+    def test_stale(self):
+        webcast = {'type': 'twitch', 'channel': 'firstinspires'}
+        self._cache_status(webcast, 'online', 'Einstein', time.time() - 60)
+
+        # Stale statuses are served while a single task refreshes them
+        WebcastOnlineHelper.add_online_status([webcast])
+        self.assertEqual(webcast['status'], 'online')
+        WebcastOnlineHelper.add_online_status([dict(webcast)])
+        self.assertEqual(len(self.taskqueue_stub.get_filtered_tasks(queue_names='default')), 1)
+
+    def test_unsupported(self):
+        webcasts = [{'type': 'livestream', 'channel': '123', 'file': '456'}]
+        WebcastOnlineHelper.add_online_status(webcasts)
+        self.assertEqual(webcasts[0]['status'], 'unknown')
+        self.assertEqual(webcasts[0]['stream_title'], None)
+
+        cached_status = memcache.get(WebcastOnlineHelper._memcache_key(webcasts[0]))
+        self.assertEqual(cached_status['status'], 'unknown')
+        self.assertTrue(cached_status['fresh_until'] > time.time())
@@ -0,0 +1,155 @@
+# benchmark_event_match_index.py
+#
+# Compares organizing an event's matches for every team status (as
+# EventTeamStatusCalcDo does) and for the event page, using the original
+# per-call MatchHelper.organizeMatches/upcomingMatches/recentMatches
+# against a single cached EventMatchIndex. Checks that both agree.
+#
+# python utils/benchmark_event_match_index.py -s /usr/local/google_appengine -q 120
+
+
+import json
+import os
+import random
+import sys
+import time
+from optparse import OptionParser
+
+
+def original_organize_matches(MatchHelper, Match, match_list):
+    """
+    MatchHelper.organizeMatches as it was, draining the sorted list with pop(0)
+    """
+    match_list = MatchHelper.natural_sort_matches(match_list)
+    matches = dict([(comp_level, list()) for comp_level in Match.COMP_LEVELS])
+    matches["num"] = len(match_list)
+    while len(match_list) > 0:
+        match = match_list.pop(0)
+        matches[match.comp_level].append(match)
+    return matches
+
+
+def make_event(Event, Match, num_teams, num_quals, seed):
+    rng = random.Random(seed)
+    event = Event(id='2017bench', year=2017, event_short='bench')
+    teams = ['frc{}'.format(team_number) for team_number in rng.sample(xrange(1, 7000), num_teams)]
+
+    schedule = [('qm', 1, match_number) for match_number in xrange(1, num_quals + 1)]
+    for set_number in xrange(1, 5):
+        schedule += [('qf', set_number, match_number) for match_number in xrange(1, 4)]
+    for set_number in xrange(1, 3):
+        schedule += [('sf', set_number, match_number) for match_number in xrange(1, 4)]
+    schedule += [('f', 1, match_number) for match_number in xrange(1, 4)]
+    num_played = len(schedule) * 2 / 3  # Mid-event
+
+    matches = []
+    for i, (comp_level, set_number, match_number) in enumerate(schedule):
+        match_teams = rng.sample(teams, 6)
+        played = i < num_played
+        alliances = {
+            'red': {'teams': match_teams[:3], 'score': rng.randint(0, 300) if played else -1, 'surrogates': []},
+            'blue': {'teams': match_teams[3:], 'score': rng.randint(0, 300) if played else -1, 'surrogates': []},
+        }
+        matches.append(Match(
+            id=Match.renderKeyName(event.key.id(), comp_level, set_number, match_number),
+            event=event.key,
+            year=2017,
+            comp_level=comp_level,
+            set_number=set_number,
+            match_number=match_number,
+            team_key_names=match_teams,
+            alliances_json=json.dumps(alliances)))
+    rng.shuffle(matches)  # Queries don't return matches in order
+    event._matches = matches
+    return event, teams
+
+
+def keys(matches):
+    return [match.key_name for match in matches]
+
+
+def run_original(MatchHelper, Match, event, teams):
+    statuses = {}
+    for team_key in teams:
+        team_matches = [m for m in event.matches if team_key in m.team_key_names]
+        next_match = MatchHelper.upcomingMatches(team_matches, num=1)
+        last_match = MatchHelper.recentMatches(team_matches, num=1)
+        organized = original_organize_matches(MatchHelper, Match, event.matches)
+        statuses[team_key] = (keys(next_match), keys(last_match), keys(organized['qm']))
+
+    organized = original_organize_matches(MatchHelper, Match, event.matches)
+    page = (
+        dict((comp_level, keys(organized[comp_level])) for comp_level in Match.COMP_LEVELS),
+        keys(MatchHelper.recentMatches(event.matches)),
+        keys(MatchHelper.upcomingMatches(event.matches)),
+    )
+    return statuses, page
+
+
+def run_index(Match, event, teams):
+    event._match_index = None  # Start each request with a fresh event
+    statuses = {}
+    for team_key in teams:
+        match_index = event.match_index
+        next_match = match_index.next_match(team_key)
+        last_match = match_index.last_match(team_key)
+        statuses[team_key] = (
+            keys([next_match] if next_match else []),
+            keys([last_match] if last_match else []),
+            keys(match_index.organized['qm']))
+
+    match_index = event.match_index
+    page = (
+        dict((comp_level, keys(match_index.organized[comp_level])) for comp_level in Match.COMP_LEVELS),
+        keys(match_index.recent_matches()),
+        keys(match_index.upcoming_matches()),
+    )
+    return statuses, page
+
+
+def main(sdk_path, num_teams, num_quals, num_requests):
+    sys.path.insert(0, sdk_path)
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+    import dev_appserver
+    dev_appserver.fix_sys_path()
+
+    from google.appengine.ext import testbed
+    tb = testbed.Testbed()
+    tb.activate()
+    tb.init_datastore_v3_stub()
+    tb.init_memcache_stub()
+
+    from helpers.match_helper import MatchHelper
+    from models.event import Event
+    from models.match import Match
+
+    event, teams = make_event(Event, Match, num_teams, num_quals, seed=0)
+    for match in event.matches:
+        match.alliances  # Decode JSON up front so only organizing is timed
+
+    start = time.time()
+    for _ in xrange(num_requests):
+        original = run_original(MatchHelper, Match, event, teams)
+    original_time = (time.time() - start) / num_requests
+
+    start = time.time()
+    for _ in xrange(num_requests):
+        current = run_index(Match, event, teams)
+    current_time = (time.time() - start) / num_requests
+
+    print "{} matches, {} teams".format(len(event.matches), num_teams)
+    print "Original: {:.1f}ms per request".format(original_time * 1000)
+    print "Index:    {:.1f}ms per request ({:.1f}x)".format(current_time * 1000, original_time / current_time)
+    print "Identical results: {}".format(original == current)
+
+    tb.deactivate()
+
+
+if __name__ == '__main__':
+    parser = OptionParser()
+    parser.add_option('-s', '--sdk_path', dest='sdk_path', default='/usr/local/google_appengine')
+    parser.add_option('-t', '--teams', dest='teams', type='int', default=40)
+    parser.add_option('-q', '--quals', dest='quals', type='int', default=120)
+    parser.add_option('-r', '--requests', dest='requests', type='int', default=20)
+    options, _ = parser.parse_args()
+    main(options.sdk_path, options.teams, options.quals, options.requests)
@@ -0,0 +1,96 @@
+# benchmark_location_similarity.py
+#
+# Compares LocationHelper.get_similarity against the original
+# four-SequenceMatcher implementation on a synthetic set of teams,
+# checking that both make the same ranking decisions.
+#
+# python utils/benchmark_location_similarity.py -s /usr/local/google_appengine -n 10000
+
+import os
+import random
+import re
+import sys
+import time
+from difflib import SequenceMatcher
+from optparse import OptionParser
+
+WORDS = ['high', 'school', 'academy', 'robotics', 'technical', 'central', 'north', 'south',
+         'east', 'west', 'county', 'regional', 'magnet', 'charter', 'engineering', 'science',
+         'lincoln', 'washington', 'jefferson', 'roosevelt', 'kennedy', 'valley', 'lake', 'river',
+         'university', 'institute', 'community', 'college', 'st.', 'mary\'s', 'catholic', 'prep']
+
+
+def original_similarity(a, b):
+    a = a.lower().strip()
+    b = b.lower().strip()
+
+    a_split = filter(lambda x: x, re.split('\s+|,|-', a))
+    b_split = filter(lambda x: x, re.split('\s+|,|-', b))
+    a_sorted = ' '.join(sorted(a_split))
+    b_sorted = ' '.join(sorted(b_split))
+    a_acr = ''.join([w[0] if w else '' for w in a_split]).lower()
+    b_acr = ''.join([w[0] if w else '' for w in b_split]).lower()
+
+    return max([
+        SequenceMatcher(None, a, b).ratio(),
+        SequenceMatcher(None, a_sorted, b_sorted).ratio(),
+        SequenceMatcher(None, a_acr, b).ratio(),
+        SequenceMatcher(None, a, b_acr).ratio(),
+    ])
+
+
+def random_name(rng):
+    return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(2, 5))).title()
+
+
+def make_corpus(num_teams, candidates_per_team, seed):
+    """
+    Each team has a query name and candidate place names, like a Places search
+    """
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(num_teams):
+        query = random_name(rng)
+        candidates = [random_name(rng) for _ in range(candidates_per_team - 1)]
+        words = query.split()
+        rng.shuffle(words)
+        candidates.insert(rng.randint(0, len(candidates)), ' '.join(words))  # A reordered true match
+        corpus.append((query, candidates))
+    return corpus
+
+
+def best_candidates(similarity, corpus):
+    return [max(range(len(candidates)), key=lambda i: similarity(query, candidates[i])) for query, candidates in corpus]
+
+
+def main(sdk_path, num_teams, candidates_per_team):
+    sys.path.insert(0, sdk_path)
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+    import dev_appserver
+    dev_appserver.fix_sys_path()
+
+    from helpers.location_helper import LocationHelper
+
+    corpus = make_corpus(num_teams, candidates_per_team, seed=0)
+
+    start = time.time()
+    original = best_candidates(original_similarity, corpus)
+    original_time = time.time() - start
+
+    start = time.time()
+    current = best_candidates(LocationHelper.get_similarity, corpus)
+    current_time = time.time() - start
+
+    print "{} teams x {} candidates".format(num_teams, candidates_per_team)
+    print "Original: {:.2f}s".format(original_time)
+    print "Current:  {:.2f}s ({:.1f}x)".format(current_time, original_time / current_time)
+    print "Same ranking decisions: {}".format(original == current)
+
+
+if __name__ == '__main__':
+    parser = OptionParser()
+    parser.add_option('-s', '--sdk_path', dest='sdk_path', default='/usr/local/google_appengine')
+    parser.add_option('-n', '--num_teams', dest='num_teams', type='int', default=10000)
+    parser.add_option('-c', '--candidates', dest='candidates', type='int', default=5)
+    options, _ = parser.parse_args()
+    main(options.sdk_path, options.num_teams, options.candidates)
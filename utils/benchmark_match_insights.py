@@ -0,0 +1,329 @@
+# benchmark_match_insights.py
+#
+# Compares InsightsHelper's match insight calculations against the original
+# per-insight loops on a synthetic full season, checking that both produce
+# identical Insights.
+#
+# python utils/benchmark_match_insights.py -s /usr/local/google_appengine -y 2017
+
+import json
+import math
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from optparse import OptionParser
+
+
+def make_original_insights_helper(InsightsHelper, Insight, Match):
+    """
+    InsightsHelper with the original match insight calculations
+    """
+    class OriginalInsightsHelper(InsightsHelper):
+        @classmethod
+        def _calculateHighscoreMatchesByWeek(self, week_event_matches, year):
+            """
+            Returns an Insight where the data is a list of tuples:
+            (week string, list of highest scoring matches)
+            """
+            highscore_matches_by_week = []  # tuples: week, list of matches (if there are ties)
+            for week, week_events in week_event_matches:
+                week_highscore_matches = []
+                highscore = 0
+                for event, matches in week_events:
+                    for match in matches:
+                        redScore = int(match.alliances['red']['score'])
+                        blueScore = int(match.alliances['blue']['score'])
+                        maxScore = max(redScore, blueScore)
+                        if maxScore >= highscore:
+                            if maxScore > highscore:
+                                week_highscore_matches = []
+                            week_highscore_matches.append(self._generateMatchData(match, event))
+                            highscore = maxScore
+                highscore_matches_by_week.append((week, week_highscore_matches))
+
+            insight = None
+            if highscore_matches_by_week != []:
+                insight = self._createInsight(highscore_matches_by_week, Insight.INSIGHT_NAMES[Insight.MATCH_HIGHSCORE_BY_WEEK], year)
+            if insight is not None:
+                return [insight]
+            else:
+                return []
+
+        @classmethod
+        def _calculateHighscoreMatches(self, week_event_matches, year):
+            """
+            Returns an Insight where the data is list of highest scoring matches
+            """
+            highscore_matches = {
+                'qual': [],
+                'playoff': [],
+                'overall': [],
+            }  # dict of list of matches (if there are ties)
+            highscore = {
+                'qual': 0,
+                'playoff': 0,
+                'overall': 0,
+            }
+            for _, week_events in week_event_matches:
+                for event, matches in week_events:
+                    for match in matches:
+                        comp_level = 'qual' if match.comp_level == 'qm' else 'playoff'
+                        match_data = self._generateMatchData(match, event)
+
+                        redScore = int(match.alliances['red']['score'])
+                        blueScore = int(match.alliances['blue']['score'])
+
+                        # Overall, including penalties
+                        maxScore = max(redScore, blueScore)
+                        if maxScore >= highscore['overall']:
+                            if maxScore > highscore['overall']:
+                                highscore_matches['overall'] = []
+                            highscore_matches['overall'].append(match_data)
+                            highscore['overall'] = maxScore
+
+                        # Penalty free, if possible
+                        if year >= 2017:
+                            if match.score_breakdown:
+                                redScore -= match.score_breakdown['red'].get('foulPoints', 0)
+                                blueScore -= match.score_breakdown['blue'].get('foulPoints', 0)
+
+                        maxScore = max(redScore, blueScore)
+                        if maxScore >= highscore[comp_level]:
+                            if maxScore > highscore[comp_level]:
+                                highscore_matches[comp_level] = []
+                            highscore_matches[comp_level].append(match_data)
+                            highscore[comp_level] = maxScore
+
+            insight = None
+            if highscore_matches != []:
+                insight = self._createInsight(highscore_matches, Insight.INSIGHT_NAMES[Insight.MATCH_HIGHSCORE], year)
+            if insight is not None:
+                return [insight]
+            else:
+                return []
+
+        @classmethod
+        def _calculateMatchAveragesByWeek(self, week_event_matches, year):
+            """
+            Returns a list of Insights, one for all data and one for elim data
+            The data for each Insight is a list of tuples:
+            (week string, match averages)
+            """
+            match_averages_by_week = []  # tuples: week, average score
+            elim_match_averages_by_week = []  # tuples: week, average score
+            for week, week_events in week_event_matches:
+                week_match_sum = 0
+                num_matches_by_week = 0
+                elim_week_match_sum = 0
+                elim_num_matches_by_week = 0
+                for _, matches in week_events:
+                    for match in matches:
+                        if not match.has_been_played:
+                            continue
+                        redScore = int(match.alliances['red']['score'])
+                        blueScore = int(match.alliances['blue']['score'])
+                        week_match_sum += redScore + blueScore
+                        num_matches_by_week += 1
+                        if match.comp_level in Match.ELIM_LEVELS:
+                            elim_week_match_sum += redScore + blueScore
+                            elim_num_matches_by_week += 1
+
+                if num_matches_by_week != 0:
+                    week_average = float(week_match_sum) / num_matches_by_week / 2
+                    match_averages_by_week.append((week, week_average))
+
+                if elim_num_matches_by_week != 0:
+                    elim_week_average = float(elim_week_match_sum) / elim_num_matches_by_week / 2
+                    elim_match_averages_by_week.append((week, elim_week_average))
+
+            insights = []
+            if match_averages_by_week != []:
+                insights.append(self._createInsight(match_averages_by_week, Insight.INSIGHT_NAMES[Insight.MATCH_AVERAGES_BY_WEEK], year))
+            if elim_match_averages_by_week != []:
+                insights.append(self._createInsight(elim_match_averages_by_week, Insight.INSIGHT_NAMES[Insight.ELIM_MATCH_AVERAGES_BY_WEEK], year))
+            return insights
+
+        @classmethod
+        def _calculateScoreDistribution(self, week_event_matches, year):
+            """
+            Returns a list of Insights, one for all data and one for elim data
+            The data for each Insight is a dict:
+            Key: Middle score of a bucketed range of scores, Value: % occurrence
+            """
+            score_distribution = defaultdict(int)
+            elim_score_distribution = defaultdict(int)
+            overall_highscore = 0
+            for _, week_events in week_event_matches:
+                for _, matches in week_events:
+                    for match in matches:
+                        if not match.has_been_played:
+                            continue
+                        redScore = int(match.alliances['red']['score'])
+                        blueScore = int(match.alliances['blue']['score'])
+
+                        overall_highscore = max(overall_highscore, redScore, blueScore)
+
+                        score_distribution[redScore] += 1
+                        score_distribution[blueScore] += 1
+
+                        if match.comp_level in Match.ELIM_LEVELS:
+                            elim_score_distribution[redScore] += 1
+                            elim_score_distribution[blueScore] += 1
+
+            insights = []
+            if score_distribution != {}:
+                binAmount = math.ceil(float(overall_highscore) / 20)
+                totalCount = float(sum(score_distribution.values()))
+                score_distribution_normalized = {}
+                for score, amount in score_distribution.items():
+                    roundedScore = score - int(score % binAmount) + binAmount / 2  # Round off and then center in the bin
+                    contribution = float(amount) * 100 / totalCount
+                    if roundedScore in score_distribution_normalized:
+                        score_distribution_normalized[roundedScore] += contribution
+                    else:
+                        score_distribution_normalized[roundedScore] = contribution
+                insights.append(self._createInsight(score_distribution_normalized, Insight.INSIGHT_NAMES[Insight.SCORE_DISTRIBUTION], year))
+            if elim_score_distribution != {}:
+                if binAmount is None:  # Use same binAmount from above if possible
+                    binAmount = math.ceil(float(overall_highscore) / 20)
+                totalCount = float(sum(elim_score_distribution.values()))
+                elim_score_distribution_normalized = {}
+                for score, amount in elim_score_distribution.items():
+                    roundedScore = score - int(score % binAmount) + binAmount / 2
+                    contribution = float(amount) * 100 / totalCount
+                    if roundedScore in elim_score_distribution_normalized:
+                        elim_score_distribution_normalized[roundedScore] += contribution
+                    else:
+                        elim_score_distribution_normalized[roundedScore] = contribution
+                insights.append(self._createInsight(elim_score_distribution_normalized, Insight.INSIGHT_NAMES[Insight.ELIM_SCORE_DISTRIBUTION], year))
+
+            return insights
+
+        @classmethod
+        def _calculateNumMatches(self, week_event_matches, year):
+            """
+            Returns an Insight where the data is the number of matches
+            """
+            numMatches = 0
+            for _, week_events in week_event_matches:
+                for _, matches in week_events:
+                    numMatches += len(matches)
+
+            insight = None
+            if numMatches != 0:
+                insight = self._createInsight(numMatches, Insight.INSIGHT_NAMES[Insight.NUM_MATCHES], year)
+            if insight is not None:
+                return [insight]
+            else:
+                return []
+
+    return OriginalInsightsHelper
+
+
+def make_season(Event, Match, year, num_weeks, events_per_week, seed):
+    """
+    Returns week_event_matches with unsaved Events and Matches,
+    roughly the size of a real season
+    """
+    rng = random.Random(seed)
+    week_event_matches = []
+    for week in xrange(num_weeks):
+        week_events = []
+        for i in xrange(events_per_week):
+            event = Event(id='{}e{}w{}'.format(year, i, week), year=year, name='Event {} Week {}'.format(i, week), event_short='e{}w{}'.format(i, week))
+            matches = []
+            for j in xrange(90):
+                if j < 75:
+                    comp_level, set_number, match_number = 'qm', 1, j + 1
+                else:
+                    comp_level, set_number, match_number = rng.choice(['qf', 'sf', 'f']), j % 4 + 1, j % 3 + 1
+                played = rng.random() > 0.02
+                alliances = {}
+                score_breakdown = {}
+                for color in ['red', 'blue']:
+                    alliances[color] = {
+                        'teams': ['frc{}'.format(rng.randint(1, 7000)) for _ in xrange(3)],
+                        'score': rng.randint(0, 450) if played else -1,
+                    }
+                    score_breakdown[color] = {'foulPoints': rng.choice([0, 0, 0, 5, 25, 50])}
+                matches.append(Match(
+                    id=Match.renderKeyName(event.key.id(), comp_level, set_number, match_number),
+                    event=event.key,
+                    year=year,
+                    comp_level=comp_level,
+                    set_number=set_number,
+                    match_number=match_number,
+                    alliances_json=json.dumps(alliances),
+                    score_breakdown_json=json.dumps(score_breakdown)))
+            week_events.append((event, matches))
+        week_event_matches.append(('Week {}'.format(week + 1), week_events))
+    return week_event_matches
+
+
+def run(helper, week_event_matches, year, columnar):
+    insights = []
+    if columnar:
+        columns = helper._extractMatchColumns(week_event_matches, year)
+        insights += helper._calculateHighscoreMatchesByWeek(week_event_matches, columns, year)
+        insights += helper._calculateHighscoreMatches(columns, year)
+        insights += helper._calculateMatchAveragesByWeek(week_event_matches, columns, year)
+        insights += helper._calculateScoreDistribution(columns, year)
+        insights += helper._calculateNumMatches(columns, year)
+    else:
+        insights += helper._calculateHighscoreMatchesByWeek(week_event_matches, year)
+        insights += helper._calculateHighscoreMatches(week_event_matches, year)
+        insights += helper._calculateMatchAveragesByWeek(week_event_matches, year)
+        insights += helper._calculateScoreDistribution(week_event_matches, year)
+        insights += helper._calculateNumMatches(week_event_matches, year)
+    return [(insight.name, insight.data_json) for insight in insights]
+
+
+def main(sdk_path, year, num_weeks, events_per_week):
+    sys.path.insert(0, sdk_path)
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+    import dev_appserver
+    dev_appserver.fix_sys_path()
+
+    from google.appengine.ext import testbed
+    tb = testbed.Testbed()
+    tb.activate()
+    tb.init_datastore_v3_stub()
+    tb.init_memcache_stub()
+
+    from helpers.insights_helper import InsightsHelper
+    from models.event import Event
+    from models.insight import Insight
+    from models.match import Match
+    OriginalInsightsHelper = make_original_insights_helper(InsightsHelper, Insight, Match)
+
+    # Fresh, unparsed matches for each run so JSON decoding is included
+    original_season = make_season(Event, Match, year, num_weeks, events_per_week, seed=0)
+    current_season = make_season(Event, Match, year, num_weeks, events_per_week, seed=0)
+    num_matches = sum(len(matches) for _, week_events in original_season for _, matches in week_events)
+
+    start = time.time()
+    original = run(OriginalInsightsHelper, original_season, year, columnar=False)
+    original_time = time.time() - start
+
+    start = time.time()
+    current = run(InsightsHelper, current_season, year, columnar=True)
+    current_time = time.time() - start
+
+    print "{} matches in {} weeks".format(num_matches, num_weeks)
+    print "Original: {:.2f}s".format(original_time)
+    print "Current:  {:.2f}s ({:.1f}x)".format(current_time, original_time / current_time)
+    print "Identical insights: {}".format(original == current)
+
+    tb.deactivate()
+
+
+if __name__ == '__main__':
+    parser = OptionParser()
+    parser.add_option('-s', '--sdk_path', dest='sdk_path', default='/usr/local/google_appengine')
+    parser.add_option('-y', '--year', dest='year', type='int', default=2017)
+    parser.add_option('-w', '--weeks', dest='weeks', type='int', default=7)
+    parser.add_option('-e', '--events_per_week', dest='events_per_week', type='int', default=18)
+    options, _ = parser.parse_args()
+    main(options.sdk_path, options.year, options.weeks, options.events_per_week)